@@ -438,8 +438,23 @@ NFPA 72 Requirements:
         try:
             from app.plan_set_analyzer import PlanSetAnalyzer
 
-            analyzer = PlanSetAnalyzer()
-            analysis = analyzer.analyze_plan_set(self.plan_set_files)
+            files = self.plan_set_files
+            analyzer = PlanSetAnalyzer(
+                workers=min(len(files), os.cpu_count() or 1), sheet_timeout_s=120.0
+            )
+
+            def on_sheet(index, sheet):
+                name = os.path.basename(files[index])
+                if isinstance(sheet, Exception):
+                    self.log.append(f"   ⚠️ {name}: {sheet}")
+                else:
+                    self.log.append(
+                        f"   ✓ {name}: {len(sheet.fire_layers)} fire layer(s), "
+                        f"{sheet.device_count} device(s)"
+                    )
+                QtWidgets.QApplication.processEvents()
+
+            analysis = analyzer.analyze_plan_set(files, on_sheet=on_sheet)
             report = analyzer.format_analysis_report(analysis)
 
             self.log.append(report)
@@ -78,6 +78,30 @@ def load_catalog():
     return [_normalize_proto(d) for d in _builtin()]
 
 
+SEARCH_LIMIT = 200
+
+
+def search_devices(
+    query: str, filters: dict | None = None, limit: int | None = SEARCH_LIMIT
+) -> list[dict] | None:
+    """Catalog devices matching ``query``, best match first, at most ``limit``.
+
+    ``filters`` may hold ``manufacturer`` and/or ``type`` for exact matches.
+    Returns None when no populated catalog database is available, so callers
+    can fall back to filtering the loaded device dicts.
+    """
+    if db_connection is None or db_loader is None:
+        return None
+    try:
+        con = db_connection.get_connection()
+        if not con.execute("SELECT 1 FROM devices LIMIT 1").fetchone():
+            return None
+        rows = db_loader.search_devices(con, query, filters, limit=limit)
+    except Exception:
+        return None
+    return [_normalize_proto(d) for d in rows]
+
+
 def _normalize_proto(proto: dict) -> dict:
     """Ensure required fields exist and provide a display_name for UI.
 
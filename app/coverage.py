@@ -1,12 +1,202 @@
+import numpy as np
 from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtCore import QPointF, QRectF
 from PySide6.QtGui import QPainterPath
 
-try:
-    # For type hints only (avoid hard import cycles)
-    from .device import DeviceItem  # noqa: F401
-except Exception:
-    pass
+# Packed footprint columns: centre, circle radius, square half-side (0 = none), style
+_X, _Y, _R, _HALF, _STYLE = range(5)
+
+
+def _style(color: QtGui.QColor, fill: QtGui.QColor):
+    """(circle pen, circle brush, square pen, square brush) in the device overlay look."""
+    cpen = QtGui.QPen(color)
+    cpen.setCosmetic(True)
+    cpen.setStyle(QtCore.Qt.DashLine)
+    spen = QtGui.QPen(color)
+    spen.setCosmetic(True)
+    spen.setStyle(QtCore.Qt.DotLine)
+    return cpen, QtGui.QBrush(fill), spen, QtGui.QBrush(fill)
+
+
+# Style ids used by DeviceItem: manually set coverage, and auto-sized coverage
+MANUAL, AUTO = 0, 1
+DEVICE_STYLES = (
+    _style(QtGui.QColor(255, 193, 7, 200), QtGui.QColor(255, 193, 7, 40)),  # Yellow/Amber
+    _style(QtGui.QColor(80, 170, 255, 200), QtGui.QColor(80, 170, 255, 40)),  # Blue
+)
+
+
+class CoverageOverlayItem(QtWidgets.QGraphicsItem):
+    """Every coverage footprint of a scene, painted by one item.
+
+    Footprints (a circle and/or a square around a centre) live in one packed
+    array, keyed by owner. ``paint`` culls them against the exposed rect and
+    draws each style as a single path, so thousands of devices cost one item
+    instead of two per device. Moving one footprint repaints only its old and
+    new extents. The item has no shape: it never takes clicks or hit tests.
+    """
+
+    def __init__(self, styles=DEVICE_STYLES, parent=None):
+        super().__init__(parent)
+        self.styles = list(styles)
+        self._data = np.zeros((0, 5))
+        self._active = np.zeros(0, dtype=bool)
+        self._slots: dict = {}
+        self._free: list[int] = []
+        self._bounds = QRectF()
+        self.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+        self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+    # ---- footprints
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    @staticmethod
+    def _extent(row) -> QRectF:
+        reach = max(row[_R], row[_HALF])
+        return QRectF(row[_X] - reach, row[_Y] - reach, 2 * reach, 2 * reach)
+
+    def _alloc(self) -> int:
+        if not self._free:
+            # Double the packed arrays; new slots start inactive and free
+            n = len(self._data)
+            grow = max(64, n)
+            self._data = np.concatenate([self._data, np.zeros((grow, 5))])
+            self._active = np.concatenate([self._active, np.zeros(grow, dtype=bool)])
+            self._free.extend(range(n + grow - 1, n - 1, -1))
+        return self._free.pop()
+
+    def _changed(self, rect: QRectF):
+        """Grow the bounds to cover ``rect`` if needed, then repaint just ``rect``."""
+        if not self._bounds.contains(rect):
+            self.prepareGeometryChange()
+            self._bounds = self._bounds.united(rect) if not self._bounds.isNull() else rect
+        self.update(rect)
+
+    def set_footprint(self, key, x, y, radius=0.0, half_side=0.0, style=0):
+        """Add or replace ``key``'s footprint; nothing is drawn if both sizes are 0."""
+        if radius <= 0 and half_side <= 0:
+            self.remove(key)
+            return
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = self._alloc()
+        else:
+            self.update(self._extent(self._data[slot]))
+        self._data[slot] = (x, y, radius, half_side, style)
+        self._active[slot] = True
+        self._changed(self._extent(self._data[slot]))
+
+    def move(self, key, x, y):
+        """Recentre ``key``'s footprint, repainting only where it was and is."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return
+        row = self._data[slot]
+        self.update(self._extent(row))
+        row[_X], row[_Y] = x, y
+        self._changed(self._extent(row))
+
+    def remove(self, key):
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        self._active[slot] = False
+        self._free.append(slot)
+        self.update(self._extent(self._data[slot]))
+
+    def set_footprints(self, centers, radii=0.0, half_sides=0.0, styles=0):
+        """Replace all footprints with packed arrays; keys are row numbers."""
+        centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+        n = len(centers)
+        data = np.empty((n, 5))
+        data[:, _X:_R] = centers
+        data[:, _R] = np.broadcast_to(np.asarray(radii, dtype=float), n)
+        data[:, _HALF] = np.broadcast_to(np.asarray(half_sides, dtype=float), n)
+        data[:, _STYLE] = np.broadcast_to(np.asarray(styles, dtype=float), n)
+        self.prepareGeometryChange()
+        self._data = data
+        self._active = (data[:, _R] > 0) | (data[:, _HALF] > 0)
+        self._slots = {i: i for i in np.flatnonzero(self._active).tolist()}
+        self._free = np.flatnonzero(~self._active).tolist()[::-1]
+        self._bounds = self._packed_bounds()
+        self.update()
+
+    def clear(self):
+        self.set_footprints(np.zeros((0, 2)))
+
+    def _packed_bounds(self) -> QRectF:
+        rows = self._data[self._active]
+        if not len(rows):
+            return QRectF()
+        reach = np.maximum(rows[:, _R], rows[:, _HALF])
+        x0, y0 = (rows[:, _X] - reach).min(), (rows[:, _Y] - reach).min()
+        x1, y1 = (rows[:, _X] + reach).max(), (rows[:, _Y] + reach).max()
+        return QRectF(x0, y0, x1 - x0, y1 - y0)
+
+    # ---- QGraphicsItem
+    def boundingRect(self) -> QRectF:
+        # Cosmetic pens draw ~1 device pixel outside the geometry; pad a little
+        return self._bounds.adjusted(-2, -2, 2, 2) if not self._bounds.isNull() else QRectF()
+
+    def shape(self) -> QPainterPath:
+        return QPainterPath()
+
+    def visible_rows(self, rect: QRectF) -> np.ndarray:
+        """Footprints whose extent intersects ``rect`` (the culling step of `paint`)."""
+        rows = self._data[self._active]
+        reach = np.maximum(rows[:, _R], rows[:, _HALF])
+        keep = (
+            (rows[:, _X] + reach >= rect.left())
+            & (rows[:, _X] - reach <= rect.right())
+            & (rows[:, _Y] + reach >= rect.top())
+            & (rows[:, _Y] - reach <= rect.bottom())
+        )
+        return rows[keep]
+
+    def paint(self, painter, option, widget=None):
+        rows = self.visible_rows(option.exposedRect)
+        if not len(rows):
+            return
+        for style in np.unique(rows[:, _STYLE]).astype(int).tolist():
+            if not 0 <= style < len(self.styles):
+                continue
+            cpen, cbrush, spen, sbrush = self.styles[style]
+            mine = rows[rows[:, _STYLE] == style]
+            squares = mine[mine[:, _HALF] > 0]
+            circles = mine[mine[:, _R] > 0]
+            if len(squares):
+                path = QPainterPath()
+                path.setFillRule(QtCore.Qt.WindingFill)
+                for x, y, h in squares[:, [_X, _Y, _HALF]].tolist():
+                    path.addRect(x - h, y - h, 2 * h, 2 * h)
+                painter.setPen(spen)
+                painter.setBrush(sbrush)
+                painter.drawPath(path)
+            if len(circles):
+                path = QPainterPath()
+                path.setFillRule(QtCore.Qt.WindingFill)
+                for x, y, r in circles[:, [_X, _Y, _R]].tolist():
+                    path.addEllipse(QPointF(x, y), r, r)
+                painter.setPen(cpen)
+                painter.setBrush(cbrush)
+                painter.drawPath(path)
+
+
+def coverage_overlay(
+    scene: QtWidgets.QGraphicsScene, create: bool = True
+) -> CoverageOverlayItem | None:
+    """The scene's shared device coverage overlay (z just beneath the device layer)."""
+    overlay = getattr(scene, "_coverage_overlay", None)
+    if overlay is None and create:
+        overlay = CoverageOverlayItem()
+        overlay.setZValue(95)
+        scene.addItem(overlay)
+        scene._coverage_overlay = overlay
+    return overlay
 
 
 def rebuild_overlay(
@@ -15,14 +205,13 @@ def rebuild_overlay(
     size: float = 120.0,
     pen: QtGui.QPen | None = None,
     brush: QtGui.QBrush | None = None,
-) -> None:
+) -> CoverageOverlayItem:
     """Rebuilds simple coverage glyphs (square with inner circle) centered on each device.
     - size: outer square width/height (scene units)
-    """
-    # Clear previous overlay
-    for it in list(overlay_group.childItems()):
-        it.scene().removeItem(it)
 
+    All glyphs are drawn by one `CoverageOverlayItem` under ``overlay_group``,
+    reused across rebuilds.
+    """
     if pen is None:
         pen = QtGui.QPen(QtCore.Qt.darkBlue)
         pen.setCosmetic(True)
@@ -30,9 +219,16 @@ def rebuild_overlay(
     if brush is None:
         brush = QtGui.QBrush(QtCore.Qt.transparent)
 
-    half = float(size) / 2.0
-    inner_r = float(size) * 0.35  # inner circle radius
+    overlay = next(
+        (it for it in overlay_group.childItems() if isinstance(it, CoverageOverlayItem)), None
+    )
+    if overlay is None:
+        overlay = CoverageOverlayItem()
+        overlay.setZValue(79)  # just beneath devices_group (which is usually 100)
+        overlay.setParentItem(overlay_group)
+    overlay.styles = [(pen, brush, pen, brush)]
 
+    centers = []
     for it in devices_group.childItems():
         # Only draw for device-like items having rect()/center()
         if not hasattr(it, "rect"):
@@ -41,15 +237,7 @@ def rebuild_overlay(
             c: QPointF = it.rect().center()
         except Exception:
             continue
+        centers.append((c.x(), c.y()))
 
-        # Build square + circle path
-        path = QPainterPath()
-        rect = QRectF(c.x() - half, c.y() - half, size, size)
-        path.addRect(rect)
-        path.addEllipse(QRectF(c.x() - inner_r, c.y() - inner_r, inner_r * 2, inner_r * 2))
-
-        gp = QtWidgets.QGraphicsPathItem(path)
-        gp.setPen(pen)
-        gp.setBrush(brush)
-        gp.setZValue(79)  # just beneath devices_group (which is usually 100)
-        gp.setParentItem(overlay_group)
+    overlay.set_footprints(centers, float(size) * 0.35, float(size) / 2.0)
+    return overlay
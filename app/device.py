@@ -1,5 +1,7 @@
 from PySide6 import QtCore, QtGui, QtWidgets
 
+from app.coverage import AUTO, MANUAL, coverage_overlay
+
 
 class DeviceItem(QtWidgets.QGraphicsItemGroup):
     """Device glyph + label + optional coverage overlays (strobe/speaker/smoke)."""
@@ -62,31 +64,8 @@ class DeviceItem(QtWidgets.QGraphicsItemGroup):
             "px_per_ft": 12.0,
         }
         self.coverage_enabled = True
-        self._cov_circle = QtWidgets.QGraphicsEllipseItem()
-        self._cov_circle.setZValue(-10)
-        self._cov_circle.setVisible(False)
-        self._cov_circle.setAcceptedMouseButtons(QtCore.Qt.NoButton)
-        self._cov_circle.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, False)
-        self._cov_circle.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, False)
-        cpen = QtGui.QPen(QtGui.QColor(80, 170, 255, 200))
-        cpen.setCosmetic(True)
-        cpen.setStyle(QtCore.Qt.DashLine)
-        self._cov_circle.setPen(cpen)
-        self._cov_circle.setBrush(QtGui.QColor(80, 170, 255, 40))
-        self.addToGroup(self._cov_circle)
-
-        self._cov_square = QtWidgets.QGraphicsRectItem()
-        self._cov_square.setZValue(-11)
-        self._cov_square.setVisible(False)
-        self._cov_square.setAcceptedMouseButtons(QtCore.Qt.NoButton)
-        self._cov_square.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, False)
-        self._cov_square.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, False)
-        spen = QtGui.QPen(QtGui.QColor(80, 170, 255, 140))
-        spen.setCosmetic(True)
-        spen.setStyle(QtCore.Qt.DotLine)
-        self._cov_square.setPen(spen)
-        self._cov_square.setBrush(QtGui.QColor(80, 170, 255, 25))
-        self.addToGroup(self._cov_square)
+        # Footprints are drawn by the scene's shared CoverageOverlayItem
+        self.setFlag(QtWidgets.QGraphicsItem.ItemSendsScenePositionChanges, True)
 
         self.setPos(x, y)
 
@@ -95,6 +74,19 @@ class DeviceItem(QtWidgets.QGraphicsItemGroup):
         if change == QtWidgets.QGraphicsItem.ItemSelectedChange:
             sel = bool(value)
             self._halo.setVisible(sel)
+        elif change == QtWidgets.QGraphicsItem.ItemScenePositionHasChanged:
+            overlay = self._coverage_overlay(create=False)
+            if overlay is not None:
+                overlay.move(self, value.x(), value.y())
+        elif change == QtWidgets.QGraphicsItem.ItemSceneChange:
+            overlay = self._coverage_overlay(create=False)
+            if overlay is not None:
+                overlay.remove(self)
+        elif change in (
+            QtWidgets.QGraphicsItem.ItemSceneHasChanged,
+            QtWidgets.QGraphicsItem.ItemVisibleHasChanged,
+        ):
+            self._update_coverage_items()
         return super().itemChange(change, value)
 
     def set_label_text(self, text: str):
@@ -114,50 +106,35 @@ class DeviceItem(QtWidgets.QGraphicsItemGroup):
         self.coverage.update(cfg)
         self._update_coverage_items()
 
-    def _update_coverage_items(self):
-        if not self.coverage_enabled:
-            self._cov_circle.setVisible(False)
-            self._cov_square.setVisible(False)
-            return
-
-        source = self.coverage.get("source", "manual")
-        if source == "manual":
-            color = QtGui.QColor(255, 193, 7, 200)  # Yellow/Amber
-            brush_color = QtGui.QColor(255, 193, 7, 40)
-        else:  # auto
-            color = QtGui.QColor(80, 170, 255, 200)  # Blue
-            brush_color = QtGui.QColor(80, 170, 255, 40)
-
-        cpen = self._cov_circle.pen()
-        cpen.setColor(color)
-        self._cov_circle.setPen(cpen)
-        self._cov_circle.setBrush(brush_color)
-
-        spen = self._cov_square.pen()
-        spen.setColor(color)
-        self._cov_square.setPen(spen)
-        self._cov_square.setBrush(brush_color)
+    def _coverage_overlay(self, create=True):
+        scene = self.scene()
+        return coverage_overlay(scene, create) if scene is not None else None
 
+    def _update_coverage_items(self):
         mode = self.coverage.get("mode", "none")
         r_ft = float(self.coverage.get("computed_radius_ft") or 0.0)
         ppf = float(self.coverage.get("px_per_ft") or 12.0)
         r_px = r_ft * ppf
+        shown = self.coverage_enabled and mode != "none" and r_px > 0 and self.isVisible()
 
-        # hide all
-        self._cov_circle.setVisible(False)
-        self._cov_square.setVisible(False)
-        if mode == "none" or r_px <= 0:
+        overlay = self._coverage_overlay(create=shown)
+        if overlay is None:
             return
-
-        # circle always
-        self._cov_circle.setRect(-r_px, -r_px, 2 * r_px, 2 * r_px)
-        self._cov_circle.setVisible(True)
-
-        # if strobe + ceiling: show square footprint
-        if mode == "strobe" and self.coverage.get("mount", "ceiling") == "ceiling":
-            side = 2 * r_px
-            self._cov_square.setRect(-side / 2, -side / 2, side, side)
-            self._cov_square.setVisible(True)
+        if not shown:
+            overlay.remove(self)
+            return
+        # circle always; strobe + ceiling also shows the square footprint
+        square = mode == "strobe" and self.coverage.get("mount", "ceiling") == "ceiling"
+        source = self.coverage.get("source", "manual")
+        pos = self.scenePos()
+        overlay.set_footprint(
+            self,
+            pos.x(),
+            pos.y(),
+            r_px,
+            r_px if square else 0.0,
+            MANUAL if source == "manual" else AUTO,
+        )
 
     def set_coverage_enabled(self, on: bool):
         self.coverage_enabled = bool(on)
@@ -191,3 +168,43 @@ class DeviceItem(QtWidgets.QGraphicsItemGroup):
             it.set_coverage(cov)
         it.set_coverage_enabled(bool(d.get("show_coverage", True)))
         return it
+
+    def apply_json(self, d: dict):
+        """Update this device in place from `to_json` output."""
+        self.setPos(float(d.get("x", 0)), float(d.get("y", 0)))
+        self.symbol = d.get("symbol", "?")
+        self.manufacturer = d.get("manufacturer", "")
+        self.part_number = d.get("part_number", "")
+        name = d.get("name", "Device")
+        if name != self.name:
+            self.name = name
+            self._label.setText(name)
+        cov = d.get("coverage")
+        if cov:
+            self.coverage = dict(cov)
+        self.set_coverage_enabled(bool(d.get("show_coverage", True)))
+
+
+def apply_coverage(items, coverages) -> int:
+    """
+    Set coverage on many devices as one scene update.
+
+    View repaints are suspended while the overlays change and each scene is
+    repainted once afterwards, instead of once per device. ``coverages`` pairs
+    with ``items``; None entries leave that device unchanged. Returns the number
+    of devices updated.
+    """
+    pairs = [(it, cov) for it, cov in zip(items, coverages) if cov]
+    scenes = {it.scene() for it, _ in pairs} - {None}
+    views = [v for s in scenes for v in s.views() if v.updatesEnabled()]
+    for v in views:
+        v.setUpdatesEnabled(False)
+    try:
+        for it, cov in pairs:
+            it.set_coverage(cov)
+    finally:
+        for v in views:
+            v.setUpdatesEnabled(True)
+    for s in scenes:
+        s.update()
+    return len(pairs)
@@ -0,0 +1,259 @@
+"""Lazy, virtualized device palette model.
+
+The palette is a two-level tree: device types, then devices. Only the type
+rows and their match counts are loaded up front; a type's devices are read
+from the catalog a page at a time as the view scrolls (Qt's
+``canFetchMore``/``fetchMore``) and dropped again when the type collapses,
+so memory stays flat however large the catalog is. Search and filters are
+pushed down into one catalog query per change instead of a walk over
+every device.
+"""
+
+from collections import Counter
+
+from PySide6 import QtCore, QtWidgets
+from PySide6.QtCore import QModelIndex, Qt
+
+from app import catalog
+
+PAGE_SIZE = 200
+# internalId of type rows; device rows store their type row + 1
+_GROUP_ID = 0
+
+
+class CatalogSource:
+    """Palette queries against the catalog database (FTS-ranked search)."""
+
+    def __init__(self, con):
+        self.con = con
+
+    def groups(self, query: str, filters: dict) -> list[tuple[str | None, int]]:
+        return catalog.db_loader.device_type_counts(self.con, query, filters)
+
+    def devices(self, group, query: str, filters: dict, offset: int, limit: int) -> list[dict]:
+        rows = catalog.db_loader.search_devices(
+            self.con, query, {**filters, "type": group}, limit, offset
+        )
+        return [catalog._normalize_proto(d) for d in rows]
+
+
+class ListSource:
+    """The same queries over an in-memory device list (built-in catalog)."""
+
+    def __init__(self, devices: list[dict]):
+        self._devices = sorted(devices, key=lambda d: d.get("name", ""))
+
+    def _matching(self, query: str, filters: dict):
+        words = query.lower().split()
+        for d in self._devices:
+            if filters.get("manufacturer") and d.get("manufacturer") != filters["manufacturer"]:
+                continue
+            if filters.get("type") and d.get("type") != filters["type"]:
+                continue
+            text = " ".join(
+                str(d.get(k, "")) for k in ("name", "symbol", "part_number", "manufacturer")
+            ).lower()
+            if all(w in text for w in words):
+                yield d
+
+    def groups(self, query: str, filters: dict) -> list[tuple[str | None, int]]:
+        counts = Counter(d.get("type") for d in self._matching(query, filters))
+        return sorted(counts.items(), key=lambda kv: (kv[0] is None, kv[0] or ""))
+
+    def devices(self, group, query: str, filters: dict, offset: int, limit: int) -> list[dict]:
+        rows = [d for d in self._matching(query, filters) if d.get("type") == group]
+        return rows[offset : offset + limit]
+
+
+def palette_source(devices: list[dict] | None = None):
+    """Catalog database source when one is populated, else a list source."""
+    if catalog.db_connection is not None and catalog.db_loader is not None:
+        try:
+            con = catalog.db_connection.get_connection()
+            if con.execute("SELECT 1 FROM devices LIMIT 1").fetchone():
+                return CatalogSource(con)
+        except Exception:
+            pass
+    return ListSource(devices if devices is not None else catalog.load_catalog())
+
+
+class _Group:
+    __slots__ = ("key", "count", "devices")
+
+    def __init__(self, key, count: int):
+        self.key = key
+        self.count = count
+        self.devices: list[dict] = []
+
+
+class DeviceCatalogModel(QtCore.QAbstractItemModel):
+    """Device types with lazily paged devices; ``Qt.UserRole`` is the device dict."""
+
+    def __init__(self, source, page_size: int = PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.page_size = int(page_size)
+        self.query = ""
+        self.filters: dict = {}
+        self._groups: list[_Group] = []
+        self.set_query("")
+
+    def set_query(self, query: str, filters: dict | None = None):
+        """Re-run the palette query; loaded device pages are discarded."""
+        self.beginResetModel()
+        self.query = query.strip()
+        self.filters = dict(filters or {})
+        self._groups = [_Group(k, n) for k, n in self.source.groups(self.query, self.filters)]
+        self.endResetModel()
+
+    def match_count(self) -> int:
+        return sum(g.count for g in self._groups)
+
+    def loaded_count(self) -> int:
+        return sum(len(g.devices) for g in self._groups)
+
+    def _group(self, index: QModelIndex) -> _Group | None:
+        if index.isValid() and index.internalId() == _GROUP_ID:
+            return self._groups[index.row()]
+        return None
+
+    def device(self, index: QModelIndex) -> dict | None:
+        if not index.isValid() or index.internalId() == _GROUP_ID:
+            return None
+        return self._groups[index.internalId() - 1].devices[index.row()]
+
+    # ---- tree structure
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, _GROUP_ID)
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid() or index.internalId() == _GROUP_ID:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, _GROUP_ID)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._groups)
+        group = self._group(parent)
+        return len(group.devices) if group is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._groups)
+        group = self._group(parent)
+        return group is not None and group.count > 0
+
+    # ---- lazy paging
+    def canFetchMore(self, parent):
+        group = self._group(parent)
+        return group is not None and len(group.devices) < group.count
+
+    def fetchMore(self, parent):
+        group = self._group(parent)
+        if group is None:
+            return
+        start = len(group.devices)
+        page = self.source.devices(group.key, self.query, self.filters, start, self.page_size)
+        if not page:
+            group.count = start  # catalog changed underneath; stop fetching
+            return
+        self.beginInsertRows(parent, start, start + len(page) - 1)
+        group.devices.extend(page)
+        self.endInsertRows()
+
+    def release(self, parent: QModelIndex):
+        """Drop a type's loaded devices (e.g. on collapse); they refetch on demand."""
+        group = self._group(parent)
+        if group is None or not group.devices:
+            return
+        self.beginRemoveRows(parent, 0, len(group.devices) - 1)
+        group.devices = []
+        self.endRemoveRows()
+
+    # ---- display
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.internalId() == _GROUP_ID:
+            return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        group = self._group(index)
+        if group is not None:
+            if role == Qt.DisplayRole:
+                return f"{group.key or 'Unknown'} ({group.count})"
+            return None
+        dev = self.device(index)
+        if role == Qt.DisplayRole:
+            txt = f"{dev.get('name', '<unknown>')} ({dev.get('symbol', '')})"
+            if dev.get("part_number"):
+                txt += f" - {dev['part_number']}"
+            return txt
+        if role == Qt.ToolTipRole:
+            lines = [f"Name: {dev.get('name', '')}", f"Symbol: {dev.get('symbol', '')}"]
+            if dev.get("manufacturer") and dev["manufacturer"] != "(Any)":
+                lines.append(f"Manufacturer: {dev['manufacturer']}")
+            if dev.get("part_number"):
+                lines.append(f"Part Number: {dev['part_number']}")
+            return "\n".join(lines)
+        if role == Qt.UserRole:
+            return dev
+        return None
+
+
+class DevicePaletteProxy(QtCore.QSortFilterProxyModel):
+    """Sorts and hides type rows; devices keep the catalog's (ranked) order."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortCaseSensitivity(Qt.CaseInsensitive)
+        self.setDynamicSortFilter(True)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if source_parent.isValid():
+            return True
+        model = self.sourceModel()
+        return model.hasChildren(model.index(source_row, 0, source_parent))
+
+    def lessThan(self, left, right):
+        if left.parent().isValid():
+            return left.row() < right.row()
+        return super().lessThan(left, right)
+
+
+def make_palette_view(
+    source=None, parent=None
+) -> tuple[QtWidgets.QTreeView, DeviceCatalogModel, DevicePaletteProxy]:
+    """A uniform-row tree view wired to a lazy catalog model and its proxy."""
+    model = DeviceCatalogModel(source if source is not None else palette_source(), parent=parent)
+    proxy = DevicePaletteProxy(parent)
+    proxy.setSourceModel(model)
+    proxy.sort(0, Qt.AscendingOrder)
+    view = QtWidgets.QTreeView(parent)
+    view.setModel(proxy)
+    view.setHeaderHidden(True)
+    view.setUniformRowHeights(True)  # lets the view skip measuring every row
+    view.setAlternatingRowColors(True)
+    view.collapsed.connect(lambda idx: model.release(proxy.mapToSource(idx)))
+    return view, model, proxy
+
+
+__all__ = [
+    "PAGE_SIZE",
+    "CatalogSource",
+    "ListSource",
+    "palette_source",
+    "DeviceCatalogModel",
+    "DevicePaletteProxy",
+    "make_palette_view",
+]
@@ -0,0 +1,202 @@
+"""On-disk cache of flattened DXF underlays.
+
+Parsing a large DXF through ezdxf dominates reopen time, so the flattened
+per-layer polylines are written once to a compact binary file keyed by the
+DXF's content hash and ``px_per_ft``. A reopen memory-maps that file and
+rebuilds paths straight from the mapped arrays.
+
+File layout (little-endian header; the arrays are mapped in place, so they
+keep the writing host's byte order, recorded in the header; a file written
+on a host of the other byte order is treated as a miss)::
+
+    header: b"LVDXFC", uint16 version, byte order b"<" or b">",
+            uint64 table offset, uint32 table length
+    per layer, 8-byte aligned: uint32[runs] vertices per polyline,
+                               float64[2 * points] interleaved x, y
+    layer table: UTF-8 JSON list of {name, color, runs, points, runs_at, points_at}
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from PySide6 import QtGui
+
+from backend.catalog_store import get_catalog_path
+
+_logger = logging.getLogger(__name__)
+
+MAGIC = b"LVDXFC"
+VERSION = 2
+_HEADER = struct.Struct("<6sHcQI")
+BYTE_ORDER = b"<" if sys.byteorder == "little" else b">"
+SUFFIX = ".lvdxf"
+
+
+def default_cache_dir() -> str:
+    """``dxf_cache`` next to the catalog database (``~/AutoFire``)."""
+    return os.path.join(os.path.dirname(get_catalog_path()), "dxf_cache")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def path_polylines(path: QtGui.QPainterPath) -> list[list[tuple[float, float]]]:
+    """Flatten a path into polylines (curves approximated by Qt)."""
+    return [[(p.x(), p.y()) for p in poly] for poly in path.toSubpathPolygons()]
+
+
+def polylines_path(runs, points) -> QtGui.QPainterPath:
+    """Rebuild a path from run lengths and interleaved x, y coordinates."""
+    path = QtGui.QPainterPath()
+    i = 0
+    for n in runs:
+        path.moveTo(points[i], points[i + 1])
+        for k in range(i + 2, i + 2 * n, 2):
+            path.lineTo(points[k], points[k + 1])
+        i += 2 * n
+    return path
+
+
+class CachedUnderlay:
+    """A memory-mapped cache file; ``layers`` yields zero-copy array views."""
+
+    def __init__(self, fileobj, mm: mmap.mmap, table: list[dict]):
+        self._file = fileobj
+        self._mm = mm
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def layers(self):
+        """Yield ``(name, color hex, run lengths, interleaved points)`` per layer."""
+        for entry in self.table:
+            ra, pa = entry["runs_at"], entry["points_at"]
+            with memoryview(self._mm) as view:
+                runs = view[ra : ra + 4 * entry["runs"]].cast("I")
+                points = view[pa : pa + 16 * entry["points"]].cast("d")
+                try:
+                    yield entry["name"], entry["color"], runs, points
+                finally:
+                    runs.release()
+                    points.release()
+
+    def close(self):
+        try:
+            self._mm.close()
+        finally:
+            self._file.close()
+
+
+class DxfCache:
+    """Directory of cached underlays, keyed by content hash and scale."""
+
+    def __init__(self, directory: str | None = None, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = int(max_bytes)
+
+    def key(self, dxf_path: str, px_per_ft: float) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        with open(dxf_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        h.update(f"|{VERSION}|{float(px_per_ft)!r}".encode())
+        return h.hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def open(self, key: str) -> CachedUnderlay | None:
+        """Memory-map a cached underlay, or None if absent or unreadable."""
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+        f = open(path, "rb")
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, order, table_at, table_len = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("unsupported DXF cache file")
+            if order != BYTE_ORDER:
+                raise ValueError("DXF cache written with another byte order")
+            table = json.loads(bytes(mm[table_at : table_at + table_len]))
+            os.utime(path)  # most recently used survives pruning
+            return CachedUnderlay(f, mm, table)
+        except Exception as ex:
+            f.close()
+            _logger.warning("Ignoring unreadable DXF cache %s: %s", path, ex)
+            return None
+
+    def save(self, key: str, layers: dict[str, tuple[str, list[QtGui.QPainterPath]]]) -> str:
+        """Write ``layer -> (color hex, [paths])``; returns the cache file path."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(key)
+        tmp = path + ".tmp"
+        table = []
+        with open(tmp, "wb") as f:
+            f.write(b"\0" * _HEADER.size)
+            for name, (color, paths) in layers.items():
+                runs = array("I")
+                coords = array("d")
+                for p in paths:
+                    for poly in path_polylines(p):
+                        if len(poly) < 2:
+                            continue
+                        runs.append(len(poly))
+                        for x, y in poly:
+                            coords.append(x)
+                            coords.append(y)
+                entry = {"name": name, "color": color, "runs": len(runs)}
+                entry["points"] = len(coords) // 2
+                f.write(b"\0" * (_align(f.tell()) - f.tell()))
+                entry["runs_at"] = f.tell()
+                runs.tofile(f)
+                f.write(b"\0" * (_align(f.tell()) - f.tell()))
+                entry["points_at"] = f.tell()
+                coords.tofile(f)
+                table.append(entry)
+            table_at = f.tell()
+            table_bytes = json.dumps(table, separators=(",", ":")).encode("utf-8")
+            f.write(table_bytes)
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, VERSION, BYTE_ORDER, table_at, len(table_bytes)))
+        os.replace(tmp, path)
+        self.prune()
+        return path
+
+    def prune(self):
+        """Drop least recently used files beyond ``max_bytes``."""
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(SUFFIX)]
+        except OSError:
+            return
+        files = []
+        for n in names:
+            p = os.path.join(self.directory, n)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in files)
+        for _, size, p in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(p)
+                total -= size
+            except OSError:
+                pass
+
+
+__all__ = ["DxfCache", "CachedUnderlay", "default_cache_dir", "polylines_path"]
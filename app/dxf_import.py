@@ -1,5 +1,15 @@
+import logging
+import queue
+import threading
+import time
+
 from PySide6 import QtCore, QtGui, QtWidgets
 
+from app.dxf_cache import DxfCache, polylines_path
+from app.dxf_tiles import TiledPathItem, TileSet
+
+_logger = logging.getLogger(__name__)
+
 
 def _aci_to_qcolor(aci: int) -> QtGui.QColor:
     # Basic AutoCAD Color Index mapping (fallbacks)
@@ -30,44 +40,122 @@ def _insunits_to_feet(code: int) -> float:
     return float(m.get(int(code or 0), 1.0))
 
 
-def _build_paths(doc, px_per_ft: float):
-    msp = doc.modelspace()
-    ins = int(doc.header.get("$INSUNITS", 0))
-    feet_per_unit = _insunits_to_feet(ins)
-    S = feet_per_unit * float(px_per_ft)
+def _layer_pen(color: QtGui.QColor) -> QtGui.QPen:
+    pen = QtGui.QPen(color)
+    pen.setCosmetic(True)
+    pen.setWidthF(0.0)
+    return pen
+
+
+# Block paths are built y-flipped (like scene coordinates) but unscaled
+_FLIP_Y = QtGui.QTransform.fromScale(1.0, -1.0)
+
 
-    # layer -> (QPainterPath, QPen, QColor)
-    layers = {}
+class _PathBuilder:
+    """Accumulates modelspace entities into per-layer QPainterPaths.
 
-    def get_layer_pack(name: str):
-        if name not in layers:
+    QPainterPath, QPen and QColor are plain value types, so a builder may run on
+    a worker thread. ``take`` hands over what was built since the last call.
+
+    Block definitions are flattened once into per-layer paths in block units
+    and stamped onto each INSERT with its transform. With ``block_instances``
+    top-level inserts are not baked into the layer path at all; they are
+    returned by ``take_instances`` as (shared path, transform) pairs.
+    """
+
+    def __init__(self, doc, px_per_ft: float, block_instances: bool = False, scale=None):
+        self.doc = doc
+        if scale is None:
+            ins = int(doc.header.get("$INSUNITS", 0))
+            scale = _insunits_to_feet(ins) * float(px_per_ft)
+        self.S = float(scale)
+        self.block_instances = block_instances
+        self._styles = {}  # layer -> (QPen, QColor)
+        self._layers = {}  # layer -> (QPainterPath, QPen, QColor)
+        self._blocks = {}  # block name -> {layer: QPainterPath}
+        self._instances = {}  # layer -> [(QPainterPath, QTransform)]
+
+    def take(self) -> dict:
+        """Return layer -> (QPainterPath, QPen, QColor) built since the last take."""
+        out, self._layers = self._layers, {}
+        return out
+
+    def take_instances(self) -> dict:
+        """Return layer -> [(QPainterPath, QTransform)] collected since the last take."""
+        out, self._instances = self._instances, {}
+        return out
+
+    def style(self, name: str):
+        """(QPen, QColor) for a layer, resolved from the layer table once."""
+        style = self._styles.get(name)
+        if style is None:
             try:
-                lay = doc.layers.get(name)
+                lay = self.doc.layers.get(name)
                 aci = getattr(lay, "color", 7)
             except Exception:
                 aci = 7
             color = _aci_to_qcolor(aci)
-            pen = QtGui.QPen(color)
-            pen.setCosmetic(True)
-            pen.setWidthF(0.0)
-            layers[name] = (QtGui.QPainterPath(), pen, color)
-        return layers[name]
+            style = self._styles[name] = (_layer_pen(color), color)
+        return style
+
+    def get_layer_pack(self, name: str):
+        pack = self._layers.get(name)
+        if pack is None:
+            pack = self._layers[name] = (QtGui.QPainterPath(), *self.style(name))
+        return pack
+
+    def block_paths(self, name: str) -> dict:
+        """Per-layer paths of a block definition, flattened on first use."""
+        paths = self._blocks.get(name)
+        if paths is None:
+            block = self.doc.blocks.get(name)
+            if block is None:
+                raise KeyError(name)
+            self._blocks[name] = {}  # placeholder stops self-referencing blocks
+            sub = _PathBuilder(self.doc, 0.0, scale=1.0)
+            sub._styles = self._styles
+            sub._blocks = self._blocks
+            for be in block:
+                sub.emit(be)
+            paths = {layer: pack[0] for layer, pack in sub.take().items()}
+            self._blocks[name] = paths
+        return paths
 
-    def add_poly_points(layer_name: str, pts):
+    def _emit_insert(self, e):
+        for ins in e.multi_insert() if e.mcount > 1 else (e,):
+            try:
+                paths = self.block_paths(ins.dxf.name)
+                m = ins.matrix44()
+            except Exception:
+                for ve in ins.virtual_entities():
+                    self.emit(ve)
+                continue
+            block_to_wcs = QtGui.QTransform(m.ux.x, m.ux.y, m.uy.x, m.uy.y, m.origin.x, m.origin.y)
+            tr = _FLIP_Y * block_to_wcs * _FLIP_Y * QtGui.QTransform.fromScale(self.S, self.S)
+            for layer, p in paths.items():
+                if self.block_instances:
+                    self.style(layer)
+                    self._instances.setdefault(layer, []).append((p, tr))
+                else:
+                    self.get_layer_pack(layer)[0].addPath(tr.map(p))
+
+    def add_poly_points(self, layer_name: str, pts):
         if not pts:
             return
-        p, pen, _ = get_layer_pack(layer_name)
+        S = self.S
+        p, pen, _ = self.get_layer_pack(layer_name)
         x0, y0 = pts[0]
         p.moveTo(x0 * S, -y0 * S)
         for x, y in pts[1:]:
             p.lineTo(x * S, -y * S)
 
-    def emit_entity(e):
+    def emit(self, e):
+        S = self.S
         typ = e.dxftype()
         try:
             if typ == "LINE":
                 (sx, sy, _), (ex, ey, _) = e.dxf.start, e.dxf.end
-                p, pen, _ = get_layer_pack(e.dxf.layer)
+                p, pen, _ = self.get_layer_pack(e.dxf.layer)
                 p.moveTo(sx * S, -sy * S)
                 p.lineTo(ex * S, -ey * S)
 
@@ -80,7 +168,7 @@ def _build_paths(doc, px_per_ft: float):
                     points = [(v.dxf.location[0], v.dxf.location[1]) for v in e.vertices]
                     closed = bool(e.is_closed)
                 if points:
-                    p, pen, _ = get_layer_pack(e.dxf.layer)
+                    p, pen, _ = self.get_layer_pack(e.dxf.layer)
                     x0, y0 = points[0]
                     p.moveTo(x0 * S, -y0 * S)
                     for x, y in points[1:]:
@@ -92,7 +180,7 @@ def _build_paths(doc, px_per_ft: float):
                 cx, cy, _ = e.dxf.center
                 r = float(e.dxf.radius) * S
                 rect = QtCore.QRectF(cx * S - r, -cy * S - r, 2 * r, 2 * r)
-                p, pen, _ = get_layer_pack(e.dxf.layer)
+                p, pen, _ = self.get_layer_pack(e.dxf.layer)
                 p.addEllipse(rect)
 
             elif typ == "ARC":
@@ -101,7 +189,7 @@ def _build_paths(doc, px_per_ft: float):
                 start = float(e.dxf.start_angle)
                 end = float(e.dxf.end_angle)
                 rect = QtCore.QRectF(cx * S - r, -cy * S - r, 2 * r, 2 * r)
-                path, pen, _ = get_layer_pack(e.dxf.layer)
+                path, pen, _ = self.get_layer_pack(e.dxf.layer)
                 path.arcMoveTo(rect, start)
                 sweep = end - start
                 path.arcTo(rect, start, sweep)
@@ -113,36 +201,72 @@ def _build_paths(doc, px_per_ft: float):
                         (p.x, p.y)
                         for p in tool.flattening(distance=tool.major_axis.magnitude / 60.0)
                     ]
-                    add_poly_points(e.dxf.layer, pts)
+                    self.add_poly_points(e.dxf.layer, pts)
                 except Exception:
                     pass
 
             elif typ == "SPLINE":
                 try:
                     pts = e.approximate(segments=128)
-                    add_poly_points(e.dxf.layer, [(pt[0], pt[1]) for pt in pts])
+                    self.add_poly_points(e.dxf.layer, [(pt[0], pt[1]) for pt in pts])
                 except Exception:
                     pass
 
             elif typ == "INSERT":
                 try:
-                    for ve in e.virtual_entities():
-                        emit_entity(ve)
+                    self._emit_insert(e)
                 except Exception:
                     pass
         except Exception:
             pass
 
-    # Gather supported entities (including virtual entities for INSERT)
-    for e in msp:
-        emit_entity(e)
 
-    return layers
+def _build_paths(doc, px_per_ft: float):
+    builder = _PathBuilder(doc, px_per_ft)
+    # Gather supported entities (INSERTs are stamped from cached block paths)
+    for e in doc.modelspace():
+        builder.emit(e)
+    return builder.take()
 
 
-def import_dxf_into_group(
-    path: str, target_group: QtWidgets.QGraphicsItemGroup, px_per_ft: float
-) -> tuple[QtCore.QRectF, dict]:
+def _iter_path_batches(
+    doc, px_per_ft: float, batch_size: int = 2000, cancel=None, block_instances=False
+):
+    """Yield ``(done, total, packs, instances)`` every ``batch_size`` modelspace entities.
+
+    ``packs`` maps layer -> (QPainterPath, QPen, QColor) holding only the
+    geometry added since the previous batch; ``instances`` maps layer ->
+    (QPen, QColor, [(QPainterPath, QTransform)]) for inserts kept as instances.
+    Stops early once ``cancel`` (a ``threading.Event``) is set.
+    """
+    msp = doc.modelspace()
+    try:
+        total = len(msp)
+    except Exception:
+        total = 0
+    builder = _PathBuilder(doc, px_per_ft, block_instances=block_instances)
+
+    def _take():
+        inst = {
+            layer: (*builder.style(layer), placed)
+            for layer, placed in builder.take_instances().items()
+        }
+        return builder.take(), inst
+
+    done = 0
+    for e in msp:
+        builder.emit(e)
+        done += 1
+        if done % batch_size == 0:
+            if cancel is not None and cancel.is_set():
+                return
+            yield (done, total, *_take())
+    packs, inst = _take()
+    if packs or inst or done == 0:
+        yield done, max(total, done), packs, inst
+
+
+def _require_ezdxf():
     try:
         import ezdxf
         from ezdxf import recover
@@ -150,24 +274,23 @@ def import_dxf_into_group(
         raise RuntimeError(
             "DXF support not available (ezdxf). Install it in this Python env."
         ) from ex
+    return ezdxf, recover
 
+
+def _read_doc(path: str):
+    ezdxf, recover = _require_ezdxf()
     # Try normal open; on structure errors, recover
     try:
-        doc = ezdxf.readfile(path)
+        return ezdxf.readfile(path)
     except Exception:
         doc, aud = recover.readfile(path)  # may have errors but usable
+        return doc
 
-    # Clear previous items from the underlay group
-    scn = target_group.scene()
-    for child in list(target_group.childItems()):
-        scn.removeItem(child)
-
-    packs = _build_paths(doc, px_per_ft)
 
-    # Create per-layer groups for easier layer management
-    layer_groups = {}
-    bounds = QtCore.QRectF()
-    for layer_name, (p, pen, color) in packs.items():
+def _layer_group(target_group, layer_groups: dict, layer_name: str, color):
+    """The item group holding a DXF layer, created on first use."""
+    grp = layer_groups.get(layer_name)
+    if grp is None:
         grp = QtWidgets.QGraphicsItemGroup()
         grp.setZValue(target_group.zValue())
         grp.setParentItem(target_group)
@@ -177,15 +300,203 @@ def import_dxf_into_group(
         grp.setFlags(
             QtWidgets.QGraphicsItem.ItemIsMovable | QtWidgets.QGraphicsItem.ItemIsSelectable
         )
-        item = QtWidgets.QGraphicsPathItem(p)
-        item.setPen(pen)
-        item.setBrush(QtCore.Qt.NoBrush)
-        item.setParentItem(grp)
-        item.setData(2001, layer_name)
-        item.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
         layer_groups[layer_name] = grp
-        rect = p.controlPointRect()
+    return grp
+
+
+def _add_path_item(grp, layer_name: str, p, pen, transform=None, tiles=None):
+    """Add a path item to a layer group; returns its bounds in group coordinates."""
+    item = TiledPathItem(p, tiles) if tiles is not None else QtWidgets.QGraphicsPathItem(p)
+    item.setPen(pen)
+    item.setBrush(QtCore.Qt.NoBrush)
+    if transform is not None:
+        item.setTransform(transform)
+    item.setParentItem(grp)
+    item.setData(2001, layer_name)
+    item.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
+    rect = p.controlPointRect()
+    return transform.mapRect(rect) if transform is not None else rect
+
+
+class DxfImportJob:
+    """Import a DXF underlay without blocking the GUI thread.
+
+    A worker thread reads the file and builds per-layer paths, queueing them in
+    batches of ``batch_size`` entities. `poll` runs on the GUI thread (e.g. from
+    a QTimer) and attaches queued batches to ``target_group`` within a time
+    budget, so the view stays pannable while the remaining layers load.
+
+    With ``tiled`` (the default) each layer chunk is drawn by a `TiledPathItem`
+    that only paints exposed tiles at the view's level of detail. With a
+    ``cache`` the flattened layers are stored on disk after the first parse
+    and later imports of the same file stream from the memory-mapped copy.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        target_group: QtWidgets.QGraphicsItemGroup,
+        px_per_ft: float,
+        batch_size: int = 2000,
+        block_instances: bool = False,
+        tiled: bool = True,
+        cache: DxfCache | None = None,
+    ):
+        self.path = path
+        self.target_group = target_group
+        self.px_per_ft = float(px_per_ft)
+        self.batch_size = max(1, int(batch_size))
+        self.block_instances = bool(block_instances)
+        self.tiled = bool(tiled)
+        self.cache = cache
+        self.bounds = QtCore.QRectF()
+        self.layer_groups: dict = {}
+        self.done = 0
+        self.total = 0
+        self.finished = False
+        self.error: Exception | None = None
+        self._cancel = threading.Event()
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of modelspace entities processed (0 while the file is read)."""
+        if self.finished:
+            return 1.0
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def start(self):
+        """Clear the target group and start the worker thread."""
+        _require_ezdxf()
+        self._clear_target()
+        self._thread = threading.Thread(target=self.run, name="dxf-import", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Stop the worker and remove whatever was already attached."""
+        self._cancel.set()
+        self._clear_target()
+        self.layer_groups = {}
+        self.bounds = QtCore.QRectF()
+        self.finished = True
+
+    def run(self):
+        """Worker body; also usable inline for a synchronous import."""
+        key = None
+        collected = {}  # layer -> (color hex, [paths]) for the on-disk cache
+        try:
+            if self.cache is not None and not self.block_instances:
+                key = self.cache.key(self.path, self.px_per_ft)
+                if self._run_cached(key):
+                    key = None
+                    return
+            doc = _read_doc(self.path)
+            batches = _iter_path_batches(
+                doc, self.px_per_ft, self.batch_size, self._cancel, self.block_instances
+            )
+            for done, total, packs, instances in batches:
+                for name, (p, _, color) in packs.items():
+                    collected.setdefault(name, (color.name(), []))[1].append(p)
+                self._put_batch(done, total, packs, instances)
+        except Exception as ex:
+            key = None
+            self._queue.put(ex)
+        finally:
+            self._queue.put(None)
+        if key is not None and not self.cancelled:
+            try:
+                self.cache.save(key, collected)
+            except OSError as ex:
+                _logger.warning("Could not write DXF cache for %s: %s", self.path, ex)
+
+    def _run_cached(self, key: str) -> bool:
+        """Stream layers from a memory-mapped cache file; False on a cache miss."""
+        cached = self.cache.open(key)
+        if cached is None:
+            return False
+        with cached:
+            total = len(cached.table)
+            for i, (name, color_hex, runs, points) in enumerate(cached.layers(), start=1):
+                if self.cancelled:
+                    break
+                color = QtGui.QColor(color_hex)
+                p = polylines_path(runs, points)
+                self._put_batch(i, total, {name: (p, _layer_pen(color), color)}, {})
+        return True
+
+    def _put_batch(self, done: int, total: int, packs: dict, instances: dict):
+        # Tiling runs here too, so the GUI thread only creates items
+        packs = {
+            name: (p, pen, color, TileSet(p) if self.tiled else None)
+            for name, (p, pen, color) in packs.items()
+        }
+        self._queue.put((done, total, packs, instances))
+
+    def poll(self, budget_s: float = 0.02) -> bool:
+        """Attach queued batches for up to ``budget_s``; returns True while more may come."""
+        deadline = time.perf_counter() + budget_s
+        while not self.finished:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return True
+            if item is None:
+                self.finished = True
+            elif isinstance(item, Exception):
+                self.error = item
+            elif not self.cancelled:
+                self.done, self.total, packs, instances = item
+                self._attach(packs, instances)
+            if time.perf_counter() >= deadline:
+                break
+        return not self.finished
+
+    def _attach(self, packs: dict, instances: dict):
+        for layer_name, (p, pen, color, tiles) in packs.items():
+            grp = _layer_group(self.target_group, self.layer_groups, layer_name, color)
+            self._grow(_add_path_item(grp, layer_name, p, pen, tiles=tiles))
+        for layer_name, (pen, color, placed) in instances.items():
+            grp = _layer_group(self.target_group, self.layer_groups, layer_name, color)
+            for p, tr in placed:
+                # Instances share the block's path data (QPainterPath is implicitly shared)
+                self._grow(_add_path_item(grp, layer_name, p, pen, tr))
+
+    def _grow(self, rect: QtCore.QRectF):
         if rect.isValid():
-            bounds = bounds.united(rect)
+            self.bounds = self.bounds.united(rect)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the worker has queued everything (for tests and scripts)."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def _clear_target(self):
+        scn = self.target_group.scene()
+        for child in list(self.target_group.childItems()):
+            scn.removeItem(child)
 
-    return bounds, layer_groups
+
+def import_dxf_into_group(
+    path: str,
+    target_group: QtWidgets.QGraphicsItemGroup,
+    px_per_ft: float,
+    block_instances: bool = False,
+) -> tuple[QtCore.QRectF, dict]:
+    """Synchronous import: the same pipeline as `DxfImportJob`, run inline."""
+    _require_ezdxf()
+    job = DxfImportJob(path, target_group, px_per_ft, block_instances=block_instances)
+    job._clear_target()
+    job.run()
+    while job.poll(budget_s=float("inf")):
+        pass
+    if job.error is not None:
+        raise job.error
+    return job.bounds, job.layer_groups
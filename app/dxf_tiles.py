@@ -0,0 +1,160 @@
+"""Tiled, level-of-detail geometry for DXF underlay layers.
+
+A layer path is flattened to polylines and cut into square tiles: long segments
+are split, then each piece goes to the tile holding its midpoint. Every tile
+keeps its full path plus coarser copies simplified by snapping vertices to a
+grid of growing tolerance, so a zoomed-out view strokes a fraction of the
+vertices and sub-pixel detail is dropped. `TiledPathItem` paints only the tiles
+under the exposed rect, at the level that matches the view's level of detail.
+"""
+
+import math
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from cad_core.spatial import GridIndex
+
+TILE_SIZE = 512.0
+# Simplification tolerances (scene units) of the coarse levels, finest first;
+# level 0 is always the unsimplified path.
+LEVEL_TOLERANCES = (1.0, 4.0, 16.0, 64.0)
+
+Run = list[tuple[float, float]]
+
+
+def _simplify(run: Run, tol: float) -> Run:
+    """Keep the first vertex in each ``tol`` grid cell along the run, plus its end."""
+    out = [run[0]]
+    last = (math.floor(run[0][0] / tol), math.floor(run[0][1] / tol))
+    for x, y in run[1:-1]:
+        cell = (math.floor(x / tol), math.floor(y / tol))
+        if cell != last:
+            out.append((x, y))
+            last = cell
+    out.append(run[-1])
+    return out
+
+
+def _split_long(pts: Run, max_len: float) -> Run:
+    """Insert vertices so no segment is longer than ``max_len`` (keeps tiles tight)."""
+    out = pts[:1]
+    for a, b in zip(pts, pts[1:]):
+        n = math.ceil(math.hypot(b[0] - a[0], b[1] - a[1]) / max_len)
+        for k in range(1, n):
+            f = k / n
+            out.append((a[0] + (b[0] - a[0]) * f, a[1] + (b[1] - a[1]) * f))
+        out.append(b)
+    return out
+
+
+def _runs_path(runs: list[Run]) -> QtGui.QPainterPath:
+    path = QtGui.QPainterPath()
+    for run in runs:
+        path.moveTo(*run[0])
+        for x, y in run[1:]:
+            path.lineTo(x, y)
+    return path
+
+
+def _extent(run: Run) -> float:
+    xs = [p[0] for p in run]
+    ys = [p[1] for p in run]
+    return max(max(xs) - min(xs), max(ys) - min(ys))
+
+
+class TileSet:
+    """Tiles of one layer path: ``tiles[k] = (bounds, [path per level])``.
+
+    Built from plain value types, so it can be constructed on a worker thread.
+    """
+
+    def __init__(
+        self,
+        path: QtGui.QPainterPath,
+        tile: float = TILE_SIZE,
+        tolerances=LEVEL_TOLERANCES,
+    ):
+        self.tile = float(tile)
+        self.tolerances = tuple(tolerances)
+        self.tiles: list[tuple[QtCore.QRectF, list[QtGui.QPainterPath]]] = []
+        self.index = GridIndex(self.tile)
+        self._build(path)
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def _build(self, path: QtGui.QPainterPath):
+        t = self.tile
+        buckets: dict[tuple[int, int], list[Run]] = {}
+        for poly in path.toSubpathPolygons():
+            pts = _split_long([(p.x(), p.y()) for p in poly], t)
+            run: Run = []
+            key = None
+            for a, b in zip(pts, pts[1:]):
+                k = (math.floor((a[0] + b[0]) / (2 * t)), math.floor((a[1] + b[1]) / (2 * t)))
+                if k != key:
+                    if len(run) > 1:
+                        buckets.setdefault(key, []).append(run)
+                    run = [a]
+                    key = k
+                run.append(b)
+            if len(run) > 1:
+                buckets.setdefault(key, []).append(run)
+        for runs in buckets.values():
+            xs = [x for run in runs for x, _ in run]
+            ys = [y for run in runs for _, y in run]
+            bounds = QtCore.QRectF(
+                QtCore.QPointF(min(xs), min(ys)), QtCore.QPointF(max(xs), max(ys))
+            )
+            levels = [_runs_path(runs)]
+            for tol in self.tolerances:
+                kept = [_simplify(run, tol) for run in runs if _extent(run) >= tol]
+                levels.append(_runs_path(kept))
+            self.index.insert_bbox(
+                len(self.tiles), bounds.left(), bounds.top(), bounds.right(), bounds.bottom()
+            )
+            self.tiles.append((bounds, levels))
+
+    def level_for(self, lod: float) -> int:
+        """Coarsest level whose simplification error stays under one device pixel."""
+        pixel = 1.0 / lod if lod > 0 else math.inf
+        level = 0
+        for i, tol in enumerate(self.tolerances, start=1):
+            # Snapping moves a vertex by up to tol * sqrt(2)
+            if tol * 1.5 <= pixel:
+                level = i
+        return level
+
+    def visible(self, rect: QtCore.QRectF) -> list[int]:
+        """Indices of tiles whose bounds meet ``rect``."""
+        return sorted(self.index.query_bbox(rect.left(), rect.top(), rect.right(), rect.bottom()))
+
+
+class TiledPathItem(QtWidgets.QGraphicsPathItem):
+    """Path item that paints its `TileSet` instead of stroking the whole path.
+
+    The full path is still set on the item, so bounds, shape, hit testing and
+    object snaps behave like any other `QGraphicsPathItem`.
+    """
+
+    def __init__(self, path: QtGui.QPainterPath, tiles: TileSet | None = None, parent=None):
+        super().__init__(path, parent)
+        self.tiles = tiles if tiles is not None else TileSet(path)
+        # Needed for option.exposedRect to be the damaged area, not the bounds
+        self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+    def paint(self, painter, option, widget=None):
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        level = self.tiles.level_for(lod)
+        painter.setPen(self.pen())
+        painter.setBrush(QtCore.Qt.NoBrush)
+        tiles = self.tiles.tiles
+        for i in self.tiles.visible(option.exposedRect):
+            painter.drawPath(tiles[i][1][level])
+        if option.state & QtWidgets.QStyle.State_Selected:
+            pen = QtGui.QPen(QtGui.QColor(60, 180, 255), 0, QtCore.Qt.DashLine)
+            painter.setPen(pen)
+            painter.drawRect(self.boundingRect())
+
+
+__all__ = ["TILE_SIZE", "LEVEL_TOLERANCES", "TileSet", "TiledPathItem"]
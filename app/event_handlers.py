@@ -29,11 +29,10 @@ def setup_event_handlers(window: MainWindow) -> None:
 def new_project(window: MainWindow) -> None:
     """Create a new project."""
     window.clear_underlay()
-    for it in list(window.layer_devices.childItems()):
+    removed = list(window.layer_devices.childItems()) + list(window.layer_wires.childItems())
+    for it in removed:
         it.scene().removeItem(it)
-    for it in list(window.layer_wires.childItems()):
-        it.scene().removeItem(it)
-    window.push_history()
+    window.push_history(changed=removed)
     window.statusBar().showMessage("New project")
 
 
@@ -73,8 +72,7 @@ def open_project(window: MainWindow) -> None:
     try:
         with zipfile.ZipFile(p, "r") as z:
             data = json.loads(z.read("project.json").decode("utf-8"))
-        window.load_state(data)
-        window.push_history()
+        window.push_history(changed=window.load_state(data))
         window.statusBar().showMessage(f"Opened: {os.path.basename(p)}")
     except Exception as ex:
         QMessageBox.critical(window, "Open Project Error", str(ex))
@@ -0,0 +1,151 @@
+"""Delta-based undo/redo history for the model-space scene.
+
+Each entry stores only the items an edit touched, as ``(layer, before, after)``
+JSON strings keyed by the item's stable id, plus any scene settings that
+changed. Undo applies ``before``; redo applies ``after``. Memory therefore grows
+with the size of the edits, not the size of the drawing, and is capped by a
+byte budget that drops the oldest entries first.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+# (layer name, JSON before or None if created, JSON after or None if deleted)
+ItemDelta = tuple[str, str | None, str | None]
+
+
+@dataclass
+class HistoryEntry:
+    items: dict[str, ItemDelta] = field(default_factory=dict)
+    state: dict[str, tuple[object, object]] = field(default_factory=dict)
+    coalesce: bool = False
+    stamp: float = field(default_factory=time.monotonic)
+
+    def __bool__(self) -> bool:
+        return bool(self.items or self.state)
+
+    @property
+    def nbytes(self) -> int:
+        n = 0
+        for layer, before, after in self.items.values():
+            n += len(layer) + len(before or "") + len(after or "") + 64
+        return n + 64 * len(self.state)
+
+    def _can_absorb(self, other: "HistoryEntry", window_s: float) -> bool:
+        if not (self.coalesce and other.coalesce) or self.state or other.state:
+            return False
+        if other.stamp - self.stamp > window_s or self.items.keys() != other.items.keys():
+            return False
+        # Only pure modifications merge; creates/deletes keep their own entry
+        return all(
+            d[1] is not None and d[2] is not None
+            for d in (*self.items.values(), *other.items.values())
+        )
+
+
+def diff_items(before: dict[str, tuple[str, str]], after: dict[str, tuple[str, str]]):
+    """Item deltas between two ``uid -> (layer, json)`` snapshots."""
+    out: dict[str, ItemDelta] = {}
+    for uid, (layer, js) in after.items():
+        old = before.get(uid)
+        if old is None:
+            out[uid] = (layer, None, js)
+        elif old[1] != js or old[0] != layer:
+            out[uid] = (layer, old[1], js)
+    for uid, (layer, js) in before.items():
+        if uid not in after:
+            out[uid] = (layer, js, None)
+    return out
+
+
+def diff_state(before: dict, after: dict) -> dict[str, tuple[object, object]]:
+    return {k: (before.get(k), v) for k, v in after.items() if before.get(k) != v}
+
+
+class History:
+    """Linear undo stack of `HistoryEntry` deltas with a memory cap.
+
+    - ``max_bytes``: approximate budget for all entries; oldest are dropped first.
+    - ``coalesce_moves``: merge consecutive coalescible entries (drag moves of the
+      same items within ``coalesce_window_s``) into one undo step.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entries: int = 1000,
+        coalesce_moves: bool = True,
+        coalesce_window_s: float = 1.5,
+    ):
+        self.max_bytes = int(max_bytes)
+        self.max_entries = int(max_entries)
+        self.coalesce_moves = bool(coalesce_moves)
+        self.coalesce_window_s = float(coalesce_window_s)
+        self._entries: list[HistoryEntry] = []
+        self._index = 0  # entries[:index] are applied
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def can_undo(self) -> bool:
+        return self._index > 0
+
+    def can_redo(self) -> bool:
+        return self._index < len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self._index = 0
+        self._bytes = 0
+
+    def push(self, entry: HistoryEntry) -> bool:
+        """Record an applied edit; returns False for empty (no-op) entries."""
+        if not entry:
+            return False
+        for dropped in self._entries[self._index :]:
+            self._bytes -= dropped.nbytes
+        del self._entries[self._index :]
+        top = self._entries[-1] if self._entries else None
+        if (
+            self.coalesce_moves
+            and top is not None
+            and top._can_absorb(entry, self.coalesce_window_s)
+        ):
+            self._bytes -= top.nbytes
+            for uid, (layer, _, after) in entry.items.items():
+                top.items[uid] = (layer, top.items[uid][1], after)
+            top.stamp = entry.stamp
+            self._bytes += top.nbytes
+            return True
+        self._entries.append(entry)
+        self._index = len(self._entries)
+        self._bytes += entry.nbytes
+        while len(self._entries) > 1 and (
+            self._bytes > self.max_bytes or len(self._entries) > self.max_entries
+        ):
+            self._bytes -= self._entries.pop(0).nbytes
+            self._index -= 1
+        return True
+
+    def undo(self) -> HistoryEntry | None:
+        """Step back; the caller applies each delta's ``before`` side."""
+        if not self.can_undo():
+            return None
+        self._index -= 1
+        return self._entries[self._index]
+
+    def redo(self) -> HistoryEntry | None:
+        """Step forward; the caller applies each delta's ``after`` side."""
+        if not self.can_redo():
+            return None
+        entry = self._entries[self._index]
+        self._index += 1
+        return entry
+
+
+__all__ = ["History", "HistoryEntry", "diff_items", "diff_state"]
@@ -0,0 +1,303 @@
+"""Tiled table of segment intersection points used by object snaps.
+
+Segments from sketch lines, wires and (flattened) DXF underlay paths are bucketed
+into square tiles. Each tile's intersections are computed once (a sweep, or the
+NumPy grid engine for dense tiles) in a background worker and kept until
+geometry touching that tile changes, so the snap query is a lookup instead of a
+pairwise loop per mouse move. Finished tiles
+are keyed by a digest of their segments and can be persisted to disk, letting a
+reopened drawing reuse the table without recomputing it. Writes are debounced
+until the workers have been idle for `SAVE_DELAY` seconds, and ``close`` writes
+whatever is still pending. The on-disk table is
+shared by all drawings and trimmed by least-recent use, not to the open drawing.
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+
+from PySide6 import QtWidgets
+
+from cad_core.intersect import intersect_all, sweep_intersections
+from cad_core.spatial import GridIndex
+
+_logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+# Tile tables kept on disk, most recently used first out of the eviction order
+MAX_STORED_TILES = 50_000
+# Seconds the workers must stay idle before new tiles are written to disk
+SAVE_DELAY = 5.0
+# Tiles with more segments than this use the NumPy grid engine instead of the sweep
+GRID_ENGINE_MIN = 256
+
+
+def item_segments(it) -> list[tuple[float, float, float, float]]:
+    """Scene-space segments of a line item or a path item (curves flattened)."""
+    t = it.sceneTransform()
+    if isinstance(it, QtWidgets.QGraphicsLineItem):
+        ln = it.line()
+        x1, y1 = t.map(ln.x1(), ln.y1())
+        x2, y2 = t.map(ln.x2(), ln.y2())
+        return [(x1, y1, x2, y2)]
+    if isinstance(it, QtWidgets.QGraphicsPathItem):
+        segs = []
+        for poly in it.path().toSubpathPolygons(t):
+            pts = [(p.x(), p.y()) for p in poly]
+            segs += [a + b for a, b in zip(pts, pts[1:]) if a != b]
+        return segs
+    return []
+
+
+def _is_visible(it) -> bool:
+    try:
+        return bool(it.isVisible())
+    except RuntimeError:
+        return False
+
+
+class IntersectionCache:
+    """Per-tile intersection points, rebuilt in the background when invalidated.
+
+    ``add_item``/``remove_item`` only mark the tiles an item touches as dirty;
+    ``flush`` schedules those tiles. Until a tile finishes it simply offers no
+    intersection snaps, so the UI never waits on the sweep.
+    """
+
+    def __init__(self, tile: float = 256.0, background: bool = True, path: str | None = None):
+        self.tile = float(tile)
+        self.path = path
+        self._grid = GridIndex(self.tile)
+        self._tile_segs: dict[tuple[int, int], dict[object, list]] = {}
+        self._item_tiles: dict[object, set] = {}
+        self._dirty: set[tuple[int, int]] = set()
+        self._gen: dict[tuple[int, int], int] = {}
+        self._points: dict[tuple[int, int], tuple[list, list]] = {}
+        self._digests: dict[tuple[int, int], str] = {}
+        self._stored: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._pending: set = set()
+        self._unsaved = False
+        self._save_timer: threading.Timer | None = None
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="snap-intersections")
+            if background
+            else None
+        )
+        if path:
+            self.load(path)
+
+    # ---- geometry bookkeeping
+    def add_item(self, it):
+        if it in self._item_tiles:
+            self.remove_item(it)
+        by_tile: dict[tuple[int, int], list] = {}
+        for s in item_segments(it):
+            for cell in self._grid.segment_cells(*s):
+                by_tile.setdefault(cell, []).append(s)
+        for cell, segs in by_tile.items():
+            self._tile_segs.setdefault(cell, {})[it] = segs
+        self._item_tiles[it] = set(by_tile)
+        self._dirty.update(by_tile)
+
+    def remove_item(self, it):
+        for cell in self._item_tiles.pop(it, ()):
+            owners = self._tile_segs.get(cell)
+            if owners is not None:
+                owners.pop(it, None)
+                if not owners:
+                    del self._tile_segs[cell]
+            self._dirty.add(cell)
+
+    def invalidate_rect(self, minx: float, miny: float, maxx: float, maxy: float):
+        """Force the tiles under a scene rect to be recomputed on next flush."""
+        self._dirty.update(self._grid.box_cells(minx, miny, maxx, maxy))
+
+    def clear(self):
+        self._tile_segs.clear()
+        self._item_tiles.clear()
+        self._dirty.clear()
+        with self._lock:
+            self._points.clear()
+            self._digests.clear()
+            for cell in self._gen:
+                self._gen[cell] += 1
+
+    # ---- tile builds
+    def _digest(self, cell, segs) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(array("d", (self.tile, float(cell[0]), float(cell[1]))).tobytes())
+        h.update(array("d", [v for s in segs for v in s]).tobytes())
+        return h.hexdigest()
+
+    def _build(self, cell, segs) -> list:
+        t = self.tile
+        out = []
+        if len(segs) > GRID_ENGINE_MIN:
+            i, j, pts = intersect_all(segs)
+            hits = zip(i.tolist(), j.tolist(), pts[:, 0].tolist(), pts[:, 1].tolist())
+        else:
+            hits = sweep_intersections(segs)
+        for i, j, x, y in hits:
+            if math.floor(x / t) != cell[0] or math.floor(y / t) != cell[1]:
+                continue  # reported by the neighbouring tile that owns it
+            if _at_end(segs[i], x, y) and _at_end(segs[j], x, y):
+                continue  # shared polyline vertex, already an endpoint snap
+            out.append((i, j, x, y))
+        return out
+
+    def _install(self, cell, gen, digest, owners, hits):
+        pts = sorted(((x, y, owners[i], owners[j]) for i, j, x, y in hits), key=lambda p: p[0])
+        with self._lock:
+            if self._gen.get(cell) != gen:
+                return
+            if self._stored.pop(digest, None) is None:  # (re)insert as most recently used
+                self._unsaved = True
+            self._stored[digest] = [list(h) for h in hits]
+            self._points[cell] = ([p[0] for p in pts], pts)
+
+    def _finished(self, fut, cell, gen, digest, owners):
+        with self._lock:
+            self._pending.discard(fut)
+            idle = not self._pending
+        try:
+            self._install(cell, gen, digest, owners, fut.result())
+        except Exception:
+            _logger.exception("Intersection tile %s failed", cell)
+        if idle and self.path:
+            self._schedule_save()
+
+    def _schedule_save(self):
+        """(Re)start the save timer, so a burst of rebuilds is written once."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(SAVE_DELAY, self._save_if_unsaved)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save_if_unsaved(self):
+        if self._unsaved and self.path:
+            self.save(self.path)
+
+    def close(self):
+        """Write pending tiles now, e.g. when the document closes or the app exits."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+        self._save_if_unsaved()
+
+    def flush(self):
+        """Schedule a rebuild for every tile invalidated since the last flush."""
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        for cell in dirty:
+            with self._lock:
+                gen = self._gen.get(cell, 0) + 1
+                self._gen[cell] = gen
+                self._points.pop(cell, None)
+                self._digests.pop(cell, None)
+            tile_owners = self._tile_segs.get(cell)
+            if not tile_owners:
+                continue
+            owners, segs = [], []
+            for it, lst in tile_owners.items():
+                owners += [it] * len(lst)
+                segs += lst
+            digest = self._digest(cell, segs)
+            with self._lock:
+                self._digests[cell] = digest
+                stored = self._stored.get(digest)
+            if stored is not None:
+                self._install(cell, gen, digest, owners, [tuple(h) for h in stored])
+            elif self._executor is None:
+                self._install(cell, gen, digest, owners, self._build(cell, segs))
+            else:
+                fut = self._executor.submit(self._build, cell, segs)
+                with self._lock:
+                    self._pending.add(fut)
+                fut.add_done_callback(
+                    lambda f, c=cell, g=gen, d=digest, o=owners: self._finished(f, c, g, d, o)
+                )
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until scheduled tiles are built (mainly for tests and export)."""
+        with self._lock:
+            pending = list(self._pending)
+        done, not_done = wait_futures(pending, timeout=timeout)
+        return not not_done
+
+    # ---- queries
+    def is_ready(self) -> bool:
+        return not self._dirty and not self._pending
+
+    def query(self, x: float, y: float, radius: float) -> list[tuple[float, float, float]]:
+        """Return (distance, x, y) for visible intersections within radius."""
+        out = []
+        for cell in self._grid.box_cells(x - radius, y - radius, x + radius, y + radius):
+            entry = self._points.get(cell)
+            if not entry:
+                continue
+            xs, pts = entry
+            lo = bisect.bisect_left(xs, x - radius)
+            hi = bisect.bisect_right(xs, x + radius)
+            for px, py, a, b in pts[lo:hi]:
+                d = math.hypot(px - x, py - y)
+                if d <= radius and _is_visible(a) and _is_visible(b):
+                    out.append((d, px, py))
+        out.sort()
+        return out
+
+    # ---- persistence
+    def save(self, path: str):
+        """Write the tile tables, keeping the `MAX_STORED_TILES` most recently used.
+
+        Tiles of other drawings are kept until evicted, so reopening any recent
+        drawing reuses its table.
+        """
+        with self._lock:
+            while len(self._stored) > MAX_STORED_TILES:
+                del self._stored[next(iter(self._stored))]
+            tiles = dict(self._stored)
+            self._unsaved = False
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "tiles": tiles}, f)
+            os.replace(tmp, path)
+        except Exception:
+            self._unsaved = True
+            _logger.warning("Could not write intersection cache %s", path, exc_info=True)
+
+    def load(self, path: str):
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception:
+            _logger.warning("Ignoring unreadable intersection cache %s", path, exc_info=True)
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        with self._lock:
+            self._stored.update(data.get("tiles", {}))
+
+
+def _at_end(seg, x: float, y: float, tol: float = 1e-6) -> bool:
+    return (abs(seg[0] - x) <= tol and abs(seg[1] - y) <= tol) or (
+        abs(seg[2] - x) <= tol and abs(seg[3] - y) <= tol
+    )
+
+
+__all__ = ["IntersectionCache", "item_segments"]
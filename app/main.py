@@ -2,6 +2,8 @@ import json
 import math
 import os
 import sys
+import uuid
+import weakref
 
 # Many UI style blocks and template strings in this file intentionally exceed
 # the project's line-length setting. To reduce noisy E501 (line too long)
@@ -24,7 +26,6 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
-    QListWidget,
     QListWidgetItem,
     QMainWindow,
     QMenu,
@@ -35,11 +36,14 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from app import catalog, dxf_import
+from app import catalog, device_palette, dxf_cache, dxf_import
+from app.history import History, HistoryEntry, diff_items, diff_state
+from app.intersection_cache import IntersectionCache
 from app.logging_config import setup_logging
 
 # Grid scene and defaults used by the main window
 from app.scene import DEFAULT_GRID_SIZE, GridScene
+from app.snap_index import SNAP_CENTER, SNAP_END, SNAP_INTERSECT, SNAP_MID, SnapIndex
 
 # Sentry error tracking (optional)
 try:
@@ -52,7 +56,7 @@ except ImportError:
 setup_logging()
 import logging
 
-from app.device import DeviceItem
+from app.device import DeviceItem, apply_coverage
 from app.tools import draw as draw_tools
 from app.tools.chamfer_tool import ChamferTool
 from app.tools.extend_tool import ExtendTool
@@ -196,6 +200,10 @@ APP_TITLE = f"LV CAD (Layer Vision) {APP_VERSION}"
 PREF_DIR = os.path.join(os.path.expanduser("~"), "LV_CAD")
 PREF_PATH = os.path.join(PREF_DIR, "preferences.json")
 LOG_DIR = os.path.join(PREF_DIR, "logs")
+CACHE_DIR = os.path.join(PREF_DIR, "cache")
+
+# QGraphicsItem data role holding the stable id used by history deltas
+ITEM_UID_ROLE = 2010
 
 # Standard page sizes in inches (width, height)
 PAGE_SIZES = {
@@ -249,6 +257,125 @@ def infer_device_kind(d: dict) -> str:
     return "other"
 
 
+def _sketch_json(it):
+    """Project JSON for a sketch item in its parent's coordinates (drag offsets baked in)."""
+    off = it.pos()
+    ox, oy = off.x(), off.y()
+    if isinstance(it, QtWidgets.QGraphicsLineItem):
+        ln = it.line()
+        return {
+            "type": "line",
+            "x1": ln.x1() + ox,
+            "y1": ln.y1() + oy,
+            "x2": ln.x2() + ox,
+            "y2": ln.y2() + oy,
+        }
+    if isinstance(it, QtWidgets.QGraphicsRectItem):
+        r = it.rect()
+        return {"type": "rect", "x": r.x() + ox, "y": r.y() + oy, "w": r.width(), "h": r.height()}
+    if isinstance(it, QtWidgets.QGraphicsEllipseItem):
+        r = it.rect()
+        return {
+            "type": "circle",
+            "x": r.center().x() + ox,
+            "y": r.center().y() + oy,
+            "r": r.width() / 2.0,
+        }
+    if isinstance(it, QtWidgets.QGraphicsPathItem):
+        p = it.path()
+        pts = []
+        for i in range(p.elementCount()):
+            e = p.elementAt(i)
+            pts.append({"x": e.x + ox, "y": e.y + oy})
+        return {"type": "poly", "pts": pts}
+    if isinstance(it, QtWidgets.QGraphicsSimpleTextItem):
+        return {"type": "text", "x": ox, "y": oy, "text": it.text()}
+    return None
+
+
+def _room_polygon(it, close_tol_px: float = 0.5):
+    """Scene-space outline of a rectangle or closed polyline sketch item, else None."""
+    if isinstance(it, QtWidgets.QGraphicsRectItem):
+        poly = it.mapToScene(it.rect())
+    elif isinstance(it, QtWidgets.QGraphicsPathItem):
+        subpaths = it.path().toSubpathPolygons()
+        if len(subpaths) != 1 or subpaths[0].count() < 4:
+            return None
+        poly = subpaths[0]
+        if QtCore.QLineF(poly.first(), poly.last()).length() > close_tol_px:
+            return None
+        poly = it.mapToScene(poly)
+    else:
+        return None
+    return [(p.x(), p.y()) for p in poly]
+
+
+def _sketch_from_json(s: dict):
+    t = s.get("type")
+    if t == "line":
+        it = QtWidgets.QGraphicsLineItem(s["x1"], s["y1"], s["x2"], s["y2"])
+    elif t == "rect":
+        it = QtWidgets.QGraphicsRectItem(s["x"], s["y"], s["w"], s["h"])
+    elif t == "circle":
+        r = float(s.get("r", 0.0))
+        cx = float(s.get("x", 0.0))
+        cy = float(s.get("y", 0.0))
+        it = QtWidgets.QGraphicsEllipseItem(cx - r, cy - r, 2 * r, 2 * r)
+    elif t == "poly":
+        pts = [QtCore.QPointF(p["x"], p["y"]) for p in s.get("pts", [])]
+        if len(pts) < 2:
+            return None
+        path = QtGui.QPainterPath(pts[0])
+        for p in pts[1:]:
+            path.lineTo(p)
+        it = QtWidgets.QGraphicsPathItem(path)
+    elif t == "text":
+        it = QtWidgets.QGraphicsSimpleTextItem(s.get("text", ""))
+        it.setPos(float(s.get("x", 0.0)), float(s.get("y", 0.0)))
+        it.setFlag(QtWidgets.QGraphicsItem.ItemIgnoresTransformations, True)
+    else:
+        return None
+    pen = QtGui.QPen(QtGui.QColor("#e0e0e0"))
+    pen.setCosmetic(True)
+    if hasattr(it, "setPen"):
+        it.setPen(pen)
+    it.setZValue(20)
+    it.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
+    it.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
+    return it
+
+
+def _sketch_apply_json(it, s: dict) -> bool:
+    """Update a sketch item in place; False if ``s`` describes another item type."""
+    t = s.get("type")
+    if t == "text":
+        if not isinstance(it, QtWidgets.QGraphicsSimpleTextItem):
+            return False
+        it.setText(s.get("text", ""))
+        it.setPos(float(s.get("x", 0.0)), float(s.get("y", 0.0)))
+        return True
+    if t == "line" and isinstance(it, QtWidgets.QGraphicsLineItem):
+        it.setLine(s["x1"], s["y1"], s["x2"], s["y2"])
+    elif t == "rect" and isinstance(it, QtWidgets.QGraphicsRectItem):
+        it.setRect(s["x"], s["y"], s["w"], s["h"])
+    elif t == "circle" and isinstance(it, QtWidgets.QGraphicsEllipseItem):
+        r = float(s.get("r", 0.0))
+        it.setRect(float(s.get("x", 0.0)) - r, float(s.get("y", 0.0)) - r, 2 * r, 2 * r)
+    elif t == "poly" and isinstance(it, QtWidgets.QGraphicsPathItem):
+        pts = [QtCore.QPointF(p["x"], p["y"]) for p in s.get("pts", [])]
+        if len(pts) < 2:
+            return False
+        path = QtGui.QPainterPath(pts[0])
+        for p in pts[1:]:
+            path.lineTo(p)
+        it.setPath(path)
+    else:
+        return False
+    # Geometry is stored with the drag offset baked in
+    it.setPos(0.0, 0.0)
+    return True
+
+
 class CanvasView(QGraphicsView):
     def __init__(self, scene, devices_group, wires_group, sketch_group, overlay_group, window_ref):
         super().__init__(scene)
@@ -307,99 +434,67 @@ class CanvasView(QGraphicsView):
         # snap cycling state
         self._snap_candidates = []
         self._snap_index = 0
+        # spatial index of snap points, re-synced lazily after edits; the
+        # intersection table is built in the background and kept on disk
+        self.snap_index = SnapIndex(
+            intersections=IntersectionCache(path=os.path.join(CACHE_DIR, "intersections.json"))
+        )
+        self._snap_scene = None
 
     def _px_to_scene(self, px: float) -> float:
         a = self.mapToScene(QtCore.QPoint(0, 0))
         b = self.mapToScene(QtCore.QPoint(int(px), int(px)))
         return QtCore.QLineF(a, b).length()
 
+    def _sync_snap_index(self):
+        sc = self.scene()
+        if not self.snap_index.dirty and self._snap_scene is sc:
+            return
+        overlay = self.overlay_group
+        self.snap_index.sync(it for it in sc.items() if it.topLevelItem() is not overlay)
+        self._snap_scene = sc
+
+    def _refresh_snaps(self, items):
+        """Update snap candidates of ``items`` and their children after an edit."""
+        if self.snap_index.dirty or self._snap_scene is not self.scene():
+            return  # a full sync is due anyway
+        overlay = self.overlay_group
+        todo, touched = list(items), []
+        while todo:
+            it = todo.pop()
+            todo += it.childItems()
+            if it.topLevelItem() is not overlay:
+                touched.append(it)
+        self.snap_index.update_items(touched)
+
     def _compute_osnap(self, p: QPointF) -> QtCore.QPointF | None:
-        # Search nearby items and return nearest enabled snap point
+        # Query the snap index for the nearest enabled snap point
         try:
             thr_scene = self._px_to_scene(12)
-            box = QtCore.QRectF(p.x() - thr_scene, p.y() - thr_scene, thr_scene * 2, thr_scene * 2)
-            best = None
-            best_d = 1e18
-            items = list(self.scene().items(box))
-            # First pass: endpoint/mid/center
-            cand = []
-            for it in items:
-                # skip overlay helpers
-                if it is self.osnap_marker:
-                    continue
-                pts = []
-                if isinstance(it, QtWidgets.QGraphicsLineItem):
-                    l = it.line()
-                    if self.osnap_end:
-                        pts += [QtCore.QPointF(l.x1(), l.y1()), QtCore.QPointF(l.x2(), l.y2())]
-                    if self.osnap_mid:
-                        pts += [QtCore.QPointF((l.x1() + l.x2()) / 2.0, (l.y1() + l.y2()) / 2.0)]
-                elif isinstance(it, QtWidgets.QGraphicsRectItem):
-                    if self.osnap_center:
-                        r = it.rect()
-                        pts = [QtCore.QPointF(r.center())]
-                elif isinstance(it, QtWidgets.QGraphicsEllipseItem):
-                    if self.osnap_center:
-                        r = it.rect()
-                        pts = [QtCore.QPointF(r.center())]
-                elif isinstance(it, QtWidgets.QGraphicsPathItem):
-                    pth = it.path()
-                    n = pth.elementCount()
-                    if n >= 1 and (self.osnap_end or self.osnap_mid):
-                        e0 = pth.elementAt(0)
-                        eN = pth.elementAt(n - 1)
-                        if self.osnap_end:
-                            pts += [QtCore.QPointF(e0.x, e0.y), QtCore.QPointF(eN.x, eN.y)]
-                        if self.osnap_mid and n >= 2:
-                            e1 = pth.elementAt(1)
-                            pts += [QtCore.QPointF((e0.x + e1.x) / 2.0, (e0.y + e1.y) / 2.0)]
-                for q in pts:
-                    d = QtCore.QLineF(p, q).length()
-                    if d <= thr_scene:
-                        cand.append((d, q))
-            # Intersection snaps between nearby lines
+            self._sync_snap_index()
+            kinds = set()
+            if self.osnap_end:
+                kinds.add(SNAP_END)
+            if self.osnap_mid:
+                kinds.add(SNAP_MID)
+            if self.osnap_center:
+                kinds.add(SNAP_CENTER)
             if self.osnap_intersect:
-                lines = [it for it in items if isinstance(it, QtWidgets.QGraphicsLineItem)]
-                n = len(lines)
-                for i in range(n):
-                    li = QtCore.QLineF(lines[i].line())
-                    for j in range(i + 1, n):
-                        lj = QtCore.QLineF(lines[j].line())
-                        ip = QtCore.QPointF()
-                        if li.intersect(lj, ip) != QtCore.QLineF.NoIntersection:
-                            d = QtCore.QLineF(p, ip).length()
-                            if d <= thr_scene:
-                                cand.append((d, ip))
+                kinds.add(SNAP_INTERSECT)
+            cand = self.snap_index.query(p.x(), p.y(), thr_scene, kinds)
             # Perpendicular from point to line
             if self.osnap_perp:
-                for it in items:
-                    if not isinstance(it, QtWidgets.QGraphicsLineItem):
-                        continue
-                    l = QtCore.QLineF(it.line())
-                    # project point onto line segment
-                    ax, ay, bx, by = l.x1(), l.y1(), l.x2(), l.y2()
-                    vx, vy = bx - ax, by - ay
-                    wx, wy = p.x() - ax, p.y() - ay
-                    denom = vx * vx + vy * vy
-                    if denom <= 1e-6:
-                        continue
-                    t = (wx * vx + wy * vy) / denom
-                    if 0.0 <= t <= 1.0:
-                        qx, qy = ax + t * vx, ay + t * vy
-                        qpt = QtCore.QPointF(qx, qy)
-                        d = QtCore.QLineF(p, qpt).length()
-                        if d <= thr_scene:
-                            cand.append((d, qpt))
+                cand += self.snap_index.perpendicular(p.x(), p.y(), thr_scene)
             # Sort candidates by distance and deduplicate
             cand.sort(key=lambda x: x[0])
             uniq = []
             seen = set()
-            for _, q in cand:
-                key = (round(q.x(), 2), round(q.y(), 2))
+            for _, qx, qy in cand:
+                key = (round(qx, 2), round(qy, 2))
                 if key in seen:
                     continue
                 seen.add(key)
-                uniq.append(q)
+                uniq.append(QtCore.QPointF(qx, qy))
             self._snap_candidates = uniq
             self._snap_index = 0
             return uniq[0] if uniq else None
@@ -706,7 +801,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "draw", None) and getattr(win.draw, "mode", 0) != 0:
                 try:
                     if win.draw.on_click(sp, shift_ortho=self.ortho):
-                        win.push_history()
+                        win.push_history(changed=win.draw.changed)
                         e.accept()
                         return
                 except Exception:
@@ -721,7 +816,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "text_tool", None) and getattr(win.text_tool, "active", False):
                 try:
                     if win.text_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.text_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -729,7 +824,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "mtext_tool", None) and getattr(win.mtext_tool, "active", False):
                 try:
                     if win.mtext_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.mtext_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -738,7 +833,7 @@ class CanvasView(QGraphicsView):
                 try:
                     # freehand starts on press; release will commit
                     if win.freehand_tool.on_press(sp):
-                        win.push_history()
+                        win.push_history(changed=win.freehand_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -746,7 +841,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "leader_tool", None) and getattr(win.leader_tool, "active", False):
                 try:
                     if win.leader_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.leader_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -768,7 +863,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "trim_tool", None) and getattr(win.trim_tool, "active", False):
                 try:
                     if win.trim_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.trim_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -776,7 +871,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "extend_tool", None) and getattr(win.extend_tool, "active", False):
                 try:
                     if win.extend_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.extend_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -784,7 +879,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "fillet_tool", None) and getattr(win.fillet_tool, "active", False):
                 try:
                     if win.fillet_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.fillet_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -792,7 +887,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "move_tool", None) and getattr(win.move_tool, "active", False):
                 try:
                     if win.move_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.move_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -800,7 +895,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "rotate_tool", None) and getattr(win.rotate_tool, "active", False):
                 try:
                     if win.rotate_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.rotate_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -808,7 +903,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "mirror_tool", None) and getattr(win.mirror_tool, "active", False):
                 try:
                     if win.mirror_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.mirror_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -816,7 +911,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "scale_tool", None) and getattr(win.scale_tool, "active", False):
                 try:
                     if win.scale_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.scale_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -824,7 +919,7 @@ class CanvasView(QGraphicsView):
             if getattr(win, "chamfer_tool", None) and getattr(win.chamfer_tool, "active", False):
                 try:
                     if win.chamfer_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.chamfer_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -834,7 +929,8 @@ class CanvasView(QGraphicsView):
             ):
                 try:
                     if win.underlay_drag_tool.on_click(sp):
-                        win.push_history()
+                        # Only the underlay placement, a setting, changed
+                        win.push_history(changed=[])
                         e.accept()
                         return
                 except Exception:
@@ -844,7 +940,7 @@ class CanvasView(QGraphicsView):
             ):
                 try:
                     if win.fillet_radius_tool.on_click(sp):
-                        win.push_history()
+                        win.push_history(changed=win.fillet_radius_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -904,7 +1000,7 @@ class CanvasView(QGraphicsView):
                 except Exception:
                     pass
                 it.setParentItem(self.devices_group)
-                win.push_history()
+                win.push_history(changed=[it])
                 e.accept()
                 return
             else:
@@ -931,7 +1027,7 @@ class CanvasView(QGraphicsView):
             ):
                 try:
                     if self.win.freehand_tool.on_release(self.last_scene_pos):
-                        self.win.push_history()
+                        self.win.push_history(changed=self.win.freehand_tool.changed)
                         e.accept()
                         return
                 except Exception:
@@ -941,12 +1037,18 @@ class CanvasView(QGraphicsView):
             ):
                 try:
                     if self.win.cloud_tool.finish():
-                        self.win.push_history()
+                        self.win.push_history(changed=self.win.cloud_tool.changed)
                         e.accept()
                         return
                 except Exception:
                     pass
         super().mouseReleaseEvent(e)
+        if e.button() == Qt.LeftButton:
+            sel = self.scene().selectedItems()
+            if sel:
+                # A left-drag may have moved the selection; only it needs new snaps
+                self._refresh_snaps(sel)
+                self.win.push_history(changed=sel, coalesce=True)
 
 
 class MainWindow(QMainWindow):
@@ -955,8 +1057,10 @@ class MainWindow(QMainWindow):
         # Ensure basic mutable structures exist immediately. Some tools
         # or simulated events may call push_history during init, so make
         # sure these attributes are present as soon as the object is created.
-        self.history = []
-        self.history_index = -1
+        self.history = History()
+        self._history_items = {}  # uid -> (layer, JSON) as of the last step
+        self._history_state = None
+        self._uid_items = weakref.WeakValueDictionary()
         self.setWindowTitle(APP_TITLE)
         self.resize(1400, 900)
         self.prefs = load_prefs()
@@ -973,6 +1077,13 @@ class MainWindow(QMainWindow):
         self.prefs.setdefault("page_size", "Letter")
         self.prefs.setdefault("page_orient", "Landscape")
         self.prefs.setdefault("page_margin_in", 0.5)
+        self.prefs.setdefault("history_max_mb", 64)
+        self.prefs.setdefault("history_coalesce_moves", True)
+        self.prefs.setdefault("dxf_block_instances", False)
+        self.prefs.setdefault("dxf_cache", True)
+        self.prefs.setdefault("dxf_cache_max_mb", 512)
+        self.history.max_bytes = int(float(self.prefs["history_max_mb"]) * 1024 * 1024)
+        self.history.coalesce_moves = bool(self.prefs["history_coalesce_moves"])
         self.prefs.setdefault("show_placement_coverage", True)
         save_prefs(self.prefs)
 
@@ -986,40 +1097,8 @@ class MainWindow(QMainWindow):
         self.set_theme(self.prefs.get("theme", "dark"))  # apply early
 
         self.devices_all = catalog.load_catalog()
-        # Minimal device tree so headless simulators can find and use it.
-        try:
-            self.device_tree = QtWidgets.QTreeWidget()
-            self.device_tree.setHeaderLabels(["Devices"])
-            self.device_tree.setAlternatingRowColors(True)
-            self.device_tree.setSortingEnabled(True)
-            try:
-                self.device_tree.sortByColumn(0, Qt.AscendingOrder)
-            except Exception:
-                pass
-            # Minimal population so headless sims can find devices
-            try:
-                # Group devices by type for a small hierarchy
-                grouped = {}
-                for d in self.devices_all:
-                    cat = d.get("type", "Unknown") or "Unknown"
-                    grouped.setdefault(cat, []).append(d)
-                for cat in sorted(grouped.keys()):
-                    cat_item = QtWidgets.QTreeWidgetItem([cat])
-                    for dev in sorted(grouped[cat], key=lambda x: x.get("name", "")):
-                        txt = f"{dev.get('name','<unknown>')} ({dev.get('symbol','')})"
-                        if dev.get("part_number"):
-                            txt += f" - {dev.get('part_number')}"
-                        it = QtWidgets.QTreeWidgetItem([txt])
-                        it.setData(0, QtCore.Qt.UserRole, dev)
-                        cat_item.addChild(it)
-                    self.device_tree.addTopLevelItem(cat_item)
-                self.device_tree.expandAll()
-            except Exception:
-                pass
-        except Exception:
-            # If Qt widgets are not fully usable in this environment, leave a None
-            # and let callers fall back. Simulators check for presence.
-            self.device_tree = None
+        # Palette view over the lazy catalog model; headless simulators use it too
+        self.ensure_device_tree()
         # Ensure we have an active layer id and layer list available early.
         # Some headless runners create the MainWindow and call placement
         # routines before the full DB wiring is complete. Provide a safe
@@ -1058,6 +1137,7 @@ class MainWindow(QMainWindow):
         self.layer_overlay = QtWidgets.QGraphicsItemGroup()
         self.layer_overlay.setZValue(200)
         self.scene.addItem(self.layer_overlay)
+        self._coverage_gap_item = None
         # Allow child items to receive mouse events for selection and dragging
         for grp in (
             self.layer_underlay,
@@ -1088,6 +1168,7 @@ class MainWindow(QMainWindow):
         self.title_block = None
         # DXF layers placeholder used by serialize_state; ensure exists early
         self._dxf_layers = {}
+        self._dxf_job = None
         # Sheet manager: list of {name, scene}; paper_scene points to current sheet
         self.sheets = []
         self.paper_scene = None
@@ -1150,6 +1231,12 @@ class MainWindow(QMainWindow):
         setup_event_handlers(self)
         setup_menus(self)
         setup_toolbar(self)
+        self._history_state = self._settings_state()
+
+    def closeEvent(self, e: QtGui.QCloseEvent):
+        # Intersection tiles are saved on a debounce; write what is still pending
+        self.view.snap_index.intersections.close()
+        super().closeEvent(e)
 
     def _on_space_combo_changed(self, idx: int):
         if self.space_lock.isChecked():
@@ -1270,11 +1357,11 @@ class MainWindow(QMainWindow):
         ll_typ = QHBoxLayout()
         ll_typ.addWidget(QLabel("Type:"))
         ll_typ.addWidget(self.cmb_type)
-        self.list = QListWidget()
+        self.ensure_device_tree()
         ll.addLayout(ll_top)
         ll.addLayout(ll_typ)
         ll.addWidget(self.search)
-        ll.addWidget(self.list)
+        ll.addWidget(self.device_view)
 
         self._populate_filters()
 
@@ -1284,11 +1371,10 @@ class MainWindow(QMainWindow):
         # Ensure central widget is just the view
         self.setCentralWidget(self.view)
 
-        self.search.textChanged.connect(self._refresh_device_list)
-        self.cmb_mfr.currentIndexChanged.connect(self._refresh_device_list)
-        self.cmb_type.currentIndexChanged.connect(self._refresh_device_list)
-        self.list.itemClicked.connect(self.choose_device)
-        self._refresh_device_list()
+        self.search.textChanged.connect(self._filter_device_tree)
+        self.cmb_mfr.currentIndexChanged.connect(self._filter_device_tree)
+        self.cmb_type.currentIndexChanged.connect(self._filter_device_tree)
+        self._filter_device_tree()
 
         # OSNAP initial states are wired in View â†’ Object Snaps
 
@@ -1603,176 +1689,49 @@ class MainWindow(QMainWindow):
         self.cmb_type.clear()
         self.cmb_type.addItems(types)
 
-    def _refresh_device_list(self):
-        q = self.search.text().lower().strip()
-        want_mfr = self.cmb_mfr.currentText()
-        want_type = self.cmb_type.currentText()
-        self.list.clear()
-        for d in self.devices_all:
-            if want_mfr and want_mfr != "(Any)" and d.get("manufacturer") != want_mfr:
-                continue
-            if want_type and want_type != "(Any)" and d.get("type") != want_type:
-                continue
-            txt = f"{d['name']} ({d['symbol']})"
-            if q and q not in txt.lower() and q not in (d.get("part_number", "").lower()):
-                continue
-            it = QListWidgetItem(txt)
-            it.setData(Qt.UserRole, d)
-            self.list.addItem(it)
-
-        self.cmb_category.clear()
-        self.cmb_category.addItems(["All Categories"] + sorted(list(categories)))
-
-        self.cmb_mfr.clear()
-        self.cmb_mfr.addItems(["All Manufacturers"] + sorted(list(manufacturers)))
-
-        self.cmb_type.clear()
-        self.cmb_type.addItems(["All Device Types"] + sorted(list(types)))
-
     def _populate_device_tree(self):
-        """Populate the device tree with categorized devices and improved organization."""
-        self.device_tree.clear()
-
-        # Organize devices by category and type with better hierarchy
-        categorized_devices = {}
-        for d in self.devices_all:
-            # Skip devices with empty names
-            if not d.get("name"):
-                continue
-
-            category = d.get("system_category", "Unknown") or "Unknown"
-            device_type = d.get("type", "Unknown") or "Unknown"
-
-            # Ensure category and type are not empty
-            if not category:
-                category = "Unknown"
-            if not device_type:
-                device_type = "Unknown"
-
-            if category not in categorized_devices:
-                categorized_devices[category] = {}
-            if device_type not in categorized_devices[category]:
-                categorized_devices[category][device_type] = []
-
-            categorized_devices[category][device_type].append(d)
-
-        # Create tree items with improved visual hierarchy and spacing
-        for category in sorted(categorized_devices.keys()):
-            category_item = QtWidgets.QTreeWidgetItem([category])
-            category_item.setExpanded(True)  # Start expanded for better visibility
-            font = category_item.font(0)
-            font.setBold(True)
-            font.setPointSize(11)  # Larger font for categories
-            category_item.setFont(0, font)
-            category_item.setIcon(0, QtGui.QIcon())  # Add icon if needed
-
-            for device_type in sorted(categorized_devices[category].keys()):
-                type_item = QtWidgets.QTreeWidgetItem([device_type])
-                type_item.setExpanded(True)  # Start expanded for better visibility
-                font = type_item.font(0)
-                font.setItalic(True)
-                font.setBold(True)
-                font.setPointSize(10)  # Slightly smaller than category
-                type_item.setFont(0, font)
-                type_item.setIcon(0, QtGui.QIcon())  # Add icon if needed
-
-                for device in sorted(
-                    categorized_devices[category][device_type], key=lambda x: x["name"]
-                ):
-                    # Create device item with formatted text and better spacing
-                    display_text = f"{device['name']} ({device['symbol']})"
-                    if device.get("part_number"):
-                        display_text += f" - {device['part_number']}"
-
-                    device_item = QtWidgets.QTreeWidgetItem([display_text])
-                    device_item.setData(0, Qt.UserRole, device)
-
-                    # Set tooltip with detailed information
-                    tooltip = f"Name: {device['name']}\nSymbol: {device['symbol']}\nType: {device_type}\nCategory: {category}"
-                    if device.get("manufacturer") and device["manufacturer"] != "(Any)":
-                        tooltip += f"\nManufacturer: {device['manufacturer']}"
-                    if device.get("part_number"):
-                        tooltip += f"\nPart Number: {device['part_number']}"
-                    device_item.setToolTip(0, tooltip)
-
-                    # Add icon based on device type if needed
-                    device_item.setIcon(0, QtGui.QIcon())  # Add icon if needed
-
-                    type_item.addChild(device_item)
-
-                category_item.addChild(type_item)
-
-            self.device_tree.addTopLevelItem(category_item)
-
-        # Expand all items by default for better visibility
-        self.device_tree.expandAll()
-
-        # Set better styling for the tree
-        self.device_tree.setStyleSheet(
-            "QTreeWidget { border: 1px solid #555; background-color: #252526; alternate-background-color: #2d2d30; selection-background-color: #0078d7; selection-color: white; } QTreeWidget::item { padding: 3px; } QTreeWidget::item:hover { background-color: #3f3f41; } QTreeWidget::item:selected { background-color: #0078d7; } QScrollBar:vertical { border: none; background: #333336; width: 14px; margin: 0px 0px 0px 0px; } QScrollBar::handle:vertical { background: #555558; border-radius: 4px; min-height: 20px; } QScrollBar::handle:vertical:hover { background: #666669; }"
+        """Build the palette view over a lazily paged catalog model."""
+        if getattr(self, "device_model", None) is not None:
+            self.device_model.set_query("")
+            return
+        self.device_view, self.device_model, self.device_proxy = device_palette.make_palette_view(
+            device_palette.palette_source(self.devices_all)
+        )
+        self.device_view.clicked.connect(self._on_device_index_selected)
+        self.device_view.setStyleSheet(
+            "QTreeView { border: 1px solid #555; background-color: #252526; alternate-background-color: #2d2d30; selection-background-color: #0078d7; selection-color: white; } QTreeView::item { padding: 3px; } QTreeView::item:hover { background-color: #3f3f41; } QTreeView::item:selected { background-color: #0078d7; } QScrollBar:vertical { border: none; background: #333336; width: 14px; margin: 0px 0px 0px 0px; } QScrollBar::handle:vertical { background: #555558; border-radius: 4px; min-height: 20px; } QScrollBar::handle:vertical:hover { background: #666669; }"
         )
 
     def _filter_device_tree(self):
-        """Filter the device tree based on search and filter criteria."""
-        search_text = self.search.text().lower().strip()
-        selected_category = self.cmb_category.currentText()
+        """Re-run the palette query for the search text and filter combos."""
+        if getattr(self, "device_model", None) is None:
+            self._populate_device_tree()
+        filters = {}
         selected_mfr = self.cmb_mfr.currentText()
         selected_type = self.cmb_type.currentText()
-
-        def item_matches(item):
-            """Recursively check if an item or any of its children match the filters."""
-            # If it's a device, check if it matches
-            device = item.data(0, Qt.UserRole)
-            if device:
-                search_matches = not search_text or (
-                    search_text in device.get("name", "").lower()
-                    or search_text in device.get("symbol", "").lower()
-                    or search_text in device.get("part_number", "").lower()
-                )
-                mfr_matches = selected_mfr == "All Manufacturers" or selected_mfr == device.get(
-                    "manufacturer", "(Any)"
-                )
-                type_matches = selected_type == "All Device Types" or selected_type == device.get(
-                    "type", "Unknown"
-                )
-                category_matches = (
-                    selected_category == "All Categories"
-                    or selected_category == device.get("system_category", "Unknown")
-                )
-
-                return search_matches and mfr_matches and type_matches and category_matches
-
-            # If it's a category or type, check if any children match
-            child_count = item.childCount()
-            any_child_matches = False
-            for i in range(child_count):
-                if item_matches(item.child(i)):
-                    any_child_matches = True
-                    break  # No need to check other children
-
-            return any_child_matches
-
-        def update_visibility(item):
-            """Recursively update the visibility of items."""
-            matches = item_matches(item)
-            item.setHidden(not matches)
-
-            for i in range(item.childCount()):
-                update_visibility(item.child(i))
-
-        # Iterate over top-level items and update visibility
-        for i in range(self.device_tree.topLevelItemCount()):
-            update_visibility(self.device_tree.topLevelItem(i))
-
-        self.device_tree.expandAll()
+        if selected_mfr and selected_mfr != "(Any)":
+            filters["manufacturer"] = selected_mfr
+        if selected_type and selected_type != "(Any)":
+            filters["type"] = selected_type
+        # One indexed catalog query; only the visible page of each type is loaded
+        self.device_model.set_query(self.search.text(), filters)
+        if self.search.text().strip():
+            self.device_view.expandAll()
+
+    def _on_device_index_selected(self, index: QtCore.QModelIndex):
+        """Handle device selection from the palette view."""
+        device = index.data(Qt.UserRole)
+        if device:
+            self._select_palette_device(device)
 
     def _on_device_selected(self, item: QtWidgets.QTreeWidgetItem, column: int):
         """Handle device selection from the tree view."""
         # Only process leaf items (devices, not categories or types)
         if item.childCount() > 0 or not item.data(0, Qt.UserRole):
             return
+        self._select_palette_device(item.data(0, Qt.UserRole))
 
-        device = item.data(0, Qt.UserRole)
+    def _select_palette_device(self, device: dict):
         try:
             import json as _json
 
@@ -1792,122 +1751,22 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage(f"Selected: {device['name']} ({device['symbol']})")
 
     def ensure_device_tree(self):
-        """Lazily ensure a device_tree exists and is populated.
+        """Lazily ensure a device_tree exists.
 
         Headless simulators may create the MainWindow in trimmed contexts and
-        expect a device_tree to be present. This helper creates a minimal
-        QTreeWidget and populates it from the loaded catalog if missing.
+        expect a device_tree to be present. It is the palette view, so they
+        read devices through ``device_model`` (type rows, then devices paged
+        in with ``fetchMore``) rather than a tree built from every device.
         """
         if getattr(self, "device_tree", None):
             return
         try:
-            self.device_tree = QtWidgets.QTreeWidget()
-            self.device_tree.setHeaderLabels(["Devices"])
-            self.device_tree.setAlternatingRowColors(True)
-            self.device_tree.setSortingEnabled(True)
-            try:
-                self.device_tree.sortByColumn(0, Qt.AscendingOrder)
-            except Exception:
-                pass
-            # Minimal population
-            try:
-                grouped = {}
-                for d in getattr(self, "devices_all", []):
-                    cat = d.get("type", "Unknown") or "Unknown"
-                    grouped.setdefault(cat, []).append(d)
-                for cat in sorted(grouped.keys()):
-                    cat_item = QtWidgets.QTreeWidgetItem([cat])
-                    for dev in sorted(grouped[cat], key=lambda x: x.get("name", "")):
-                        txt = f"{dev.get('name','<unknown>')} ({dev.get('symbol','')})"
-                        if dev.get("part_number"):
-                            txt += f" - {dev.get('part_number')}"
-                        it = QtWidgets.QTreeWidgetItem([txt])
-                        it.setData(0, QtCore.Qt.UserRole, dev)
-                        cat_item.addChild(it)
-                    self.device_tree.addTopLevelItem(cat_item)
-                try:
-                    self.device_tree.expandAll()
-                except Exception:
-                    pass
-            except Exception:
-                pass
+            self._populate_device_tree()
+            self.device_tree = self.device_view
         except Exception:
+            # If Qt widgets are not fully usable in this environment, leave a None
+            # and let callers fall back. Simulators check for presence.
             self.device_tree = None
-        # If we couldn't create a real QTreeWidget (e.g., headless Qt issues),
-        # provide a minimal Python-only tree object that implements the small
-        # subset of the QTreeWidget API used by headless simulators.
-        if getattr(self, "device_tree", None) is None:
-            try:
-
-                class SimpleTreeItem:
-                    def __init__(self, text):
-                        self._text = text
-                        self._children = []
-                        self._data = {}
-
-                    def childCount(self):
-                        return len(self._children)
-
-                    def child(self, i):
-                        return self._children[i]
-
-                    def addChild(self, it):
-                        self._children.append(it)
-
-                    def setData(self, col, role, value):
-                        self._data[(col, role)] = value
-
-                    def data(self, col, role):
-                        return self._data.get((col, role))
-
-                class SimpleTree:
-                    def __init__(self):
-                        self._tops = []
-
-                    def setHeaderLabels(self, labels):
-                        pass
-
-                    def setAlternatingRowColors(self, v):
-                        pass
-
-                    def setSortingEnabled(self, v):
-                        pass
-
-                    def sortByColumn(self, c, order=None):
-                        pass
-
-                    def addTopLevelItem(self, it):
-                        self._tops.append(it)
-
-                    def topLevelItemCount(self):
-                        return len(self._tops)
-
-                    def topLevelItem(self, i):
-                        return self._tops[i]
-
-                    def expandAll(self):
-                        pass
-
-                st = SimpleTree()
-                grouped = {}
-                for d in getattr(self, "devices_all", []):
-                    cat = d.get("type", "Unknown") or "Unknown"
-                    grouped.setdefault(cat, []).append(d)
-                for cat in sorted(grouped.keys()):
-                    cat_item = SimpleTreeItem(cat)
-                    for dev in sorted(grouped[cat], key=lambda x: x.get("name", "")):
-                        txt = f"{dev.get('name','<unknown>')} ({dev.get('symbol','')})"
-                        if dev.get("part_number"):
-                            txt += f" - {dev.get('part_number')}"
-                        it = SimpleTreeItem(txt)
-                        # store device dict under (0, UserRole) like Qt
-                        it.setData(0, QtCore.Qt.UserRole, dev)
-                        cat_item.addChild(it)
-                    st.addTopLevelItem(cat_item)
-                self.device_tree = st
-            except Exception:
-                # give up gracefully
-                self.device_tree = None
 
     def _clear_filters(self):
         """Clear all filter selections."""
@@ -1970,7 +1829,7 @@ class MainWindow(QMainWindow):
                     }
 
                     # Add to history and update UI
-                    self.push_history()
+                    self.push_history(changed=[device_item])
                     self.statusBar().showMessage(f"Placed FACP panel: {name}")
                     self.connections_tree.add_panel(name, device_item, panel.panel_type)
 
@@ -2059,7 +1918,7 @@ class MainWindow(QMainWindow):
         # Create a new viewport item
         new_viewport = ViewportItem(self.scene, QtCore.QRectF(0, 0, 500, 400), self)
         self.paper_scene.addItem(new_viewport)
-        self.push_history()
+        self.push_history(changed=[new_viewport])
         self.statusBar().showMessage("New viewport added to Paperspace.")
 
     def show_job_info_dialog(self):
@@ -2086,7 +1945,7 @@ class MainWindow(QMainWindow):
                     selected_device.pos() + QtCore.QPointF(20, 20)
                 )  # Offset for visibility
                 self.layer_sketch.addToGroup(token_item)
-                self.push_history()
+                self.push_history(changed=[token_item])
                 self.statusBar().showMessage(
                     f"Placed token '{selected_token_string}' for {selected_device.name}"
                 )
@@ -2117,6 +1976,157 @@ class MainWindow(QMainWindow):
         self.prefs["show_placement_coverage"] = bool(on)
         save_prefs(self.prefs)
 
+    def _coverage_rooms_ft(self) -> list[list[tuple[float, float]]]:
+        """Room outlines in feet: the selected sketch rectangles / closed polylines, else all."""
+        sketch = self.layer_sketch.childItems()
+        selected = [it for it in sketch if it.isSelected()]
+        ppf = float(self.px_per_ft)
+        return [
+            [(x / ppf, y / ppf) for x, y in poly]
+            for poly in map(_room_polygon, selected or sketch)
+            if poly
+        ]
+
+    def toggle_coverage_gaps(self, on: bool):
+        """Show (re-analysing) or hide the rasterized coverage-gap overlay."""
+        if self._coverage_gap_item is not None:
+            try:
+                self.scene.removeItem(self._coverage_gap_item)
+            except Exception:
+                pass
+            self._coverage_gap_item = None
+        if on:
+            self.analyze_coverage_gaps()
+
+    def analyze_coverage_gaps(self):
+        """Rasterize rooms and device coverage, report gaps and overlay them on the plan."""
+        from backend import coverage_analysis
+
+        ppf = float(self.px_per_ft)
+        rooms = self._coverage_rooms_ft()
+        if not rooms:
+            self.statusBar().showMessage(
+                "Coverage gaps: draw rooms as rectangles or closed polylines first"
+            )
+            return None
+        devices = [it for it in self.layer_devices.childItems() if isinstance(it, DeviceItem)]
+        centers = [(d.scenePos().x() / ppf, d.scenePos().y() / ppf) for d in devices]
+        radii = [
+            (
+                float(d.coverage.get("computed_radius_ft") or 0.0)
+                if d.coverage.get("mode", "none") != "none"
+                else 0.0
+            )
+            for d in devices
+        ]
+        cell_ft = float(self.prefs.get("coverage_cell_ft", 1.0))
+        grid = coverage_analysis.analyze_coverage(rooms, centers, radii, cell_ft)
+
+        rgba = coverage_analysis.overlay_rgba(grid)
+        h, w = grid.shape
+        image = QtGui.QImage(rgba.data, w, h, 4 * w, QtGui.QImage.Format_RGBA8888).copy()
+        item = QtWidgets.QGraphicsPixmapItem(QtGui.QPixmap.fromImage(image))
+        item.setScale(grid.cell_ft * ppf)
+        item.setPos(grid.origin_ft[0] * ppf, grid.origin_ft[1] * ppf)
+        item.setZValue(90)  # above sketch, beneath devices
+        item.setAcceptedMouseButtons(Qt.NoButton)
+        item.setTransformationMode(Qt.FastTransformation)
+        lines = [
+            f"Room {r.room + 1}: {r.percent:.1f}% covered, {r.uncovered_sqft:.0f} sq ft uncovered, "
+            f"{r.overlapped} overlapped cell(s) (max {r.max_overlap})"
+            for r in grid.rooms
+        ]
+        item.setToolTip("\n".join(lines))
+        self.toggle_coverage_gaps(False)
+        self.scene.addItem(item)
+        self._coverage_gap_item = item
+
+        gaps = sum(r.uncovered_sqft for r in grid.rooms)
+        self.statusBar().showMessage(
+            f"Coverage {grid.percent:.1f}% across {len(rooms)} room(s); {gaps:.0f} sq ft uncovered"
+        )
+        return grid
+
+    def auto_size_coverage(self):
+        """Size every strobe, speaker and smoke detector from the rooms they sit in.
+
+        Rooms are the selected rectangles / closed polylines on the sketch layer,
+        or all of them when none are selected. Candela, speaker and smoke radii
+        are computed for the whole floor in one pass and applied as one update.
+        """
+        from backend import coverage_service
+
+        ppf = float(self.px_per_ft)
+        rooms = self._coverage_rooms_ft()
+        devices = [it for it in self.layer_devices.childItems() if isinstance(it, DeviceItem)]
+        kinds = []
+        for d in devices:
+            mode = d.coverage.get("mode", "none")
+            kinds.append(
+                mode if mode != "none" else infer_device_kind({"name": d.name, "symbol": d.symbol})
+            )
+        if not devices:
+            self.statusBar().showMessage("Auto-size coverage: no devices placed")
+            return
+        positions = [(d.scenePos().x() / ppf, d.scenePos().y() / ppf) for d in devices]
+        mounts = [d.coverage.get("mount", "ceiling") for d in devices]
+        # Speakers and detectors keep their own inputs; the dialog defaults otherwise
+        params = [d.coverage.get("params") or {} for d in devices]
+        l10 = [float(p.get("L10", 95.0)) for p in params]
+        target_db = [float(p.get("target_db", 75.0)) for p in params]
+        spacing = [float(p.get("spacing_ft", 30.0)) for p in params]
+        ceiling_ft = float(self.prefs.get("ceiling_height_ft", 10.0))
+        try:
+            sizing = coverage_service.size_floor(
+                positions,
+                kinds,
+                rooms,
+                ceiling_heights_ft=ceiling_ft,
+                mounts=mounts,
+                speaker_l10_db=l10,
+                speaker_target_db=target_db,
+                smoke_spacing_ft=spacing,
+            )
+        except Exception as ex:
+            QtWidgets.QMessageBox.critical(self, "Auto-Size Coverage", str(ex))
+            return
+
+        covs = []
+        for i, d in enumerate(devices):
+            kind = kinds[i]
+            r_ft = float(sizing.radius_ft[i])
+            if not sizing.sized[i] or kind not in ("strobe", "speaker", "smoke"):
+                covs.append(None)
+                continue
+            if kind == "strobe":
+                p = {
+                    "diameter_ft": 2.0 * r_ft,
+                    "candela": int(sizing.candela[i]),
+                    "room_size_ft": float(sizing.room_size_ft[i]),
+                }
+            elif kind == "speaker":
+                p = {"L10": l10[i], "target_db": target_db[i]}
+            else:
+                p = {"spacing_ft": spacing[i]}
+            covs.append(
+                {
+                    "source": "auto",
+                    "mode": kind,
+                    "mount": mounts[i],
+                    "params": p,
+                    "computed_radius_ft": r_ft,
+                    "px_per_ft": ppf,
+                }
+            )
+        n = apply_coverage(devices, covs)
+        if n:
+            self.push_history(changed=[d for d, c in zip(devices, covs) if c])
+        skipped = sum(1 for k, c in zip(kinds, covs) if c is None and k == "strobe")
+        msg = f"Auto-sized coverage for {n} device(s) in {len(rooms)} room(s)"
+        if skipped:
+            msg += f"; {skipped} strobe(s) outside a room or without a rating"
+        self.statusBar().showMessage(msg)
+
     # ---------- command bar ----------
     def _run_command(self):
         txt = (self.cmd.text() or "").strip().lower()
@@ -2173,7 +2183,7 @@ class MainWindow(QMainWindow):
                 pt = self._parse_coord_input(txt)
                 if pt is not None:
                     if self.draw.add_point_command(pt):
-                        self.push_history()
+                        self.push_history(changed=self.draw.changed)
                     return
             fn = m.get(txt)
             if fn:
@@ -2290,7 +2300,7 @@ class MainWindow(QMainWindow):
             except Exception:
                 pass
             if committing_poly:
-                self.push_history()
+                self.push_history(changed=self.draw.changed)
         # cancel dimension tool
         if getattr(self, "dim_tool", None):
             try:
@@ -2430,7 +2440,7 @@ class MainWindow(QMainWindow):
                 dlg = CoverageDialog(self, existing=d.coverage)
                 if dlg.exec() == QtWidgets.QDialog.Accepted:
                     d.set_coverage(dlg.get_settings(self.px_per_ft))
-                    self.push_history()
+                    self.push_history(changed=[d])
             elif act == act_tog:
                 if d.coverage.get("mode", "none") == "none":
                     diam_ft = float(self.prefs.get("default_strobe_diameter_ft", 50.0))
@@ -2446,7 +2456,7 @@ class MainWindow(QMainWindow):
                     d.set_coverage(
                         {"mode": "none", "computed_radius_ft": 0.0, "px_per_ft": self.px_per_ft}
                     )
-                self.push_history()
+                self.push_history(changed=[d])
             elif act == act_lbl:
                 txt, ok = QtWidgets.QInputDialog.getText(self, "Device Label", "Text:", text=d.name)
                 if ok:
@@ -2457,95 +2467,110 @@ class MainWindow(QMainWindow):
             return
 
     # ---------- history / serialize ----------
-    def serialize_state(self):
-        devs = []
-        for it in self.layer_devices.childItems():
-            if isinstance(it, DeviceItem):
-                devs.append(it.to_json())
-        # underlay transform
-        ut = self.layer_underlay.transform()
-        underlay = {
-            "m11": ut.m11(),
-            "m12": ut.m12(),
-            "m13": ut.m13(),
-            "m21": ut.m21(),
-            "m22": ut.m22(),
-            "m23": ut.m23(),
-            "m31": ut.m31(),
-            "m32": ut.m32(),
-            "m33": ut.m33(),
+    def _item_uid(self, it) -> str:
+        """Stable id of a tracked item, assigned on first use."""
+        uid = it.data(ITEM_UID_ROLE)
+        if not uid:
+            uid = uuid.uuid4().hex
+            it.setData(ITEM_UID_ROLE, uid)
+        self._uid_items[uid] = it
+        return uid
+
+    def _tracked_layers(self):
+        return {
+            "devices": self.layer_devices,
+            "wires": self.layer_wires,
+            "sketch": self.layer_sketch,
         }
-        # DXF layer states
-        dxf_layers = {}
-        for name, grp in (self._dxf_layers or {}).items():
-            # get first child pen color
-            color_hex = None
-            for ch in grp.childItems():
-                try:
-                    if hasattr(ch, "pen"):
-                        color_hex = ch.pen().color().name()
-                        break
-                except Exception:
-                    pass
-            dxf_layers[name] = {
-                "visible": bool(grp.isVisible()),
-                "locked": bool(grp.data(2004) or False),
-                "print": False if grp.data(2003) is False else True,
-                "color": color_hex,
-                "orig_color": grp.data(2002),
-            }
 
-        # sketch geometry
-        def _line_json(it: QtWidgets.QGraphicsLineItem):
-            l = it.line()
-            return {"type": "line", "x1": l.x1(), "y1": l.y1(), "x2": l.x2(), "y2": l.y2()}
-
-        def _rect_json(it: QtWidgets.QGraphicsRectItem):
-            r = it.rect()
-            return {"type": "rect", "x": r.x(), "y": r.y(), "w": r.width(), "h": r.height()}
-
-        def _ellipse_json(it: QtWidgets.QGraphicsEllipseItem):
-            r = it.rect()
-            return {
-                "type": "circle",
-                "x": r.center().x(),
-                "y": r.center().y(),
-                "r": r.width() / 2.0,
-            }
-
-        def _path_json(it: QtWidgets.QGraphicsPathItem):
-            p = it.path()
-            pts = []
-            for i in range(p.elementCount()):
-                e = p.elementAt(i)
-                pts.append({"x": e.x, "y": e.y})
-            return {"type": "poly", "pts": pts}
-
-        def _text_json(it: QtWidgets.QGraphicsSimpleTextItem):
-            p = it.pos()
-            return {"type": "text", "x": p.x(), "y": p.y(), "text": it.text()}
+    def _item_layer(self, it):
+        parent = it.parentItem()
+        for layer, grp in self._tracked_layers().items():
+            if parent is grp:
+                return layer
+        return None
 
-        sketch = []
-        for it in self.layer_sketch.childItems():
-            if isinstance(it, QtWidgets.QGraphicsLineItem):
-                sketch.append(_line_json(it))
-            elif isinstance(it, QtWidgets.QGraphicsRectItem):
-                sketch.append(_rect_json(it))
-            elif isinstance(it, QtWidgets.QGraphicsEllipseItem):
-                sketch.append(_ellipse_json(it))
-            elif isinstance(it, QtWidgets.QGraphicsPathItem):
-                sketch.append(_path_json(it))
-            elif isinstance(it, QtWidgets.QGraphicsSimpleTextItem):
-                sketch.append(_text_json(it))
-        # wires
-        wires = []
-        for it in self.layer_wires.childItems():
+    def _item_json(self, layer: str, it):
+        """JSON dict for an item on a tracked layer, or None if it is not persisted."""
+        if layer == "devices":
+            d = it.to_json() if isinstance(it, DeviceItem) else None
+        elif layer == "wires":
+            d = None
             if isinstance(it, QtWidgets.QGraphicsPathItem):
                 p = it.path()
                 if p.elementCount() >= 2:
+                    off = it.pos()
                     a = p.elementAt(0)
                     b = p.elementAt(1)
-                    wires.append({"ax": a.x, "ay": a.y, "bx": b.x, "by": b.y})
+                    d = {
+                        "ax": a.x + off.x(),
+                        "ay": a.y + off.y(),
+                        "bx": b.x + off.x(),
+                        "by": b.y + off.y(),
+                    }
+        else:
+            d = _sketch_json(it)
+        if d is not None:
+            d["id"] = self._item_uid(it)
+        return d
+
+    def _item_from_json(self, layer: str, d: dict):
+        """Create an item on ``layer`` from its JSON; returns None if unsupported."""
+        if layer == "devices":
+            it = DeviceItem.from_json(d)
+        elif layer == "wires":
+            a = QtCore.QPointF(float(d.get("ax", 0.0)), float(d.get("ay", 0.0)))
+            b = QtCore.QPointF(float(d.get("bx", 0.0)), float(d.get("by", 0.0)))
+            path = QtGui.QPainterPath(a)
+            path.lineTo(b)
+            it = QtWidgets.QGraphicsPathItem(path)
+            pen = QtGui.QPen(QtGui.QColor("#2aa36b"))
+            pen.setCosmetic(True)
+            pen.setWidth(2)
+            it.setPen(pen)
+            it.setZValue(60)
+            it.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
+            it.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
+        else:
+            it = _sketch_from_json(d)
+            if it is None:
+                return None
+        it.setParentItem(self._tracked_layers()[layer])
+        if d.get("id"):
+            it.setData(ITEM_UID_ROLE, d["id"])
+        self._item_uid(it)
+        return it
+
+    def _update_item(self, layer: str, it, d: dict) -> bool:
+        """Apply ``d`` to an existing item in place; False if it must be recreated."""
+        if layer == "devices":
+            if not isinstance(it, DeviceItem):
+                return False
+            it.apply_json(d)
+            return True
+        if layer == "wires":
+            if not isinstance(it, QtWidgets.QGraphicsPathItem):
+                return False
+            path = QtGui.QPainterPath(
+                QtCore.QPointF(float(d.get("ax", 0.0)), float(d.get("ay", 0.0)))
+            )
+            path.lineTo(QtCore.QPointF(float(d.get("bx", 0.0)), float(d.get("by", 0.0))))
+            it.setPath(path)
+            it.setPos(0.0, 0.0)
+            return True
+        return _sketch_apply_json(it, d)
+
+    def _reconcile_item(self, layer: str, it, d: dict):
+        """Make ``it`` (or a new item when None) match ``d``; returns the live item."""
+        if it is not None and self._update_item(layer, it, d):
+            return it
+        if it is not None and it.scene() is not None:
+            it.scene().removeItem(it)
+        return self._item_from_json(layer, d)
+
+    def _settings_state(self):
+        ut = self.layer_underlay.transform()
+        up = self.layer_underlay.pos()
         return {
             "grid": int(self.scene.grid_size),
             "snap": bool(self.scene.snap_enabled),
@@ -2554,20 +2579,21 @@ class MainWindow(QMainWindow):
             "grid_opacity": float(self.prefs.get("grid_opacity", 0.25)),
             "grid_width_px": float(self.prefs.get("grid_width_px", 0.0)),
             "grid_major_every": int(self.prefs.get("grid_major_every", 5)),
-            "devices": devs,
-            "underlay_transform": underlay,
-            "dxf_layers": dxf_layers,
-            "sketch": sketch,
-            "wires": wires,
+            "underlay_transform": {
+                "m11": ut.m11(),
+                "m12": ut.m12(),
+                "m13": ut.m13(),
+                "m21": ut.m21(),
+                "m22": ut.m22(),
+                "m23": ut.m23(),
+                "m31": ut.m31(),
+                "m32": ut.m32(),
+                "m33": ut.m33(),
+            },
+            "underlay_pos": {"x": up.x(), "y": up.y()},
         }
 
-    def load_state(self, data):
-        for it in list(self.layer_devices.childItems()):
-            it.scene().removeItem(it)
-        for it in list(self.layer_wires.childItems()):
-            it.scene().removeItem(it)
-        for it in list(self.layer_sketch.childItems()):
-            it.scene().removeItem(it)
+    def _apply_settings(self, data):
         self.scene.snap_enabled = bool(data.get("snap", True))
         self.act_view_snap.setChecked(self.scene.snap_enabled)
         self.scene.grid_size = int(data.get("grid", DEFAULT_GRID_SIZE))
@@ -2588,10 +2614,6 @@ class MainWindow(QMainWindow):
             self.prefs["grid_opacity"], self.prefs["grid_width_px"], self.prefs["grid_major_every"]
         )
         self._apply_snap_step_from_inches(self.snap_step_in)
-        for d in data.get("devices", []):
-            it = DeviceItem.from_json(d)
-            it.setParentItem(self.layer_devices)
-        # underlay transform
         ut = data.get("underlay_transform")
         if ut:
             tr = QtGui.QTransform(
@@ -2606,74 +2628,185 @@ class MainWindow(QMainWindow):
                 ut.get("m33", 1),
             )
             self.layer_underlay.setTransform(tr)
-        # restore sketch
-        from PySide6 import QtGui
-
-        for s in data.get("sketch", []):
-            t = s.get("type")
-            if t == "line":
-                it = QtWidgets.QGraphicsLineItem(s["x1"], s["y1"], s["x2"], s["y2"])
-            elif t == "rect":
-                it = QtWidgets.QGraphicsRectItem(s["x"], s["y"], s["w"], s["h"])
-            elif t == "circle":
-                r = float(s.get("r", 0.0))
-                cx = float(s.get("x", 0.0))
-                cy = float(s.get("y", 0.0))
-                it = QtWidgets.QGraphicsEllipseItem(cx - r, cy - r, 2 * r, 2 * r)
-            elif t == "poly":
-                pts = [QtCore.QPointF(p["x"], p["y"]) for p in s.get("pts", [])]
-                if len(pts) < 2:
+        up = data.get("underlay_pos")
+        if up:
+            self.layer_underlay.setPos(float(up.get("x", 0.0)), float(up.get("y", 0.0)))
+
+    def serialize_state(self):
+        items = {layer: [] for layer in self._tracked_layers()}
+        for layer, grp in self._tracked_layers().items():
+            for it in grp.childItems():
+                d = self._item_json(layer, it)
+                if d is not None:
+                    items[layer].append(d)
+        # DXF layer states
+        dxf_layers = {}
+        for name, grp in (self._dxf_layers or {}).items():
+            # get first child pen color
+            color_hex = None
+            for ch in grp.childItems():
+                try:
+                    if hasattr(ch, "pen"):
+                        color_hex = ch.pen().color().name()
+                        break
+                except Exception:
+                    pass
+            dxf_layers[name] = {
+                "visible": bool(grp.isVisible()),
+                "locked": bool(grp.data(2004) or False),
+                "print": False if grp.data(2003) is False else True,
+                "color": color_hex,
+                "orig_color": grp.data(2002),
+            }
+        return {
+            **self._settings_state(),
+            "devices": items["devices"],
+            "dxf_layers": dxf_layers,
+            "sketch": items["sketch"],
+            "wires": items["wires"],
+        }
+
+    def load_state(self, data):
+        """Reconcile the scene with ``data``, touching only what differs.
+
+        Items are matched by their stable id: matches whose JSON changed are
+        updated in place, unmatched live items are removed and the rest of
+        ``data`` is created. Returns the items created, updated or removed,
+        for `push_history`.
+        """
+        self._invalidate_snaps()
+        self._apply_settings(data)
+        changed = []
+        for layer, grp in self._tracked_layers().items():
+            live = {}
+            for it in grp.childItems():
+                d = self._item_json(layer, it)
+                if d is None:
+                    it.scene().removeItem(it)
+                else:
+                    live[d["id"]] = (it, d)
+            seen = set()
+            for d in data.get(layer, []):
+                uid = d.get("id")
+                if uid in seen:
+                    # Duplicate id in the file; keep both items distinct
+                    d = {k: v for k, v in d.items() if k != "id"}
+                seen.add(uid)
+                cur = live.pop(uid, None) if uid else None
+                if cur is None:
+                    changed.append(self._item_from_json(layer, d))
+                elif cur[1] != d:
+                    changed.append(self._reconcile_item(layer, cur[0], d))
+            for it, _ in live.values():
+                it.scene().removeItem(it)
+                changed.append(it)
+        return [it for it in changed if it is not None]
+
+    def _history_snapshot(self):
+        """uid -> (layer, JSON string) for every persisted item on a tracked layer."""
+        snap = {}
+        for layer, grp in self._tracked_layers().items():
+            for it in grp.childItems():
+                d = self._item_json(layer, it)
+                if d is not None:
+                    snap[d["id"]] = (layer, json.dumps(d, sort_keys=True))
+        return snap
+
+    def push_history(self, changed=None, coalesce=False):
+        """Record the edit just made as one undo step.
+
+        Only the difference to the previous step is stored. Callers pass the
+        items they created, modified or removed as ``changed``; leaving it out
+        falls back to comparing every tracked item, which serializes the whole
+        drawing. ``coalesce`` marks drag moves that may merge with the previous
+        step.
+        """
+        if not hasattr(self, "layer_devices"):
+            return
+        base = self._history_items
+        if changed is None:
+            snap = self._history_snapshot()
+            items = diff_items(base, snap)
+            self._history_items = snap
+        else:
+            items = {}
+            for it in changed:
+                layer = self._item_layer(it)
+                d = self._item_json(layer, it) if layer else None
+                if d is None:
+                    uid = it.data(ITEM_UID_ROLE)
+                    if uid in base:
+                        old_layer, old = base.pop(uid)
+                        items[uid] = (old_layer, old, None)
                     continue
-                path = QtGui.QPainterPath(pts[0])
-                for p in pts[1:]:
-                    path.lineTo(p)
-                it = QtWidgets.QGraphicsPathItem(path)
-            elif t == "text":
-                it = QtWidgets.QGraphicsSimpleTextItem(s.get("text", ""))
-                it.setPos(float(s.get("x", 0.0)), float(s.get("y", 0.0)))
-                it.setFlag(QtWidgets.QGraphicsItem.ItemIgnoresTransformations, True)
-            else:
+                rec = (layer, json.dumps(d, sort_keys=True))
+                old = base.get(d["id"])
+                if old != rec:
+                    items[d["id"]] = (layer, old[1] if old else None, rec[1])
+                    base[d["id"]] = rec
+        state = self._settings_state()
+        if self._history_state is None:
+            self._history_state = state
+        entry = HistoryEntry(items, diff_state(self._history_state, state), coalesce=coalesce)
+        self._history_state = state
+        if self.history.push(entry):
+            self._invalidate_snaps(None if entry.state else changed)
+
+    def _invalidate_snaps(self, items=None):
+        """Refresh snap candidates of ``items``, or of the whole scene when None."""
+        view = getattr(self, "view", None)
+        if view is None:
+            return
+        if items is None:
+            view.snap_index.invalidate()
+        else:
+            view._refresh_snaps(items)
+
+    def _find_item(self, uid: str, layer: str):
+        it = self._uid_items.get(uid)
+        grp = self._tracked_layers()[layer]
+        if it is not None and it.parentItem() is grp:
+            return it
+        for it in grp.childItems():
+            if it.data(ITEM_UID_ROLE) == uid:
+                return it
+        return None
+
+    def _apply_history(self, entry, undo: bool):
+        touched = []
+        for uid, (layer, before, after) in entry.items.items():
+            target = before if undo else after
+            old = self._find_item(uid, layer)
+            if old is not None:
+                touched.append(old)
+            if target is None:
+                if old is not None and old.scene() is not None:
+                    old.scene().removeItem(old)
+                self._history_items.pop(uid, None)
                 continue
-            pen = QtGui.QPen(QtGui.QColor("#e0e0e0"))
-            pen.setCosmetic(True)
-            if hasattr(it, "setPen"):
-                it.setPen(pen)
-            it.setZValue(20)
-            it.setParentItem(self.layer_sketch)
-            it.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
-            it.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
-        # restore wires
-        for w in data.get("wires", []):
-            a = QtCore.QPointF(float(w.get("ax", 0.0)), float(w.get("ay", 0.0)))
-            b = QtCore.QPointF(float(w.get("bx", 0.0)), float(w.get("by", 0.0)))
-            path = QtGui.QPainterPath(a)
-            path.lineTo(b)
-            wi = QtWidgets.QGraphicsPathItem(path)
-            pen = QtGui.QPen(QtGui.QColor("#2aa36b"))
-            pen.setCosmetic(True)
-            pen.setWidth(2)
-            wi.setPen(pen)
-            wi.setZValue(60)
-            wi.setParentItem(self.layer_wires)
-            wi.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
-            wi.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
-
-    def push_history(self):
-        if self.history_index < len(self.history) - 1:
-            self.history = self.history[: self.history_index + 1]
-        self.history.append(self.serialize_state())
-        self.history_index += 1
+            it = self._reconcile_item(layer, old, json.loads(target))
+            if it is not None:
+                touched.append(it)
+                self._history_items[uid] = (layer, target)
+        if entry.state:
+            self._history_state = {
+                **self._history_state,
+                **{k: (b if undo else a) for k, (b, a) in entry.state.items()},
+            }
+            self._apply_settings(self._history_state)
+        # Settings such as the underlay transform can move any snap point
+        self._invalidate_snaps(None if entry.state else touched)
 
     def undo(self):
-        if self.history_index > 0:
-            self.history_index -= 1
-            self.load_state(self.history[self.history_index])
+        entry = self.history.undo()
+        if entry is not None:
+            self._apply_history(entry, undo=True)
             self.statusBar().showMessage("Undo")
 
     def redo(self):
-        if self.history_index < len(self.history) - 1:
-            self.history_index += 1
-            self.load_state(self.history[self.history_index])
+        entry = self.history.redo()
+        if entry is not None:
+            self._apply_history(entry, undo=False)
             self.statusBar().showMessage("Redo")
 
     # ---------- right-dock props logic ----------
@@ -2766,7 +2899,7 @@ class MainWindow(QMainWindow):
         elif mode == "speaker":
             cov["computed_radius_ft"] = max(0.0, sz)
         d.set_coverage(cov)
-        self.push_history()
+        self.push_history(changed=[d])
         self.scene.update()
 
     def _on_mode_changed_props(self, mode: str):
@@ -2778,6 +2911,7 @@ class MainWindow(QMainWindow):
     def clear_underlay(self):
         for it in list(self.layer_underlay.childItems()):
             it.scene().removeItem(it)
+        self._invalidate_snaps()
 
     # ---------- selection helpers ----------
     def _select_similar_from(self, base_item: QtWidgets.QGraphicsItem):
@@ -2869,6 +3003,12 @@ class MainWindow(QMainWindow):
         self.view.fitInView(rect, Qt.KeepAspectRatio)
 
     # ---------- underlay import ----------
+    def _dxf_cache(self):
+        if not self.prefs.get("dxf_cache", True):
+            return None
+        max_mb = float(self.prefs.get("dxf_cache_max_mb", 512))
+        return dxf_cache.DxfCache(max_bytes=int(max_mb * 1024 * 1024))
+
     def import_dxf_underlay(self):
         p, _ = QFileDialog.getOpenFileName(self, "Import DXF Underlay", "", "DXF Files (*.dxf)")
         if not p:
@@ -2879,23 +3019,71 @@ class MainWindow(QMainWindow):
                 message=f"Importing DXF underlay: {os.path.basename(p)}",
                 level="info",
             )
+        if getattr(self, "_dxf_job", None) is not None:
+            self._dxf_job.cancel()
         try:
-            bounds, layer_groups = dxf_import.import_dxf_into_group(
-                p, self.layer_underlay, self.px_per_ft
+            job = dxf_import.DxfImportJob(
+                p,
+                self.layer_underlay,
+                self.px_per_ft,
+                block_instances=bool(self.prefs.get("dxf_block_instances", False)),
+                cache=self._dxf_cache(),
             )
+            self._dxf_layers = job.layer_groups
+            job.start()
+        except Exception as ex:
+            if sentry_sdk:
+                sentry_sdk.capture_exception(ex)
+            QMessageBox.critical(self, "DXF Import Error", str(ex))
+            return
+        self._dxf_job = job
+        # Non-modal so the view can be panned while layers stream in
+        dlg = QtWidgets.QProgressDialog(
+            f"Importing {os.path.basename(p)}...", "Cancel", 0, 1000, self
+        )
+        dlg.setWindowModality(Qt.NonModal)
+        dlg.setMinimumDuration(500)
+        dlg.canceled.connect(job.cancel)
+        timer = QtCore.QTimer(self)
+        timer.setInterval(30)
+        n_layers = [0]
+
+        def _tick():
+            more = job.poll()
+            if len(job.layer_groups) != n_layers[0]:
+                n_layers[0] = len(job.layer_groups)
+                self._refresh_dxf_layers_dock()
+            if more:
+                dlg.setValue(int(job.progress * 1000))
+                return
+            timer.stop()
+            dlg.reset()
+            if self._dxf_job is job:  # not superseded by a newer import
+                self._dxf_job = None
+                self._dxf_underlay_loaded(p, job)
+
+        timer.timeout.connect(_tick)
+        timer.start()
+
+    def _dxf_underlay_loaded(self, path: str, job):
+        if job.error is not None:
+            if sentry_sdk:
+                sentry_sdk.capture_exception(job.error)
+            QMessageBox.critical(self, "DXF Import Error", str(job.error))
+        elif job.cancelled:
+            self.statusBar().showMessage("DXF import cancelled")
+        else:
+            bounds = job.bounds
             if bounds and not bounds.isNull():
                 # Expand scene rect to include underlay, then fit
                 self.scene.setSceneRect(
                     self.scene.sceneRect().united(bounds.adjusted(-200, -200, 200, 200))
                 )
                 self.view.fitInView(bounds.adjusted(-100, -100, 100, 100), Qt.KeepAspectRatio)
-            self.statusBar().showMessage(f"Imported underlay: {os.path.basename(p)}")
-            self._dxf_layers = layer_groups
-            self._refresh_dxf_layers_dock()
-        except Exception as ex:
-            if sentry_sdk:
-                sentry_sdk.capture_exception(ex)
-            QMessageBox.critical(self, "DXF Import Error", str(ex))
+            self.statusBar().showMessage(f"Imported underlay: {os.path.basename(path)}")
+        self._dxf_layers = job.layer_groups
+        self._refresh_dxf_layers_dock()
+        self._invalidate_snaps()
 
     def import_pdf_underlay(self):
         p, _ = QFileDialog.getOpenFileName(self, "Import PDF Underlay", "", "PDF Files (*.pdf)")
@@ -2950,7 +3138,7 @@ class MainWindow(QMainWindow):
             sc = it.scene()
             if sc:
                 sc.removeItem(it)
-        self.push_history()
+        self.push_history(changed=sel)
 
     # ---------- text / wire ----------
     def _set_wire_mode(self):
@@ -2973,7 +3161,7 @@ class MainWindow(QMainWindow):
             return
         try:
             scale_underlay_by_factor(self.layer_underlay, float(val), QtCore.QPointF(0, 0))
-            self.push_history()
+            self.push_history(changed=[])
             self.statusBar().showMessage(f"Underlay scaled by factor {float(val):.4f}")
         except Exception as ex:
             QMessageBox.critical(self, "Underlay Scale Error", str(ex))
@@ -2999,7 +3187,7 @@ class MainWindow(QMainWindow):
             self.scene.setSceneRect(
                 self.scene.sceneRect().united(ub.adjusted(-200, -200, 200, 200))
             )
-            self.push_history()
+            self.push_history(changed=[])
             self.statusBar().showMessage("Underlay centered in view")
         except Exception as ex:
             QMessageBox.critical(self, "Center Underlay Error", str(ex))
@@ -3011,7 +3199,7 @@ class MainWindow(QMainWindow):
             self.scene.setSceneRect(
                 self.scene.sceneRect().united(ub.adjusted(-200, -200, 200, 200))
             )
-            self.push_history()
+            self.push_history(changed=[])
             self.statusBar().showMessage("Underlay moved to origin")
         except Exception as ex:
             QMessageBox.critical(self, "Move Underlay Error", str(ex))
@@ -3024,7 +3212,7 @@ class MainWindow(QMainWindow):
             self.scene.setSceneRect(
                 self.scene.sceneRect().united(ub.adjusted(-200, -200, 200, 200))
             )
-            self.push_history()
+            self.push_history(changed=[])
             self.statusBar().showMessage("Underlay transform reset")
         except Exception as ex:
             QMessageBox.critical(self, "Reset Underlay Error", str(ex))
@@ -3129,10 +3317,10 @@ class MainWindow(QMainWindow):
         dist_ft = float(spin.value())
         right = side.currentText() == "Right"
         make_copy = bool(dup.isChecked())
-        self._apply_offset_selected(dist_ft, right, make_copy)
-        self.push_history()
+        self.push_history(changed=self._apply_offset_selected(dist_ft, right, make_copy))
 
     def _apply_offset_selected(self, dist_ft: float, right: bool, make_copy: bool):
+        """Offset the selected sketch items; returns the items created or modified."""
         import math
 
         sel = [
@@ -3149,7 +3337,7 @@ class MainWindow(QMainWindow):
             )
         ]
         if not sel:
-            return
+            return []
         dpx = dist_ft * self.px_per_ft
         sign = 1.0 if right else -1.0
 
@@ -3158,6 +3346,7 @@ class MainWindow(QMainWindow):
             it.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
             return it
 
+        changed = []
         for it in sel:
             layer = it.parentItem() or self.layer_sketch
             if isinstance(it, QtWidgets.QGraphicsLineItem):
@@ -3174,7 +3363,7 @@ class MainWindow(QMainWindow):
                 pen.setCosmetic(True)
                 tgt.setPen(pen)
                 tgt.setZValue(20)
-                add_flags(tgt)
+                changed.append(add_flags(tgt))
             elif isinstance(it, QtWidgets.QGraphicsRectItem):
                 r = it.rect()
                 g = sign * dpx
@@ -3186,7 +3375,7 @@ class MainWindow(QMainWindow):
                 pen.setCosmetic(True)
                 tgt.setPen(pen)
                 tgt.setZValue(20)
-                add_flags(tgt)
+                changed.append(add_flags(tgt))
             elif isinstance(it, QtWidgets.QGraphicsEllipseItem):
                 r = it.rect()
                 g = sign * dpx
@@ -3198,7 +3387,7 @@ class MainWindow(QMainWindow):
                 pen.setCosmetic(True)
                 tgt.setPen(pen)
                 tgt.setZValue(20)
-                add_flags(tgt)
+                changed.append(add_flags(tgt))
             elif isinstance(it, QtWidgets.QGraphicsPathItem):
                 p = it.path()
                 if p.elementCount() < 2:
@@ -3222,7 +3411,8 @@ class MainWindow(QMainWindow):
                 pen.setCosmetic(True)
                 tgt.setPen(pen)
                 tgt.setZValue(20)
-                add_flags(tgt)
+                changed.append(add_flags(tgt))
+        return changed
 
     # ---------- export ----------
     def export_png(self):
@@ -15,6 +15,7 @@ from PySide6.QtWidgets import (
     QMainWindow,
 )
 
+from app import device_palette
 from app.logging_config import setup_logging
 
 # Grid scene and defaults used by the main window
@@ -163,41 +164,30 @@ class ModelSpaceWindow(QMainWindow):
         w = QtWidgets.QWidget()
         lay = QtWidgets.QVBoxLayout(w)
 
-        # Device tree
-        self.device_tree = QtWidgets.QTreeWidget()
-        self.device_tree.setHeaderLabels(["Devices"])
-        self.device_tree.setAlternatingRowColors(True)
-        self.device_tree.setSortingEnabled(True)
+        # Device search; filtering runs in the catalog query, not over the rows
+        self.device_search = QtWidgets.QLineEdit()
+        self.device_search.setPlaceholderText("Search devices...")
+        self.device_search.setClearButtonEnabled(True)
+        self.device_search.textChanged.connect(self._filter_device_palette)
+        lay.addWidget(self.device_search)
 
-        # Populate device tree
-        self._populate_device_tree()
+        # Device tree: a lazily paged view over the catalog
+        self.device_tree, self.device_model, self.device_proxy = device_palette.make_palette_view(
+            device_palette.palette_source(self.devices_all)
+        )
 
         lay.addWidget(self.device_tree)
         dock.setWidget(w)
         self.addDockWidget(Qt.LeftDockWidgetArea, dock)
 
-    def _populate_device_tree(self):
-        """Populate the device tree with available devices."""
+    def _filter_device_palette(self, text: str):
+        """Re-query the palette; matching types expand once a search is active."""
         try:
-            # Group devices by type for hierarchy
-            grouped = {}
-            for d in self.devices_all:
-                cat = d.get("type", "Unknown") or "Unknown"
-                grouped.setdefault(cat, []).append(d)
-
-            for cat in sorted(grouped.keys()):
-                cat_item = QtWidgets.QTreeWidgetItem([cat])
-                for dev in sorted(grouped[cat], key=lambda x: x.get("name", "")):
-                    txt = f"{dev.get('name','<unknown>')} ({dev.get('symbol','')})"
-                    if dev.get("part_number"):
-                        txt += f" - {dev.get('part_number')}"
-                    it = QtWidgets.QTreeWidgetItem([txt])
-                    it.setData(0, QtCore.Qt.UserRole, dev)
-                    cat_item.addChild(it)
-                self.device_tree.addTopLevelItem(cat_item)
-            self.device_tree.expandAll()
+            self.device_model.set_query(text)
+            if text.strip():
+                self.device_tree.expandAll()
         except Exception as e:
-            _logger.error(f"Failed to populate device tree: {e}")
+            _logger.error(f"Failed to filter device palette: {e}")
 
     def _setup_properties_dock(self):
         """Setup the properties dock."""
@@ -5,7 +5,11 @@ by combining data from multiple DXF sheets.
 """
 
 import logging
-from dataclasses import dataclass
+import multiprocessing
+import time
+from collections.abc import Callable, Iterator
+from concurrent import futures
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from PySide6 import QtCore
@@ -13,6 +17,28 @@ from PySide6 import QtCore
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class LayerStats:
+    """Modelspace contents of one layer, gathered in a single traversal."""
+
+    entity_count: int = 0
+    entity_types: dict[str, int] = field(default_factory=dict)  # dxftype -> count
+    block_names: dict[str, int] = field(default_factory=dict)  # INSERT name -> count
+    bbox: tuple[float, float, float, float] | None = None  # min_x, min_y, max_x, max_y
+
+    def add(self, dxftype: str, block_name: str | None, box) -> None:
+        self.entity_count += 1
+        self.entity_types[dxftype] = self.entity_types.get(dxftype, 0) + 1
+        if block_name is not None:
+            self.block_names[block_name] = self.block_names.get(block_name, 0) + 1
+        if box is not None:
+            self.bbox = box if self.bbox is None else _union(self.bbox, box)
+
+
+def _union(a: tuple, b: tuple) -> tuple[float, float, float, float]:
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
 @dataclass
 class SheetAnalysis:
     """Analysis results for a single DXF sheet."""
@@ -23,6 +49,8 @@ class SheetAnalysis:
     device_count: int
     bounds: QtCore.QRectF | None
     errors: list[str]
+    # Entity layer name -> stats, for every layer with modelspace entities
+    layer_histogram: dict[str, LayerStats] = field(default_factory=dict)
 
 
 @dataclass
@@ -39,11 +67,42 @@ class PlanSetAnalysis:
     errors: list[str]
 
 
+# (sheet index in the input list, analysis or the exception that replaced it)
+SheetResult = tuple[int, "SheetAnalysis | Exception"]
+
+
+# Worker side of the queue a pool's workers report sheet starts on
+_started = None
+
+
+def _init_worker(started) -> None:
+    global _started
+    _started = started
+
+
+def _analyze_sheet_in_worker(
+    index: int, file_path: str, fire_layer_patterns: list[str]
+) -> SheetAnalysis:
+    """Process-pool entry point (module level so it pickles)."""
+    if _started is not None:
+        _started.put(index)
+    analyzer = PlanSetAnalyzer()
+    analyzer.fire_layer_patterns = list(fire_layer_patterns)
+    return analyzer._analyze_single_sheet(file_path)
+
+
 class PlanSetAnalyzer:
-    """Analyze multiple DXF files as a coordinated plan set."""
+    """Analyze multiple DXF files as a coordinated plan set.
+
+    With ``workers`` > 1 sheets are parsed in a pool of that many processes;
+    ``sheet_timeout_s`` bounds how long one sheet may run before it is
+    reported as an error.
+    """
 
-    def __init__(self):
+    def __init__(self, workers: int = 1, sheet_timeout_s: float | None = None):
         """Initialize the plan set analyzer."""
+        self.workers = max(1, int(workers))
+        self.sheet_timeout_s = sheet_timeout_s
         self.fire_layer_patterns = [
             "FIRE",
             "FA",
@@ -58,18 +117,31 @@ class PlanSetAnalyzer:
             "ANNUNCIATOR",
         ]
 
-    def analyze_plan_set(self, file_paths: list[str]) -> PlanSetAnalysis:
+    def analyze_plan_set(
+        self,
+        file_paths: list[str],
+        on_sheet: Callable[[int, "SheetAnalysis | Exception"], None] | None = None,
+    ) -> PlanSetAnalysis:
         """
         Analyze multiple DXF files as a complete plan set.
 
         Args:
             file_paths: List of paths to DXF files
+            on_sheet: Optional callback ``(index, result)`` invoked as each sheet
+                finishes, in completion order; ``result`` is a SheetAnalysis or
+                the exception that stopped that sheet
 
         Returns:
-            Combined analysis of all sheets
+            Combined analysis of all sheets, in input order
         """
         logger.info(f"Analyzing plan set with {len(file_paths)} sheets")
 
+        results: dict[int, SheetAnalysis | Exception] = {}
+        for index, result in self.iter_sheets(file_paths):
+            results[index] = result
+            if on_sheet is not None:
+                on_sheet(index, result)
+
         sheets = []
         total_layers = 0
         total_fire_layers = 0
@@ -78,30 +150,29 @@ class PlanSetAnalyzer:
         errors = []
         combined_bounds = None
 
-        for path in file_paths:
-            try:
-                sheet = self._analyze_single_sheet(path)
-                sheets.append(sheet)
+        for index, path in enumerate(file_paths):
+            sheet = results[index]
+            if isinstance(sheet, Exception):
+                error_msg = f"Error analyzing {Path(path).name}: {sheet}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+                continue
+            sheets.append(sheet)
 
-                total_layers += sheet.layer_count
-                total_fire_layers += len(sheet.fire_layers)
-                total_devices += sheet.device_count
+            total_layers += sheet.layer_count
+            total_fire_layers += len(sheet.fire_layers)
+            total_devices += sheet.device_count
 
-                # Track layer names across sheets
-                for layer in sheet.fire_layers:
-                    layer_summary[layer] = layer_summary.get(layer, 0) + 1
+            # Track layer names across sheets
+            for layer in sheet.fire_layers:
+                layer_summary[layer] = layer_summary.get(layer, 0) + 1
 
-                # Combine bounds
-                if sheet.bounds:
-                    if combined_bounds is None:
-                        combined_bounds = sheet.bounds
-                    else:
-                        combined_bounds = combined_bounds.united(sheet.bounds)
-
-            except Exception as e:
-                error_msg = f"Error analyzing {Path(path).name}: {e}"
-                logger.error(error_msg)
-                errors.append(error_msg)
+            # Combine bounds
+            if sheet.bounds:
+                if combined_bounds is None:
+                    combined_bounds = sheet.bounds
+                else:
+                    combined_bounds = combined_bounds.united(sheet.bounds)
 
         return PlanSetAnalysis(
             sheet_count=len(sheets),
@@ -114,6 +185,77 @@ class PlanSetAnalyzer:
             errors=errors,
         )
 
+    def iter_sheets(self, file_paths: list[str]) -> Iterator[SheetResult]:
+        """
+        Analyze sheets and yield ``(index, result)`` as each one finishes.
+
+        Runs inline when ``workers`` is 1 (input order), otherwise in a
+        process pool (completion order).
+        """
+        if self.workers <= 1 or len(file_paths) <= 1:
+            for index, path in enumerate(file_paths):
+                try:
+                    yield index, self._analyze_single_sheet(path)
+                except Exception as e:
+                    yield index, e
+            return
+        yield from self._iter_sheets_pool(file_paths)
+
+    def _iter_sheets_pool(self, file_paths: list[str]) -> Iterator[SheetResult]:
+        remaining = dict(enumerate(file_paths))
+        while remaining:
+            # A timed-out sheet can't be cancelled inside its worker, so the
+            # pool is torn down and the unfinished sheets go to a fresh one
+            yield from self._run_pool(remaining)
+
+    def _run_pool(self, remaining: dict[int, str]) -> Iterator[SheetResult]:
+        # spawn: forking a process that runs a Qt GUI is not safe
+        ctx = multiprocessing.get_context("spawn")
+        # Workers report each sheet as they pick it up; a future turns
+        # "running" while still queued, so it can't start the clock
+        started = ctx.Queue()
+        others = set(multiprocessing.active_children())
+        executor = futures.ProcessPoolExecutor(
+            max_workers=min(self.workers, len(remaining)),
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(started,),
+        )
+        pending = {
+            executor.submit(_analyze_sheet_in_worker, index, path, self.fire_layer_patterns): index
+            for index, path in remaining.items()
+        }
+        start_of: dict[int, float] = {}
+        timed_out = False
+        try:
+            while pending and not timed_out:
+                done, _ = futures.wait(pending, timeout=0.1, return_when=futures.FIRST_COMPLETED)
+                for fut in done:
+                    index = pending.pop(fut)
+                    del remaining[index]
+                    try:
+                        yield index, fut.result()
+                    except Exception as e:
+                        yield index, e
+                if self.sheet_timeout_s is None:
+                    continue
+                now = time.monotonic()
+                while not started.empty():
+                    start_of.setdefault(started.get(), now)
+                for fut, index in list(pending.items()):
+                    if index in start_of and now - start_of[index] > self.sheet_timeout_s:
+                        del pending[fut]
+                        del remaining[index]
+                        timed_out = True
+                        yield index, TimeoutError(f"timed out after {self.sheet_timeout_s:g}s")
+        finally:
+            processes = [p for p in multiprocessing.active_children() if p not in others]
+            executor.shutdown(wait=not timed_out, cancel_futures=True)
+            if timed_out:
+                for proc in processes:
+                    proc.terminate()
+            started.close()
+
     def _analyze_single_sheet(self, file_path: str) -> SheetAnalysis:
         """
         Analyze a single DXF sheet.
@@ -146,26 +288,25 @@ class PlanSetAnalyzer:
                 if any(pattern in layer.upper() for pattern in self.fire_layer_patterns)
             ]
 
-            # Count devices (entities in fire layers)
-            device_count = 0
-            for layer_name in fire_layers:
-                try:
-                    entities = list(msp.query(f'*[layer=="{layer_name}"]'))
-                    device_count += len(entities)
-                except Exception as e:
-                    logger.warning(f"Error counting devices in layer {layer_name}: {e}")
+            # One traversal of modelspace gathers everything per layer
+            histogram = self._layer_histogram(msp)
+
+            # Count devices (entities in fire layers); layer names match
+            # case-insensitively like ezdxf queries do
+            fire_keys = {layer.upper() for layer in fire_layers}
+            device_count = sum(
+                stats.entity_count for name, stats in histogram.items() if name.upper() in fire_keys
+            )
 
             # Get bounds
             bounds = None
-            try:
-                extents = msp.extents()
-                if extents:
-                    min_pt, max_pt = extents
-                    bounds = QtCore.QRectF(
-                        min_pt[0], -max_pt[1], max_pt[0] - min_pt[0], max_pt[1] - min_pt[1]
-                    )
-            except Exception as e:
-                logger.warning(f"Could not determine bounds for {path.name}: {e}")
+            boxes = [stats.bbox for stats in histogram.values() if stats.bbox is not None]
+            if boxes:
+                extent = boxes[0]
+                for box in boxes[1:]:
+                    extent = _union(extent, box)
+                min_x, min_y, max_x, max_y = extent
+                bounds = QtCore.QRectF(min_x, -max_y, max_x - min_x, max_y - min_y)
 
             return SheetAnalysis(
                 filename=path.name,
@@ -174,6 +315,7 @@ class PlanSetAnalyzer:
                 device_count=device_count,
                 bounds=bounds,
                 errors=[],
+                layer_histogram=histogram,
             )
 
         except Exception as e:
@@ -187,6 +329,29 @@ class PlanSetAnalyzer:
                 errors=[str(e)],
             )
 
+    def _layer_histogram(self, msp) -> dict[str, LayerStats]:
+        """Per-layer entity types, block names and 2D extents in one pass."""
+        from ezdxf import bbox as ezbbox
+
+        cache = ezbbox.Cache()
+        histogram: dict[str, LayerStats] = {}
+        for entity in msp:
+            layer = entity.dxf.get("layer", "0")
+            dxftype = entity.dxftype()
+            block_name = entity.dxf.get("name") if dxftype == "INSERT" else None
+            box = None
+            try:
+                ext = ezbbox.extents((entity,), fast=True, cache=cache)
+                if ext.has_data:
+                    box = (ext.extmin.x, ext.extmin.y, ext.extmax.x, ext.extmax.y)
+            except Exception as e:
+                logger.debug(f"No extents for {dxftype} on {layer}: {e}")
+            stats = histogram.get(layer)
+            if stats is None:
+                stats = histogram[layer] = LayerStats()
+            stats.add(dxftype, block_name, box)
+        return histogram
+
     def format_analysis_report(self, analysis: PlanSetAnalysis) -> str:
         """
         Format plan set analysis as a readable report.
@@ -230,31 +395,33 @@ class PlanSetAnalyzer:
         return "\n".join(lines)
 
 
-def import_plan_set(file_paths: list[str]) -> PlanSetAnalysis:
+def import_plan_set(file_paths: list[str], workers: int = 1) -> PlanSetAnalysis:
     """
     Import and analyze multiple DXF files as a plan set.
 
     Args:
         file_paths: List of paths to DXF files
+        workers: Number of worker processes (1 analyzes inline)
 
     Returns:
         Combined plan set analysis
     """
-    analyzer = PlanSetAnalyzer()
+    analyzer = PlanSetAnalyzer(workers=workers)
     return analyzer.analyze_plan_set(file_paths)
 
 
-def analyze_layers_batch(file_paths: list[str]) -> dict:
+def analyze_layers_batch(file_paths: list[str], workers: int = 1) -> dict:
     """
     Analyze layers across multiple DXF files.
 
     Args:
         file_paths: List of paths to DXF files
+        workers: Number of worker processes (1 analyzes inline)
 
     Returns:
         Dictionary with batch analysis results
     """
-    analyzer = PlanSetAnalyzer()
+    analyzer = PlanSetAnalyzer(workers=workers)
     analysis = analyzer.analyze_plan_set(file_paths)
 
     return {
@@ -0,0 +1,224 @@
+"""Spatial index of object-snap candidates for the model-space canvas.
+
+Snap points (endpoints, midpoints and centers) are extracted once per item in
+scene coordinates and bucketed in a uniform grid, so a nearest-snap query only
+touches the cells under the cursor instead of re-walking every item on each
+mouse move. Intersections come from the tiled `IntersectionCache`.
+"""
+
+import math
+
+from PySide6 import QtGui, QtWidgets
+
+from app.intersection_cache import IntersectionCache
+from cad_core.spatial import GridIndex
+
+SNAP_END = "end"
+SNAP_MID = "mid"
+SNAP_CENTER = "center"
+SNAP_INTERSECT = "intersect"
+
+_SNAP_TYPES = (
+    QtWidgets.QGraphicsLineItem,
+    QtWidgets.QGraphicsRectItem,
+    QtWidgets.QGraphicsEllipseItem,
+    QtWidgets.QGraphicsPathItem,
+)
+
+_MOVE = QtGui.QPainterPath.ElementType.MoveToElement
+_LINE = QtGui.QPainterPath.ElementType.LineToElement
+_CURVE = QtGui.QPainterPath.ElementType.CurveToElement
+
+
+def _signature(it):
+    """Cheap value that changes whenever the item's snap geometry changes."""
+    if isinstance(it, QtWidgets.QGraphicsLineItem):
+        geom = it.line()
+    elif isinstance(it, QtWidgets.QGraphicsPathItem):
+        geom = it.path()
+    else:
+        geom = it.rect()
+    return (geom, it.sceneTransform())
+
+
+class SnapIndex:
+    """Grid-bucketed snap candidates, maintained incrementally per item.
+
+    Items are the keys: ``add_item``/``update_item``/``remove_item`` touch only
+    that item's candidates, and ``sync`` reconciles against a list of live items
+    by re-extracting just those whose geometry or transform changed.
+    """
+
+    def __init__(self, cell: float = 48.0, intersections: IntersectionCache | None = None):
+        self._points = GridIndex(cell)  # candidate id -> point
+        self._lines = GridIndex(cell)  # line item -> segment (perpendicular)
+        self.intersections = intersections if intersections is not None else IntersectionCache()
+        self._cands: dict[int, tuple[float, float, str, object]] = {}
+        self._owned: dict[object, set[int]] = {}
+        self._segments: dict[object, tuple[float, float, float, float]] = {}
+        self._sigs: dict[object, object] = {}
+        self._next_id = 0
+        self.dirty = True
+
+    def __len__(self) -> int:
+        return len(self._cands)
+
+    def __contains__(self, it) -> bool:
+        return it in self._sigs
+
+    def invalidate(self):
+        """Mark the index stale; the next ``sync`` re-checks item geometry."""
+        self.dirty = True
+
+    def clear(self):
+        self._points.clear()
+        self._lines.clear()
+        self._cands.clear()
+        self._owned.clear()
+        self._segments.clear()
+        self._sigs.clear()
+        self.intersections.clear()
+        self.dirty = True
+
+    # ---- candidate bookkeeping
+    def _add_candidate(self, x: float, y: float, kind: str, owner):
+        cid = self._next_id
+        self._next_id += 1
+        self._cands[cid] = (x, y, kind, owner)
+        self._points.insert_point(cid, x, y)
+        self._owned.setdefault(owner, set()).add(cid)
+
+    def _extract(self, it):
+        t = it.sceneTransform()
+        pts = []
+        if isinstance(it, QtWidgets.QGraphicsLineItem):
+            ln = it.line()
+            x1, y1 = t.map(ln.x1(), ln.y1())
+            x2, y2 = t.map(ln.x2(), ln.y2())
+            pts += [(x1, y1, SNAP_END), (x2, y2, SNAP_END)]
+            pts.append(((x1 + x2) / 2.0, (y1 + y2) / 2.0, SNAP_MID))
+            self._segments[it] = (x1, y1, x2, y2)
+        elif isinstance(it, (QtWidgets.QGraphicsRectItem, QtWidgets.QGraphicsEllipseItem)):
+            c = it.rect().center()
+            x, y = t.map(c.x(), c.y())
+            pts.append((x, y, SNAP_CENTER))
+        elif isinstance(it, QtWidgets.QGraphicsPathItem):
+            pth = it.path()
+            n = pth.elementCount()
+            prev = None
+            i = 0
+            while i < n:
+                e = pth.elementAt(i)
+                if e.type == _CURVE and i + 2 < n:
+                    # Cubic: two control points follow, the last one is the end
+                    e = pth.elementAt(i + 2)
+                    i += 2
+                    cur = t.map(e.x, e.y)
+                    pts.append((cur[0], cur[1], SNAP_END))
+                elif e.type in (_MOVE, _LINE):
+                    cur = t.map(e.x, e.y)
+                    pts.append((cur[0], cur[1], SNAP_END))
+                    if e.type == _LINE and prev is not None:
+                        pts.append(((prev[0] + cur[0]) / 2.0, (prev[1] + cur[1]) / 2.0, SNAP_MID))
+                else:
+                    cur = prev
+                prev = cur
+                i += 1
+        return pts
+
+    # ---- incremental maintenance
+    def add_item(self, it):
+        if not isinstance(it, _SNAP_TYPES):
+            return
+        if it in self._sigs:
+            self.remove_item(it)
+        self._sigs[it] = _signature(it)
+        for x, y, kind in self._extract(it):
+            self._add_candidate(x, y, kind, it)
+        seg = self._segments.get(it)
+        if seg is not None:
+            self._lines.insert_segment(it, *seg)
+        if isinstance(it, (QtWidgets.QGraphicsLineItem, QtWidgets.QGraphicsPathItem)):
+            self.intersections.add_item(it)
+
+    def remove_item(self, it):
+        if self._sigs.pop(it, None) is None:
+            return
+        for cid in self._owned.pop(it, ()):
+            self._cands.pop(cid)
+            self._points.remove(cid)
+        self._segments.pop(it, None)
+        self._lines.remove(it)
+        self.intersections.remove_item(it)
+
+    def update_item(self, it):
+        self.remove_item(it)
+        self.add_item(it)
+
+    def update_items(self, items):
+        """Re-check just ``items``: re-extract changed ones, drop ones out of a scene."""
+        for it in items:
+            if it.scene() is None:
+                self.remove_item(it)
+            elif self._sigs.get(it) != _signature(it):
+                self.update_item(it)
+
+    def sync(self, items):
+        """Reconcile with the live items, touching only what changed."""
+        seen = set()
+        for it in items:
+            if not isinstance(it, _SNAP_TYPES):
+                continue
+            seen.add(it)
+            if self._sigs.get(it) != _signature(it):
+                self.update_item(it)
+        for it in [k for k in self._sigs if k not in seen]:
+            self.remove_item(it)
+        self.intersections.flush()
+        self.dirty = False
+
+    # ---- queries
+    def query(self, x: float, y: float, radius: float, kinds) -> list[tuple[float, float, float]]:
+        """Return (distance, x, y) for visible candidates of ``kinds`` within radius."""
+        out = []
+        if SNAP_INTERSECT in kinds:
+            self.intersections.flush()
+            out += self.intersections.query(x, y, radius)
+        for cid in self._points.query_radius(x, y, radius):
+            cx, cy, kind, owner = self._cands[cid]
+            if kind not in kinds:
+                continue
+            d = math.hypot(cx - x, cy - y)
+            if d <= radius and _is_visible(owner):
+                out.append((d, cx, cy))
+        out.sort()
+        return out
+
+    def perpendicular(self, x: float, y: float, radius: float) -> list[tuple[float, float, float]]:
+        """Feet of perpendiculars from (x, y) onto nearby line segments."""
+        out = []
+        for it in self._lines.query_radius(x, y, radius):
+            ax, ay, bx, by = self._segments[it]
+            vx, vy = bx - ax, by - ay
+            denom = vx * vx + vy * vy
+            if denom <= 1e-6:
+                continue
+            t = ((x - ax) * vx + (y - ay) * vy) / denom
+            if 0.0 <= t <= 1.0 and _is_visible(it):
+                qx, qy = ax + t * vx, ay + t * vy
+                d = math.hypot(qx - x, qy - y)
+                if d <= radius:
+                    out.append((d, qx, qy))
+        out.sort()
+        return out
+
+
+def _is_visible(it) -> bool:
+    try:
+        return bool(it.isVisible())
+    except RuntimeError:
+        # Underlying C++ item already deleted; it will drop out on next sync
+        return False
+
+
+__all__ = ["SnapIndex", "SNAP_END", "SNAP_MID", "SNAP_CENTER", "SNAP_INTERSECT"]
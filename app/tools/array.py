@@ -54,6 +54,7 @@ class ArrayTool(QtCore.QObject):
         left = cx - (cols - 1) * sx / 2.0
         top = cy - (rows - 1) * sx / 2.0
 
+        placed = []
         for r in range(rows):
             for c in range(cols):
                 x = left + c * sx
@@ -77,6 +78,7 @@ class ArrayTool(QtCore.QObject):
                     }
                 )
                 it.setParentItem(self.layer_devices)
+                placed.append(it)
 
-        win.push_history()
+        win.push_history(changed=placed)
         win.statusBar().showMessage(f"Array placed: {cols}x{rows} at ~{spacing_ft:.1f} ft.")
@@ -16,6 +16,7 @@ class ChamferTool:
         self.first = None
         self.d1 = 1.0
         self.d2 = 1.0
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -99,6 +100,7 @@ class ChamferTool:
         nl2 = move_line(l2, self.d2, self.win.px_per_ft)
         self.first.setLine(nl1)
         it.setLine(nl2)
+        self.changed = [self.first, it]
         self.active = False
         self.first = None
         return True
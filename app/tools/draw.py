@@ -20,6 +20,7 @@ class DrawController:
         self.mode = DrawMode.NONE
         self.temp_item = None
         self.points = []
+        self.changed = []  # items the last committed step created or modified
 
     def set_mode(self, mode: DrawMode):
         self.finish()
@@ -45,6 +46,7 @@ class DrawController:
 
     def finish(self):
         # Commit polyline if user ends with Esc and we have >=2 points
+        self.changed = []
         if self.mode == DrawMode.POLYLINE and len(self.points) >= 2:
             path = QtGui.QPainterPath(self.points[0])
             for pt in self.points[1:]:
@@ -57,6 +59,7 @@ class DrawController:
             it.setParentItem(self.layer)
             it.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
             it.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
+            self.changed = [it]
         # Cleanup preview
         if self.temp_item and self.temp_item.scene():
             self.temp_item.scene().removeItem(self.temp_item)
@@ -194,6 +197,7 @@ class DrawController:
             it.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
             it.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
             self.finish()
+            self.changed = [it]
             return True
 
         elif self.mode == DrawMode.POLYLINE:
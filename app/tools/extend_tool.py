@@ -33,6 +33,7 @@ class ExtendTool:
         self.win = window
         self.active = False
         self.boundary = None
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -78,5 +79,6 @@ class ExtendTool:
             it.setLine(ltar.x1(), ltar.y1(), ip.x(), ip.y())
         self.active = False
         self.boundary = None
+        self.changed = [it]
         self.win.statusBar().showMessage("Extended")
         return True
@@ -39,6 +39,7 @@ class FilletRadiusTool:
         self.active = False
         self.r_ft = 1.0
         self.first = None
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         dlg = QtWidgets.QInputDialog(self.win)
@@ -161,6 +162,7 @@ class FilletRadiusTool:
         arc_item.setParentItem(self.layer)
         arc_item.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
         arc_item.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
+        self.changed = [self.first, it, arc_item]
         self.active = False
         self.first = None
         return True
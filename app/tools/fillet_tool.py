@@ -42,6 +42,7 @@ class FilletTool:
         self.active = False
         self.first = None
         self.first_pick = None
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -96,6 +97,7 @@ class FilletTool:
                     item.setLine(ip.x(), ip.y(), li.x2(), li.y2())
                 else:
                     item.setLine(li.x1(), li.y1(), ip.x(), ip.y())
+            self.changed = [it1, it2]
             self.active = False
             self.first = None
             self.first_pick = None
@@ -127,6 +129,7 @@ class FilletTool:
         pen.setCosmetic(True)
         arc_item.setPen(pen)
         it.scene().addItem(arc_item)
+        self.changed = [self.first, it, arc_item]
         self.active = False
         self.first = None
         self.first_pick = None
@@ -9,6 +9,7 @@ class FreehandTool:
         self.drawing = False
         self.path_item = None
         self.last_pt = None
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -60,6 +61,7 @@ class FreehandTool:
         if not self.drawing:
             return False
         self.drawing = False
+        self.changed = [self.path_item] if self.path_item else []
         if self.path_item:
             self.path_item.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
             self.path_item.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
@@ -8,6 +8,7 @@ class LeaderTool:
         self.active = False
         self.p0 = None
         self.p1 = None
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -66,5 +67,6 @@ class LeaderTool:
         t.setPos(self.p1 + QtCore.QPointF(8, -8))
         t.setParentItem(self.layer)
         t.setZValue(20)
+        self.changed = [line, head, t]
         self.active = False
         return True
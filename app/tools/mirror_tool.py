@@ -7,6 +7,7 @@ class MirrorTool:
         self.active = False
         self.p1 = None
         self.p2 = None
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -53,6 +54,7 @@ class MirrorTool:
                 it.setTransform(t, combine=True)
             except Exception:
                 pass
+        self.changed = sel
         self.active = False
         self.p1 = None
         self.p2 = None
@@ -7,6 +7,7 @@ class MoveTool:
         self.active = False
         self.base = None
         self.copy = False
+        self.changed = []  # items the last committed step created or modified
 
     def start(self, copy=False):
         self.active = True
@@ -33,6 +34,7 @@ class MoveTool:
             self.active = False
             self.base = None
             return False
+        self.changed = []
         for it in sel:
             try:
                 if self.copy:
@@ -56,8 +58,10 @@ class MoveTool:
                         dup.setPos(it.pos() + delta)
                         dup.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
                         dup.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
+                        self.changed.append(dup)
                 else:
                     it.setPos(it.pos() + delta)
+                    self.changed.append(it)
             except Exception:
                 pass
         self.active = False
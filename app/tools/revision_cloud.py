@@ -8,6 +8,7 @@ class RevisionCloudTool:
         self.active = False
         self.points = []
         self.temp = None
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -65,6 +66,7 @@ class RevisionCloudTool:
         item.setZValue(40)
         item.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
         item.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
+        self.changed = [item]
         if self.temp and self.temp.scene():
             try:
                 self.temp.scene().removeItem(self.temp)
@@ -6,6 +6,7 @@ class ScaleTool:
         self.win = window
         self.active = False
         self.base = None
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -47,6 +48,7 @@ class ScaleTool:
                     it.setTransform(t, combine=True)
                 except Exception:
                     pass
+            self.changed = sel
             self.active = False
             self.base = None
             return True
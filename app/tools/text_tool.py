@@ -6,6 +6,7 @@ class TextTool:
         self.win = window
         self.layer = layer
         self.active = False
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -33,6 +34,7 @@ class TextTool:
         it.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
         it.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
         it.setParentItem(self.layer)
+        self.changed = [it]
         self.active = False
         self.win.statusBar().showMessage("Text placed")
         return True
@@ -45,6 +47,7 @@ class MTextTool:
         self.active = False
         self.text = ""
         self.height_ft = 1.0
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -96,6 +99,7 @@ class MTextTool:
         item.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
         item.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
         item.setParentItem(self.layer)
+        self.changed = [item]
         self.active = False
         self.win.statusBar().showMessage("MText placed")
         return True
@@ -44,6 +44,7 @@ class TrimTool:
         self.win = window
         self.active = False
         self.cut_item = None
+        self.changed = []  # items the last committed step created or modified
 
     def start(self):
         self.active = True
@@ -90,6 +91,7 @@ class TrimTool:
             it.setLine(ip.x(), ip.y(), ltar.x2(), ltar.y2())
         else:
             it.setLine(ltar.x1(), ltar.y1(), ip.x(), ip.y())
+        self.changed = [it]
         self.win.statusBar().showMessage("Trimmed")
         self.active = False
         self.cut_item = None
@@ -197,6 +197,12 @@ def setup_menus(window: MainWindow) -> None:
     window.act_view_place_cov.setChecked(bool(window.prefs.get("show_placement_coverage", True)))
     window.act_view_place_cov.toggled.connect(window.toggle_placement_coverage)
     m_view.addAction(window.act_view_place_cov)
+    act_auto_cov = QtGui.QAction("Auto-Size Coverage", window)
+    act_auto_cov.triggered.connect(window.auto_size_coverage)
+    m_view.addAction(act_auto_cov)
+    window.act_view_gaps = QtGui.QAction("Show Coverage Gaps", window, checkable=True)
+    window.act_view_gaps.toggled.connect(window.toggle_coverage_gaps)
+    m_view.addAction(window.act_view_gaps)
     m_view.addSeparator()
     act_scale = QtGui.QAction("Set Pixels per Foot…", window)
     act_scale.triggered.connect(window.set_px_per_ft)
@@ -1,11 +1,21 @@
+import csv
+import itertools
 import json
+import logging
 import os
 import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 from db import loader as db_loader
 
+logger = logging.getLogger(__name__)
+
 
 def get_catalog_path() -> str:
     home = Path(os.path.expanduser("~"))
@@ -18,34 +28,102 @@ def get_catalog_path() -> str:
 # ruff: noqa: E501
 # noqa: E501
 
+# Connection tuning applied once per pooled connection. WAL lets readers run
+# alongside a writer; NORMAL sync is durable across app crashes in WAL mode.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA busy_timeout=5000",
+)
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_verified: set[str] = set()
+
 
-def _connect() -> sqlite3.Connection:
-    path = get_catalog_path()
-    con = sqlite3.connect(path)
-    con.row_factory = sqlite3.Row
-    db_loader.ensure_schema(con)
+def get_connection(path: str | None = None) -> sqlite3.Connection:
+    """This thread's long-lived connection to the catalog at ``path``.
+
+    Connections are pooled per thread and database path. The schema is
+    verified the first time a path is opened in this process, not per call.
+    """
+    path = path or get_catalog_path()
+    pool = _local.__dict__.setdefault("pool", {})
+    con = pool.get(path)
+    if con is None:
+        con = sqlite3.connect(path)
+        con.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            con.execute(pragma)
+        with _schema_lock:
+            if path not in _schema_verified:
+                db_loader.ensure_schema(con)
+                _schema_verified.add(path)
+        pool[path] = con
     return con
 
 
+@contextmanager
+def transaction(path: str | None = None, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+    """Run a block in one transaction: commit on success, roll back on error.
+
+    ``immediate`` takes the write lock up front. Nested use on the same thread
+    becomes a savepoint inside the outer transaction.
+    """
+    con = get_connection(path)
+    depth = _local.__dict__.setdefault("depth", {})
+    level = depth.get(id(con), 0)
+    savepoint = f"sp{level}"
+    if level:
+        con.execute(f"SAVEPOINT {savepoint}")
+    else:
+        con.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    depth[id(con)] = level + 1
+    try:
+        yield con
+    except BaseException:
+        if level:
+            con.execute(f"ROLLBACK TO {savepoint}")
+            con.execute(f"RELEASE {savepoint}")
+        else:
+            con.rollback()
+        raise
+    else:
+        if level:
+            con.execute(f"RELEASE {savepoint}")
+        else:
+            con.commit()
+    finally:
+        depth[id(con)] = level
+
+
+def close_connections() -> None:
+    """Close this thread's pooled connections (e.g. before deleting the file)."""
+    pool = _local.__dict__.get("pool", {})
+    for con in pool.values():
+        con.close()
+    pool.clear()
+
+
 def seed_defaults() -> None:
-    con = _connect()
-    cur = con.cursor()
-    # Seed device types
-    types = [
-        ("strobe", "Strobe / Notification Appliance"),
-        ("speaker", "Speaker / Audio Appliance"),
-        ("smoke", "Smoke / Heat / Detector"),
-        ("pull", "Pull Station"),
-        ("panel", "Fire Alarm Panel"),
-    ]
-    for code, desc in types:
-        cur.execute(
-            "INSERT OR IGNORE INTO device_types(code, description) VALUES(?,?)", (code, desc)
-        )
-    # Seed a manufacturer
-    cur.execute("INSERT OR IGNORE INTO manufacturers(name) VALUES(?)", ("Generic",))
-    con.commit()
-    con.close()
+    with transaction() as con:
+        cur = con.cursor()
+        # Seed device types
+        types = [
+            ("strobe", "Strobe / Notification Appliance"),
+            ("speaker", "Speaker / Audio Appliance"),
+            ("smoke", "Smoke / Heat / Detector"),
+            ("pull", "Pull Station"),
+            ("panel", "Fire Alarm Panel"),
+        ]
+        for code, desc in types:
+            cur.execute(
+                "INSERT OR IGNORE INTO device_types(code, description) VALUES(?,?)", (code, desc)
+            )
+        # Seed a manufacturer
+        cur.execute("INSERT OR IGNORE INTO manufacturers(name) VALUES(?)", ("Generic",))
 
 
 def add_device(
@@ -56,45 +134,42 @@ def add_device(
     symbol: str = "",
     specs: dict[str, Any] | None = None,
 ) -> int:
-    con = _connect()
-    cur = con.cursor()
-    # manufacturer id
-    cur.execute("INSERT OR IGNORE INTO manufacturers(name) VALUES(?)", (manufacturer,))
-    cur.execute("SELECT id FROM manufacturers WHERE name=?", (manufacturer,))
-    mid = cur.fetchone()[0]
-    # type id
-    cur.execute("SELECT id FROM device_types WHERE code=?", (type_code,))
-    row = cur.fetchone()
-    if not row:
-        raise ValueError(f"Unknown device type code: {type_code}")
-    tid = row[0]
-    props = json.dumps({})
-    cur.execute(
-        "INSERT INTO devices(manufacturer_id,type_id,model,name,symbol,properties_json) VALUES(?,?,?,?,?,?)",
-        (mid, tid, model, name, symbol, props),
-    )
-    did = cur.lastrowid
-    if specs:
+    with transaction() as con:
+        cur = con.cursor()
+        # manufacturer id
+        cur.execute("INSERT OR IGNORE INTO manufacturers(name) VALUES(?)", (manufacturer,))
+        cur.execute("SELECT id FROM manufacturers WHERE name=?", (manufacturer,))
+        mid = cur.fetchone()[0]
+        # type id
+        cur.execute("SELECT id FROM device_types WHERE code=?", (type_code,))
+        row = cur.fetchone()
+        if not row:
+            raise ValueError(f"Unknown device type code: {type_code}")
+        tid = row[0]
+        props = json.dumps({})
         cur.execute(
-            "INSERT OR REPLACE INTO device_specs(device_id, strobe_candela, speaker_db_at10ft, smoke_spacing_ft, current_a, voltage_v, notes) VALUES(?,?,?,?,?,?,?)",
-            (
-                did,
-                specs.get("strobe_candela"),
-                specs.get("speaker_db_at10ft"),
-                specs.get("smoke_spacing_ft"),
-                specs.get("current_a"),
-                specs.get("voltage_v"),
-                specs.get("notes"),
-            ),
+            "INSERT INTO devices(manufacturer_id,type_id,model,name,symbol,properties_json) VALUES(?,?,?,?,?,?)",
+            (mid, tid, model, name, symbol, props),
         )
-    con.commit()
-    con.close()
-    return did
+        did = cur.lastrowid
+        if specs:
+            cur.execute(
+                "INSERT OR REPLACE INTO device_specs(device_id, strobe_candela, speaker_db_at10ft, smoke_spacing_ft, current_a, voltage_v, notes) VALUES(?,?,?,?,?,?,?)",
+                (
+                    did,
+                    specs.get("strobe_candela"),
+                    specs.get("speaker_db_at10ft"),
+                    specs.get("smoke_spacing_ft"),
+                    specs.get("current_a"),
+                    specs.get("voltage_v"),
+                    specs.get("notes"),
+                ),
+            )
+        return did
 
 
-def list_devices(type_code: str | None = None) -> list[dict[str, Any]]:
-    con = _connect()
-    cur = con.cursor()
+def list_devices(type_code: str | None = None, path: str | None = None) -> list[dict[str, Any]]:
+    cur = get_connection(path).cursor()
     if type_code:
         cur.execute(
             """
@@ -117,20 +192,169 @@ def list_devices(type_code: str | None = None) -> list[dict[str, Any]]:
             ORDER BY manufacturer, model
             """
         )
-    rows = [dict(r) for r in cur.fetchall()]
-    con.close()
-    return rows
+    return [dict(r) for r in cur.fetchall()]
 
 
-def get_device_specs(device_id: int) -> dict[str, Any] | None:
-    con = _connect()
-    cur = con.cursor()
+def get_device_specs(device_id: int, path: str | None = None) -> dict[str, Any] | None:
+    cur = get_connection(path).cursor()
     cur.execute(
         "SELECT strobe_candela, speaker_db_at10ft, smoke_spacing_ft, current_a, voltage_v, notes FROM device_specs WHERE device_id=?",
         (device_id,),
     )
     row = cur.fetchone()
-    con.close()
     if not row:
         return None
     return dict(row)
+
+
+def search_devices(
+    query: str,
+    filters: dict[str, str] | None = None,
+    limit: int | None = 50,
+    path: str | None = None,
+) -> list[dict[str, Any]]:
+    """Ranked full-text device search; see `db.loader.search_devices`."""
+    return db_loader.search_devices(get_connection(path), query, filters, limit)
+
+
+SPEC_FIELDS = (
+    "strobe_candela",
+    "speaker_db_at10ft",
+    "smoke_spacing_ft",
+    "current_a",
+    "voltage_v",
+    "notes",
+)
+
+
+@dataclass
+class ImportReport:
+    """Outcome of `import_devices`."""
+
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+def _read_rows(source: str | os.PathLike) -> Iterator[dict[str, Any]]:
+    """Stream rows from a .csv, .jsonl or .json (list of objects) file."""
+    suffix = Path(source).suffix.lower()
+    with open(source, newline="", encoding="utf-8") as f:
+        if suffix == ".csv":
+            yield from csv.DictReader(f)
+        elif suffix == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif suffix == ".json":
+            yield from json.load(f)
+        else:
+            raise ValueError(f"Unsupported device import file: {source}")
+
+
+def _id_map(cur: sqlite3.Cursor, table: str, key: str) -> dict[str, int]:
+    cur.execute(f"SELECT id, {key} FROM {table}")
+    return {r[1]: r[0] for r in cur.fetchall()}
+
+
+def _insert_batches(
+    cur: sqlite3.Cursor,
+    rows: Iterator[dict[str, Any]],
+    batch_size: int,
+    create_types: bool,
+    next_id: int,
+) -> int:
+    mfr_ids = _id_map(cur, "manufacturers", "name")
+    type_ids = _id_map(cur, "device_types", "code")
+    count = 0
+    while batch := list(itertools.islice(rows, batch_size)):
+        devices = []
+        specs = []
+        for row in batch:
+            mfr = row.get("manufacturer") or "Generic"
+            mid = mfr_ids.get(mfr)
+            if mid is None:
+                cur.execute("INSERT INTO manufacturers(name) VALUES(?)", (mfr,))
+                mid = mfr_ids[mfr] = cur.lastrowid
+            code = row.get("type") or row.get("type_code")
+            tid = type_ids.get(code)
+            if tid is None:
+                if not create_types or not code:
+                    raise ValueError(f"Unknown device type code: {code}")
+                cur.execute(
+                    "INSERT INTO device_types(code, description) VALUES(?,?)",
+                    (code, row.get("type_description")),
+                )
+                tid = type_ids[code] = cur.lastrowid
+            props = row.get("properties", row.get("properties_json")) or {}
+            if not isinstance(props, str):
+                props = json.dumps(props)
+            devices.append(
+                (
+                    next_id,
+                    mid,
+                    tid,
+                    row.get("model", ""),
+                    row.get("name", ""),
+                    row.get("symbol", ""),
+                    props,
+                )
+            )
+            # Empty CSV cells are missing values; REAL affinity converts numeric text
+            spec = tuple(None if row.get(k) == "" else row.get(k) for k in SPEC_FIELDS)
+            if any(v is not None for v in spec):
+                specs.append((next_id, *spec))
+            next_id += 1
+        cur.executemany(
+            "INSERT INTO devices(id,manufacturer_id,type_id,model,name,symbol,properties_json) VALUES(?,?,?,?,?,?,?)",
+            devices,
+        )
+        if specs:
+            cur.executemany(
+                "INSERT OR REPLACE INTO device_specs(device_id, strobe_candela, speaker_db_at10ft, smoke_spacing_ft, current_a, voltage_v, notes) VALUES(?,?,?,?,?,?,?)",
+                specs,
+            )
+        count += len(devices)
+    return count
+
+
+def import_devices(
+    source: Iterable[dict[str, Any]] | str | os.PathLike,
+    path: str | None = None,
+    batch_size: int = 1000,
+    create_types: bool = False,
+) -> ImportReport:
+    """Bulk-insert devices in one transaction.
+
+    ``source`` is an iterable of row dicts or a path to a CSV/JSON/JSONL file.
+    Rows use the `add_device` fields (``manufacturer``, ``type``, ``model``,
+    ``name``, ``symbol``), optional ``properties`` (dict or JSON text),
+    ``type_description`` and any of `SPEC_FIELDS`. Manufacturers are created as
+    needed; unknown type codes raise ValueError unless ``create_types``.
+    Manufacturer and type ids resolve through in-memory maps and rows go in
+    with ``executemany`` per batch.
+    """
+    rows = _read_rows(source) if isinstance(source, str | os.PathLike) else iter(source)
+    t0 = time.perf_counter()
+    with transaction(path, immediate=True) as con:
+        cur = con.cursor()
+        # Ids are assigned here so specs can reference them without a
+        # per-row lastrowid; the write lock makes MAX(id) stable
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM devices")
+        next_id = cur.fetchone()[0]
+        cur.execute("SELECT seq FROM sqlite_sequence WHERE name='devices'")
+        seq = cur.fetchone()
+        next_id = max(next_id, seq[0] if seq else 0) + 1
+        with db_loader.deferred_search_index(con, next_id):
+            count = _insert_batches(cur, rows, batch_size, create_types, next_id)
+    report = ImportReport(rows=count, seconds=time.perf_counter() - t0)
+    logger.info(
+        "Imported %d devices in %.2fs (%.0f rows/s)",
+        report.rows,
+        report.seconds,
+        report.rows_per_sec,
+    )
+    return report
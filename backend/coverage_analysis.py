@@ -0,0 +1,223 @@
+# backend/coverage_analysis.py
+"""Rasterized coverage-gap analysis.
+
+Rooms and device coverage discs are rasterized onto one grid of square cells;
+a cell belongs to a room, or is covered by a device, when its centre lies
+inside the room outline or within the device's radius. Both are drawn as
+per-row spans accumulated in a difference array, so the cost grows with the
+number of spans rather than with devices x cells.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class RoomCoverage:
+    """Coverage figures for one room; counts are in cells."""
+
+    room: int
+    cells: int
+    covered: int
+    overlapped: int  # cells covered by more than one device
+    max_overlap: int
+    cell_ft: float
+
+    @property
+    def uncovered(self) -> int:
+        return self.cells - self.covered
+
+    @property
+    def percent(self) -> float:
+        return 100.0 * self.covered / self.cells if self.cells else 0.0
+
+    @property
+    def uncovered_sqft(self) -> float:
+        return self.uncovered * self.cell_ft**2
+
+
+@dataclass
+class CoverageGrid:
+    """The rasterized floor: cell (row, col) has its centre at `cell_center`."""
+
+    origin_ft: tuple[float, float]  # (x, y) of the grid's top-left corner
+    cell_ft: float
+    room: np.ndarray  # (H, W) int32 room index per cell, -1 outside every room
+    count: np.ndarray  # (H, W) uint16 number of devices covering each cell
+    rooms: list[RoomCoverage]
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.room.shape
+
+    @property
+    def percent(self) -> float:
+        """Coverage of all rooms together."""
+        cells = sum(r.cells for r in self.rooms)
+        return 100.0 * sum(r.covered for r in self.rooms) / cells if cells else 0.0
+
+    def uncovered_mask(self, room: int | None = None) -> np.ndarray:
+        inside = self.room >= 0 if room is None else self.room == room
+        return inside & (self.count == 0)
+
+    def uncovered_cells(self, room: int | None = None) -> np.ndarray:
+        """(N, 2) feet coordinates of the centres of uncovered cells."""
+        rows, cols = np.nonzero(self.uncovered_mask(room))
+        return self.cell_center(rows, cols)
+
+    def cell_center(self, rows, cols) -> np.ndarray:
+        x0, y0 = self.origin_ft
+        rows, cols = np.asarray(rows, dtype=float), np.asarray(cols, dtype=float)
+        return np.column_stack(((cols + 0.5) * self.cell_ft + x0, (rows + 0.5) * self.cell_ft + y0))
+
+
+# Overlay colours (RGBA): no coverage, covered once, covered more than once
+GAP_RGBA = (220, 40, 40, 110)
+COVERED_RGBA = (60, 180, 75, 50)
+OVERLAP_RGBA = (255, 193, 7, 80)
+
+
+def _fill_spans(shape, rows, c0, c1, dtype) -> np.ndarray:
+    """Add 1 over columns [c0, c1] of each row, clipped to the grid, via a difference array."""
+    h, w = shape
+    c0 = np.maximum(c0, 0)
+    c1 = np.minimum(c1, w - 1)
+    keep = (rows >= 0) & (rows < h) & (c0 <= c1)
+    rows, c0, c1 = rows[keep], c0[keep], c1[keep]
+    diff = np.bincount(rows * (w + 1) + c0, minlength=h * (w + 1))
+    diff -= np.bincount(rows * (w + 1) + c1 + 1, minlength=h * (w + 1))
+    return np.cumsum(diff.reshape(h, w + 1)[:, :w], axis=1).astype(dtype)
+
+
+def _room_spans(poly, x0, y0, cell, h):
+    """Rows and inclusive column spans of cells whose centres are inside ``poly`` (even-odd)."""
+    ax, ay = poly[:, 0], poly[:, 1]
+    bx, by = np.roll(ax, -1), np.roll(ay, -1)
+    r0 = max(int(np.ceil((ay.min() - y0) / cell - 0.5)), 0)
+    r1 = min(int(np.floor((ay.max() - y0) / cell - 0.5)), h - 1)
+    if r1 < r0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, np.int64)
+    rows = np.arange(r0, r1 + 1)
+    yc = (rows[:, None] + 0.5) * cell + y0
+    straddles = (ay > yc) != (by > yc)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xs = np.where(straddles, ax + (yc - ay) * (bx - ax) / (by - ay), np.inf)
+    xs.sort(axis=1)
+    # Crossings pair up left to right; a centre is inside for x_in <= x < x_out
+    n_pairs = xs.shape[1] // 2
+    x_in, x_out = xs[:, 0 : 2 * n_pairs : 2], xs[:, 1 : 2 * n_pairs : 2]
+    valid = np.isfinite(x_out)
+    c0 = np.ceil((x_in - x0) / cell - 0.5)
+    c1 = np.ceil((x_out - x0) / cell - 0.5) - 1
+    rows = np.broadcast_to(rows[:, None], valid.shape)
+    return rows[valid], c0[valid].astype(np.int64), c1[valid].astype(np.int64)
+
+
+def _disc_spans(centers, radii, x0, y0, cell):
+    """Rows and inclusive column spans of cells whose centres are within each disc."""
+    cx, cy = centers[:, 0], centers[:, 1]
+    r_top = np.ceil((cy - radii - y0) / cell - 0.5).astype(np.int64)
+    r_bot = np.floor((cy + radii - y0) / cell - 0.5).astype(np.int64)
+    n_rows = np.maximum(r_bot - r_top + 1, 0)
+    dev = np.repeat(np.arange(len(cx)), n_rows)
+    first = np.repeat(np.cumsum(n_rows) - n_rows, n_rows)
+    rows = r_top[dev] + (np.arange(len(dev)) - first)
+    dy = (rows + 0.5) * cell + y0 - cy[dev]
+    half = np.sqrt(np.maximum(radii[dev] ** 2 - dy**2, 0.0))
+    c0 = np.ceil((cx[dev] - half - x0) / cell - 0.5).astype(np.int64)
+    c1 = np.floor((cx[dev] + half - x0) / cell - 0.5).astype(np.int64)
+    return rows, c0, c1
+
+
+def analyze_coverage(rooms, centers_ft, radii_ft, cell_ft: float = 1.0) -> CoverageGrid:
+    """
+    Rasterizes rooms and device coverage and measures what is left uncovered.
+
+    Args:
+        rooms: Room polygons in feet, each a (K, 2) array-like of vertices. A cell
+            inside several rooms belongs to the first.
+        centers_ft: (N, 2) device positions in feet.
+        radii_ft: N coverage radii in feet (e.g. `computed_radius_ft`), or one for
+            all devices. Devices with no positive radius cover nothing.
+        cell_ft: Grid resolution in feet.
+
+    Returns:
+        A CoverageGrid spanning the rooms, with per-room figures in ``rooms``.
+    """
+    if cell_ft <= 0:
+        raise ValueError("cell_ft must be positive")
+    polys = [np.asarray(p, dtype=float).reshape(-1, 2) for p in rooms]
+    centers = np.asarray(centers_ft, dtype=float).reshape(-1, 2)
+    radii = np.broadcast_to(np.asarray(radii_ft, dtype=float), (len(centers),))
+    lit = np.isfinite(radii) & (radii > 0) & np.isfinite(centers).all(axis=1)
+    centers, radii = centers[lit], radii[lit]
+
+    outlines = [p for p in polys if len(p) >= 3]
+    if outlines:
+        lo = np.min([p.min(axis=0) for p in outlines], axis=0)
+        hi = np.max([p.max(axis=0) for p in outlines], axis=0)
+    else:
+        lo = hi = np.zeros(2)
+    x0, y0 = float(lo[0]), float(lo[1])
+    w = max(int(np.ceil((hi[0] - x0) / cell_ft)), 1)
+    h = max(int(np.ceil((hi[1] - y0) / cell_ft)), 1)
+
+    room = np.full((h, w), -1, dtype=np.int32)
+    for r, poly in enumerate(polys):
+        if len(poly) < 3:
+            continue
+        rows, c0, c1 = _room_spans(poly, x0, y0, cell_ft, h)
+        if not len(rows):
+            continue
+        # Fill within the room's bounding window only
+        top, left = rows.min(), max(c0.min(), 0)
+        window = (rows.max() - top + 1, min(c1.max(), w - 1) - left + 1)
+        if window[1] <= 0:
+            continue
+        inside = _fill_spans(window, rows - top, c0 - left, c1 - left, np.int64) > 0
+        view = room[top : top + window[0], left : left + window[1]]
+        view[inside & (view < 0)] = r
+
+    count = _fill_spans((h, w), *_disc_spans(centers, radii, x0, y0, cell_ft), np.uint16)
+
+    n = len(polys)
+    inside = room >= 0
+    labels = room[inside]
+    counts = count[inside]
+    cells = np.bincount(labels, minlength=n)
+    covered = np.bincount(labels[counts > 0], minlength=n)
+    overlapped = np.bincount(labels[counts > 1], minlength=n)
+    # Highest coverage count seen per room (cheaper than np.maximum.at)
+    seen = np.zeros((n, int(counts.max(initial=0)) + 1), dtype=bool)
+    seen[labels, counts] = True
+    max_overlap = np.where(
+        seen.any(axis=1), seen.shape[1] - 1 - np.argmax(seen[:, ::-1], axis=1), 0
+    )
+    stats = [
+        RoomCoverage(
+            r,
+            int(cells[r]),
+            int(covered[r]),
+            int(overlapped[r]),
+            int(max_overlap[r]),
+            float(cell_ft),
+        )
+        for r in range(n)
+    ]
+    return CoverageGrid((x0, y0), float(cell_ft), room, count, stats)
+
+
+def overlay_rgba(
+    grid: CoverageGrid, gap=GAP_RGBA, covered=COVERED_RGBA, overlap=OVERLAP_RGBA
+) -> np.ndarray:
+    """(H, W, 4) uint8 image of ``grid``: gaps, single and multiple coverage inside rooms.
+
+    Row 0 is the grid's top (smallest y), matching scene coordinates.
+    """
+    image = np.zeros(grid.shape + (4,), dtype=np.uint8)
+    inside = grid.room >= 0
+    image[inside & (grid.count == 0)] = gap
+    image[inside & (grid.count == 1)] = covered
+    image[inside & (grid.count > 1)] = overlap
+    return image
@@ -1,6 +1,10 @@
 # backend/coverage_service.py
+from dataclasses import dataclass
+
+import numpy as np
+
+from db import coverage_tables
 from db.connection import get_connection
-from db.coverage_tables import CEILING_STROBE_TABLE_NAME, WALL_STROBE_TABLE_NAME
 
 
 def get_required_wall_strobe_candela(room_size: int) -> int | None:
@@ -13,20 +17,8 @@ def get_required_wall_strobe_candela(room_size: int) -> int | None:
     Returns:
         The required candela rating, or None if no suitable rating is found.
     """
-    con = get_connection()
-    cur = con.cursor()
-    # Find the smallest room_size in the table that is >= the given room_size
-    cur.execute(
-        f"""
-        SELECT candela FROM {WALL_STROBE_TABLE_NAME}
-        WHERE room_size >= ?
-        ORDER BY room_size ASC
-        LIMIT 1
-        """,
-        (room_size,),
-    )
-    result = cur.fetchone()
-    return result[0] if result else None
+    # Smallest table room_size >= the given room_size, from the cached table
+    return coverage_tables.lookup(get_connection()).wall_candela(room_size)
 
 
 def get_required_ceiling_strobe_candela(ceiling_height: int, room_size: int) -> int | None:
@@ -40,18 +32,171 @@ def get_required_ceiling_strobe_candela(ceiling_height: int, room_size: int) ->
     Returns:
         The required candela rating, or None if no suitable rating is found.
     """
-    con = get_connection()
-    cur = con.cursor()
-    # Find the best matching record for the given ceiling height and room size.
-    # We look for the closest ceiling height without going under, then the smallest room size that fits.
-    cur.execute(
-        f"""
-        SELECT candela FROM {CEILING_STROBE_TABLE_NAME}
-        WHERE ceiling_height >= ? AND room_size >= ?
-        ORDER BY ceiling_height ASC, room_size ASC
-        LIMIT 1
-        """,
-        (ceiling_height, room_size),
-    )
-    result = cur.fetchone()
-    return result[0] if result else None
+    # The closest ceiling height without going under, then the smallest room size that fits.
+    return coverage_tables.lookup(get_connection()).ceiling_candela(ceiling_height, room_size)
+
+
+def get_required_wall_strobe_candela_batch(room_sizes) -> np.ndarray:
+    """
+    Vectorized `get_required_wall_strobe_candela`.
+
+    Args:
+        room_sizes: Array-like of room sizes in feet.
+
+    Returns:
+        An int array of candela ratings, `coverage_tables.NO_RATING` where none fits.
+    """
+    return coverage_tables.lookup(get_connection()).wall_candela_batch(room_sizes)
+
+
+def get_required_ceiling_strobe_candela_batch(ceiling_heights, room_sizes) -> np.ndarray:
+    """
+    Vectorized `get_required_ceiling_strobe_candela`.
+
+    Args:
+        ceiling_heights: Array-like of ceiling heights in feet (or one height for all rooms).
+        room_sizes: Array-like of room sizes in feet.
+
+    Returns:
+        An int array of candela ratings, `coverage_tables.NO_RATING` where none fits.
+    """
+    lookup = coverage_tables.lookup(get_connection())
+    return lookup.ceiling_candela_batch(ceiling_heights, room_sizes)
+
+
+def invalidate_cache() -> None:
+    """Reload the coverage tables on the next lookup (call after editing them)."""
+    coverage_tables.invalidate_lookup()
+
+
+# Device kinds sized by `size_floor`
+STROBE, SPEAKER, SMOKE = "strobe", "speaker", "smoke"
+
+
+def room_index(points, rooms) -> np.ndarray:
+    """
+    Index of the first room polygon containing each point, or -1.
+
+    Args:
+        points: (N, 2) array-like of x, y.
+        rooms: Sequence of polygons, each a (K, 2) array-like of vertices.
+
+    Returns:
+        An int array of length N.
+    """
+    pts = np.asarray(points, dtype=float).reshape(-1, 2)
+    out = np.full(len(pts), -1, dtype=np.int64)
+    for r, poly in enumerate(rooms):
+        poly = np.asarray(poly, dtype=float).reshape(-1, 2)
+        if len(poly) < 3:
+            continue
+        (x0, y0), (x1, y1) = poly.min(axis=0), poly.max(axis=0)
+        cand = np.flatnonzero(
+            (out < 0)
+            & (pts[:, 0] >= x0)
+            & (pts[:, 0] <= x1)
+            & (pts[:, 1] >= y0)
+            & (pts[:, 1] <= y1)
+        )
+        if not len(cand):
+            continue
+        # Even-odd rule: count edge crossings of a ray towards +x, (points x edges)
+        px, py = pts[cand, 0:1], pts[cand, 1:2]
+        ax, ay = poly[:, 0], poly[:, 1]
+        bx, by = np.roll(ax, -1), np.roll(ay, -1)
+        straddles = (ay > py) != (by > py)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = ax + (py - ay) * (bx - ax) / (by - ay)
+        inside = np.count_nonzero(straddles & (px < x_cross), axis=1) % 2 == 1
+        out[cand[inside]] = r
+    return out
+
+
+@dataclass
+class FloorSizing:
+    """Per-device results of `size_floor`; arrays are in device order."""
+
+    room: np.ndarray  # containing room index, -1 if none
+    room_size_ft: np.ndarray  # longest dimension of that room, NaN if none
+    candela: np.ndarray  # strobes only; NO_RATING elsewhere or when none fits
+    radius_ft: np.ndarray  # coverage radius; NaN where the device could not be sized
+    spacing_ft: np.ndarray  # smoke detectors only; NaN elsewhere
+
+    @property
+    def sized(self) -> np.ndarray:
+        return ~np.isnan(self.radius_ft)
+
+
+def size_floor(
+    positions_ft,
+    kinds,
+    rooms,
+    ceiling_heights_ft=10.0,
+    mounts=None,
+    speaker_l10_db=95.0,
+    speaker_target_db=75.0,
+    smoke_spacing_ft=30.0,
+) -> FloorSizing:
+    """
+    Sizes coverage for every strobe, speaker and smoke detector on a floor in one pass.
+
+    Strobes get the candela the coverage tables require for their room (longest
+    room dimension; wall or ceiling mount) and cover the rated room size. Speakers
+    cover the inverse-square distance at which L@10ft falls to the target level.
+    Smoke detectors cover half their spacing. Other kinds are left unsized.
+
+    Args:
+        positions_ft: (N, 2) device positions in feet.
+        kinds: N device kinds ("strobe", "speaker", "smoke" or anything else).
+        rooms: Room polygons in feet, as for `room_index`.
+        ceiling_heights_ft: Ceiling height per room, or one for all rooms.
+        mounts: N strobe mounts ("wall" or "ceiling"); default ceiling.
+        speaker_l10_db: Speaker level at 10 ft, per device or scalar.
+        speaker_target_db: Required level, per device or scalar.
+        smoke_spacing_ft: Detector spacing, per device or scalar.
+
+    Returns:
+        A FloorSizing.
+    """
+    pts = np.asarray(positions_ft, dtype=float).reshape(-1, 2)
+    n = len(pts)
+    kinds = np.asarray(kinds, dtype=object).reshape(n)
+    room = room_index(pts, rooms)
+
+    sizes = np.full(len(rooms) + 1, np.nan)  # last slot: "no room" for index -1
+    for r, poly in enumerate(rooms):
+        poly = np.asarray(poly, dtype=float).reshape(-1, 2)
+        if len(poly):
+            sizes[r] = np.ptp(poly, axis=0).max()
+    room_size = sizes[room]
+    heights = np.broadcast_to(np.asarray(ceiling_heights_ft, dtype=float), (len(rooms),))
+    height = np.append(heights, np.nan)[room]
+
+    candela = np.full(n, coverage_tables.NO_RATING, dtype=np.int64)
+    radius = np.full(n, np.nan)
+    spacing = np.full(n, np.nan)
+
+    strobe = (kinds == STROBE) & (room >= 0)
+    if strobe.any():
+        lookup = coverage_tables.lookup(get_connection())
+        wall = np.zeros(n, dtype=bool)
+        if mounts is not None:
+            wall = np.asarray(mounts, dtype=object).reshape(n) == "wall"
+        for mask, (cd, rated) in (
+            (strobe & wall, lookup.wall_rating_batch(room_size)),
+            (strobe & ~wall, lookup.ceiling_rating_batch(height, room_size)),
+        ):
+            candela[mask] = cd[mask]
+            radius[mask] = rated[mask] / 2.0
+
+    speaker = kinds == SPEAKER
+    l10 = np.broadcast_to(np.asarray(speaker_l10_db, dtype=float), (n,))
+    target = np.broadcast_to(np.asarray(speaker_target_db, dtype=float), (n,))
+    # inverse-square, ref at 10 ft: L(r) = L10 - 20*log10(r/10)
+    radius[speaker] = 10.0 * 10.0 ** ((l10[speaker] - target[speaker]) / 20.0)
+
+    smoke = kinds == SMOKE
+    spacing[smoke] = np.broadcast_to(np.asarray(smoke_spacing_ft, dtype=float), (n,))[smoke]
+    radius[smoke] = np.maximum(spacing[smoke], 0.0) / 2.0
+
+    return FloorSizing(room, room_size, candela, radius, spacing)
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 
+import numpy as np
+
+from cad_core.spatial import BoxIndex
+
 from .models import CircleDTO, PointDTO, SegmentDTO
 
 
@@ -12,7 +17,113 @@ class EntityRef:
     id: str
 
 
-class InMemoryGeomRepo:
+KINDS = ("point", "segment", "circle")
+
+
+def _point_coords(p: PointDTO) -> tuple[float, float]:
+    return (p.x, p.y)
+
+
+def _segment_coords(s: SegmentDTO) -> tuple[float, float, float, float]:
+    return (s.a.x, s.a.y, s.b.x, s.b.y)
+
+
+def _circle_coords(c: CircleDTO) -> tuple[float, float, float]:
+    return (c.center.x, c.center.y, c.r)
+
+
+_TO_COORDS = {"point": _point_coords, "segment": _segment_coords, "circle": _circle_coords}
+_WIDTH = {"point": 2, "segment": 4, "circle": 3}
+
+
+def _bounds(kind: str, coords: np.ndarray) -> np.ndarray:
+    """(N, 4) bounding boxes of (N, width) coordinate rows of one kind."""
+    if kind == "point":
+        return np.hstack([coords, coords])
+    if kind == "segment":
+        a, b = coords[:, 0:2], coords[:, 2:4]
+        return np.hstack([np.minimum(a, b), np.maximum(a, b)])
+    r = np.abs(coords[:, 2:3])
+    return np.hstack([coords[:, 0:2] - r, coords[:, 0:2] + r])
+
+
+def _distances(kind: str, coords: np.ndarray, x: float, y: float) -> np.ndarray:
+    """Distance from (x, y) to each primitive (to the outline, for circles)."""
+    if kind == "point":
+        return np.hypot(coords[:, 0] - x, coords[:, 1] - y)
+    if kind == "segment":
+        ax, ay = coords[:, 0], coords[:, 1]
+        dx, dy = coords[:, 2] - ax, coords[:, 3] - ay
+        len2 = dx * dx + dy * dy
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.clip(((x - ax) * dx + (y - ay) * dy) / len2, 0.0, 1.0)
+        t = np.where(len2 > 0, t, 0.0)
+        return np.hypot(ax + t * dx - x, ay + t * dy - y)
+    return np.abs(np.hypot(coords[:, 0] - x, coords[:, 1] - y) - np.abs(coords[:, 2]))
+
+
+class _SpatialQueries(ABC):
+    """Box, radius and nearest-neighbour queries over a `BoxIndex` per kind.
+
+    Repositories keep ``_index[kind]`` current inside their add/update/remove
+    methods (keyed by the ``n`` of ``"kind:n"``) and supply the coordinates
+    of indexed handles through ``coords``.
+    """
+
+    _index: dict[str, BoxIndex]
+
+    @abstractmethod
+    def handle(self, eid: str) -> int | None:
+        """Index key of a live entity id, or None if it is missing."""
+
+    @abstractmethod
+    def coords(self, kind: str, handles: np.ndarray) -> np.ndarray:
+        """(N, width) coordinates of live ``handles`` of one kind (see `ArrayGeomRepo`)."""
+
+    @staticmethod
+    def _kinds(kinds: str | Iterable[str]) -> tuple[str, ...]:
+        kinds = (kinds,) if isinstance(kinds, str) else tuple(kinds)
+        unknown = set(kinds) - set(KINDS)
+        if unknown:
+            raise ValueError(f"unknown geometry kind(s): {sorted(unknown)}")
+        return kinds
+
+    def spatial_index(self, kind: str) -> BoxIndex:
+        """The live index of one kind, for handle-level bulk queries."""
+        return self._index[self._kinds(kind)[0]]
+
+    def query_bbox(
+        self, minx: float, miny: float, maxx: float, maxy: float, kinds=KINDS
+    ) -> list[EntityRef]:
+        """Entities whose bounding box overlaps the query box, by kind then id."""
+        return [
+            EntityRef(kind, f"{kind}:{h}")
+            for kind in self._kinds(kinds)
+            for h in self._index[kind].query_bbox(minx, miny, maxx, maxy).tolist()
+        ]
+
+    def query_radius(self, x: float, y: float, r: float, kinds=KINDS) -> list[EntityRef]:
+        """Entities within distance r of (x, y) (circles by their outline), by kind then id."""
+        out = []
+        for kind in self._kinds(kinds):
+            handles = self._index[kind].query_radius(x, y, r)
+            near = _distances(kind, self.coords(kind, handles), x, y) <= r
+            out.extend(EntityRef(kind, f"{kind}:{h}") for h in handles[near].tolist())
+        return out
+
+    def nearest(self, x: float, y: float, k: int = 1, kinds=KINDS) -> list[tuple[EntityRef, float]]:
+        """The k entities closest to (x, y) with their distances, closest first."""
+        found = []
+        for rank, kind in enumerate(self._kinds(kinds)):
+            handles, dist = self._index[kind].nearest(
+                x, y, k, lambda h, kind=kind: _distances(kind, self.coords(kind, h), x, y)
+            )
+            found.extend((d, rank, h, kind) for d, h in zip(dist.tolist(), handles.tolist()))
+        found.sort()
+        return [(EntityRef(kind, f"{kind}:{h}"), d) for d, _, h, kind in found[:k]]
+
+
+class InMemoryGeomRepo(_SpatialQueries):
     """
     Minimal in-memory repository for geometry primitives.
 
@@ -25,16 +136,40 @@ class InMemoryGeomRepo:
         self._segments: dict[str, SegmentDTO] = {}
         self._circles: dict[str, CircleDTO] = {}
         self._counters: dict[str, int] = {"point": 0, "segment": 0, "circle": 0}
+        self._index: dict[str, BoxIndex] = {kind: BoxIndex() for kind in KINDS}
 
     def _next_id(self, kind: str) -> str:
         n = self._counters[kind] + 1
         self._counters[kind] = n
         return f"{kind}:{n}"
 
+    def _store(self, kind: str) -> dict:
+        return {"point": self._points, "segment": self._segments, "circle": self._circles}[kind]
+
+    def _reindex(self, kind: str, eid: str, coords) -> None:
+        row = np.asarray([coords], dtype=float)
+        self._index[kind].set([int(eid.rpartition(":")[2])], _bounds(kind, row))
+
+    def _unindex(self, kind: str, eid: str) -> None:
+        self._index[kind].remove([int(eid.rpartition(":")[2])])
+
+    def handle(self, eid: str) -> int | None:
+        """Integer handle (the ``n`` of ``"kind:n"``) of a stored entity, else None."""
+        kind = eid.partition(":")[0]
+        if kind not in _TO_COORDS or eid not in self._store(kind):
+            return None
+        return int(eid.rpartition(":")[2])
+
+    def coords(self, kind: str, handles: np.ndarray) -> np.ndarray:
+        store = self._store(kind)
+        rows = [_TO_COORDS[kind](store[f"{kind}:{h}"]) for h in np.asarray(handles).tolist()]
+        return np.asarray(rows, dtype=float).reshape(-1, _WIDTH[kind])
+
     # CRUD: points
     def add_point(self, p: PointDTO) -> EntityRef:
         eid = self._next_id("point")
         self._points[eid] = p
+        self._reindex("point", eid, _point_coords(p))
         return EntityRef("point", eid)
 
     def get_point(self, eid: str) -> PointDTO | None:
@@ -43,9 +178,16 @@ class InMemoryGeomRepo:
     def update_point(self, eid: str, p: PointDTO) -> bool:
         if eid in self._points:
             self._points[eid] = p
+            self._reindex("point", eid, _point_coords(p))
             return True
         return False
 
+    def remove_point(self, eid: str) -> bool:
+        if self._points.pop(eid, None) is None:
+            return False
+        self._unindex("point", eid)
+        return True
+
     def iter_points(self) -> Iterator[tuple[str, PointDTO]]:
         return iter(self._points.items())
 
@@ -53,6 +195,7 @@ class InMemoryGeomRepo:
     def add_segment(self, s: SegmentDTO) -> EntityRef:
         eid = self._next_id("segment")
         self._segments[eid] = s
+        self._reindex("segment", eid, _segment_coords(s))
         return EntityRef("segment", eid)
 
     def get_segment(self, eid: str) -> SegmentDTO | None:
@@ -61,9 +204,16 @@ class InMemoryGeomRepo:
     def update_segment(self, eid: str, s: SegmentDTO) -> bool:
         if eid in self._segments:
             self._segments[eid] = s
+            self._reindex("segment", eid, _segment_coords(s))
             return True
         return False
 
+    def remove_segment(self, eid: str) -> bool:
+        if self._segments.pop(eid, None) is None:
+            return False
+        self._unindex("segment", eid)
+        return True
+
     def iter_segments(self) -> Iterator[tuple[str, SegmentDTO]]:
         return iter(self._segments.items())
 
@@ -71,6 +221,7 @@ class InMemoryGeomRepo:
     def add_circle(self, c: CircleDTO) -> EntityRef:
         eid = self._next_id("circle")
         self._circles[eid] = c
+        self._reindex("circle", eid, _circle_coords(c))
         return EntityRef("circle", eid)
 
     def get_circle(self, eid: str) -> CircleDTO | None:
@@ -79,8 +230,285 @@ class InMemoryGeomRepo:
     def update_circle(self, eid: str, c: CircleDTO) -> bool:
         if eid in self._circles:
             self._circles[eid] = c
+            self._reindex("circle", eid, _circle_coords(c))
             return True
         return False
 
+    def remove_circle(self, eid: str) -> bool:
+        if self._circles.pop(eid, None) is None:
+            return False
+        self._unindex("circle", eid)
+        return True
+
     def iter_circles(self) -> Iterator[tuple[str, CircleDTO]]:
         return iter(self._circles.items())
+
+
+def _table_dtype(width: int) -> np.dtype:
+    return np.dtype([("coords", "f8", (width,)), ("eid", "i8")])
+
+
+# Structured row layouts: coords are (x, y), (x1, y1, x2, y2) and (cx, cy, r)
+POINT_DTYPE = _table_dtype(_WIDTH["point"])
+SEGMENT_DTYPE = _table_dtype(_WIDTH["segment"])
+CIRCLE_DTYPE = _table_dtype(_WIDTH["circle"])
+
+
+class _ArrayTable:
+    """One primitive kind stored in a growable structured array.
+
+    Entities get increasing integer handles (the ``n`` of ``"kind:n"``, never
+    reused); rows live in slots, and a removed entity's slot is NaN-filled,
+    marked ``eid = -1`` and reused by the next add. ``index`` holds the
+    bounding box of every live handle.
+    """
+
+    def __init__(self, kind: str, dtype: np.dtype) -> None:
+        self.kind = kind
+        self.width = dtype["coords"].shape[0]
+        self._data = np.zeros(0, dtype=dtype)
+        self._used = 0  # slots ever handed out (high-water mark)
+        self._free: list[int] = []
+        self._slot_of = np.full(1, -1, dtype=np.int64)  # handle -> slot, -1 when removed
+        self._last = 0  # last handle issued
+        self.index = BoxIndex()
+
+    def __len__(self) -> int:
+        return self._used - len(self._free)
+
+    def _reserve(self, rows: int, handles: int) -> None:
+        if self._used + rows > len(self._data):
+            grown = np.zeros(max(2 * len(self._data), self._used + rows, 64), self._data.dtype)
+            grown[: self._used] = self._data[: self._used]
+            self._data = grown
+        if handles >= len(self._slot_of):
+            grown = np.full(max(2 * len(self._slot_of), handles + 1), -1, dtype=np.int64)
+            grown[: len(self._slot_of)] = self._slot_of
+            self._slot_of = grown
+
+    def handle(self, eid: str) -> int | None:
+        """Integer handle of a live ``"kind:n"`` id, else None."""
+        kind, _, n = eid.partition(":")
+        if kind != self.kind or not n.isdigit():
+            return None
+        h = int(n)
+        return h if 0 < h <= self._last and self._slot_of[h] >= 0 else None
+
+    def add(self, coords) -> np.ndarray:
+        coords = np.asarray(coords, dtype=float).reshape(-1, self.width)
+        n = len(coords)
+        handles = np.arange(self._last + 1, self._last + n + 1, dtype=np.int64)
+        self._reserve(max(n - len(self._free), 0), self._last + n)
+        reuse = min(n, len(self._free))
+        slots = np.empty(n, dtype=np.int64)
+        if reuse:
+            slots[:reuse] = self._free[-reuse:][::-1]
+            del self._free[-reuse:]
+        slots[reuse:] = np.arange(self._used, self._used + n - reuse)
+        self._used += n - reuse
+        self._data["coords"][slots] = coords
+        self._data["eid"][slots] = handles
+        self._slot_of[handles] = slots
+        self._last += n
+        self.index.set(handles, _bounds(self.kind, coords))
+        return handles
+
+    def slots(self, handles) -> np.ndarray:
+        """Slots of ``handles`` (-1 for unknown or removed ones)."""
+        handles = np.asarray(handles, dtype=np.int64)
+        known = (handles > 0) & (handles <= self._last)
+        return np.where(known, self._slot_of[np.where(known, handles, 0)], -1)
+
+    def update(self, handles, coords) -> np.ndarray:
+        slots = self.slots(handles)
+        coords = np.asarray(coords, dtype=float).reshape(-1, self.width)
+        coords = np.broadcast_to(coords, (len(slots), self.width))
+        ok = slots >= 0
+        self._data["coords"][slots[ok]] = coords[ok]
+        self.index.set(np.asarray(handles, dtype=np.int64)[ok], _bounds(self.kind, coords[ok]))
+        return ok
+
+    def remove(self, handle: int) -> bool:
+        slot = int(self.slots([handle])[0])
+        if slot < 0:
+            return False
+        self._data["coords"][slot] = np.nan
+        self._data["eid"][slot] = -1
+        self._slot_of[handle] = -1
+        self._free.append(slot)
+        self.index.remove([handle])
+        return True
+
+    def get(self, handle: int) -> list[float]:
+        return self._data["coords"][self._slot_of[handle]].tolist()
+
+    def coords(self, handles: np.ndarray) -> np.ndarray:
+        return self._data["coords"][self._slot_of[handles]]
+
+    def reindex(self) -> None:
+        self.index.clear()
+        handles, coords = self.live()
+        self.index.set(handles, _bounds(self.kind, coords))
+
+    def view(self) -> np.ndarray:
+        return self._data[: self._used]
+
+    def live(self) -> tuple[np.ndarray, np.ndarray]:
+        """(handles, coords) of live entities in handle (insertion) order."""
+        eids = self._data["eid"][: self._used]
+        slots = np.flatnonzero(eids >= 0)
+        slots = slots[np.argsort(eids[slots], kind="stable")]
+        return eids[slots], self._data["coords"][slots]
+
+
+def _as_coords(values, to_coords) -> np.ndarray | list:
+    if isinstance(values, np.ndarray):
+        return values
+    return [to_coords(v) if not isinstance(v, (tuple, list)) else v for v in values]
+
+
+class ArrayGeomRepo(_SpatialQueries):
+    """
+    Geometry repository backed by NumPy structured arrays.
+
+    Same API as `InMemoryGeomRepo` ("kind:n" ids, DTOs in and out) at a few
+    dozen bytes per primitive, plus bulk operations on integer handles:
+
+    - ``add_*s`` / ``update_*s`` take (N, 2|4|3) coordinate arrays (or DTOs)
+    - ``*_view()`` is a zero-copy structured view of the storage; its
+      ``["coords"]`` field is an (N, width) float array usable directly by
+      `cad_core.batch` (removed rows are NaN with ``eid == -1``)
+    - ``live_*()`` returns (handles, coords) of the live entities
+
+    Writes made through a view bypass the spatial index; call `reindex`
+    afterwards.
+    """
+
+    def __init__(self) -> None:
+        self._points = _ArrayTable("point", POINT_DTYPE)
+        self._segments = _ArrayTable("segment", SEGMENT_DTYPE)
+        self._circles = _ArrayTable("circle", CIRCLE_DTYPE)
+        self._tables = {t.kind: t for t in (self._points, self._segments, self._circles)}
+        self._index = {kind: t.index for kind, t in self._tables.items()}
+
+    def coords(self, kind: str, handles: np.ndarray) -> np.ndarray:
+        return self._tables[kind].coords(np.asarray(handles, dtype=np.int64))
+
+    def reindex(self) -> None:
+        """Rebuild the spatial index from the stored coordinates."""
+        for table in self._tables.values():
+            table.reindex()
+
+    @staticmethod
+    def _ref(table: _ArrayTable, handle: int) -> EntityRef:
+        return EntityRef(table.kind, f"{table.kind}:{int(handle)}")
+
+    def handle(self, eid: str) -> int | None:
+        """Integer handle of a live entity id of any kind, else None."""
+        table = self._tables.get(eid.partition(":")[0])
+        return table.handle(eid) if table is not None else None
+
+    # CRUD: points
+    def add_point(self, p: PointDTO) -> EntityRef:
+        return self._ref(self._points, self._points.add(_point_coords(p))[0])
+
+    def get_point(self, eid: str) -> PointDTO | None:
+        h = self._points.handle(eid)
+        return None if h is None else PointDTO(*self._points.get(h))
+
+    def update_point(self, eid: str, p: PointDTO) -> bool:
+        h = self._points.handle(eid)
+        return h is not None and bool(self._points.update([h], _point_coords(p))[0])
+
+    def remove_point(self, eid: str) -> bool:
+        h = self._points.handle(eid)
+        return h is not None and self._points.remove(h)
+
+    def iter_points(self) -> Iterator[tuple[str, PointDTO]]:
+        handles, coords = self._points.live()
+        for h, (x, y) in zip(handles.tolist(), coords.tolist()):
+            yield f"point:{h}", PointDTO(x, y)
+
+    def add_points(self, points: Iterable[PointDTO] | np.ndarray) -> np.ndarray:
+        return self._points.add(_as_coords(points, _point_coords))
+
+    def update_points(self, handles, points: Iterable[PointDTO] | np.ndarray) -> np.ndarray:
+        return self._points.update(handles, _as_coords(points, _point_coords))
+
+    def points_view(self) -> np.ndarray:
+        return self._points.view()
+
+    def live_points(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._points.live()
+
+    # CRUD: segments
+    def add_segment(self, s: SegmentDTO) -> EntityRef:
+        return self._ref(self._segments, self._segments.add(_segment_coords(s))[0])
+
+    def get_segment(self, eid: str) -> SegmentDTO | None:
+        h = self._segments.handle(eid)
+        if h is None:
+            return None
+        x1, y1, x2, y2 = self._segments.get(h)
+        return SegmentDTO(PointDTO(x1, y1), PointDTO(x2, y2))
+
+    def update_segment(self, eid: str, s: SegmentDTO) -> bool:
+        h = self._segments.handle(eid)
+        return h is not None and bool(self._segments.update([h], _segment_coords(s))[0])
+
+    def remove_segment(self, eid: str) -> bool:
+        h = self._segments.handle(eid)
+        return h is not None and self._segments.remove(h)
+
+    def iter_segments(self) -> Iterator[tuple[str, SegmentDTO]]:
+        handles, coords = self._segments.live()
+        for h, (x1, y1, x2, y2) in zip(handles.tolist(), coords.tolist()):
+            yield f"segment:{h}", SegmentDTO(PointDTO(x1, y1), PointDTO(x2, y2))
+
+    def add_segments(self, segments: Iterable[SegmentDTO] | np.ndarray) -> np.ndarray:
+        return self._segments.add(_as_coords(segments, _segment_coords))
+
+    def update_segments(self, handles, segments: Iterable[SegmentDTO] | np.ndarray) -> np.ndarray:
+        return self._segments.update(handles, _as_coords(segments, _segment_coords))
+
+    def segments_view(self) -> np.ndarray:
+        return self._segments.view()
+
+    def live_segments(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._segments.live()
+
+    # CRUD: circles
+    def add_circle(self, c: CircleDTO) -> EntityRef:
+        return self._ref(self._circles, self._circles.add(_circle_coords(c))[0])
+
+    def get_circle(self, eid: str) -> CircleDTO | None:
+        h = self._circles.handle(eid)
+        if h is None:
+            return None
+        x, y, r = self._circles.get(h)
+        return CircleDTO(PointDTO(x, y), r)
+
+    def update_circle(self, eid: str, c: CircleDTO) -> bool:
+        h = self._circles.handle(eid)
+        return h is not None and bool(self._circles.update([h], _circle_coords(c))[0])
+
+    def remove_circle(self, eid: str) -> bool:
+        h = self._circles.handle(eid)
+        return h is not None and self._circles.remove(h)
+
+    def iter_circles(self) -> Iterator[tuple[str, CircleDTO]]:
+        handles, coords = self._circles.live()
+        for h, (x, y, r) in zip(handles.tolist(), coords.tolist()):
+            yield f"circle:{h}", CircleDTO(PointDTO(x, y), r)
+
+    def add_circles(self, circles: Iterable[CircleDTO] | np.ndarray) -> np.ndarray:
+        return self._circles.add(_as_coords(circles, _circle_coords))
+
+    def update_circles(self, handles, circles: Iterable[CircleDTO] | np.ndarray) -> np.ndarray:
+        return self._circles.update(handles, _as_coords(circles, _circle_coords))
+
+    def circles_view(self) -> np.ndarray:
+        return self._circles.view()
+
+    def live_circles(self) -> tuple[np.ndarray, np.ndarray]:
+        return self._circles.live()
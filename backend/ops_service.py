@@ -1,22 +1,176 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
 from dataclasses import dataclass
 
-from .geom_repo import EntityRef, InMemoryGeomRepo
+import numpy as np
+
+from cad_core.batch import intersection_line_line, segment_intersection_params
+
+from .geom_repo import ArrayGeomRepo, EntityRef, InMemoryGeomRepo
 from .models import PointDTO, SegmentDTO
 
 
+def _side(segments: np.ndarray, px, py) -> np.ndarray:
+    """Sign of the side of (px, py) relative to each segment's direction (0 on the line)."""
+    ax, ay, bx, by = segments[:, 0], segments[:, 1], segments[:, 2], segments[:, 3]
+    return np.sign((bx - ax) * (py - ay) - (by - ay) * (px - ax))
+
+
 @dataclass
 class OpsService:
-    repo: InMemoryGeomRepo
+    repo: InMemoryGeomRepo | ArrayGeomRepo
+    tol: float = 1e-9
 
     # Example: create a segment from two points
     def create_segment(self, a: PointDTO, b: PointDTO) -> EntityRef:
         seg = SegmentDTO(a=a, b=b)
         return self.repo.add_segment(seg)
 
-    # Example placeholder for future op (trim/extend)
-    def trim_segment_to_line(self, seg_ref: EntityRef, cut_a: PointDTO, cut_b: PointDTO) -> bool:
-        _ = (seg_ref, cut_a, cut_b)
-        # TODO: integrate with cad_core.trim operation
-        return False
+    def _segment_handle(self, seg_ref: EntityRef) -> int | None:
+        return self.repo.handle(seg_ref.id) if seg_ref.kind == "segment" else None
+
+    def _write_segments(self, handles: np.ndarray, coords: np.ndarray) -> list[EntityRef]:
+        if isinstance(self.repo, ArrayGeomRepo):
+            self.repo.update_segments(handles, coords)
+        else:
+            for h, (x1, y1, x2, y2) in zip(handles.tolist(), coords.tolist()):
+                seg = SegmentDTO(PointDTO(x1, y1), PointDTO(x2, y2))
+                self.repo.update_segment(f"segment:{h}", seg)
+        return [EntityRef("segment", f"segment:{h}") for h in handles.tolist()]
+
+    def _move_end_to_line(
+        self, seg_ref: EntityRef, la: PointDTO, lb: PointDTO, end: str, trim: bool
+    ) -> bool:
+        if end not in ("a", "b"):
+            raise ValueError("end must be 'a' or 'b'")
+        h = self._segment_handle(seg_ref)
+        if h is None:
+            return False
+        seg = self.repo.coords("segment", np.array([h]))
+        pts, t, valid = intersection_line_line(seg, np.array([[la.x, la.y, lb.x, lb.y]]), self.tol)
+        if not valid[0]:
+            return False
+        t = float(t[0])
+        if trim:
+            ok = -self.tol <= t <= 1.0 + self.tol
+        else:
+            ok = t > 1.0 + self.tol if end == "b" else t < -self.tol
+        if not ok:
+            return False
+        seg[0, slice(2, 4) if end == "b" else slice(0, 2)] = pts[0]
+        self._write_segments(np.array([h]), seg)
+        return True
+
+    def trim_segment_to_line(
+        self, seg_ref: EntityRef, cut_a: PointDTO, cut_b: PointDTO, end: str = "b"
+    ) -> bool:
+        """Trim one end of a segment back to the line through cut_a and cut_b.
+
+        ``end`` ('a' or 'b') moves to where the line crosses the segment. Returns
+        False, leaving the segment alone, if it is missing, parallel to the line
+        or does not reach it (a trim never lengthens; see `extend_segment_to_line`).
+        """
+        return self._move_end_to_line(seg_ref, cut_a, cut_b, end, trim=True)
+
+    def extend_segment_to_line(
+        self, seg_ref: EntityRef, bound_a: PointDTO, bound_b: PointDTO, end: str = "b"
+    ) -> bool:
+        """Extend one end of a segment to the line through bound_a and bound_b.
+
+        Returns False, leaving the segment alone, if it is missing, parallel to
+        the line, or the line does not lie beyond ``end``.
+        """
+        return self._move_end_to_line(seg_ref, bound_a, bound_b, end, trim=False)
+
+    def trim_segments(self, cut_a: PointDTO, cut_b: PointDTO, keep: PointDTO) -> list[EntityRef]:
+        """Trim every segment that crosses the cutter segment cut_a-cut_b.
+
+        Each crossing segment keeps the part on ``keep``'s side of the cutter
+        and its other end moves to the crossing. Candidates come from the
+        repo's segment index and crossings from one `cad_core.batch` call.
+        Segments that only touch the cutter are left alone.
+
+        Returns:
+            Refs of the trimmed segments, by id.
+        """
+        cutter = np.array([[cut_a.x, cut_a.y, cut_b.x, cut_b.y]])
+        side = _side(cutter, keep.x, keep.y)[0]
+        if side == 0:
+            raise ValueError("keep must not lie on the cutter line")
+        index = self.repo.spatial_index("segment")
+        handles = index.query_bbox(
+            min(cut_a.x, cut_b.x),
+            min(cut_a.y, cut_b.y),
+            max(cut_a.x, cut_b.x),
+            max(cut_a.y, cut_b.y),
+        )
+        segs = self.repo.coords("segment", handles)
+        pts, _, _, valid = segment_intersection_params(segs, cutter, self.tol)
+        side_a = _side(cutter, segs[:, 0], segs[:, 1])
+        side_b = _side(cutter, segs[:, 2], segs[:, 3])
+        crossing = valid & (side_a * side_b < 0)
+        keep_a, keep_b = crossing & (side_a == side), crossing & (side_b == side)
+        segs[keep_a, 2:4] = pts[keep_a]
+        segs[keep_b, 0:2] = pts[keep_b]
+        return self._write_segments(handles[crossing], segs[crossing])
+
+    def extend_segments(
+        self,
+        refs: Iterable[EntityRef],
+        max_distance: float,
+        boundaries: Iterable[EntityRef] | None = None,
+    ) -> list[EntityRef]:
+        """Extend both ends of each segment to the nearest boundary ahead of it.
+
+        An end moves along its segment's direction to the first boundary
+        segment it would cross within ``max_distance``. Ends already touching
+        a boundary (e.g. joined to a neighbour) stay put. Boundaries are every
+        other segment in the repo, or only ``boundaries`` when given. All rays
+        are matched against the segment index in one bulk query.
+
+        Returns:
+            Refs of the extended segments, by id.
+        """
+        if max_distance <= 0:
+            raise ValueError("max_distance must be positive")
+        handles = {self._segment_handle(r) for r in refs} - {None}
+        handles = np.array(sorted(handles), dtype=np.int64)
+        segs = self.repo.coords("segment", handles)
+        n = len(segs)
+
+        # Rays forward from each b end (rows 0..n-1), then backward from each a end
+        d = segs[:, 2:4] - segs[:, 0:2]
+        length = np.hypot(d[:, 0], d[:, 1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            unit = np.where(length[:, None] > 0, d / length[:, None], np.nan)
+        origin = np.vstack([segs[:, 2:4], segs[:, 0:2]])
+        rays = np.hstack([origin, origin + np.vstack([unit, -unit]) * max_distance])
+        owner = np.tile(handles, 2)
+
+        boxes = np.hstack(
+            [np.minimum(rays[:, :2], rays[:, 2:]), np.maximum(rays[:, :2], rays[:, 2:])]
+        )
+        rows, keys = self.repo.spatial_index("segment").query_bboxes(boxes)
+        keep = keys != owner[rows]
+        if boundaries is not None:
+            bounds = [self._segment_handle(r) for r in boundaries]
+            keep &= np.isin(keys, [h for h in bounds if h is not None])
+        rows, keys = rows[keep], keys[keep]
+        pts, t, _, valid = segment_intersection_params(
+            rays[rows], self.repo.coords("segment", keys), self.tol
+        )
+        rows, t, pts = rows[valid], t[valid], pts[valid]
+
+        # Nearest hit per ray; a hit at the origin means the end already touches
+        order = np.lexsort((t, rows))
+        first = order[np.unique(rows[order], return_index=True)[1]]
+        rows, t, pts = rows[first], t[first], pts[first]
+        move = t > self.tol
+        rows, pts = rows[move], pts[move]
+
+        fwd = rows < n
+        segs[rows[fwd], 2:4] = pts[fwd]
+        segs[rows[~fwd] - n, 0:2] = pts[~fwd]
+        changed = np.unique(rows % n) if n else rows
+        return self._write_segments(handles[changed], segs[changed])
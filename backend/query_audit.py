@@ -0,0 +1,154 @@
+"""EXPLAIN QUERY PLAN audit of the catalog queries the app issues.
+
+Each catalog read path is run against a database with SQLite's trace hook
+recording the statements actually executed (parameters inlined), so the
+audit follows the code rather than a copy of its SQL. Every statement is
+then explained, and scans of a whole table (or of a whole index standing in
+for it) are flagged unless the query lists every row by design.
+
+    python -m backend.query_audit [catalog.db] [--strict]
+"""
+
+import argparse
+import re
+import sqlite3
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from backend import catalog_store
+from db import coverage_tables
+from db import loader as db_loader
+
+# "SCAN t", with or without an index, visits every row of t; FTS virtual
+# table cursors only visit matches.
+_FULL_SCAN = re.compile(r"^SCAN (\S+)(?!\S| VIRTUAL TABLE)")
+
+
+@dataclass
+class QueryPlan:
+    """The plan of one statement issued by a named app query."""
+
+    query: str
+    sql: str
+    plan: list[str] = field(default_factory=list)
+    lists_all: bool = False  # the query returns every row, so a scan is expected
+
+    @property
+    def full_scans(self) -> list[str]:
+        return [m.group(1) for m in map(_FULL_SCAN.match, self.plan) if m]
+
+    @property
+    def flagged(self) -> bool:
+        return bool(self.full_scans) and not self.lists_all
+
+
+def _is_app_statement(sql: str) -> bool:
+    # Skip trigger bodies ("-- " prefixed), pragmas, schema probes and the
+    # FTS module's own shadow-table statements.
+    words = sql.split(None, 1)
+    if not words or words[0].upper() not in ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE"):
+        return False
+    return "sqlite_master" not in sql and f"'{db_loader.SEARCH_TABLE}_" not in sql
+
+
+def capture(con: sqlite3.Connection, call: Callable[[], object]) -> list[str]:
+    """Statements ``call`` executes on ``con``, with bound values inlined."""
+    statements: list[str] = []
+    con.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        con.set_trace_callback(None)
+    return [sql for sql in statements if _is_app_statement(sql)]
+
+
+def explain(con: sqlite3.Connection, sql: str) -> list[str]:
+    return [row[3] for row in con.execute("EXPLAIN QUERY PLAN " + sql)]
+
+
+def _load_coverage_lookup(con: sqlite3.Connection):
+    lookup = coverage_tables.CoverageLookup(con)
+    return lookup.wall, lookup.ceiling, lookup.radius
+
+
+def workload(con: sqlite3.Connection, path: str) -> list[tuple[str, Callable[[], object], bool]]:
+    """``(name, call, lists_all)`` for each catalog read path, with sample arguments."""
+    row = con.execute("SELECT code FROM device_types ORDER BY code LIMIT 1").fetchone()
+    type_code = row[0] if row else "Detector"
+    row = con.execute("SELECT name FROM manufacturers ORDER BY name LIMIT 1").fetchone()
+    mfr = row[0] if row else "(Any)"
+    row = con.execute("SELECT MIN(id) FROM devices").fetchone()
+    device_id = row[0] or 1
+    return [
+        ("fetch_devices", lambda: db_loader.fetch_devices(con), True),
+        ("list_manufacturers", lambda: db_loader.list_manufacturers(con), True),
+        ("list_types", lambda: db_loader.list_types(con), True),
+        ("search_devices", lambda: db_loader.search_devices(con, "smoke det"), False),
+        (
+            "search_devices(manufacturer)",
+            lambda: db_loader.search_devices(con, "", {"manufacturer": mfr}),
+            False,
+        ),
+        (
+            "search_devices(type page)",
+            lambda: db_loader.search_devices(con, "", {"type": type_code}, 200, 200),
+            False,
+        ),
+        (
+            "search_devices(untyped)",
+            lambda: db_loader.search_devices(con, "", {"type": None}),
+            False,
+        ),
+        ("device_type_counts", lambda: db_loader.device_type_counts(con), True),
+        ("device_type_counts(query)", lambda: db_loader.device_type_counts(con, "smoke"), False),
+        # Candela/radius lookups read each coverage table once into memory
+        ("coverage_tables.lookup", lambda: _load_coverage_lookup(con), True),
+        ("catalog_store.list_devices", lambda: catalog_store.list_devices(path=path), True),
+        (
+            "catalog_store.list_devices(type)",
+            lambda: catalog_store.list_devices(type_code, path=path),
+            False,
+        ),
+        (
+            "catalog_store.get_device_specs",
+            lambda: catalog_store.get_device_specs(device_id, path=path),
+            False,
+        ),
+    ]
+
+
+def audit(path: str | None = None) -> list[QueryPlan]:
+    """Plans of every statement in `workload` against the catalog at ``path``.
+
+    The database is opened through `catalog_store.get_connection`, so pending
+    migrations are applied first, as they would be by the app.
+    """
+    path = path or catalog_store.get_catalog_path()
+    con = catalog_store.get_connection(path)
+    plans = []
+    for name, call, lists_all in workload(con, path):
+        for sql in capture(con, call):
+            plans.append(QueryPlan(name, sql, explain(con, sql), lists_all))
+    return plans
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("db", nargs="?", help="catalog database (default: the app catalog)")
+    ap.add_argument("--strict", action="store_true", help="exit 1 if any query is flagged")
+    args = ap.parse_args(argv)
+
+    plans = audit(args.db)
+    flagged = 0
+    for qp in plans:
+        status = "FULL SCAN" if qp.flagged else "ok"
+        flagged += qp.flagged
+        print(f"[{status}] {qp.query}")
+        for line in qp.plan:
+            print(f"    {line}")
+    print(f"{len(plans)} statements, {flagged} with full table scans")
+    return 1 if args.strict and flagged else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,185 @@
+"""NumPy batch counterparts of the scalar kernels in `cad_core.lines`.
+
+Segments are float arrays shaped (..., 4) as (x1, y1, x2, y2) and points are
+(..., 2); leading dimensions broadcast, so ``s1[:, None]`` against
+``s2[None, :]`` tests every pair. Each kernel performs the same floating-point
+operations, in the same order, as its scalar twin, so results match exactly;
+where the scalar version returns None the batch version clears the row in a
+``valid`` mask and fills coordinates with NaN.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+import numpy as np
+
+from .lines import Line, Point
+
+
+def as_segments(segments) -> np.ndarray:
+    """(..., 4) float array from an array-like of (x1, y1, x2, y2) or `Line` objects."""
+    if isinstance(segments, Line):
+        segments = [segments]
+    if isinstance(segments, np.ndarray):
+        arr = segments.astype(float, copy=False)
+    else:
+        segments = list(segments) if isinstance(segments, Iterable) else segments
+        if segments and isinstance(segments[0], Line):
+            segments = [(s.a.x, s.a.y, s.b.x, s.b.y) for s in segments]
+        arr = np.asarray(segments, dtype=float)
+    if arr.shape == (0,):
+        arr = arr.reshape(0, 4)
+    if arr.shape[-1:] != (4,):
+        raise ValueError("segments must have shape (..., 4)")
+    return arr
+
+
+def as_points(points) -> np.ndarray:
+    """(..., 2) float array from an array-like of (x, y) or `Point` objects."""
+    if isinstance(points, Point):
+        points = [points]
+    if not isinstance(points, np.ndarray):
+        points = list(points)
+        if points and isinstance(points[0], Point):
+            points = [(p.x, p.y) for p in points]
+    arr = np.asarray(points, dtype=float)
+    if arr.shape == (0,):
+        arr = arr.reshape(0, 2)
+    if arr.shape[-1:] != (2,):
+        raise ValueError("points must have shape (..., 2)")
+    return arr
+
+
+def _split(segments: np.ndarray):
+    return segments[..., 0], segments[..., 1], segments[..., 2], segments[..., 3]
+
+
+def _points(x: np.ndarray, y: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    out = np.stack(np.broadcast_arrays(x, y), axis=-1)
+    out[~valid] = np.nan
+    return out
+
+
+def is_parallel(s1, s2, tol: float = 1e-9) -> np.ndarray:
+    """Mask of segment pairs whose infinite lines are parallel (see `lines.is_parallel`)."""
+    ax, ay, bx, by = _split(as_segments(s1))
+    cx, cy, dx, dy = _split(as_segments(s2))
+    rx, ry = bx - ax, by - ay
+    sx, sy = dx - cx, dy - cy
+    return np.abs(rx * sy - ry * sx) < tol
+
+
+def intersection_line_line(s1, s2, tol: float = 1e-9) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Intersections of infinite lines through segment pairs.
+
+    Returns ``(points, t, valid)``: the points (..., 2), the parameter along
+    ``s1`` (point = a1 + t * (b1 - a1)) and a mask that is False for parallel
+    pairs, whose points and t are NaN.
+    """
+    ax, ay, bx, by = _split(as_segments(s1))
+    cx, cy, dx, dy = _split(as_segments(s2))
+    rx, ry = bx - ax, by - ay
+    sx, sy = dx - cx, dy - cy
+    rxs = rx * sy - ry * sx
+    qx, qy = cx - ax, cy - ay
+    valid = ~(np.abs(rxs) < tol)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (qx * sy - qy * sx) / rxs
+    t = np.where(valid, t, np.nan)
+    return _points(ax + rx * t, ay + ry * t, valid), t, valid
+
+
+def is_point_on_segment(points, segments, tol: float = 1e-9) -> np.ndarray:
+    """Mask of points lying on their segments within tol (see `lines.is_point_on_segment`)."""
+    pts = as_points(points)
+    px, py = pts[..., 0], pts[..., 1]
+    ax, ay, bx, by = _split(as_segments(segments))
+    abx, aby = bx - ax, by - ay
+    apx, apy = px - ax, py - ay
+    bpx, bpy = px - bx, py - by
+    bax, bay = ax - bx, ay - by
+    collinear = ~(np.abs(apx * aby - apy * abx) > tol)
+    return collinear & (apx * abx + apy * aby >= -tol) & (bpx * bax + bpy * bay >= -tol)
+
+
+def intersection_segment_segment(
+    s1, s2, tol: float = 1e-9
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Intersections of finite segment pairs.
+
+    Returns ``(points, t, u, valid)`` with ``t``/``u`` the parameters along
+    ``s1``/``s2``. A pair is valid exactly when
+    `lines.intersection_segment_segment` returns a point for it; invalid rows
+    are NaN.
+    """
+    s1, s2 = as_segments(s1), as_segments(s2)
+    points, t, valid = intersection_line_line(s1, s2, tol)
+    with np.errstate(invalid="ignore"):
+        valid = valid & is_point_on_segment(points, s1, tol) & is_point_on_segment(points, s2, tol)
+    ax, ay, bx, by = _split(s1)
+    cx, cy, dx, dy = _split(s2)
+    rx, ry = bx - ax, by - ay
+    sx, sy = dx - cx, dy - cy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = ((cx - ax) * ry - (cy - ay) * rx) / (rx * sy - ry * sx)
+    points[~valid] = np.nan
+    return points, np.where(valid, t, np.nan), np.where(valid, u, np.nan), valid
+
+
+def segment_intersection_params(
+    s1, s2, tol: float = 1e-9
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Batch `intersect.segment_intersection_xy`: bounds checked on the parameters.
+
+    Returns ``(points, t, u, valid)`` like `intersection_segment_segment`, but a
+    pair is accepted when both parameters lie within [-tol, 1 + tol]. Unlike the
+    point-on-segment test this does not depend on the coordinates' magnitude,
+    so it suits large drawings in scene units.
+    """
+    ax, ay, bx, by = _split(as_segments(s1))
+    cx, cy, dx, dy = _split(as_segments(s2))
+    rx, ry = bx - ax, by - ay
+    sx, sy = dx - cx, dy - cy
+    den = rx * sy - ry * sx
+    qx, qy = cx - ax, cy - ay
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (qx * sy - qy * sx) / den
+        u = (qx * ry - qy * rx) / den
+        valid = (
+            ~(np.abs(den) < tol) & (-tol <= t) & (t <= 1.0 + tol) & (-tol <= u) & (u <= 1.0 + tol)
+        )
+    t, u = np.where(valid, t, np.nan), np.where(valid, u, np.nan)
+    return _points(ax + t * rx, ay + t * ry, valid), t, u, valid
+
+
+def nearest_point_on_line(segments, points) -> tuple[np.ndarray, np.ndarray]:
+    """Closest points on the infinite lines through segments (see `lines.nearest_point_on_line`).
+
+    Returns ``(points, t)``; degenerate (zero-length) segments give their first
+    end and t = 0.
+    """
+    pts = as_points(points)
+    px, py = pts[..., 0], pts[..., 1]
+    ax, ay, bx, by = _split(as_segments(segments))
+    abx, aby = bx - ax, by - ay
+    denom = abx * abx + aby * aby
+    degenerate = denom <= 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = ((px - ax) * abx + (py - ay) * aby) / denom
+    t = np.where(degenerate, 0.0, t)
+    x = np.where(degenerate, ax, ax + abx * t)
+    y = np.where(degenerate, ay, ay + aby * t)
+    return np.stack(np.broadcast_arrays(x, y), axis=-1), t
+
+
+__all__ = [
+    "as_segments",
+    "as_points",
+    "is_parallel",
+    "intersection_line_line",
+    "is_point_on_segment",
+    "intersection_segment_segment",
+    "segment_intersection_params",
+    "nearest_point_on_line",
+]
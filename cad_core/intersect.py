@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import heapq
+from collections.abc import Sequence
+
+import numpy as np
+
+from .batch import as_segments, segment_intersection_params
+from .spatial import grid_cell_size
+
+Seg = tuple[float, float, float, float]
+
+
+def segment_intersection_xy(s1: Seg, s2: Seg, tol: float = 1e-9) -> tuple[float, float] | None:
+    """Bounded intersection of two (x1, y1, x2, y2) segments, or None.
+
+    Float-tuple counterpart of `lines.intersection_segment_segment` for hot loops:
+    parallel/collinear pairs return None, parameters are accepted within tol.
+    """
+    ax, ay, bx, by = s1
+    cx, cy, dx, dy = s2
+    rx, ry = bx - ax, by - ay
+    sx, sy = dx - cx, dy - cy
+    den = rx * sy - ry * sx
+    if abs(den) < tol:
+        return None
+    qx, qy = cx - ax, cy - ay
+    t = (qx * sy - qy * sx) / den
+    u = (qx * ry - qy * rx) / den
+    if -tol <= t <= 1.0 + tol and -tol <= u <= 1.0 + tol:
+        return (ax + t * rx, ay + t * ry)
+    return None
+
+
+def sweep_intersections(
+    segments: Sequence[Seg], tol: float = 1e-9
+) -> list[tuple[int, int, float, float]]:
+    """All crossing pairs among segments, as (i, j, x, y) with i < j.
+
+    Sort-and-sweep along x: segments enter the active set in order of their left
+    end and leave once the sweep passes their right end, so only pairs whose x
+    extents overlap (and whose y extents overlap) reach the exact test.
+    """
+    n = len(segments)
+    lo_x = [0.0] * n
+    boxes = []
+    for k, (x1, y1, x2, y2) in enumerate(segments):
+        lo_x[k] = min(x1, x2)
+        boxes.append((max(x1, x2), min(y1, y2), max(y1, y2)))
+    out: list[tuple[int, int, float, float]] = []
+    active: set[int] = set()
+    leaving: list[tuple[float, int]] = []
+    for k in sorted(range(n), key=lo_x.__getitem__):
+        x0 = lo_x[k] - tol
+        while leaving and leaving[0][0] < x0:
+            active.discard(heapq.heappop(leaving)[1])
+        hi_x, lo_y, hi_y = boxes[k]
+        sk = segments[k]
+        for a in active:
+            _, a_lo_y, a_hi_y = boxes[a]
+            if a_lo_y > hi_y + tol or a_hi_y < lo_y - tol:
+                continue
+            ip = segment_intersection_xy(segments[a], sk, tol)
+            if ip is not None:
+                i, j = (a, k) if a < k else (k, a)
+                out.append((i, j, ip[0], ip[1]))
+        active.add(k)
+        heapq.heappush(leaving, (hi_x, k))
+    return out
+
+
+# Candidate pairs tested per batch; bounds memory on dense cells
+_PAIR_CHUNK = 1 << 21
+
+
+def intersect_all(
+    segments, tol: float = 1e-9, cell: float | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Every crossing pair among (N, 4) segments, by uniform-grid bucketing.
+
+    Each segment is bucketed into the grid cells its bounding box (grown by
+    tol) overlaps; only segments sharing a cell become candidate pairs, and a
+    pair is kept in just one of its shared cells (the one holding the lower
+    left corner of the two boxes' overlap), so no deduplication pass is needed.
+    Candidates then go through `batch.segment_intersection_params` in chunks,
+    with the same parallel/parameter ``tol`` rules as `segment_intersection_xy`
+    and `sweep_intersections`. Work is O((n + k) log n) for k candidates.
+
+    Args:
+        segments: (N, 4) array-like of (x1, y1, x2, y2).
+        tol: Tolerance, as for `segment_intersection_xy`.
+        cell: Grid cell size; by default chosen from the segment extents.
+
+    Returns:
+        ``(i, j, points)``: index arrays with i < j, sorted by (i, j), and the
+        (K, 2) intersection points.
+    """
+    segs = as_segments(segments).reshape(-1, 4)
+    n = len(segs)
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty((0, 2)))
+    if n < 2:
+        return empty
+    lo = np.minimum(segs[:, 0:2], segs[:, 2:4]) - tol
+    hi = np.maximum(segs[:, 0:2], segs[:, 2:4]) + tol
+    finite = np.isfinite(lo).all(axis=1) & np.isfinite(hi).all(axis=1)
+    if not finite.all():
+        ids = np.flatnonzero(finite)
+        i, j, pts = intersect_all(segs[ids], tol, cell)
+        return ids[i], ids[j], pts
+    origin = lo.min(axis=0)
+    lo, hi = lo - origin, hi - origin
+    cell = float(cell) if cell else grid_cell_size(lo, hi, n)
+
+    c_lo = np.floor(lo / cell).astype(np.int64)
+    c_hi = np.floor(hi / cell).astype(np.int64)
+    span = c_hi - c_lo + 1
+    per_seg = span[:, 0] * span[:, 1]
+    seg = np.repeat(np.arange(n), per_seg)
+    k = np.arange(len(seg)) - np.repeat(np.cumsum(per_seg) - per_seg, per_seg)
+    cx = c_lo[seg, 0] + k % span[seg, 0]
+    cy = c_lo[seg, 1] + k // span[seg, 0]
+    rows = int(c_hi[:, 1].max()) + 1
+    key = cx * rows + cy
+    order = np.argsort(key, kind="stable")
+    key, seg = key[order], seg[order]
+
+    # Within each cell, entry p pairs with entries p+1 .. end of the cell
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    sizes = np.diff(np.r_[starts, len(key)])
+    ends = np.repeat(starts + sizes, sizes)
+    n_pairs = ends - np.arange(len(key)) - 1
+    bounds = np.searchsorted(np.cumsum(n_pairs), np.arange(0, n_pairs.sum(), _PAIR_CHUNK), "right")
+    bounds = np.r_[bounds, len(key)]
+
+    out_i, out_j, out_p = [], [], []
+    for e0, e1 in zip(bounds[:-1], bounds[1:]):
+        counts = n_pairs[e0:e1]
+        a = np.repeat(np.arange(e0, e1), counts)
+        if not len(a):
+            continue
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        b = a + 1 + (np.arange(len(a)) - first)
+        sa, sb = seg[a], seg[b]
+        # overlapping boxes, reported only from the cell owning the overlap's corner
+        corner = np.maximum(lo[sa], lo[sb])
+        keep = (corner <= np.minimum(hi[sa], hi[sb])).all(axis=1)
+        owner = np.floor(corner / cell).astype(np.int64)
+        keep &= owner[:, 0] * rows + owner[:, 1] == key[a]
+        sa, sb = sa[keep], sb[keep]
+        pts, _, _, ok = segment_intersection_params(segs[sa], segs[sb], tol)
+        sa, sb = sa[ok], sb[ok]
+        out_i.append(np.minimum(sa, sb))
+        out_j.append(np.maximum(sa, sb))
+        out_p.append(pts[ok])
+    if not out_i:
+        return empty
+    i, j, pts = np.concatenate(out_i), np.concatenate(out_j), np.concatenate(out_p)
+    order = np.lexsort((j, i))
+    return i[order], j[order], pts[order]
+
+
+__all__ = ["segment_intersection_xy", "sweep_intersections", "intersect_all"]
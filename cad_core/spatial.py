@@ -0,0 +1,456 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Hashable, Iterable, Iterator
+
+import numpy as np
+
+Cell = tuple[int, int]
+BBox = tuple[float, float, float, float]
+
+
+class GridIndex:
+    """Uniform grid hash mapping keys to the cells their geometry touches.
+
+    Points occupy one cell, boxes every cell they overlap and segments only the
+    cells they actually traverse (so long diagonals do not flood their bbox).
+    Queries return candidate keys from the cells under the query region; callers
+    do the exact distance/overlap test on the handful that come back.
+    """
+
+    def __init__(self, cell: float = 64.0) -> None:
+        if cell <= 0:
+            raise ValueError("cell size must be positive")
+        self.cell = float(cell)
+        self._cells: dict[Cell, set[Hashable]] = {}
+        self._key_cells: dict[Hashable, tuple[Cell, ...]] = {}
+        self._boxes: dict[Hashable, BBox] = {}
+
+    def __len__(self) -> int:
+        return len(self._key_cells)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._key_cells
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._key_cells)
+
+    def cell_of(self, x: float, y: float) -> Cell:
+        c = self.cell
+        return (math.floor(x / c), math.floor(y / c))
+
+    def box_cells(self, minx: float, miny: float, maxx: float, maxy: float) -> list[Cell]:
+        i0, j0 = self.cell_of(minx, miny)
+        i1, j1 = self.cell_of(maxx, maxy)
+        return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+    def segment_cells(self, x1: float, y1: float, x2: float, y2: float) -> list[Cell]:
+        """Cells crossed by the segment (Amanatides-Woo grid traversal)."""
+        c = self.cell
+        i, j = self.cell_of(x1, y1)
+        i_end, j_end = self.cell_of(x2, y2)
+        dx, dy = x2 - x1, y2 - y1
+        step_i = 1 if dx > 0 else -1
+        step_j = 1 if dy > 0 else -1
+        if dx != 0:
+            t_max_x = ((i + (step_i > 0)) * c - x1) / dx
+            t_delta_x = c / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy != 0:
+            t_max_y = ((j + (step_j > 0)) * c - y1) / dy
+            t_delta_y = c / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+        cells = [(i, j)]
+        for _ in range(abs(i_end - i) + abs(j_end - j)):
+            if t_max_x < t_max_y:
+                i += step_i
+                t_max_x += t_delta_x
+            else:
+                j += step_j
+                t_max_y += t_delta_y
+            cells.append((i, j))
+        return cells
+
+    def _store(self, key: Hashable, cells: Iterable[Cell], bbox: BBox) -> None:
+        if key in self._key_cells:
+            self.remove(key)
+        cells = tuple(dict.fromkeys(cells))
+        for cell in cells:
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                bucket = self._cells[cell] = set()
+            bucket.add(key)
+        self._key_cells[key] = cells
+        self._boxes[key] = bbox
+
+    # ---- mutation
+    def insert_point(self, key: Hashable, x: float, y: float) -> None:
+        self._store(key, (self.cell_of(x, y),), (x, y, x, y))
+
+    def insert_bbox(
+        self, key: Hashable, minx: float, miny: float, maxx: float, maxy: float
+    ) -> None:
+        self._store(key, self.box_cells(minx, miny, maxx, maxy), (minx, miny, maxx, maxy))
+
+    def insert_segment(self, key: Hashable, x1: float, y1: float, x2: float, y2: float) -> None:
+        bbox = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        self._store(key, self.segment_cells(x1, y1, x2, y2), bbox)
+
+    def remove(self, key: Hashable) -> bool:
+        cells = self._key_cells.pop(key, None)
+        if cells is None:
+            return False
+        for cell in cells:
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                continue
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+        del self._boxes[key]
+        return True
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._key_cells.clear()
+        self._boxes.clear()
+
+    # ---- queries
+    def bbox(self, key: Hashable) -> BBox | None:
+        return self._boxes.get(key)
+
+    def cells_of(self, key: Hashable) -> tuple[Cell, ...]:
+        return self._key_cells.get(key, ())
+
+    def keys_in_cells(self, cells: Iterable[Cell]) -> set[Hashable]:
+        out: set[Hashable] = set()
+        for cell in cells:
+            bucket = self._cells.get(cell)
+            if bucket:
+                out.update(bucket)
+        return out
+
+    def query_bbox(self, minx: float, miny: float, maxx: float, maxy: float) -> set[Hashable]:
+        """Keys whose bounding box overlaps the query box."""
+        boxes = self._boxes
+        out = set()
+        for key in self.keys_in_cells(self.box_cells(minx, miny, maxx, maxy)):
+            bx0, by0, bx1, by1 = boxes[key]
+            if bx0 <= maxx and bx1 >= minx and by0 <= maxy and by1 >= miny:
+                out.add(key)
+        return out
+
+    def query_radius(self, x: float, y: float, r: float) -> set[Hashable]:
+        """Keys whose bounding box lies within distance r of (x, y)."""
+        boxes = self._boxes
+        r2 = r * r
+        out = set()
+        for key in self.keys_in_cells(self.box_cells(x - r, y - r, x + r, y + r)):
+            bx0, by0, bx1, by1 = boxes[key]
+            dx = bx0 - x if x < bx0 else (x - bx1 if x > bx1 else 0.0)
+            dy = by0 - y if y < by0 else (y - by1 if y > by1 else 0.0)
+            if dx * dx + dy * dy <= r2:
+                out.add(key)
+        return out
+
+
+def grid_cell_size(lo: np.ndarray, hi: np.ndarray, n: int) -> float:
+    """Cell size with about one (N, 2) ``lo``/``hi`` bbox per cell and few cells per bbox."""
+    ext = np.maximum(hi[:, 0] - lo[:, 0], hi[:, 1] - lo[:, 1])
+    span = np.max(hi - lo.min(axis=0), axis=0)
+    cell = max(float(np.median(ext)), float(np.sqrt(span[0] * span[1] / n)), 1e-12)
+    while True:
+        counts = (np.floor(hi / cell) - np.floor(lo / cell) + 1).prod(axis=1)
+        if counts.sum() <= 8 * n:
+            return cell
+        cell *= 2.0
+
+
+def _empty() -> np.ndarray:
+    return np.empty(0, dtype=np.int64)
+
+
+def _expand_cells(c_lo: np.ndarray, span: np.ndarray):
+    """(row, cx, cy) for every cell of each row's span[row] block starting at c_lo[row]."""
+    per_row = span[:, 0] * span[:, 1]
+    row = np.repeat(np.arange(len(span)), per_row)
+    k = np.arange(len(row)) - np.repeat(np.cumsum(per_row) - per_row, per_row)
+    return row, c_lo[row, 0] + k % span[row, 0], c_lo[row, 1] + k // span[row, 0]
+
+
+def _gather(starts: np.ndarray, pos: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Indices of the CSR runs ``starts[pos]:starts[pos + 1]``, and each run's length."""
+    first = starts[pos]
+    sizes = starts[pos + 1] - first
+    offset = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return np.repeat(first, sizes) + offset, sizes
+
+
+class BoxIndex:
+    """Bounding boxes of integer keys in a uniform grid, maintained with NumPy.
+
+    The array counterpart of `GridIndex` for large, bulk-loaded sets: keys are
+    non-negative integers (array handles) and `set`/`remove` take arrays.
+    Boxes live in a sorted cell table built in one vectorized pass. Boxes set
+    since the last build, and boxes spanning more than `MAX_CELLS` cells, sit
+    on a "loose" list that queries check directly; the table is rebuilt by
+    the first query after that list outgrows an eighth of the index. Updates
+    are O(1) per key, and queries touch the cells under the query box plus
+    the loose keys.
+    """
+
+    MAX_CELLS = 64
+
+    def __init__(self, cell: float | None = None) -> None:
+        if cell is not None and cell <= 0:
+            raise ValueError("cell size must be positive")
+        self._fixed_cell = cell
+        self.cell = float(cell or 1.0)
+        self._boxes = np.full((0, 4), np.nan)  # (minx, miny, maxx, maxy) by key
+        self._live = np.zeros(0, dtype=bool)
+        self._bucketed = np.zeros(0, dtype=bool)  # key's current box is in the table
+        self._loose: list[np.ndarray] = []
+        self._n_loose = 0
+        self._n_big = 0  # loose because they span too many cells, as of the last build
+        self._origin = np.zeros(2, dtype=np.int64)
+        self._shape = (0, 0)
+        self._cells = _empty()  # sorted distinct cell keys
+        self._starts = _empty()  # members of _cells[i]: _members[_starts[i]:_starts[i + 1]]
+        self._members = _empty()
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._live))
+
+    def __contains__(self, key: int) -> bool:
+        return 0 <= key < len(self._live) and bool(self._live[key])
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._live):
+            return
+        size = max(size, 2 * len(self._live), 64)
+        boxes = np.full((size, 4), np.nan)
+        boxes[: len(self._boxes)] = self._boxes
+        self._boxes = boxes
+        for name in ("_live", "_bucketed"):
+            flags = np.zeros(size, dtype=bool)
+            old = getattr(self, name)
+            flags[: len(old)] = old
+            setattr(self, name, flags)
+
+    def _add_loose(self, keys: np.ndarray) -> None:
+        if len(keys):
+            self._loose.append(keys)
+            self._n_loose += len(keys)
+
+    # ---- mutation
+    def set(self, keys, boxes) -> None:
+        """Insert or move ``keys`` to (N, 4) ``boxes``; non-finite boxes are removed."""
+        keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        if not len(keys):
+            return
+        if keys.min() < 0:
+            raise ValueError("keys must be non-negative")
+        self._reserve(int(keys.max()) + 1)
+        live = np.isfinite(boxes).all(axis=1)
+        self._boxes[keys] = np.where(live[:, None], boxes, np.nan)
+        self._live[keys] = live
+        self._bucketed[keys] = False
+        self._add_loose(keys[live])
+
+    def remove(self, keys) -> None:
+        keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+        keys = keys[(keys >= 0) & (keys < len(self._live))]
+        self._boxes[keys] = np.nan
+        self._live[keys] = False
+        self._bucketed[keys] = False
+
+    def clear(self) -> None:
+        self.__init__(self._fixed_cell)
+
+    def rebuild(self) -> None:
+        """Bucket every live box into a fresh cell table."""
+        keys = np.flatnonzero(self._live)
+        self._bucketed[:] = False
+        self._loose, self._n_loose, self._n_big = [], 0, 0
+        self._cells = self._starts = self._members = _empty()
+        self._shape = (0, 0)
+        if not len(keys):
+            return
+        lo, hi = self._boxes[keys, :2], self._boxes[keys, 2:]
+        if self._fixed_cell is None:
+            # Size cells for the bulk of the boxes; a few huge ones stay loose instead
+            ext = (hi - lo).max(axis=1)
+            typical = ext <= np.quantile(ext, 0.99)
+            origin = lo[typical].min(axis=0)
+            self.cell = grid_cell_size(lo[typical] - origin, hi[typical] - origin, len(keys))
+        c_lo = np.floor(lo / self.cell).astype(np.int64)
+        c_hi = np.floor(hi / self.cell).astype(np.int64)
+        span = c_hi - c_lo + 1
+        per_key = span[:, 0] * span[:, 1]
+        small = per_key <= self.MAX_CELLS
+        self._add_loose(keys[~small])
+        self._n_big = self._n_loose
+        keys, c_lo, c_hi, span = keys[small], c_lo[small], c_hi[small], span[small]
+        if not len(keys):
+            return
+        self._origin = c_lo.min(axis=0)
+        self._shape = tuple((c_hi.max(axis=0) - self._origin + 1).tolist())
+        row, cx, cy = _expand_cells(c_lo - self._origin, span)
+        cell_key = cx * self._shape[1] + cy
+        order = np.argsort(cell_key, kind="stable")
+        cell_key, members = cell_key[order], keys[row[order]]
+        first = np.flatnonzero(np.r_[True, cell_key[1:] != cell_key[:-1]])
+        self._cells = cell_key[first]
+        self._starts = np.r_[first, len(cell_key)]
+        self._members = members
+        self._bucketed[keys] = True
+
+    # ---- queries
+    def bbox(self, key: int) -> BBox | None:
+        if key not in self:
+            return None
+        return tuple(self._boxes[key].tolist())
+
+    def _candidates(self, minx: float, miny: float, maxx: float, maxy: float) -> np.ndarray:
+        if self._n_loose - self._n_big > max(256, len(self) // 8):
+            self.rebuild()
+        i0, j0 = np.floor(np.array([minx, miny]) / self.cell).astype(np.int64) - self._origin
+        i1, j1 = np.floor(np.array([maxx, maxy]) / self.cell).astype(np.int64) - self._origin
+        i0, j0 = max(i0, 0), max(j0, 0)
+        i1, j1 = min(i1, self._shape[0] - 1), min(j1, self._shape[1] - 1)
+        parts = []
+        if i1 >= i0 and j1 >= j0:
+            n_cells = (i1 - i0 + 1) * (j1 - j0 + 1)
+            if n_cells > len(self._cells):
+                # The query covers most of the grid: test every bucketed box
+                parts.append(np.flatnonzero(self._bucketed))
+            else:
+                rows = np.arange(i0, i1 + 1)[:, None] * self._shape[1]
+                wanted = (rows + np.arange(j0, j1 + 1)).ravel()
+                pos = np.minimum(np.searchsorted(self._cells, wanted), len(self._cells) - 1)
+                pos = pos[self._cells[pos] == wanted]
+                members = self._members[_gather(self._starts, pos)[0]]
+                parts.append(members[self._bucketed[members]])
+        loose = self._loose_keys()
+        if len(loose):
+            parts.append(loose)
+        return np.unique(np.concatenate(parts)) if parts else _empty()
+
+    def _loose_keys(self) -> np.ndarray:
+        """Live keys off the cell table, compacting the loose list on the way."""
+        if not self._loose:
+            return _empty()
+        loose = np.unique(np.concatenate(self._loose))
+        loose = loose[self._live[loose] & ~self._bucketed[loose]]
+        self._loose, self._n_loose = [loose], len(loose)
+        return loose
+
+    def query_bbox(self, minx: float, miny: float, maxx: float, maxy: float) -> np.ndarray:
+        """Sorted keys whose box overlaps the query box."""
+        keys = self._candidates(minx, miny, maxx, maxy)
+        return keys[self._overlap(np.array([[minx, miny, maxx, maxy]]), keys)]
+
+    def query_bboxes(self, boxes) -> tuple[np.ndarray, np.ndarray]:
+        """Bulk `query_bbox`: ``(rows, keys)`` of every key overlapping ``boxes[row]``.
+
+        All (N, 4) query boxes are matched against the cell table in one
+        vectorized pass, after bucketing any pending changes. Pairs are sorted
+        by row, then key; non-finite query boxes match nothing.
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        if self._n_loose > self._n_big:
+            self.rebuild()
+        pairs = []
+        if len(self._cells):
+            shape = np.array(self._shape)
+            finite = np.isfinite(boxes).all(axis=1)
+            safe = np.where(finite[:, None], boxes, 0.0)
+            c_lo = np.floor(safe[:, :2] / self.cell).astype(np.int64) - self._origin
+            c_hi = np.floor(safe[:, 2:] / self.cell).astype(np.int64) - self._origin
+            outside = ~finite | (c_hi < 0).any(axis=1) | (c_lo >= shape).any(axis=1)
+            c_lo, c_hi = np.clip(c_lo, 0, shape - 1), np.clip(c_hi, 0, shape - 1)
+            span = np.where(outside[:, None], 0, np.maximum(c_hi - c_lo + 1, 0))
+            row, cx, cy = _expand_cells(c_lo, span)
+            wanted = cx * shape[1] + cy
+            pos = np.minimum(np.searchsorted(self._cells, wanted), len(self._cells) - 1)
+            hit = self._cells[pos] == wanted
+            idx, sizes = _gather(self._starts, pos[hit])
+            rows, keys = np.repeat(row[hit], sizes), self._members[idx]
+            keep = self._overlap(boxes[rows], keys)
+            # A pair meets in several shared cells; keep it only in the one
+            # holding the lower left corner of the two boxes' overlap
+            rows, keys, found = rows[keep], keys[keep], np.repeat(wanted[hit], sizes)[keep]
+            corner = np.maximum(boxes[rows, :2], self._boxes[keys, :2])
+            owner = np.floor(corner / self.cell).astype(np.int64) - self._origin
+            keep = owner[:, 0] * shape[1] + owner[:, 1] == found
+            pairs.append(rows[keep] * len(self._live) + keys[keep])
+        loose = self._loose_keys()
+        if len(loose):
+            rows, keys = np.repeat(np.arange(len(boxes)), len(loose)), np.tile(loose, len(boxes))
+            keep = self._overlap(boxes[rows], keys)
+            pairs.append(rows[keep] * len(self._live) + keys[keep])
+        if not pairs:
+            return _empty(), _empty()
+        pair = np.sort(np.concatenate(pairs))
+        return pair // len(self._live), pair % len(self._live)
+
+    def _overlap(self, query: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        b = self._boxes[keys]
+        return (
+            (b[:, 0] <= query[:, 2])
+            & (b[:, 2] >= query[:, 0])
+            & (b[:, 1] <= query[:, 3])
+            & (b[:, 3] >= query[:, 1])
+        )
+
+    def box_distance(self, keys, x: float, y: float) -> np.ndarray:
+        """Distance from (x, y) to each key's box (0 inside it)."""
+        b = self._boxes[np.asarray(keys, dtype=np.int64)]
+        dx = np.maximum(np.maximum(b[:, 0] - x, x - b[:, 2]), 0.0)
+        dy = np.maximum(np.maximum(b[:, 1] - y, y - b[:, 3]), 0.0)
+        return np.hypot(dx, dy)
+
+    def query_radius(self, x: float, y: float, r: float) -> np.ndarray:
+        """Sorted keys whose box lies within distance r of (x, y)."""
+        keys = self._candidates(x - r, y - r, x + r, y + r)
+        return keys[self.box_distance(keys, x, y) <= r]
+
+    def nearest(
+        self,
+        x: float,
+        y: float,
+        k: int = 1,
+        distance: Callable[[np.ndarray], np.ndarray] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """The k keys nearest (x, y), closest first (ties by key).
+
+        ``distance(keys)`` gives the exact distance to each key's geometry and
+        must be at least its box distance (the default). The search radius
+        doubles from one cell until k keys are known to be within it.
+
+        Returns:
+            ``(keys, distances)``.
+        """
+        total = len(self)
+        if k <= 0 or not total:
+            return _empty(), np.empty(0)
+        distance = distance or (lambda keys: self.box_distance(keys, x, y))
+        r = self.cell
+        while True:
+            keys = self.query_radius(x, y, r)
+            d = np.asarray(distance(keys), dtype=float)
+            # Keys outside the radius may still be beaten by ones not yet found
+            done = len(keys) == total
+            inside = d <= r
+            if done or np.count_nonzero(inside) >= k:
+                if not done:
+                    keys, d = keys[inside], d[inside]
+                order = np.lexsort((keys, d))[:k]
+                return keys[order], d[order]
+            r *= 2.0
+
+
+__all__ = ["GridIndex", "BoxIndex", "grid_cell_size"]
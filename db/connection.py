@@ -1,7 +1,7 @@
 # db/connection.py
 import sqlite3
 
-from . import coverage_tables, loader, schema
+from . import coverage_tables, loader
 
 _connection: sqlite3.Connection | None = None
 
@@ -25,15 +25,10 @@ def initialize_database(in_memory: bool = True):
     # Set row factory for dict-like access
     _connection.row_factory = sqlite3.Row
 
-    # Create schema
-    schema.create_schema_tables(_connection)
-    coverage_tables.create_tables(_connection)
-
-    # Populate with data
-    loader.seed_demo(_connection)
-    coverage_tables.populate_tables(_connection)
-
-    _connection.commit()
+    # Create or upgrade the schema and seed a new catalog; a current
+    # database skips all DDL and seeding.
+    if loader.ensure_schema(_connection):
+        loader.seed_demo(_connection)
 
 
 def get_connection() -> sqlite3.Connection:
@@ -47,5 +42,6 @@ def close_connection():
     """Closes the shared database connection."""
     global _connection
     if _connection:
+        coverage_tables.invalidate_lookup(_connection)
         _connection.close()
         _connection = None
@@ -1,42 +1,47 @@
 # db/coverage_tables.py
+from bisect import bisect_left
+from functools import cached_property
+
+import numpy as np
 
 WALL_STROBE_TABLE_NAME = "wall_strobe_coverage"
 CEILING_STROBE_TABLE_NAME = "ceiling_strobe_coverage"
 
 
-def create_tables(con):
-    cur = con.cursor()
-    cur.execute(
-        f"""
+TABLES = (
+    f"""
         CREATE TABLE IF NOT EXISTS {WALL_STROBE_TABLE_NAME} (
             room_size INTEGER PRIMARY KEY,
             candela INTEGER NOT NULL
         )
-    """
-    )
-    cur.execute(
-        f"""
+    """,
+    f"""
         CREATE TABLE IF NOT EXISTS {CEILING_STROBE_TABLE_NAME} (
             ceiling_height INTEGER,
             room_size INTEGER,
             candela INTEGER NOT NULL,
             PRIMARY KEY (ceiling_height, room_size)
         )
-    """
-    )
+    """,
     # Strobe radius table for coverage calculations
-    cur.execute(
-        """
+    """
         CREATE TABLE IF NOT EXISTS strobe_candela (
             candela INTEGER PRIMARY KEY,
             radius_ft REAL NOT NULL
         )
-    """
-    )
-    con.commit()
+    """,
+)
 
 
-def populate_tables(con):
+def create_tables(con, commit=True):
+    cur = con.cursor()
+    for sql in TABLES:
+        cur.execute(sql)
+    if commit:
+        con.commit()
+
+
+def populate_tables(con, commit=True):
     cur = con.cursor()
     # Wall-mounted data
     wall_data = [
@@ -84,4 +89,155 @@ def populate_tables(con):
         (185, 50.0),
     ]
     cur.executemany("INSERT OR REPLACE INTO strobe_candela VALUES (?, ?)", radius_data)
-    con.commit()
+    invalidate_lookup(con)
+    if commit:
+        con.commit()
+
+
+# Batch lookups return this candela where no table row fits.
+NO_RATING = 0
+
+
+class CoverageLookup:
+    """The coverage tables of one connection, held as sorted arrays.
+
+    Each table is read once, on first use; lookups are then a bisect (or a
+    NumPy ``searchsorted`` for the batch variants) with the same results as
+    the "smallest row that fits" SQL queries. Call `invalidate_lookup` after
+    writing to the tables.
+    """
+
+    def __init__(self, con):
+        self.con = con
+
+    @cached_property
+    def wall(self) -> tuple[np.ndarray, np.ndarray]:
+        rows = self.con.execute(
+            f"SELECT room_size, candela FROM {WALL_STROBE_TABLE_NAME} ORDER BY room_size"
+        ).fetchall()
+        return _columns(rows, 2)
+
+    @cached_property
+    def ceiling(self) -> list[tuple[float, np.ndarray, np.ndarray]]:
+        """``(ceiling height, room sizes, candela)`` per height, ascending."""
+        rows = self.con.execute(
+            f"SELECT ceiling_height, room_size, candela FROM {CEILING_STROBE_TABLE_NAME}"
+            " ORDER BY ceiling_height, room_size"
+        ).fetchall()
+        heights, rooms, candela = _columns(rows, 3)
+        starts = np.flatnonzero(np.r_[True, heights[1:] != heights[:-1]])
+        ends = np.r_[starts[1:], len(heights)]
+        return [(heights[a], rooms[a:b], candela[a:b]) for a, b in zip(starts, ends)]
+
+    @cached_property
+    def radius(self) -> tuple[np.ndarray, np.ndarray]:
+        rows = self.con.execute(
+            "SELECT candela, radius_ft FROM strobe_candela ORDER BY candela"
+        ).fetchall()
+        return _columns(rows, 2)
+
+    # Plain-list copies for the scalar lookups: bisect over a list is several
+    # times faster than indexing NumPy arrays element by element.
+    @cached_property
+    def _wall_lists(self):
+        return tuple(col.tolist() for col in self.wall)
+
+    @cached_property
+    def _ceiling_lists(self):
+        return [(h, rooms.tolist(), cd.tolist()) for h, rooms, cd in self.ceiling]
+
+    @cached_property
+    def _radius_map(self) -> dict[int, float]:
+        ratings, radius = self.radius
+        return dict(zip(map(int, ratings.tolist()), radius.tolist()))
+
+    def wall_candela(self, room_size) -> int | None:
+        sizes, candela = self._wall_lists
+        i = bisect_left(sizes, room_size)
+        return int(candela[i]) if i < len(sizes) else None
+
+    def ceiling_candela(self, ceiling_height, room_size) -> int | None:
+        # Lowest height >= ceiling_height with a room size that fits, then the
+        # smallest such room size: ORDER BY ceiling_height, room_size LIMIT 1.
+        for height, rooms, candela in self._ceiling_lists:
+            if height < ceiling_height:
+                continue
+            i = bisect_left(rooms, room_size)
+            if i < len(rooms):
+                return int(candela[i])
+        return None
+
+    def radius_ft(self, candela) -> float | None:
+        return self._radius_map.get(int(candela))
+
+    def wall_rating_batch(self, room_sizes) -> tuple[np.ndarray, np.ndarray]:
+        """``(candela, rated room size)`` per room size; `NO_RATING` / NaN where none fits."""
+        sizes, candela = self.wall
+        room_sizes = np.asarray(room_sizes, dtype=float)
+        i = np.searchsorted(sizes, room_sizes, side="left")
+        out = np.full(room_sizes.shape, NO_RATING, dtype=np.int64)
+        rated = np.full(room_sizes.shape, np.nan)
+        hit = i < len(sizes)
+        out[hit] = candela[i[hit]]
+        rated[hit] = sizes[i[hit]]
+        return out, rated
+
+    def ceiling_rating_batch(self, ceiling_heights, room_sizes) -> tuple[np.ndarray, np.ndarray]:
+        """``(candela, rated room size)`` per (height, room size) pair, as `wall_rating_batch`."""
+        heights, room_sizes = np.broadcast_arrays(
+            np.asarray(ceiling_heights, dtype=float), np.asarray(room_sizes, dtype=float)
+        )
+        out = np.full(heights.shape, NO_RATING, dtype=np.int64)
+        rated = np.full(heights.shape, np.nan)
+        pending = np.ones(heights.shape, dtype=bool)
+        for height, rooms, candela in self.ceiling:
+            i = np.searchsorted(rooms, room_sizes, side="left")
+            hit = pending & (heights <= height) & (i < len(rooms))
+            out[hit] = candela[i[hit]]
+            rated[hit] = rooms[i[hit]]
+            pending &= ~hit
+        return out, rated
+
+    def wall_candela_batch(self, room_sizes) -> np.ndarray:
+        """Candela per room size; `NO_RATING` where the room is too large."""
+        return self.wall_rating_batch(room_sizes)[0]
+
+    def ceiling_candela_batch(self, ceiling_heights, room_sizes) -> np.ndarray:
+        """Candela per (height, room size) pair; `NO_RATING` where none fits."""
+        return self.ceiling_rating_batch(ceiling_heights, room_sizes)[0]
+
+    def radius_ft_batch(self, candela) -> np.ndarray:
+        """Coverage radius per candela rating; NaN for ratings not in the table."""
+        ratings, radius = self.radius
+        candela = np.asarray(candela, dtype=np.int64)
+        i = np.minimum(np.searchsorted(ratings, candela, side="left"), max(len(ratings) - 1, 0))
+        out = np.full(candela.shape, np.nan)
+        if len(ratings):
+            hit = ratings[i] == candela
+            out[hit] = radius[i[hit]]
+        return out
+
+
+def _columns(rows, n: int) -> tuple[np.ndarray, ...]:
+    if not rows:
+        return tuple(np.empty(0) for _ in range(n))
+    return tuple(np.asarray(col, dtype=float) for col in zip(*rows))
+
+
+# Single-slot cache: the app shares one catalog connection.
+_lookup: CoverageLookup | None = None
+
+
+def lookup(con) -> CoverageLookup:
+    """The cached `CoverageLookup` for ``con``, built on first use."""
+    global _lookup
+    if _lookup is None or _lookup.con is not con:
+        _lookup = CoverageLookup(con)
+    return _lookup
+
+
+def invalidate_lookup(con=None):
+    """Drop cached tables (of ``con`` only, if given) so the next lookup reloads."""
+    global _lookup
+    if con is None or (_lookup is not None and _lookup.con is con):
+        _lookup = None
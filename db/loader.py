@@ -1,6 +1,7 @@
 import json
 import os
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
 
 from db import coverage_tables
@@ -20,44 +21,333 @@ def connect(db_path: str | None = None):
     return con
 
 
-def ensure_schema(con: sqlite3.Connection):
+def ensure_schema(con: sqlite3.Connection) -> bool:
+    """Create or upgrade the catalog schema to `SCHEMA_VERSION`.
+
+    A current database costs one PRAGMA read: no DDL runs and nothing is
+    committed. Returns True if migrations were applied.
+    """
+    if schema_version(con) >= SCHEMA_VERSION:
+        return False
+    migrate(con)
+    con.commit()
+    return True
+
+
+# Full-text index over the searchable device fields; rowid is devices.id.
+SEARCH_TABLE = "devices_fts"
+# bm25 column weights: name, symbol, part_number, manufacturer, notes
+SEARCH_WEIGHTS = (10.0, 8.0, 6.0, 3.0, 1.0)
+
+_DEVICE_COLUMNS = (
+    "d.id, d.name, d.symbol, dt.code AS type, m.name AS manufacturer, d.model AS part_number"
+)
+_SEARCH_ROW = """
+    SELECT d.id, d.name, d.symbol, d.model, m.name, s.notes
+    FROM devices d
+    LEFT JOIN manufacturers m ON m.id = d.manufacturer_id
+    LEFT JOIN device_specs s ON s.device_id = d.id
+"""
+
+
+def _reindex(device_id: str) -> str:
+    return f"""
+        DELETE FROM {SEARCH_TABLE} WHERE rowid = {device_id};
+        INSERT INTO {SEARCH_TABLE}(rowid, name, symbol, part_number, manufacturer, notes)
+        {_SEARCH_ROW} WHERE d.id = {device_id};
+    """
+
+
+_SEARCH_TRIGGERS = {
+    "devices_fts_ai": f"""
+        AFTER INSERT ON devices BEGIN
+            INSERT INTO {SEARCH_TABLE}(rowid, name, symbol, part_number, manufacturer, notes)
+            {_SEARCH_ROW} WHERE d.id = new.id;
+        END""",
+    "devices_fts_au": f"""
+        AFTER UPDATE ON devices BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+            {_reindex("new.id")}
+        END""",
+    "devices_fts_ad": f"""
+        AFTER DELETE ON devices BEGIN
+            DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+        END""",
+    "device_specs_fts_ai": f"""
+        AFTER INSERT ON device_specs BEGIN
+            {_reindex("new.device_id")}
+        END""",
+    "device_specs_fts_au": f"""
+        AFTER UPDATE ON device_specs BEGIN
+            {_reindex("old.device_id")}
+            {_reindex("new.device_id")}
+        END""",
+    "device_specs_fts_ad": f"""
+        AFTER DELETE ON device_specs BEGIN
+            {_reindex("old.device_id")}
+        END""",
+    "manufacturers_fts_au": f"""
+        AFTER UPDATE OF name ON manufacturers BEGIN
+            UPDATE {SEARCH_TABLE} SET manufacturer = new.name
+            WHERE rowid IN (SELECT id FROM devices WHERE manufacturer_id = new.id);
+        END""",
+}
+
+
+def _create_triggers(cur: sqlite3.Cursor, names) -> None:
+    for name in names:
+        cur.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {_SEARCH_TRIGGERS[name]}")
+
+
+def ensure_search_index(con: sqlite3.Connection) -> bool:
+    """Create the FTS5 device index and its sync triggers if missing.
+
+    Returns False when this SQLite build lacks FTS5; searches then fall back
+    to LIKE scans.
+    """
     cur = con.cursor()
-    cur.executescript(
-        """
-        CREATE TABLE IF NOT EXISTS manufacturers(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS device_types(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            code TEXT UNIQUE NOT NULL,
-            description TEXT
-        );
-        CREATE TABLE IF NOT EXISTS devices(
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            manufacturer_id INTEGER,
-            type_id INTEGER,
-            model TEXT,
-            name TEXT,
-            symbol TEXT,
-            properties_json TEXT,
-            FOREIGN KEY(manufacturer_id) REFERENCES manufacturers(id),
-            FOREIGN KEY(type_id) REFERENCES device_types(id)
-        );
-        CREATE TABLE IF NOT EXISTS device_specs(
-            device_id INTEGER PRIMARY KEY,
-            strobe_candela REAL,
-            speaker_db_at10ft REAL,
-            smoke_spacing_ft REAL,
-            current_a REAL,
-            voltage_v REAL,
-            notes TEXT,
-            FOREIGN KEY(device_id) REFERENCES devices(id)
-        );
-        """
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (SEARCH_TABLE,))
+    if cur.fetchone():
+        return True
+    try:
+        cur.execute(
+            f"""
+            CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+                name, symbol, part_number, manufacturer, notes,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            """
+        )
+    except sqlite3.OperationalError:
+        return False
+    cur.execute(
+        f"INSERT INTO {SEARCH_TABLE}(rowid, name, symbol, part_number, manufacturer, notes) {_SEARCH_ROW}"
     )
-    coverage_tables.create_tables(con)
-    con.commit()
+    _create_triggers(cur, _SEARCH_TRIGGERS)
+    return True
+
+
+def _seed_coverage_tables(con: sqlite3.Connection):
+    coverage_tables.populate_tables(con, commit=False)
+
+
+# Versioned schema, applied in order by `migrate`; PRAGMA user_version records
+# the last step a database has. Steps are SQL or callables taking the
+# connection. Never edit a released step in a way that changes its result;
+# append a new version instead.
+MIGRATIONS: tuple[tuple[int, tuple], ...] = (
+    (
+        1,
+        (
+            """
+            CREATE TABLE IF NOT EXISTS manufacturers(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS device_types(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                code TEXT UNIQUE NOT NULL,
+                description TEXT
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS devices(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                manufacturer_id INTEGER,
+                type_id INTEGER,
+                model TEXT,
+                name TEXT,
+                symbol TEXT,
+                properties_json TEXT,
+                FOREIGN KEY(manufacturer_id) REFERENCES manufacturers(id),
+                FOREIGN KEY(type_id) REFERENCES device_types(id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS device_specs(
+                device_id INTEGER PRIMARY KEY,
+                strobe_candela REAL,
+                speaker_db_at10ft REAL,
+                smoke_spacing_ft REAL,
+                current_a REAL,
+                voltage_v REAL,
+                notes TEXT,
+                FOREIGN KEY(device_id) REFERENCES devices(id)
+            )
+            """,
+            *coverage_tables.TABLES,
+            # Covering indexes for the device list, palette and search
+            # filters: type, manufacturer, name order and part number.
+            "CREATE INDEX IF NOT EXISTS idx_devices_type ON devices(type_id, name, symbol, model, manufacturer_id)",
+            "CREATE INDEX IF NOT EXISTS idx_devices_manufacturer ON devices(manufacturer_id, model, name, symbol, type_id)",
+            "CREATE INDEX IF NOT EXISTS idx_devices_name ON devices(name, symbol, model, manufacturer_id, type_id)",
+            "CREATE INDEX IF NOT EXISTS idx_devices_model ON devices(model)",
+        ),
+    ),
+    (
+        2,
+        (
+            # Full-text search index (skipped on SQLite builds without FTS5,
+            # which fall back to LIKE) and the coverage reference rows.
+            ensure_search_index,
+            _seed_coverage_tables,
+        ),
+    ),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(con: sqlite3.Connection) -> int:
+    return con.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(con: sqlite3.Connection) -> int:
+    """Apply pending `MIGRATIONS`, each atomically; returns the schema version."""
+    version = schema_version(con)
+    cur = con.cursor()
+    for target, steps in MIGRATIONS:
+        if target <= version:
+            continue
+        cur.execute(f"SAVEPOINT migrate_{target}")
+        try:
+            for step in steps:
+                if callable(step):
+                    step(con)
+                else:
+                    cur.execute(step)
+            cur.execute(f"PRAGMA user_version = {int(target)}")
+        except BaseException:
+            cur.execute(f"ROLLBACK TO migrate_{target}")
+            cur.execute(f"RELEASE migrate_{target}")
+            raise
+        cur.execute(f"RELEASE migrate_{target}")
+        version = target
+    return version
+
+
+@contextmanager
+def deferred_search_index(con: sqlite3.Connection, first_id: int):
+    """Index devices with ``id >= first_id`` in one statement on exit.
+
+    For bulk inserts inside a transaction: FTS5 is several times faster fed
+    by one INSERT ... SELECT than by a trigger per row, so the insert
+    triggers are suspended for the block.
+    """
+    cur = con.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (SEARCH_TABLE,))
+    if not cur.fetchone():
+        yield
+        return
+    names = ("devices_fts_ai", "device_specs_fts_ai")
+    for name in names:
+        cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+    try:
+        yield
+        cur.execute(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, name, symbol, part_number, manufacturer, notes)"
+            f" {_SEARCH_ROW} WHERE d.id >= ?",
+            (first_id,),
+        )
+    finally:
+        _create_triggers(cur, names)
+
+
+def _match_expression(query: str) -> str:
+    """User text -> FTS5 query: each word is a quoted prefix term.
+
+    Upper-case AND / OR / NOT pass through as operators; words are otherwise
+    AND-ed, so "smoke 2w" finds devices containing both prefixes.
+    """
+    parts = []
+    for word in query.split():
+        if word in ("AND", "OR", "NOT"):
+            if parts and parts[-1] not in ("AND", "OR", "NOT"):
+                parts.append(word)
+            continue
+        word = word.replace('"', '""')
+        parts.append(f'"{word}"*')
+    while parts and parts[-1] in ("AND", "OR", "NOT"):
+        parts.pop()
+    return " ".join(parts)
+
+
+def _search_query(con: sqlite3.Connection, query: str, filters: dict | None):
+    """FROM/WHERE clause, parameters and ranking ORDER BY for a device search."""
+    filters = filters or {}
+    where = []
+    params: list = []
+    if filters.get("manufacturer"):
+        where.append("m.name = ?")
+        params.append(filters["manufacturer"])
+    if "type" in filters and filters["type"] is None:
+        where.append("d.type_id IS NULL")
+    elif filters.get("type"):
+        where.append("dt.code = ?")
+        params.append(filters["type"])
+    joins = """
+        LEFT JOIN manufacturers m ON m.id=d.manufacturer_id
+        LEFT JOIN device_types dt ON dt.id=d.type_id
+    """
+    source = f"FROM devices d {joins}"
+    order = "ORDER BY d.name, d.id"
+    expr = _match_expression(query or "")
+    if expr:
+        cur = con.cursor()
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (SEARCH_TABLE,))
+        if cur.fetchone():
+            weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+            source = f"FROM {SEARCH_TABLE} JOIN devices d ON d.id = {SEARCH_TABLE}.rowid {joins}"
+            where.insert(0, f"{SEARCH_TABLE} MATCH ?")
+            params.insert(0, expr)
+            order = f"ORDER BY bm25({SEARCH_TABLE}, {weights}), d.name, d.id"
+        else:
+            for word in (w for w in query.split() if w not in ("AND", "OR", "NOT")):
+                where.append(
+                    "(d.name LIKE ? OR d.symbol LIKE ? OR d.model LIKE ? OR m.name LIKE ?)"
+                )
+                params.extend([f"%{word}%"] * 4)
+    if where:
+        source += " WHERE " + " AND ".join(where)
+    return source, params, order
+
+
+def search_devices(
+    con: sqlite3.Connection,
+    query: str,
+    filters: dict | None = None,
+    limit: int | None = 200,
+    offset: int = 0,
+) -> list[dict]:
+    """Devices matching ``query``, best match first.
+
+    ``filters`` may hold ``manufacturer`` and/or ``type`` (device type code;
+    None selects devices without a type) for exact matches. An empty query
+    lists matching devices by name. ``limit``/``offset`` page the results.
+    """
+    source, params, order = _search_query(con, query, filters)
+    sql = f"SELECT {_DEVICE_COLUMNS} {source} {order}"
+    if limit is not None or offset:
+        sql += " LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else int(limit), int(offset)]
+    cur = con.cursor()
+    cur.execute(sql, params)
+    return [dict(row) for row in cur.fetchall()]
+
+
+def device_type_counts(
+    con: sqlite3.Connection, query: str = "", filters: dict | None = None
+) -> list[tuple[str | None, int]]:
+    """``(type code, matching device count)`` per device type, by code."""
+    source, params, _ = _search_query(con, query, filters)
+    cur = con.cursor()
+    cur.execute(
+        f"SELECT dt.code, COUNT(*) {source} GROUP BY d.type_id ORDER BY dt.code IS NULL, dt.code",
+        params,
+    )
+    return [(row[0], row[1]) for row in cur.fetchall()]
 
 
 def _id_for(cur, table, key, value):
@@ -119,7 +409,6 @@ def seed_demo(con: sqlite3.Connection):
     ]
     for d in demo:
         add(d)
-    coverage_tables.populate_tables(con)
     con.commit()
 
 
@@ -127,7 +416,7 @@ def fetch_devices(con: sqlite3.Connection):
     cur = con.cursor()
     cur.execute(
         """
-        SELECT d.name, d.symbol, dt.code AS type, m.name AS manufacturer, d.model AS part_number
+        SELECT d.id, d.name, d.symbol, dt.code AS type, m.name AS manufacturer, d.model AS part_number
         FROM devices d
         LEFT JOIN manufacturers m ON m.id=d.manufacturer_id
         LEFT JOIN device_types dt ON dt.id=d.type_id
@@ -144,10 +433,7 @@ def fetch_layers(con: sqlite3.Connection):
 
 
 def strobe_radius_for_candela(con: sqlite3.Connection, cand: int) -> float | None:
-    cur = con.cursor()
-    cur.execute("SELECT radius_ft FROM strobe_candela WHERE candela=?", (int(cand),))
-    r = cur.fetchone()
-    return float(r["radius_ft"]) if r else None
+    return coverage_tables.lookup(con).radius_ft(cand)
 
 
 def list_manufacturers(con: sqlite3.Connection):
@@ -163,25 +449,10 @@ def list_types(con: sqlite3.Connection):
 
 
 def get_wall_strobe_candela(con: sqlite3.Connection, room_size: int) -> int | None:
-    cur = con.cursor()
-    cur.execute(
-        f"SELECT candela FROM {coverage_tables.WALL_STROBE_TABLE_NAME} WHERE room_size >= ? ORDER BY room_size ASC LIMIT 1",
-        (room_size,),
-    )
-    r = cur.fetchone()
-    return int(r["candela"]) if r else None
+    return coverage_tables.lookup(con).wall_candela(room_size)
 
 
 def get_ceiling_strobe_candela(
     con: sqlite3.Connection, ceiling_height: int, room_size: int
 ) -> int | None:
-    cur = con.cursor()
-    cur.execute(
-        f"SELECT candela FROM {coverage_tables.CEILING_STROBE_TABLE_NAME} WHERE ceiling_height >= ? AND room_size >= ? ORDER BY ceiling_height ASC, room_size ASC LIMIT 1",
-        (
-            ceiling_height,
-            room_size,
-        ),
-    )
-    r = cur.fetchone()
-    return int(r["candela"]) if r else None
+    return coverage_tables.lookup(con).ceiling_candela(ceiling_height, room_size)
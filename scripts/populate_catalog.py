@@ -5,9 +5,15 @@ Matches FireCAD/AlarmCAD competitive functionality with real manufacturers
 and device specifications for professional system design.
 """
 
-import sqlite3
 import os
 import json
+import sys
+from pathlib import Path
+
+# Ensure repo root is on sys.path when run as `python scripts/populate_catalog.py`
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend import catalog_store  # noqa: E402
 
 # Real fire alarm manufacturers
 MANUFACTURERS = [
@@ -275,88 +281,62 @@ def generate_devices():
     return devices
 
 
-def populate_database():
+def _type_code(category):
+    """Map a generator category onto the catalog's device type codes."""
+    if "Smoke" in category or "Heat" in category or "Duct" in category or "Beam" in category:
+        return "Detector"
+    if "Strobe" in category or "Horn" in category or "Speaker" in category:
+        return "Notification"
+    if "Pull" in category:
+        return "Initiating"
+    if "Module" in category:
+        return "Module"
+    return category
+
+
+def catalog_rows():
+    """Generated devices as `catalog_store.import_devices` rows."""
+    for dev in generate_devices():
+        yield {
+            "manufacturer": dev["manufacturer"],
+            "type": _type_code(dev["category"]),
+            "type_description": dev["category"],
+            "model": dev["model"],
+            "name": dev["name"],
+            "symbol": dev["symbol"],
+            "properties": dev["properties"],
+        }
+
+
+def populate_database(catalog_path=None):
     """Populate catalog.db with full device catalog."""
-    catalog_path = os.path.join(os.path.expanduser("~"), "LV_CAD", "catalog.db")
+    catalog_path = catalog_path or os.path.join(os.path.expanduser("~"), "LV_CAD", "catalog.db")
+    os.makedirs(os.path.dirname(catalog_path), exist_ok=True)
     print(f"Populating: {catalog_path}")
-    
-    con = sqlite3.connect(catalog_path)
-    cur = con.cursor()
-    
+
     # Clear existing devices (keep demo for testing)
     print("Clearing existing catalog devices...")
-    cur.execute("DELETE FROM devices WHERE id > 6")  # Keep demo devices 1-6
-    cur.execute("DELETE FROM manufacturers WHERE id > 1")  # Keep Generic
-    cur.execute("DELETE FROM device_types WHERE id > 3")  # Keep demo types
-    con.commit()
-    
-    print("Generating 16,000+ devices...")
-    devices = generate_devices()
-    print(f"Generated {len(devices)} devices")
-    
-    # Insert manufacturers
-    print("Inserting manufacturers...")
-    mfr_ids = {}
-    for mfr_name in MANUFACTURERS:
-        cur.execute("INSERT INTO manufacturers (name) VALUES (?)", (mfr_name,))
-        mfr_ids[mfr_name] = cur.lastrowid
-    
-    # Insert device types
-    print("Inserting device types...")
-    type_ids = {}
-    for category in DEVICE_CATEGORIES.keys():
-        # Map to existing types or create new
-        if "Smoke" in category or "Heat" in category or "Duct" in category or "Beam" in category:
-            type_code = "Detector"
-        elif "Strobe" in category or "Horn" in category or "Speaker" in category:
-            type_code = "Notification"
-        elif "Pull" in category:
-            type_code = "Initiating"
-        elif "Module" in category:
-            type_code = "Module"
-        else:
-            type_code = category
-        
-        cur.execute("SELECT id FROM device_types WHERE code = ?", (type_code,))
-        row = cur.fetchone()
-        if row:
-            type_ids[category] = row[0]
-        else:
-            cur.execute("INSERT INTO device_types (code, description) VALUES (?, ?)", 
-                       (type_code, category))
-            type_ids[category] = cur.lastrowid
-    
-    con.commit()
-    
-    # Insert devices in batches
-    print("Inserting devices...")
-    batch_size = 1000
-    for i in range(0, len(devices), batch_size):
-        batch = devices[i:i + batch_size]
-        for dev in batch:
-            cur.execute("""
-                INSERT INTO devices (manufacturer_id, type_id, model, name, symbol, properties_json)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                mfr_ids[dev["manufacturer"]],
-                type_ids[dev["category"]],
-                dev["model"],
-                dev["name"],
-                dev["symbol"],
-                dev["properties"]
-            ))
-        con.commit()
-        print(f"  Inserted {min(i + batch_size, len(devices))}/{len(devices)} devices...")
-    
+    with catalog_store.transaction(catalog_path) as con:
+        con.execute("DELETE FROM device_specs WHERE device_id > 6")
+        con.execute("DELETE FROM devices WHERE id > 6")  # Keep demo devices 1-6
+        con.execute("DELETE FROM manufacturers WHERE id > 1")  # Keep Generic
+        con.execute("DELETE FROM device_types WHERE id > 3")  # Keep demo types
+
+    print("Importing 16,000+ devices...")
+    report = catalog_store.import_devices(catalog_rows(), path=catalog_path, create_types=True)
+
     # Verify
-    cur.execute("SELECT COUNT(*) FROM devices")
-    total_devices = cur.fetchone()[0]
+    con = catalog_store.get_connection(catalog_path)
+    total_devices = con.execute("SELECT COUNT(*) FROM devices").fetchone()[0]
     print(f"\n✅ Database populated successfully!")
+    print(
+        f"   Imported: {report.rows} devices in {report.seconds:.2f}s"
+        f" ({report.rows_per_sec:,.0f} rows/s)"
+    )
     print(f"   Total devices: {total_devices}")
     print(f"   Manufacturers: {len(MANUFACTURERS)}")
     print(f"   Device categories: {len(DEVICE_CATEGORIES)}")
-    
-    con.close()
+    catalog_store.close_connections()
 
 
 if __name__ == "__main__":
@@ -1,16 +1,23 @@
 """Tests for backend catalog_store (device catalog management)."""
 
 import sqlite3
+import threading
 from unittest.mock import patch
 
 import pytest
 
+from backend import catalog_store
 from backend.catalog_store import (
     add_device,
+    close_connections,
     get_catalog_path,
+    get_connection,
     get_device_specs,
+    import_devices,
     list_devices,
+    search_devices,
     seed_defaults,
+    transaction,
 )
 
 
@@ -30,6 +37,7 @@ def temp_catalog_db(tmp_path):
         con.close()
 
         yield str(db_path)
+        close_connections()
 
 
 class TestGetCatalogPath:
@@ -295,3 +303,143 @@ class TestGetDeviceSpecs:
             assert retrieved["strobe_candela"] == 30
             assert retrieved["voltage_v"] == 12
             # Other fields should be None or present but null
+
+
+class TestConnectionPool:
+    """Test pooled connections and the transaction API."""
+
+    def test_connection_reused_per_thread(self, temp_catalog_db):
+        con = get_connection(temp_catalog_db)
+        assert get_connection(temp_catalog_db) is con
+        other = []
+        t = threading.Thread(target=lambda: other.append(get_connection(temp_catalog_db)))
+        t.start()
+        t.join()
+        assert other[0] is not con
+
+    def test_schema_verified_once_per_path(self, tmp_path):
+        path = str(tmp_path / "once.db")
+        with patch.object(
+            catalog_store.db_loader,
+            "ensure_schema",
+            wraps=catalog_store.db_loader.ensure_schema,
+        ) as ensure:
+            get_connection(path)
+            close_connections()
+            get_connection(path)
+            close_connections()
+        assert ensure.call_count == 1
+
+    def test_wal_enabled(self, temp_catalog_db):
+        mode = get_connection(temp_catalog_db).execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_transaction_rolls_back_on_error(self, temp_catalog_db):
+        with pytest.raises(RuntimeError):
+            with transaction(temp_catalog_db) as con:
+                con.execute("INSERT INTO manufacturers(name) VALUES('Gone')")
+                raise RuntimeError("boom")
+        row = get_connection(temp_catalog_db).execute(
+            "SELECT COUNT(*) FROM manufacturers WHERE name='Gone'"
+        )
+        assert row.fetchone()[0] == 0
+
+    def test_nested_transaction_is_a_savepoint(self, temp_catalog_db):
+        with transaction(temp_catalog_db) as con:
+            con.execute("INSERT INTO manufacturers(name) VALUES('Kept')")
+            with pytest.raises(ValueError):
+                with transaction(temp_catalog_db) as inner:
+                    inner.execute("INSERT INTO manufacturers(name) VALUES('Inner')")
+                    raise ValueError("undo inner only")
+        names = {
+            r[0] for r in get_connection(temp_catalog_db).execute("SELECT name FROM manufacturers")
+        }
+        assert "Kept" in names and "Inner" not in names
+
+
+class TestImportDevices:
+    """Test bulk import_devices."""
+
+    def _rows(self, n):
+        for i in range(n):
+            yield {
+                "manufacturer": f"Corp{i % 3}",
+                "type": "strobe",
+                "model": f"M{i}",
+                "name": f"Strobe {i}",
+                "symbol": "S",
+                "properties": {"candela": 15 + i},
+                "strobe_candela": 15 + i if i % 2 else None,
+            }
+
+    def test_import_from_generator_in_batches(self, temp_catalog_db):
+        with patch("backend.catalog_store.get_catalog_path", return_value=temp_catalog_db):
+            seed_defaults()
+            report = import_devices(self._rows(25), batch_size=10)
+
+            assert report.rows == 25 and report.rows_per_sec > 0
+            devices = list_devices("strobe")
+            assert len(devices) == 25
+            assert {d["manufacturer"] for d in devices} == {"Corp0", "Corp1", "Corp2"}
+            by_model = {d["model"]: d["id"] for d in devices}
+            assert get_device_specs(by_model["M3"])["strobe_candela"] == 18
+            assert get_device_specs(by_model["M2"]) is None
+
+    def test_ids_follow_existing_rows(self, temp_catalog_db):
+        with patch("backend.catalog_store.get_catalog_path", return_value=temp_catalog_db):
+            seed_defaults()
+            first = add_device("Corp", "strobe", "A", "First")
+            import_devices(self._rows(2))
+            later = add_device("Corp", "strobe", "B", "Last")
+
+            ids = sorted(d["id"] for d in list_devices())
+            assert ids == list(range(first, later + 1))
+
+    def test_import_from_csv_and_json(self, temp_catalog_db, tmp_path):
+        csv_path = tmp_path / "devices.csv"
+        csv_path.write_text(
+            "manufacturer,type,model,name,symbol,strobe_candela\n"
+            "Acme,strobe,C1,CSV Strobe,S,75\n"
+            "Acme,smoke,C2,CSV Smoke,SD,\n",
+            encoding="utf-8",
+        )
+        json_path = tmp_path / "devices.json"
+        json_path.write_text(
+            '[{"manufacturer": "Acme", "type": "pull", "model": "J1", "name": "JSON Pull"}]',
+            encoding="utf-8",
+        )
+        with patch("backend.catalog_store.get_catalog_path", return_value=temp_catalog_db):
+            seed_defaults()
+            assert import_devices(str(csv_path)).rows == 2
+            assert import_devices(json_path).rows == 1
+
+            by_model = {d["model"]: d for d in list_devices()}
+            assert set(by_model) == {"C1", "C2", "J1"}
+            assert get_device_specs(by_model["C1"]["id"])["strobe_candela"] == 75
+            assert get_device_specs(by_model["C2"]["id"]) is None
+
+    def test_unknown_type_rolls_back_whole_import(self, temp_catalog_db):
+        rows = [
+            {"manufacturer": "Acme", "type": "strobe", "model": "OK", "name": "Fine"},
+            {"manufacturer": "Acme", "type": "bogus", "model": "BAD", "name": "Bad"},
+        ]
+        with patch("backend.catalog_store.get_catalog_path", return_value=temp_catalog_db):
+            seed_defaults()
+            with pytest.raises(ValueError, match="Unknown device type code"):
+                import_devices(rows, batch_size=1)
+            assert list_devices() == []
+
+            import_devices(rows, create_types=True)
+            assert {d["type"] for d in list_devices()} == {"strobe", "bogus"}
+
+    def test_imported_devices_are_searchable(self, temp_catalog_db):
+        with patch("backend.catalog_store.get_catalog_path", return_value=temp_catalog_db):
+            seed_defaults()
+            rows = list(self._rows(5))
+            rows[2]["notes"] = "weatherproof housing"
+            import_devices(rows)
+            assert [d["part_number"] for d in search_devices("weatherpr")] == ["M2"]
+            # Per-row sync triggers are back after the bulk insert
+            add_device("Corp", "strobe", "LATE", "Late Strobe")
+            assert [d["part_number"] for d in search_devices("late")] == ["LATE"]
+            assert len(search_devices("strobe", {"manufacturer": "Corp1"})) == 2
@@ -0,0 +1,78 @@
+"""Tests for backend coverage_analysis (rasterized coverage gaps)."""
+
+import numpy as np
+import pytest
+
+from backend.coverage_analysis import (
+    COVERED_RGBA,
+    GAP_RGBA,
+    OVERLAP_RGBA,
+    analyze_coverage,
+    overlay_rgba,
+)
+from backend.coverage_service import room_index
+
+ROOMS = [
+    [(0, 0), (40, 0), (40, 20), (0, 20)],
+    [(40, 0), (100, 0), (100, 30), (70, 30), (70, 10), (40, 10)],  # L-shaped
+    [(10, 5), (30, 5), (20, 40)],  # overlaps room 0
+]
+
+
+def _brute_force(grid, centers, radii):
+    rows, cols = np.indices(grid.shape)
+    pts = grid.cell_center(rows.ravel(), cols.ravel())
+    dist = np.linalg.norm(pts[:, None, :] - np.asarray(centers)[None], axis=2)
+    count = (dist <= np.asarray(radii)).sum(axis=1).reshape(grid.shape)
+    return room_index(pts, ROOMS).reshape(grid.shape), count
+
+
+@pytest.mark.parametrize("cell_ft", [1.0, 0.7, 0.25])
+def test_raster_matches_cell_centre_tests(cell_ft):
+    """Room labels and coverage counts agree with per-cell point tests."""
+    rng = np.random.default_rng(7)
+    centers = rng.uniform(-10, 110, (40, 2))
+    radii = rng.uniform(0, 12, 40)
+    grid = analyze_coverage(ROOMS, centers, radii, cell_ft)
+    room, count = _brute_force(grid, centers, radii)
+    assert grid.origin_ft == (0.0, 0.0)
+    np.testing.assert_array_equal(grid.room, room)
+    np.testing.assert_array_equal(grid.count, count)
+
+
+def test_per_room_figures():
+    """Cells, coverage, overlap and gaps are reported per room."""
+    grid = analyze_coverage(ROOMS[:2], [(10, 10), (12, 10), (85, 15)], [5, 5, 0], cell_ft=1.0)
+    r0, r1 = grid.rooms
+    assert (r0.cells, r1.cells) == (800, 60 * 10 + 30 * 20)
+    assert r0.covered == np.count_nonzero(grid.count[grid.room == 0])
+    assert 0 < r0.overlapped < r0.covered and r0.max_overlap == 2
+    assert r1.covered == 0 and r1.percent == 0.0 and r1.max_overlap == 0
+    assert r0.uncovered_sqft == r0.cells - r0.covered
+    assert grid.percent == pytest.approx(100.0 * r0.covered / (r0.cells + r1.cells))
+    gaps = grid.uncovered_cells(1)
+    assert len(gaps) == r1.uncovered and (room_index(gaps, ROOMS[:2]) == 1).all()
+
+
+def test_overlay_image():
+    """The overlay colours gaps, single and overlapping coverage inside rooms only."""
+    grid = analyze_coverage([ROOMS[1]], [(50, 5), (52, 5)], [3, 3], cell_ft=0.5)
+    image = overlay_rgba(grid)
+    assert image.shape == grid.shape + (4,) and image.dtype == np.uint8
+    outside = grid.room < 0
+    assert outside.any() and not image[outside].any()
+    for rgba, mask in (
+        (GAP_RGBA, (grid.room == 0) & (grid.count == 0)),
+        (COVERED_RGBA, grid.count == 1),
+        (OVERLAP_RGBA, grid.count > 1),
+    ):
+        assert mask.any() and (image[mask] == rgba).all()
+
+
+def test_degenerate_input():
+    """No rooms, no devices and zero radii produce empty figures, not errors."""
+    assert analyze_coverage([], [(0, 0)], 5).rooms == []
+    grid = analyze_coverage([[(0, 0), (1, 0)], ROOMS[0]], np.empty((0, 2)), [])
+    assert grid.rooms[0].cells == 0 and grid.rooms[1].percent == 0.0
+    with pytest.raises(ValueError):
+        analyze_coverage(ROOMS, [], [], cell_ft=0)
@@ -3,12 +3,19 @@
 import sqlite3
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 
 from backend.coverage_service import (
     get_required_ceiling_strobe_candela,
+    get_required_ceiling_strobe_candela_batch,
     get_required_wall_strobe_candela,
+    get_required_wall_strobe_candela_batch,
+    invalidate_cache,
+    room_index,
+    size_floor,
 )
+from db.coverage_tables import NO_RATING, CoverageLookup, create_tables, populate_tables
 
 
 @pytest.fixture
@@ -192,3 +199,102 @@ class TestCeilingStrobeCandela:
         with patch("backend.coverage_service.get_connection", return_value=mock_db_connection):
             result = get_required_ceiling_strobe_candela(ceiling_height=50, room_size=200)
             assert result is None
+
+
+class TestCoverageLookup:
+    """Test the in-memory lookup tables and their batch variants."""
+
+    def test_batch_matches_scalar(self, mock_db_connection):
+        """Batch lookups agree with the per-call functions, misses included."""
+        rooms = np.arange(0, 101, 1.5)
+        heights = np.repeat([5, 10, 15, 20, 25, 30, 40], len(rooms))
+        with patch("backend.coverage_service.get_connection", return_value=mock_db_connection):
+            wall = get_required_wall_strobe_candela_batch(rooms)
+            ceiling = get_required_ceiling_strobe_candela_batch(heights, np.tile(rooms, 7))
+            expected_wall = [get_required_wall_strobe_candela(r) for r in rooms]
+            expected_ceiling = [
+                get_required_ceiling_strobe_candela(h, r)
+                for h, r in zip(heights, np.tile(rooms, 7))
+            ]
+        assert [c or None for c in wall.tolist()] == expected_wall
+        assert [c or None for c in ceiling.tolist()] == expected_ceiling
+        assert NO_RATING in wall and NO_RATING in ceiling
+
+    def test_tables_read_once_until_invalidated(self, mock_db_connection):
+        """Lookups don't query the database again until the cache is invalidated."""
+        statements = []
+        mock_db_connection.set_trace_callback(statements.append)
+        with patch("backend.coverage_service.get_connection", return_value=mock_db_connection):
+            for size in range(10, 80):
+                get_required_wall_strobe_candela(size)
+            assert len(statements) == 1
+            mock_db_connection.execute(
+                "UPDATE wall_strobe_coverage SET candela=99 WHERE room_size=30"
+            )
+            assert get_required_wall_strobe_candela(30) == 30
+            invalidate_cache()
+            assert get_required_wall_strobe_candela(30) == 99
+        assert sum(sql.startswith("SELECT") for sql in statements) == 2
+
+    def test_radius_lookup(self):
+        """Radius lookups match the seeded strobe_candela table."""
+        conn = sqlite3.connect(":memory:")
+        create_tables(conn)
+        populate_tables(conn)
+        lookup = CoverageLookup(conn)
+        assert lookup.radius_ft(75) == 30.0 and lookup.radius_ft(76) is None
+        radii = lookup.radius_ft_batch([15, 16, 185, 999])
+        assert radii[[0, 2]].tolist() == [15.0, 50.0]
+        assert np.isnan(radii[[1, 3]]).all()
+        conn.close()
+
+
+class TestSizeFloor:
+    """Test whole-floor sizing of strobes, speakers and detectors."""
+
+    ROOMS = [
+        [(0, 0), (40, 0), (40, 20), (0, 20)],  # 40 ft room
+        [(40, 0), (100, 0), (100, 30), (70, 30), (70, 10), (40, 10)],  # L-shaped, 60 ft
+    ]
+
+    def test_room_index(self):
+        """Points map to the first containing polygon; notches and outside give -1."""
+        pts = [(10, 10), (50, 5), (80, 20), (50, 20), (200, 5), (39.5, 5)]
+        assert room_index(pts, self.ROOMS).tolist() == [0, 1, 1, -1, -1, 0]
+        assert room_index(np.empty((0, 2)), self.ROOMS).tolist() == []
+
+    def test_strobes_match_scalar_lookup(self, mock_db_connection):
+        """Strobe candela is the table rating for the room; radius covers the rated size."""
+        with patch("backend.coverage_service.get_connection", return_value=mock_db_connection):
+            sizing = size_floor(
+                [(10, 10), (80, 20), (10, 5), (500, 500)],
+                ["strobe"] * 4,
+                self.ROOMS,
+                ceiling_heights_ft=[10, 20],
+                mounts=["ceiling", "ceiling", "wall", "ceiling"],
+            )
+            assert sizing.room.tolist() == [0, 1, 0, -1]
+            assert sizing.room_size_ft[:3].tolist() == [40.0, 60.0, 40.0]
+            assert sizing.candela.tolist() == [
+                get_required_ceiling_strobe_candela(10, 40),
+                get_required_ceiling_strobe_candela(20, 60),
+                get_required_wall_strobe_candela(40),
+                NO_RATING,
+            ]
+        assert sizing.radius_ft[:3].tolist() == [20.0, 30.0, 20.0]
+        assert sizing.sized.tolist() == [True, True, True, False]
+
+    def test_speakers_and_smoke(self, mock_db_connection):
+        """Speakers use the inverse-square distance, detectors half their spacing."""
+        with patch("backend.coverage_service.get_connection", return_value=mock_db_connection):
+            sizing = size_floor(
+                [(10, 10), (500, 500), (80, 20), (5, 5)],
+                ["speaker", "speaker", "smoke", "pull"],
+                self.ROOMS,
+                speaker_l10_db=[95.0, 81.0, 0, 0],
+                smoke_spacing_ft=[0, 0, 25.0, 0],
+            )
+        assert sizing.radius_ft[:3] == pytest.approx([100.0, 10.0 * 10 ** (6 / 20), 12.5])
+        assert sizing.spacing_ft[2] == 25.0 and np.isnan(sizing.spacing_ft[[0, 1, 3]]).all()
+        assert sizing.sized.tolist() == [True, True, True, False]
+        assert (sizing.candela == NO_RATING).all()
@@ -1,5 +1,9 @@
-from backend.geom_repo import InMemoryGeomRepo
+import numpy as np
+import pytest
+
+from backend.geom_repo import ArrayGeomRepo, EntityRef, InMemoryGeomRepo
 from backend.models import CircleDTO, PointDTO, SegmentDTO
+from backend.ops_service import OpsService
 
 
 def test_add_and_get_point_segment_circle():
@@ -80,3 +84,150 @@ def test_iter_circles():
     assert len(items) == 2
     assert items[0] == (c1.id, CircleDTO(PointDTO(0, 0), 5.0))
     assert items[1] == (c2.id, CircleDTO(PointDTO(10, 10), 7.5))
+
+
+@pytest.mark.parametrize("repo_cls", [InMemoryGeomRepo, ArrayGeomRepo])
+def test_repos_share_crud_semantics(repo_cls):
+    repo = repo_cls()
+    p = repo.add_point(PointDTO(1.0, 2.0))
+    s = repo.add_segment(SegmentDTO(PointDTO(0, 0), PointDTO(1, 1)))
+    c = repo.add_circle(CircleDTO(PointDTO(0, 0), 5.0))
+    assert (p.id, s.id, c.id) == ("point:1", "segment:1", "circle:1")
+    assert repo.get_segment(s.id) == SegmentDTO(PointDTO(0, 0), PointDTO(1, 1))
+    assert repo.update_circle(c.id, CircleDTO(PointDTO(1, 1), 2.0)) is True
+    assert repo.get_circle(c.id) == CircleDTO(PointDTO(1, 1), 2.0)
+
+    assert repo.remove_point(p.id) is True
+    assert repo.remove_point(p.id) is False
+    assert repo.get_point(p.id) is None
+    assert repo.update_point(p.id, PointDTO(0, 0)) is False
+    # Ids are never reused, and the wrong kind or a malformed id is unknown
+    assert repo.add_point(PointDTO(3.0, 4.0)).id == "point:2"
+    assert list(repo.iter_points()) == [("point:2", PointDTO(3.0, 4.0))]
+    for bad in ("segment:1", "point:x", "point:0", "point:99", "nope"):
+        assert repo.get_point(bad) is None
+
+
+def test_array_repo_reuses_freed_slots_in_insertion_order():
+    repo = ArrayGeomRepo()
+    refs = [repo.add_point(PointDTO(float(i), 0.0)) for i in range(5)]
+    repo.remove_point(refs[1].id)
+    repo.remove_point(refs[3].id)
+    view = repo.points_view()
+    assert len(view) == 5
+    assert view["eid"].tolist() == [1, -1, 3, -1, 5]
+    assert np.isnan(view["coords"][[1, 3]]).all()
+
+    new = repo.add_points(np.array([[10.0, 0.0], [11.0, 0.0], [12.0, 0.0]]))
+    assert new.tolist() == [6, 7, 8]
+    assert len(repo.points_view()) == 6  # two slots reused, one appended
+    # Iteration follows ids (insertion order), not slots
+    assert [eid for eid, _ in repo.iter_points()] == [
+        "point:1",
+        "point:3",
+        "point:5",
+        "point:6",
+        "point:7",
+        "point:8",
+    ]
+    handles, coords = repo.live_points()
+    assert handles.tolist() == [1, 3, 5, 6, 7, 8]
+    assert coords[:, 0].tolist() == [0.0, 2.0, 4.0, 10.0, 11.0, 12.0]
+
+
+def test_array_repo_bulk_add_and_update():
+    repo = ArrayGeomRepo()
+    n = 10_000
+    segs = np.random.default_rng(0).random((n, 4))
+    handles = repo.add_segments(segs)
+    assert handles.tolist() == list(range(1, n + 1))
+    np.testing.assert_array_equal(repo.live_segments()[1], segs)
+
+    ok = repo.update_segments(np.array([2, n, n + 1, 0]), np.zeros((4, 4)))
+    assert ok.tolist() == [True, True, False, False]
+    assert repo.get_segment("segment:2") == SegmentDTO(PointDTO(0, 0), PointDTO(0, 0))
+
+    # DTO iterables work too, and handles map back to ids
+    more = repo.add_circles([CircleDTO(PointDTO(1, 2), 3.0), CircleDTO(PointDTO(4, 5), 6.0)])
+    assert [repo.handle(f"circle:{h}") for h in more.tolist()] == more.tolist()
+    assert repo.handle("segment:0") is None
+    assert repo.get_circle("circle:2") == CircleDTO(PointDTO(4, 5), 6.0)
+
+
+def test_array_repo_views_are_zero_copy():
+    repo = ArrayGeomRepo()
+    repo.add_segments(np.arange(8.0).reshape(2, 4))
+    coords = repo.segments_view()["coords"]
+    assert coords.shape == (2, 4)
+    coords[0] = (9, 9, 9, 9)  # writes through to the store
+    assert repo.get_segment("segment:1") == SegmentDTO(PointDTO(9, 9), PointDTO(9, 9))
+
+
+def test_ops_service_accepts_array_repo():
+    repo = ArrayGeomRepo()
+    ref = OpsService(repo).create_segment(PointDTO(0, 0), PointDTO(1, 0))
+    assert ref == EntityRef("segment", "segment:1")
+    assert repo.get_segment(ref.id) == SegmentDTO(PointDTO(0, 0), PointDTO(1, 0))
+
+
+@pytest.mark.parametrize("repo_cls", [InMemoryGeomRepo, ArrayGeomRepo])
+def test_spatial_queries_follow_edits(repo_cls):
+    repo = repo_cls()
+    p = repo.add_point(PointDTO(1.0, 1.0))
+    s = repo.add_segment(SegmentDTO(PointDTO(0, 10), PointDTO(100, 10)))
+    c = repo.add_circle(CircleDTO(PointDTO(50, 50), 5.0))
+
+    assert repo.query_bbox(-1, -1, 2, 2) == [p]
+    assert repo.query_bbox(40, 0, 60, 60) == [s, c]
+    assert repo.query_bbox(40, 0, 60, 60, kinds="circle") == [c]
+    # Radius queries measure to the geometry: circles by their outline
+    assert repo.query_radius(50, 12, 2.0) == [s]
+    assert repo.query_radius(50, 50, 4.0) == []
+    assert repo.query_radius(50, 50, 5.0) == [c]
+
+    repo.update_point(p.id, PointDTO(50, 20))
+    assert repo.query_bbox(-1, -1, 2, 2) == []
+    assert repo.nearest(50, 21, k=2) == [(p, 1.0), (s, 11.0)]
+    repo.remove_segment(s.id)
+    assert repo.nearest(50, 21, k=2) == [(p, 1.0), (c, 24.0)]
+    with pytest.raises(ValueError):
+        repo.query_bbox(0, 0, 1, 1, kinds=("arc",))
+
+
+@pytest.mark.parametrize("repo_cls", [InMemoryGeomRepo, ArrayGeomRepo])
+def test_spatial_queries_match_brute_force(repo_cls):
+    rng = np.random.default_rng(3)
+    repo = repo_cls()
+    segs = {}
+    for x1, y1, dx, dy in np.column_stack(
+        [rng.uniform(0, 1000, (400, 2)), rng.normal(0, 40, (400, 2))]
+    ).tolist():
+        dto = SegmentDTO(PointDTO(x1, y1), PointDTO(x1 + dx, y1 + dy))
+        segs[repo.add_segment(dto).id] = dto
+
+    def dist(s, x, y):
+        ax, ay, bx, by = s.a.x, s.a.y, s.b.x, s.b.y
+        t = ((x - ax) * (bx - ax) + (y - ay) * (by - ay)) / ((bx - ax) ** 2 + (by - ay) ** 2)
+        t = min(max(t, 0.0), 1.0)
+        return float(np.hypot(ax + t * (bx - ax) - x, ay + t * (by - ay) - y))
+
+    for x, y in rng.uniform(0, 1000, (30, 2)).tolist():
+        exact = sorted((dist(s, x, y), int(eid.split(":")[1]), eid) for eid, s in segs.items())
+        assert [ref.id for ref, _ in repo.nearest(x, y, k=4)] == [e[2] for e in exact[:4]]
+        within = sorted(e[1] for e in exact if e[0] <= 25.0)
+        found = [int(ref.id.split(":")[1]) for ref in repo.query_radius(x, y, 25.0)]
+        assert found == within
+
+
+def test_array_repo_bulk_edits_update_the_index():
+    repo = ArrayGeomRepo()
+    handles = repo.add_points(np.array([[0.0, 0.0], [10.0, 0.0], [20.0, 0.0]]))
+    repo.update_points(handles[:1], np.array([[100.0, 100.0]]))
+    assert repo.query_bbox(-1, -1, 1, 1) == []
+    index = repo.spatial_index("point")
+    assert index.query_radius(100, 100, 0.5).tolist() == [handles[0]]
+
+    # Writes through the view bypass the index until reindex()
+    repo.points_view()["coords"][1] = (500.0, 500.0)
+    repo.reindex()
+    assert repo.query_radius(500, 500, 0.5) == [EntityRef("point", "point:2")]
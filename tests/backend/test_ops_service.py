@@ -1,13 +1,18 @@
 """Tests for backend OpsService (geometry operations service)."""
 
-from backend.geom_repo import EntityRef, InMemoryGeomRepo
-from backend.models import PointDTO
+import numpy as np
+import pytest
+
+from backend.geom_repo import ArrayGeomRepo, EntityRef, InMemoryGeomRepo
+from backend.models import PointDTO, SegmentDTO
 from backend.ops_service import OpsService
 
 
 class TestOpsService:
     """Test suite for OpsService."""
 
+    X5 = (PointDTO(5, 0), PointDTO(5, 10))
+
     def test_create_segment_basic(self):
         """Test creating a segment via OpsService."""
         repo = InMemoryGeomRepo()
@@ -40,12 +45,158 @@ class TestOpsService:
         assert repo.get_segment(ref1.id) is not None
         assert repo.get_segment(ref2.id) is not None
 
-    def test_trim_segment_to_line_not_implemented(self):
-        """Test trim_segment_to_line returns False (not yet implemented)."""
+    def test_trim_segment_to_line(self):
+        """Test trim_segment_to_line moves the chosen end to the cutting line."""
         repo = InMemoryGeomRepo()
         service = OpsService(repo=repo)
 
         seg_ref = service.create_segment(PointDTO(0, 0), PointDTO(10, 10))
         result = service.trim_segment_to_line(seg_ref, cut_a=PointDTO(5, 0), cut_b=PointDTO(5, 10))
 
-        assert result is False  # TODO placeholder returns False
+        assert result is True
+        assert repo.get_segment(seg_ref.id) == SegmentDTO(PointDTO(0, 0), PointDTO(5, 5))
+
+        # Trimming end "a", then a line the segment no longer reaches
+        assert service.trim_segment_to_line(seg_ref, PointDTO(0, 2), PointDTO(10, 2), end="a")
+        assert repo.get_segment(seg_ref.id) == SegmentDTO(PointDTO(2, 2), PointDTO(5, 5))
+        assert service.trim_segment_to_line(seg_ref, PointDTO(8, 0), PointDTO(8, 10)) is False
+        assert service.trim_segment_to_line(seg_ref, PointDTO(0, 1), PointDTO(1, 2)) is False
+        assert service.trim_segment_to_line(EntityRef("segment", "segment:99"), *self.X5) is False
+        with pytest.raises(ValueError):
+            service.trim_segment_to_line(seg_ref, *self.X5, end="c")
+
+    @pytest.mark.parametrize("repo_cls", [InMemoryGeomRepo, ArrayGeomRepo])
+    def test_extend_segment_to_line(self, repo_cls):
+        repo = repo_cls()
+        service = OpsService(repo=repo)
+        seg_ref = service.create_segment(PointDTO(0, 0), PointDTO(2, 0))
+
+        # The line must lie beyond the chosen end
+        assert service.extend_segment_to_line(seg_ref, *self.X5, end="a") is False
+        assert service.extend_segment_to_line(seg_ref, *self.X5) is True
+        assert repo.get_segment(seg_ref.id) == SegmentDTO(PointDTO(0, 0), PointDTO(5, 0))
+        assert service.extend_segment_to_line(seg_ref, PointDTO(0, 3), PointDTO(1, 3)) is False
+
+    @pytest.mark.parametrize("repo_cls", [InMemoryGeomRepo, ArrayGeomRepo])
+    def test_trim_segments_keeps_the_picked_side(self, repo_cls):
+        repo = repo_cls()
+        service = OpsService(repo=repo)
+        right = service.create_segment(PointDTO(0, 1), PointDTO(10, 1))
+        left = service.create_segment(PointDTO(10, 2), PointDTO(0, 2))
+        touching = service.create_segment(PointDTO(5, 3), PointDTO(9, 3))
+        past_cutter = service.create_segment(PointDTO(0, 20), PointDTO(10, 20))
+
+        trimmed = service.trim_segments(*self.X5, keep=PointDTO(1, 5))
+
+        assert trimmed == [right, left]
+        assert repo.get_segment(right.id) == SegmentDTO(PointDTO(0, 1), PointDTO(5, 1))
+        assert repo.get_segment(left.id) == SegmentDTO(PointDTO(5, 2), PointDTO(0, 2))
+        assert repo.get_segment(touching.id) == SegmentDTO(PointDTO(5, 3), PointDTO(9, 3))
+        assert repo.get_segment(past_cutter.id) == SegmentDTO(PointDTO(0, 20), PointDTO(10, 20))
+        with pytest.raises(ValueError):
+            service.trim_segments(*self.X5, keep=PointDTO(5, 50))
+
+    @pytest.mark.parametrize("repo_cls", [InMemoryGeomRepo, ArrayGeomRepo])
+    def test_extend_segments_to_nearest_boundary(self, repo_cls):
+        repo = repo_cls()
+        service = OpsService(repo=repo)
+        service.create_segment(PointDTO(0, -10), PointDTO(0, 10))  # walls at x = 0, 10, 12
+        service.create_segment(PointDTO(10, -10), PointDTO(10, 10))
+        wall_far = service.create_segment(PointDTO(12, -10), PointDTO(12, 10))
+        gap = service.create_segment(PointDTO(2, 0), PointDTO(8, 0))
+        joined = service.create_segment(PointDTO(0, 5), PointDTO(7, 5))  # a end on a wall
+        too_far = service.create_segment(PointDTO(4, -5), PointDTO(6, -5))
+
+        changed = service.extend_segments([gap, joined, too_far], max_distance=3.0)
+
+        assert changed == [gap, joined]
+        assert repo.get_segment(gap.id) == SegmentDTO(PointDTO(0, 0), PointDTO(10, 0))
+        assert repo.get_segment(joined.id) == SegmentDTO(PointDTO(0, 5), PointDTO(10, 5))
+        assert repo.get_segment(too_far.id) == SegmentDTO(PointDTO(4, -5), PointDTO(6, -5))
+
+        # Restricted to chosen boundaries, the near wall is ignored
+        assert service.extend_segments([gap], 5.0, boundaries=[wall_far]) == [gap]
+        assert repo.get_segment(gap.id) == SegmentDTO(PointDTO(0, 0), PointDTO(12, 0))
+        with pytest.raises(ValueError):
+            service.extend_segments([gap], 0.0)
+
+    @pytest.mark.parametrize("repo_cls", [InMemoryGeomRepo, ArrayGeomRepo])
+    def test_bulk_trim_and_extend_match_per_segment_results(self, repo_cls):
+        rng = np.random.default_rng(0)
+        n = 2000
+        starts = rng.uniform(0, 1000, (n, 2))
+        segs = np.hstack([starts, starts + rng.normal(0, 30, (n, 2))])
+        cut_a, cut_b, keep = PointDTO(100, 50), PointDTO(900, 950), PointDTO(900, 0)
+
+        repo, ref_repo = repo_cls(), InMemoryGeomRepo()
+        refs = []
+        for x1, y1, x2, y2 in segs.tolist():
+            seg = SegmentDTO(PointDTO(x1, y1), PointDTO(x2, y2))
+            refs.append(repo.add_segment(seg))
+            assert ref_repo.add_segment(seg) == refs[-1]
+        service, reference = OpsService(repo=repo), OpsService(repo=ref_repo)
+
+        trimmed = service.trim_segments(cut_a, cut_b, keep=keep)
+        assert trimmed == _trim_one_by_one(reference, refs, cut_a, cut_b, keep)
+        assert len(trimmed) > 20
+        np.testing.assert_allclose(_coords(repo, refs), _coords(ref_repo, refs))
+
+        extended = service.extend_segments(refs[:300], 25.0)
+        assert extended == _extend_one_by_one(reference, refs[:300], refs, 25.0)
+        assert len(extended) > 20
+        np.testing.assert_allclose(_coords(repo, refs), _coords(ref_repo, refs))
+
+
+def _coords(repo, refs):
+    return np.array(
+        [[s.a.x, s.a.y, s.b.x, s.b.y] for s in map(repo.get_segment, (r.id for r in refs))]
+    )
+
+
+def _side(px, py, ax, ay, bx, by):
+    return np.sign((bx - ax) * (py - ay) - (by - ay) * (px - ax))
+
+
+def _trim_one_by_one(service, refs, cut_a, cut_b, keep):
+    """Reference for `trim_segments`: pick crossers by brute force, trim each alone."""
+    cut = (cut_a.x, cut_a.y, cut_b.x, cut_b.y)
+    keep_side = _side(keep.x, keep.y, *cut)
+    done = []
+    for ref, (ax, ay, bx, by) in zip(refs, _coords(service.repo, refs)):
+        side_a, side_b = _side(ax, ay, *cut), _side(bx, by, *cut)
+        straddles = _side(cut_a.x, cut_a.y, ax, ay, bx, by) * _side(
+            cut_b.x, cut_b.y, ax, ay, bx, by
+        )
+        if side_a * side_b < 0 and straddles <= 0:
+            end = "b" if side_a == keep_side else "a"
+            assert service.trim_segment_to_line(ref, cut_a, cut_b, end=end)
+            done.append(ref)
+    return done
+
+
+def _extend_one_by_one(service, refs, boundaries, max_distance):
+    """Reference for `extend_segments`: nearest boundary ahead of each end by brute force."""
+    bounds = _coords(service.repo, boundaries)
+    p, r = bounds[:, :2], bounds[:, 2:] - bounds[:, :2]
+    done = []
+    for ref, (ax, ay, bx, by) in zip(refs, _coords(service.repo, refs)):
+        unit = np.array([bx - ax, by - ay]) / np.hypot(bx - ax, by - ay)
+        moved = False
+        for end, origin, ahead in (("b", (bx, by), unit), ("a", (ax, ay), -unit)):
+            # Ray origin + t * d against each boundary p + u * r, both params in [0, 1]
+            d = ahead * max_distance
+            denom = d[0] * r[:, 1] - d[1] * r[:, 0]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                qx, qy = p[:, 0] - origin[0], p[:, 1] - origin[1]
+                t = (qx * r[:, 1] - qy * r[:, 0]) / denom
+                u = (qx * d[1] - qy * d[0]) / denom
+            hit = (denom != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+            hit[boundaries.index(ref)] = False
+            if not hit.any() or t[hit].min() <= 1e-9:
+                continue
+            x1, y1, x2, y2 = bounds[np.flatnonzero(hit)[np.argmin(t[hit])]]
+            assert service.extend_segment_to_line(ref, PointDTO(x1, y1), PointDTO(x2, y2), end=end)
+            moved = True
+        if moved:
+            done.append(ref)
+    return done
@@ -0,0 +1,65 @@
+"""Tests for backend query_audit (EXPLAIN QUERY PLAN audit)."""
+
+import sqlite3
+
+import pytest
+
+from backend import query_audit
+from backend.catalog_store import close_connections, import_devices
+from db import loader as db_loader
+
+
+@pytest.fixture
+def catalog_db(tmp_path):
+    path = str(tmp_path / "catalog.db")
+    rows = tmp_path / "devices.jsonl"
+    rows.write_text(
+        "\n".join(
+            f'{{"manufacturer": "M{i % 5}", "type": "T{i % 3}", "model": "P-{i}",'
+            f' "name": "Smoke {i}", "symbol": "S"}}'
+            for i in range(300)
+        )
+    )
+    import_devices(str(rows), path=path, create_types=True)
+    yield path
+    close_connections()
+
+
+def test_migrated_catalog_has_no_full_scans(catalog_db):
+    plans = query_audit.audit(catalog_db)
+    names = {qp.query for qp in plans}
+    assert {
+        "fetch_devices",
+        "search_devices(type page)",
+        "catalog_store.list_devices(type)",
+    } <= names
+    assert [(qp.query, qp.full_scans) for qp in plans if qp.flagged] == []
+    assert any(qp.lists_all and qp.full_scans for qp in plans)
+    assert not any(qp.full_scans for qp in plans if qp.query.startswith("search_devices"))
+    assert all("sqlite_master" not in qp.sql for qp in plans)
+
+
+def test_unindexed_filter_is_flagged(catalog_db):
+    con = sqlite3.connect(catalog_db)
+    sql = "SELECT id FROM devices WHERE symbol = 'S'"
+    qp = query_audit.QueryPlan("by symbol", sql, query_audit.explain(con, sql))
+    assert qp.full_scans == ["devices"]
+    sql = "SELECT id FROM devices WHERE type_id = 1 ORDER BY name"
+    assert query_audit.QueryPlan("typed", sql, query_audit.explain(con, sql)).full_scans == []
+    con.close()
+
+
+def test_capture_inlines_parameters(catalog_db):
+    con = sqlite3.connect(catalog_db)
+    con.row_factory = sqlite3.Row
+    statements = query_audit.capture(
+        con, lambda: db_loader.search_devices(con, "", {"type": "T1"}, limit=5)
+    )
+    assert len(statements) == 1
+    assert "dt.code = 'T1'" in statements[0] and statements[0].endswith("LIMIT 5 OFFSET 0")
+    con.close()
+
+
+def test_main_strict_exit_code(catalog_db, capsys):
+    assert query_audit.main([catalog_db, "--strict"]) == 0
+    assert "0 with full table scans" in capsys.readouterr().out
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from cad_core import batch, lines
+from cad_core.intersect import segment_intersection_xy
+from cad_core.lines import Line, Point
+
+
+def _segments(n=400, seed=3):
+    """Random segments plus the edge cases: parallel, collinear, touching, zero-length."""
+    rng = np.random.default_rng(seed)
+    segs = rng.uniform(-50, 50, (n, 4))
+    # snap a quarter to a coarse grid so exact touches and collinear overlaps occur
+    segs[: n // 4] = np.round(segs[: n // 4] / 10) * 10
+    extra = [
+        (0, 0, 10, 0),
+        (0, 1, 10, 1),  # parallel
+        (5, 0, 15, 0),  # collinear overlap
+        (10, 0, 10, 10),  # touches at an end
+        (3, 3, 3, 3),  # zero length
+        (0, 0, 1e-10, 1e-10),  # shorter than tol
+    ]
+    return np.vstack([segs, extra])
+
+
+def _line(row):
+    return Line(Point(*row[:2]), Point(*row[2:]))
+
+
+def _pairs(segs):
+    i, j = np.triu_indices(len(segs), k=1)
+    return segs[i], segs[j]
+
+
+def _xy(p):
+    return (np.nan, np.nan) if p is None else (p.x, p.y)
+
+
+def test_intersection_line_line_parity():
+    s1, s2 = _pairs(_segments(120))
+    pts, t, valid = batch.intersection_line_line(s1, s2)
+    expected = [lines.intersection_line_line(_line(a), _line(b)) for a, b in zip(s1, s2)]
+    assert valid.tolist() == [p is not None for p in expected]
+    np.testing.assert_array_equal(pts, [_xy(p) for p in expected])
+    assert np.isnan(t[~valid]).all() and not np.isnan(t[valid]).any()
+    assert np.array_equal(batch.is_parallel(s1, s2), ~valid)
+
+
+def test_intersection_segment_segment_parity():
+    s1, s2 = _pairs(_segments(120))
+    pts, t, u, valid = batch.intersection_segment_segment(s1, s2)
+    expected = [lines.intersection_segment_segment(_line(a), _line(b)) for a, b in zip(s1, s2)]
+    assert valid.tolist() == [p is not None for p in expected]
+    assert valid.sum() > 100
+    np.testing.assert_array_equal(pts, [_xy(p) for p in expected])
+    # parameters reproduce the point on both segments
+    np.testing.assert_allclose(
+        s1[valid, :2] + t[valid, None] * (s1[valid, 2:] - s1[valid, :2]), pts[valid], atol=1e-9
+    )
+    np.testing.assert_allclose(
+        s2[valid, :2] + u[valid, None] * (s2[valid, 2:] - s2[valid, :2]), pts[valid], atol=1e-9
+    )
+    assert np.isnan(u[~valid]).all()
+
+
+def test_segment_intersection_params_parity():
+    s1, s2 = _pairs(_segments(120) * 1000.0)
+    pts, t, u, valid = batch.segment_intersection_params(s1, s2)
+    expected = [segment_intersection_xy(tuple(a), tuple(b)) for a, b in zip(s1, s2)]
+    assert valid.tolist() == [p is not None for p in expected]
+    np.testing.assert_array_equal(pts[valid], [p for p in expected if p is not None])
+    assert ((t[valid] >= -1e-9) & (u[valid] <= 1 + 1e-9)).all() and np.isnan(t[~valid]).all()
+
+
+def test_point_kernels_parity():
+    segs = _segments()
+    rng = np.random.default_rng(5)
+    pts = rng.uniform(-50, 50, (len(segs), 2))
+    # points on their segments (ends, midpoints) and just off them
+    pts[::3] = segs[::3, :2]
+    pts[1::3] = (segs[1::3, :2] + segs[1::3, 2:]) / 2
+    pts[2::6] += 1e-3
+
+    on = batch.is_point_on_segment(pts, segs)
+    assert on.tolist() == [
+        lines.is_point_on_segment(Point(*p), _line(s)) for p, s in zip(pts, segs)
+    ]
+    assert 0 < on.sum() < len(segs)
+
+    nearest, t = batch.nearest_point_on_line(segs, pts)
+    expected = [lines.nearest_point_on_line(_line(s), Point(*p)) for p, s in zip(pts, segs)]
+    np.testing.assert_array_equal(nearest, [_xy(p) for p in expected])
+    assert t[-2] == 0.0  # zero-length segment
+
+
+def test_broadcasting_and_inputs():
+    horizontal = [Line(Point(0, y), Point(10, y)) for y in range(5)]
+    vertical = np.array([(x, -1, x, 5) for x in (2.5, 7.5)], dtype=float)
+    pts, t, u, valid = batch.intersection_segment_segment(
+        batch.as_segments(horizontal)[:, None], vertical[None, :]
+    )
+    assert pts.shape == (5, 2, 2) and valid.all()
+    assert pts[3, 1].tolist() == [7.5, 3.0] and t[3, 1] == 0.75
+    single, _, ok = batch.intersection_line_line((0, 0, 1, 1), (0, 1, 1, 0))
+    assert ok and single.tolist() == [0.5, 0.5]
+    assert batch.as_points([Point(1, 2)]).tolist() == [[1.0, 2.0]]
+    with pytest.raises(ValueError):
+        batch.as_segments([(0, 0, 1)])
@@ -0,0 +1,64 @@
+import numpy as np
+
+from cad_core.intersect import intersect_all, segment_intersection_xy, sweep_intersections
+
+
+def test_segment_intersection_xy_bounded():
+    assert segment_intersection_xy((0, 0, 10, 10), (0, 10, 10, 0)) == (5.0, 5.0)
+    assert segment_intersection_xy((0, 0, 1, 1), (0, 10, 10, 0)) is None
+    assert segment_intersection_xy((0, 0, 10, 0), (0, 1, 10, 1)) is None
+
+
+def test_sweep_matches_brute_force():
+    segs = [(i * 3.0, 0.0, i * 3.0 + 7.0, 20.0) for i in range(10)]
+    segs += [(0.0, j * 4.0 + 1.0, 40.0, j * 4.0 + 2.0) for j in range(5)]
+    brute = set()
+    for i in range(len(segs)):
+        for j in range(i + 1, len(segs)):
+            ip = segment_intersection_xy(segs[i], segs[j])
+            if ip is not None:
+                brute.add((i, j))
+    found = {(i, j) for i, j, _, _ in sweep_intersections(segs)}
+    assert found == brute and len(found) > 0
+
+
+def _random_segments(n, extent, length, seed=0):
+    rng = np.random.default_rng(seed)
+    starts = rng.uniform(0, extent, (n, 2))
+    segs = np.hstack([starts, starts + rng.normal(0, length, (n, 2))])
+    # grid-snapped copies give shared endpoints, T-junctions and collinear overlaps
+    segs[: n // 10] = np.round(segs[: n // 10] / length) * length
+    return segs
+
+
+def test_intersect_all_matches_brute_force():
+    segs = _random_segments(400, 500.0, 40.0)
+    segs[:5] = [(0, 50, 500, 50)] * 5  # long, identical walls crossing many cells
+    brute = {}
+    for a in range(len(segs)):
+        for b in range(a + 1, len(segs)):
+            ip = segment_intersection_xy(tuple(segs[a]), tuple(segs[b]))
+            if ip is not None:
+                brute[(a, b)] = ip
+    for cell in (None, 3.0, 1000.0):
+        i, j, pts = intersect_all(segs, cell=cell)
+        pairs = list(zip(i.tolist(), j.tolist()))
+        assert pairs == sorted(brute)
+        np.testing.assert_array_equal(pts, [brute[p] for p in pairs])
+
+
+def test_intersect_all_matches_sweep_at_scale():
+    segs = _random_segments(20_000, 1e5, 1500.0, seed=1)
+    segs[7] = (np.nan, 0, 1, 1)  # skipped, indices of the rest preserved
+    i, j, _ = intersect_all(segs)
+    rows = [tuple(s) for s in segs.tolist()]
+    del rows[7]
+    swept = sorted((a + (a >= 7), b + (b >= 7)) for a, b, _, _ in sweep_intersections(rows))
+    assert list(zip(i.tolist(), j.tolist())) == swept and len(swept) > 1000
+
+
+def test_intersect_all_degenerate_input():
+    assert all(len(a) == 0 for a in intersect_all([]))
+    assert all(len(a) == 0 for a in intersect_all([(0, 0, 1, 1)]))
+    i, j, pts = intersect_all([(0, 0, 0, 0), (0, 0, 0, 0), (-1, 0, 1, 0), (0, -1, 0, 1)])
+    assert (i.tolist(), j.tolist(), pts.tolist()) == ([2], [3], [[0.0, 0.0]])
@@ -0,0 +1,116 @@
+import numpy as np
+
+from cad_core.spatial import BoxIndex, GridIndex
+
+
+def test_point_insert_query_and_remove():
+    g = GridIndex(cell=10.0)
+    g.insert_point("a", 1.0, 1.0)
+    g.insert_point("b", 55.0, 55.0)
+    assert g.query_radius(0.0, 0.0, 2.0) == {"a"}
+    assert g.query_bbox(50, 50, 60, 60) == {"b"}
+    assert g.remove("a") is True
+    assert g.remove("a") is False
+    assert "a" not in g and len(g) == 1
+
+
+def test_segment_only_occupies_traversed_cells():
+    g = GridIndex(cell=10.0)
+    g.insert_segment("diag", 0.0, 0.0, 100.0, 100.0)
+    # A diagonal crosses O(n) cells, not its whole n*n bbox
+    assert len(g.cells_of("diag")) < 25
+    assert "diag" in g.query_radius(50.0, 50.0, 1.0)
+    assert g.query_radius(90.0, 5.0, 1.0) == set()
+
+
+def test_reinsert_moves_key():
+    g = GridIndex(cell=10.0)
+    g.insert_bbox("r", 0, 0, 5, 5)
+    g.insert_bbox("r", 100, 100, 105, 105)
+    assert g.query_bbox(0, 0, 6, 6) == set()
+    assert g.query_bbox(99, 99, 101, 101) == {"r"}
+
+
+def _brute_bbox(boxes, q):
+    minx, miny, maxx, maxy = q
+    with np.errstate(invalid="ignore"):
+        hit = (
+            (boxes[:, 0] <= maxx)
+            & (boxes[:, 2] >= minx)
+            & (boxes[:, 1] <= maxy)
+            & (boxes[:, 3] >= miny)
+        )
+    return np.flatnonzero(hit)
+
+
+def _random_boxes(rng, n):
+    lo = rng.uniform(0, 1e4, (n, 2))
+    return np.hstack([lo, lo + rng.exponential(30, (n, 2))])
+
+
+def test_box_index_matches_brute_force_through_updates():
+    rng = np.random.default_rng(0)
+    n = 5000
+    boxes = _random_boxes(rng, n)
+    boxes[:5] = (-1e6, -1e6, 1e6, 1e6)  # huge boxes stay off the cell table
+    index = BoxIndex()
+    index.set(np.arange(n), boxes)
+
+    for _ in range(10):
+        moved = rng.choice(n, 300, replace=False)
+        boxes[moved] += rng.normal(0, 200, (300, 1))
+        index.set(moved, boxes[moved])
+        gone = rng.choice(n, 20, replace=False)
+        index.remove(gone)
+        boxes[gone] = np.nan
+        for _ in range(20):
+            x, y = rng.uniform(-500, 1.05e4, 2)
+            q = (x, y, x + rng.exponential(500), y + rng.exponential(500))
+            np.testing.assert_array_equal(index.query_bbox(*q), _brute_bbox(boxes, q))
+    assert len(index) == np.count_nonzero(~np.isnan(boxes[:, 0]))
+
+
+def test_box_index_radius_and_nearest():
+    rng = np.random.default_rng(1)
+    boxes = _random_boxes(rng, 3000)
+    index = BoxIndex(cell=50.0)
+    index.set(np.arange(3000), boxes)
+    for _ in range(50):
+        x, y = rng.uniform(0, 1e4, 2)
+        dist = index.box_distance(np.arange(3000), x, y)
+        np.testing.assert_array_equal(index.query_radius(x, y, 100.0), np.flatnonzero(dist <= 100))
+        keys, d = index.nearest(x, y, 5)
+        expected = np.lexsort((np.arange(3000), dist))[:5]
+        np.testing.assert_array_equal(keys, expected)
+        np.testing.assert_allclose(d, dist[expected])
+
+
+def test_box_index_small_and_empty():
+    index = BoxIndex()
+    assert index.query_bbox(0, 0, 1, 1).tolist() == []
+    assert index.nearest(0, 0, 3)[0].tolist() == []
+    index.set([3, 7], [(0, 0, 1, 1), (5, 5, 6, 6)])
+    assert 3 in index and 4 not in index
+    assert index.bbox(7) == (5.0, 5.0, 6.0, 6.0)
+    assert index.nearest(10, 10, 5)[0].tolist() == [7, 3]  # fewer than k
+    index.set([3], [(np.nan, 0, 1, 1)])  # non-finite boxes drop out
+    assert 3 not in index and index.query_bbox(-1, -1, 10, 10).tolist() == [7]
+
+
+def test_box_index_bulk_query_matches_single_queries():
+    rng = np.random.default_rng(2)
+    boxes = _random_boxes(rng, 4000)
+    boxes[0] = (-1e6, -1e6, 1e6, 1e6)
+    index = BoxIndex()
+    index.set(np.arange(4000), boxes)
+    index.set([5], [(2e4, 2e4, 2e4 + 1, 2e4 + 1)])  # pending move, outside the table
+    boxes[5] = (2e4, 2e4, 2e4 + 1, 2e4 + 1)
+
+    lo = rng.uniform(-1000, 2.1e4, (300, 2))
+    queries = np.hstack([lo, lo + rng.exponential(300, (300, 2))])
+    queries[7] = np.nan
+    rows, keys = index.query_bboxes(queries)
+    for r, q in enumerate(queries):
+        expected = [] if r == 7 else _brute_bbox(boxes, q).tolist()
+        assert keys[rows == r].tolist() == expected
+    assert np.all(np.diff(rows) >= 0)
@@ -95,6 +95,117 @@ class TestPerformanceBaselines:
         assert len(result) == 10
         # Baseline: ~200-1000 microseconds per 10 fillets
 
+    @pytest.mark.benchmark
+    def test_coverage_gap_analysis_baseline(self, benchmark):
+        """Baseline: coverage-gap raster of 10,000 devices over 500 rooms at 1 ft."""
+        import numpy as np
+
+        from backend.coverage_analysis import analyze_coverage, overlay_rgba
+
+        rng = np.random.default_rng(0)
+        rooms = [
+            [(x, y), (x + 50, y), (x + 50, y + 40), (x, y + 40)]
+            for x in range(0, 1000, 50)
+            for y in range(0, 1000, 40)
+        ]
+        centers = rng.uniform(0, 1000, (10_000, 2))
+        radii = rng.uniform(5, 25, 10_000)
+
+        def run_analysis():
+            grid = analyze_coverage(rooms, centers, radii, cell_ft=1.0)
+            return grid, overlay_rgba(grid)
+
+        grid, image = benchmark(run_analysis)
+        assert len(grid.rooms) == 500 and image.shape == (1000, 1000, 4)
+        # Baseline: ~200-400 milliseconds
+
+    @pytest.mark.benchmark
+    def test_batch_segment_intersection_baseline(self, benchmark):
+        """Baseline: 100,000 segment-pair intersections in one batch call."""
+        import numpy as np
+
+        from cad_core.batch import intersection_segment_segment
+
+        rng = np.random.default_rng(0)
+        s1 = rng.uniform(0, 100, (100_000, 4))
+        s2 = rng.uniform(0, 100, (100_000, 4))
+
+        points, t, u, valid = benchmark(intersection_segment_segment, s1, s2)
+        assert points.shape == (100_000, 2) and valid.any()
+        # Baseline: ~10-30 milliseconds (the scalar loop takes ~1 s)
+
+    @pytest.mark.benchmark
+    def test_intersect_all_baseline(self, benchmark):
+        """Baseline: all crossing pairs among 100,000 short segments."""
+        import numpy as np
+
+        from cad_core.intersect import intersect_all
+
+        rng = np.random.default_rng(0)
+        starts = rng.uniform(0, 1e5, (100_000, 2))
+        segs = np.hstack([starts, starts + rng.normal(0, 600, (100_000, 2))])
+
+        i, j, points = benchmark.pedantic(intersect_all, (segs,), rounds=3)
+        assert len(i) == len(points) > 100_000
+        # Baseline: ~0.5-1 seconds (the Python sweep takes ~6 s)
+
+    @pytest.mark.benchmark
+    def test_array_geom_repo_bulk_add_baseline(self, benchmark):
+        """Baseline: bulk-adding 100,000 segments to the array-backed repo."""
+        import numpy as np
+
+        from backend.geom_repo import ArrayGeomRepo
+
+        segs = np.random.default_rng(0).uniform(0, 100, (100_000, 4))
+
+        def load():
+            repo = ArrayGeomRepo()
+            repo.add_segments(segs)
+            return repo
+
+        repo = benchmark(load)
+        assert len(repo.segments_view()) == 100_000
+        # Baseline: ~5-10 milliseconds (100,000 add_segment calls take ~1.4 s)
+
+    @pytest.mark.benchmark
+    def test_geom_repo_nearest_baseline(self, benchmark):
+        """Baseline: 5 nearest segments among 100,000 via the repo's spatial index."""
+        import numpy as np
+
+        from backend.geom_repo import ArrayGeomRepo
+
+        rng = np.random.default_rng(0)
+        starts = rng.uniform(0, 1e5, (100_000, 2))
+        repo = ArrayGeomRepo()
+        repo.add_segments(np.hstack([starts, starts + rng.normal(0, 600, (100_000, 2))]))
+        repo.query_bbox(0, 0, 1, 1)  # build the cell table outside the timing
+
+        found = benchmark(repo.nearest, 5e4, 5e4, 5)
+        assert len(found) == 5
+        # Baseline: ~0.1-0.5 milliseconds (a full scan of the segments takes ~5 ms)
+
+    @pytest.mark.benchmark
+    def test_ops_extend_segments_baseline(self, benchmark):
+        """Baseline: extending 10,000 of 100,000 segments to their nearest boundaries."""
+        import numpy as np
+
+        from backend.geom_repo import ArrayGeomRepo, EntityRef
+        from backend.ops_service import OpsService
+
+        rng = np.random.default_rng(0)
+        starts = rng.uniform(0, 1e5, (100_000, 2))
+        segs = np.hstack([starts, starts + rng.normal(0, 300, (100_000, 2))])
+        refs = [EntityRef("segment", f"segment:{h}") for h in range(1, 10_001)]
+
+        def extend():
+            service = OpsService(ArrayGeomRepo())
+            service.repo.add_segments(segs)
+            return service.extend_segments(refs, 200.0)
+
+        changed = benchmark.pedantic(extend, rounds=3)
+        assert len(changed) > 5_000
+        # Baseline: ~0.2-0.5 seconds, including the first index build
+
 
 # Performance regression thresholds (percentages)
 PERFORMANCE_THRESHOLDS = {
@@ -0,0 +1,90 @@
+import pytest
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from app.coverage import MANUAL, CoverageOverlayItem, coverage_overlay, rebuild_overlay
+from app.device import DeviceItem
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def _strobe(x, y, radius_ft=10.0):
+    it = DeviceItem(x, y, "S", "Strobe")
+    it.set_coverage({"mode": "strobe", "computed_radius_ft": radius_ft, "px_per_ft": 1.0})
+    return it
+
+
+def test_devices_share_one_overlay_item(qapp):
+    scene = QtWidgets.QGraphicsScene()
+    layer = QtWidgets.QGraphicsItemGroup()
+    scene.addItem(layer)
+    devices = [_strobe(i * 30, 0) for i in range(200)]
+    for d in devices:
+        d.setParentItem(layer)
+    overlay = coverage_overlay(scene, create=False)
+    assert len(overlay) == 200
+    n_items = len(scene.items())
+
+    for on in (False, True):
+        for d in devices:
+            d.set_coverage_enabled(on)
+        assert len(overlay) == (200 if on else 0)
+        assert len(scene.items()) == n_items  # toggling creates no graphics items
+
+    devices[5].setVisible(False)
+    assert devices[5] not in overlay
+    scene.removeItem(devices[6])
+    assert devices[6] not in overlay and len(overlay) == 198
+    # No shape: clicks and hit tests go through to the items beneath
+    assert scene.items(QtCore.QPointF(3, 3)) == [devices[0]._glyph, devices[0]]
+
+
+def test_move_is_incremental(qapp):
+    scene = QtWidgets.QGraphicsScene()
+    devices = [_strobe(0, 0), _strobe(100, 0)]
+    for d in devices:
+        scene.addItem(d)
+    overlay = coverage_overlay(scene)
+    assert overlay.boundingRect().adjusted(2, 2, -2, -2) == QtCore.QRectF(-10, -10, 120, 20)
+
+    data = overlay._data
+    devices[0].setPos(40, 5)
+    assert overlay._data is data  # updated in place, no rebuild
+    assert overlay.visible_rows(QtCore.QRectF(25, -5, 10, 10))[:, :2].tolist() == [[40.0, 5.0]]
+    devices[0].setPos(-50, 0)
+    assert overlay.boundingRect().left() < -60
+
+
+def test_paint_culls_and_draws(qapp):
+    overlay = CoverageOverlayItem()
+    overlay.set_footprints([(10, 10), (90, 90), (500, 500)], radii=8.0, half_sides=[8, 0, 0])
+    assert len(overlay) == 3
+    assert len(overlay.visible_rows(QtCore.QRectF(0, 0, 100, 100))) == 2
+    overlay.remove(2)
+    overlay.set_footprint("extra", 50, 50, radius=5, style=MANUAL)
+    scene = QtWidgets.QGraphicsScene()
+    scene.addItem(overlay)
+    image = QtGui.QImage(100, 100, QtGui.QImage.Format_ARGB32)
+    image.fill(0)
+    painter = QtGui.QPainter(image)
+    scene.render(painter, QtCore.QRectF(0, 0, 100, 100), QtCore.QRectF(0, 0, 100, 100))
+    painter.end()
+    alpha = [QtGui.qAlpha(image.pixel(p, p)) for p in (10, 50, 90, 30)]
+    assert all(alpha[:3]) and alpha[3] == 0
+
+
+def test_rebuild_overlay_reuses_single_item(qapp):
+    scene = QtWidgets.QGraphicsScene()
+    devices_group = QtWidgets.QGraphicsItemGroup()
+    overlay_group = QtWidgets.QGraphicsItemGroup()
+    scene.addItem(devices_group)
+    scene.addItem(overlay_group)
+    for i in range(50):
+        QtWidgets.QGraphicsRectItem(i * 10, 0, 4, 4).setParentItem(devices_group)
+    first = rebuild_overlay(devices_group, overlay_group, size=20.0)
+    second = rebuild_overlay(devices_group, overlay_group, size=20.0)
+    assert first is second and overlay_group.childItems() == [first]
+    rows = first.visible_rows(first.boundingRect())
+    assert len(rows) == 50 and rows[0, :4].tolist() == [2.0, 2.0, 7.0, 10.0]
@@ -1,6 +1,7 @@
 # tests/test_db_loader.py
 import sqlite3
 import unittest
+import unittest.mock
 
 from db import loader
 
@@ -51,6 +52,116 @@ class TestDbLoader(unittest.TestCase):
         self.assertEqual(loader.strobe_radius_for_candela(self.con, 30), 20.0)
         self.assertEqual(loader.strobe_radius_for_candela(self.con, 75), 30.0)
 
+    def _add(self, name, symbol, model, mfr="Acme", type_code="Detector", notes=None):
+        cur = self.con.cursor()
+        t_id = loader._id_for(cur, "device_types", "code", type_code)
+        m_id = loader._id_for(cur, "manufacturers", "name", mfr)
+        cur.execute(
+            "INSERT INTO devices(manufacturer_id,type_id,model,name,symbol) VALUES(?,?,?,?,?)",
+            (m_id, t_id, model, name, symbol),
+        )
+        did = cur.lastrowid
+        if notes:
+            cur.execute("INSERT INTO device_specs(device_id, notes) VALUES(?,?)", (did, notes))
+        return did
+
+    def test_search_devices_ranked_prefix_match(self):
+        """Name matches outrank manufacturer matches; words match by prefix."""
+        strobe = self._add("Strobe 75cd", "S", "STR-75", mfr="Smokey", type_code="Notif")
+        smoke = self._add("Smoke Detector", "SD", "2W-B")
+        self._add("Pull Station", "PS", "MS-1")
+        hits = loader.search_devices(self.con, "smok")
+        self.assertEqual([d["id"] for d in hits], [smoke, strobe])
+        self.assertEqual(hits[0]["part_number"], "2W-B")
+        self.assertEqual([d["id"] for d in loader.search_devices(self.con, "2w")], [smoke])
+        self.assertEqual(
+            [d["id"] for d in loader.search_devices(self.con, "smok", {"type": "Notif"})],
+            [strobe],
+        )
+        self.assertEqual(len(loader.search_devices(self.con, "smoke OR pull")), 3)
+        self.assertEqual(len(loader.search_devices(self.con, "", limit=2)), 2)
+
+    def test_search_index_follows_updates(self):
+        """Triggers keep the index in sync with devices, specs and manufacturers."""
+        did = self._add("Heat Detector", "HD", "H-1", notes="rate of rise")
+        self.assertEqual([d["id"] for d in loader.search_devices(self.con, "rise")], [did])
+        self.con.execute("UPDATE device_specs SET notes='fixed temp' WHERE device_id=?", (did,))
+        self.assertEqual(loader.search_devices(self.con, "rise"), [])
+        self.con.execute("UPDATE manufacturers SET name='Zeta' WHERE name='Acme'")
+        self.assertEqual([d["id"] for d in loader.search_devices(self.con, "zeta")], [did])
+        self.con.execute("UPDATE devices SET name='Thermal' WHERE id=?", (did,))
+        self.assertEqual([d["id"] for d in loader.search_devices(self.con, "thermal")], [did])
+        self.con.execute("DELETE FROM devices WHERE id=?", (did,))
+        self.assertEqual(loader.search_devices(self.con, "thermal"), [])
+
+    def test_search_index_built_for_existing_rows(self):
+        """Creating the index on an existing catalog indexes its devices."""
+        did = self._add("Speaker", "SPK", "SP-1")
+        self.con.execute(f"DROP TABLE {loader.SEARCH_TABLE}")
+        for trig in ("devices_fts_ai", "devices_fts_au", "devices_fts_ad"):
+            self.con.execute(f"DROP TRIGGER {trig}")
+        self.assertTrue(loader.ensure_search_index(self.con))
+        self.assertEqual([d["id"] for d in loader.search_devices(self.con, "speak")], [did])
+
+    def test_migrate_adds_device_indexes_once(self):
+        """Migrations run once per database and are recorded in user_version."""
+        self.assertEqual(loader.schema_version(self.con), loader.SCHEMA_VERSION)
+        names = {
+            r[0] for r in self.con.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        }
+        self.assertIn("idx_devices_type", names)
+        self.con.execute("DROP INDEX idx_devices_type")
+        self.assertEqual(loader.migrate(self.con), loader.SCHEMA_VERSION)
+        self.assertIsNone(
+            self.con.execute("SELECT 1 FROM sqlite_master WHERE name='idx_devices_type'").fetchone()
+        )
+
+    def test_failed_migration_rolls_back(self):
+        """A failing step leaves neither its changes nor a new user_version."""
+        self.con.execute("PRAGMA user_version = 0")
+        self.con.execute("DROP INDEX idx_devices_type")
+        broken = ((1, ("CREATE INDEX idx_devices_type ON devices(type_id)", "NOT SQL")),)
+        with unittest.mock.patch.object(loader, "MIGRATIONS", broken):
+            with self.assertRaises(sqlite3.OperationalError):
+                loader.migrate(self.con)
+        self.assertEqual(loader.schema_version(self.con), 0)
+        self.assertIsNone(
+            self.con.execute("SELECT 1 FROM sqlite_master WHERE name='idx_devices_type'").fetchone()
+        )
+
+    def test_current_schema_skips_ddl(self):
+        """A current database costs one PRAGMA read and no writes."""
+        statements = []
+        self.con.set_trace_callback(statements.append)
+        self.assertFalse(loader.ensure_schema(self.con))
+        self.con.set_trace_callback(None)
+        self.assertEqual(statements, ["PRAGMA user_version"])
+
+    def test_unversioned_catalog_is_upgraded_in_place(self):
+        """Catalogs created before versioning keep their rows and gain indexes."""
+        con = sqlite3.connect(":memory:")
+        con.row_factory = sqlite3.Row
+        for sql in loader.MIGRATIONS[0][1][:4]:
+            con.execute(sql)
+        con.execute("INSERT INTO devices(name, symbol) VALUES('Old Strobe', 'S')")
+        self.assertTrue(loader.ensure_schema(con))
+        self.assertEqual(loader.schema_version(con), loader.SCHEMA_VERSION)
+        self.assertEqual([d["name"] for d in loader.search_devices(con, "strobe")], ["Old Strobe"])
+        self.assertEqual(loader.strobe_radius_for_candela(con, 75), 30.0)
+        con.close()
+
+    def test_initialize_database_seeds_only_new_catalogs(self):
+        """initialize_database seeds once; a current catalog is left untouched."""
+        from db import connection
+
+        with unittest.mock.patch.object(loader, "seed_demo") as seed:
+            connection.close_connection()
+            connection.initialize_database(in_memory=True)
+            con = connection.get_connection()
+            self.assertEqual(seed.call_count, 1)
+            self.assertFalse(loader.ensure_schema(con))
+            connection.close_connection()
+
 
 if __name__ == "__main__":
     unittest.main()
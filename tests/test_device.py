@@ -0,0 +1,40 @@
+import pytest
+from PySide6 import QtWidgets
+
+from app.coverage import AUTO, coverage_overlay
+from app.device import DeviceItem, apply_coverage
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_apply_coverage_updates_scene_once(qapp):
+    scene = QtWidgets.QGraphicsScene()
+    view = QtWidgets.QGraphicsView(scene)
+    items = [DeviceItem(i * 50, 0, "S", f"Strobe {i}") for i in range(3)]
+    for it in items:
+        scene.addItem(it)
+    updates = []
+    scene.changed.connect(updates.append)
+    cov = {"source": "auto", "mode": "strobe", "computed_radius_ft": 10.0, "px_per_ft": 2.0}
+
+    assert apply_coverage(items, [cov, None, dict(cov, mode="smoke")]) == 2
+    assert view.updatesEnabled()
+    overlay = coverage_overlay(scene, create=False)
+    rows = overlay.visible_rows(overlay.boundingRect())
+    assert rows.tolist() == [[0.0, 0.0, 20.0, 20.0, AUTO], [100.0, 0.0, 20.0, 0.0, AUTO]]
+    assert items[1].coverage["mode"] == "none" and items[1] not in overlay
+    qapp.processEvents()
+    assert len(updates) == 1
+
+
+def test_device_apply_json_matches_from_json(qapp):
+    src = DeviceItem(30, 40, "H", "Horn", "Acme", "H-1")
+    src.set_coverage({"mode": "strobe", "computed_radius_ft": 10.0, "px_per_ft": 2.0})
+    src.set_coverage_enabled(False)
+    it = DeviceItem(0, 0, "S", "Strobe")
+    it.apply_json(src.to_json())
+    assert it.to_json() == src.to_json()
+    assert it._label.text() == "Horn"
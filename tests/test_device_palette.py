@@ -0,0 +1,112 @@
+import sqlite3
+
+import pytest
+from PySide6 import QtWidgets
+from PySide6.QtCore import QModelIndex, Qt
+
+from app.device_palette import CatalogSource, DeviceCatalogModel, ListSource, make_palette_view
+from db import loader
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(":memory:")
+    con.row_factory = sqlite3.Row
+    loader.ensure_schema(con)
+    cur = con.cursor()
+    for code, n in (("Detector", 450), ("Strobe", 30)):
+        t_id = loader._id_for(cur, "device_types", "code", code)
+        m_id = loader._id_for(cur, "manufacturers", "name", "Acme")
+        cur.executemany(
+            "INSERT INTO devices(manufacturer_id,type_id,model,name,symbol) VALUES(?,?,?,?,?)",
+            [(m_id, t_id, f"{code[:3]}-{i:03d}", f"{code} {i:03d}", code[0]) for i in range(n)],
+        )
+    cur.execute("INSERT INTO devices(name, symbol, model) VALUES('Loose part', 'X', 'LP-1')")
+    con.commit()
+    yield con
+    con.close()
+
+
+def _groups(model):
+    return {
+        model.index(r, 0).data(): model.index(r, 0) for r in range(model.rowCount(QModelIndex()))
+    }
+
+
+def test_pages_load_on_demand(qapp, con):
+    model = DeviceCatalogModel(CatalogSource(con), page_size=200)
+    groups = _groups(model)
+    assert set(groups) == {"Detector (450)", "Strobe (30)", "Unknown (1)"}
+    assert model.match_count() == 481 and model.loaded_count() == 0
+
+    detectors = groups["Detector (450)"]
+    assert model.hasChildren(detectors) and model.rowCount(detectors) == 0
+    model.fetchMore(detectors)
+    assert model.rowCount(detectors) == 200 and model.canFetchMore(detectors)
+    model.fetchMore(detectors)
+    model.fetchMore(detectors)
+    assert model.rowCount(detectors) == 450 and not model.canFetchMore(detectors)
+    names = [model.index(r, 0, detectors).data(Qt.UserRole)["name"] for r in range(450)]
+    assert names == sorted(names)
+    assert model.index(0, 0, detectors).data() == "Detector 000 (D) - Det-000"
+    assert model.parent(model.index(5, 0, detectors)) == detectors
+
+    model.release(detectors)
+    assert model.rowCount(detectors) == 0 and model.canFetchMore(detectors)
+
+
+def test_query_resets_and_counts_matches(qapp, con):
+    model = DeviceCatalogModel(CatalogSource(con))
+    model.fetchMore(_groups(model)["Strobe (30)"])
+    model.set_query("strobe 01")
+    groups = _groups(model)
+    assert set(groups) == {"Strobe (10)"}
+    assert model.loaded_count() == 0
+    model.set_query("", {"type": "Strobe"})
+    assert set(_groups(model)) == {"Strobe (30)"}
+
+
+def test_list_source_matches_catalog_source(qapp, con):
+    devices = [dict(d) for d in loader.fetch_devices(con)]
+    for d in devices:
+        d["type"] = d["type"] or None
+    db_model = DeviceCatalogModel(CatalogSource(con))
+    list_model = DeviceCatalogModel(ListSource(devices))
+    assert set(_groups(list_model)) == set(_groups(db_model))
+    list_model.set_query("Det-04")
+    assert set(_groups(list_model)) == {"Detector (10)"}
+
+
+def test_view_fetches_expanded_group_only(qapp, con):
+    view, model, proxy = make_palette_view(CatalogSource(con))
+    view.resize(300, 400)
+    assert [proxy.index(r, 0).data() for r in range(proxy.rowCount())] == [
+        "Detector (450)",
+        "Strobe (30)",
+        "Unknown (1)",
+    ]
+    strobes = proxy.index(1, 0)
+    view.expand(strobes)
+    qapp.processEvents()
+    assert model.loaded_count() == 30
+    view.collapse(strobes)
+    assert model.loaded_count() == 0
+    model.set_query("nothing matches this")
+    assert proxy.rowCount() == 0
+
+
+def test_catalog_search_is_filtered_and_limited(con, monkeypatch):
+    from app import catalog
+
+    monkeypatch.setattr(catalog.db_connection, "get_connection", lambda: con)
+    rows = catalog.search_devices("det-04", {"manufacturer": "Acme", "type": "Detector"}, limit=3)
+    assert [d["name"] for d in rows] == ["Detector 040", "Detector 041", "Detector 042"]
+    assert catalog.search_devices("det", {"type": "Strobe"}) == []
+
+    con.execute("DELETE FROM devices")
+    assert catalog.search_devices("det") is None  # empty catalog: scan the loaded devices
@@ -0,0 +1,130 @@
+import pytest
+from PySide6 import QtGui, QtWidgets
+
+import app.dxf_cache as dxf_cache
+import app.dxf_import as dxf_import
+from app.dxf_cache import DxfCache, path_polylines, polylines_path
+
+
+def _write_dxf(path, n_lines=20):
+    ezdxf = pytest.importorskip("ezdxf")
+    doc = ezdxf.new()
+    doc.header["$INSUNITS"] = 2  # feet
+    doc.layers.add("WALLS", color=1)
+    msp = doc.modelspace()
+    for i in range(n_lines):
+        msp.add_line((i, 0), (i, 10), dxfattribs={"layer": "WALLS"})
+    msp.add_lwpolyline([(0, 0), (5, 0), (5, 5)], dxfattribs={"layer": "0"})
+    doc.saveas(path)
+    return str(path)
+
+
+def _scene_group():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    scene = QtWidgets.QGraphicsScene()
+    group = QtWidgets.QGraphicsItemGroup()
+    scene.addItem(group)
+    return app, scene, group
+
+
+def _run(job):
+    job.start()
+    assert job.wait(timeout=30)
+    while job.poll():
+        pass
+    assert job.error is None
+    return job
+
+
+def _layer_polylines(group):
+    out = {}
+    for grp in group.childItems():
+        polys = []
+        for it in grp.childItems():
+            polys.extend(path_polylines(it.mapToScene(it.path())))
+        out[grp.data(2001)] = sorted(polys)
+    return out
+
+
+def test_save_and_open_round_trip(tmp_path):
+    path = QtGui.QPainterPath()
+    path.moveTo(0, 0)
+    path.lineTo(10, 0)
+    path.lineTo(10, 5)
+    path.moveTo(-3, 2.5)
+    path.lineTo(4, 4)
+    cache = DxfCache(str(tmp_path))
+    cache.save("k", {"A": ("#ff0000", [path]), "EMPTY": ("#ffffff", [])})
+    with cache.open("k") as cached:
+        layers = {name: (color, polylines_path(r, p)) for name, color, r, p in cached.layers()}
+    assert layers["A"][0] == "#ff0000"
+    assert path_polylines(layers["A"][1]) == path_polylines(path)
+    assert layers["EMPTY"][1].isEmpty()
+
+
+def test_key_depends_on_content_and_scale(tmp_path):
+    f = tmp_path / "a.dxf"
+    f.write_bytes(b"one")
+    cache = DxfCache(str(tmp_path))
+    k1 = cache.key(str(f), 12.0)
+    assert cache.key(str(f), 12.0) == k1
+    assert cache.key(str(f), 24.0) != k1
+    f.write_bytes(b"two")
+    assert cache.key(str(f), 12.0) != k1
+
+
+def test_corrupt_file_is_a_miss(tmp_path):
+    cache = DxfCache(str(tmp_path))
+    with open(cache.path_for("bad"), "wb") as f:
+        f.write(b"not a cache file at all")
+    assert cache.open("bad") is None
+    assert cache.open("missing") is None
+
+
+def test_other_byte_order_is_a_miss(tmp_path):
+    path = QtGui.QPainterPath()
+    path.moveTo(0, 0)
+    path.lineTo(1, 1)
+    cache = DxfCache(str(tmp_path))
+    cache.save("k", {"A": ("#ffffff", [path])})
+    with open(cache.path_for("k"), "r+b") as f:
+        f.seek(8)  # magic, version
+        assert f.read(1) == dxf_cache.BYTE_ORDER
+        f.seek(8)
+        f.write(b">" if dxf_cache.BYTE_ORDER == b"<" else b"<")
+    assert cache.open("k") is None
+
+
+def test_prune_keeps_size_budget(tmp_path):
+    path = QtGui.QPainterPath()
+    path.moveTo(0, 0)
+    for i in range(200):
+        path.lineTo(i, i % 7)
+    cache = DxfCache(str(tmp_path), max_bytes=5000)
+    for k in ("a", "b", "c"):
+        cache.save(k, {"L": ("#ffffff", [path])})
+    assert cache.open("a") is None
+    with cache.open("c") as cached:
+        assert len(cached.table) == 1
+
+
+def test_import_job_reuses_cache(tmp_path):
+    dxf = _write_dxf(tmp_path / "plan.dxf")
+    cache = DxfCache(str(tmp_path / "cache"))
+    app, scene, group = _scene_group()
+    _run(dxf_import.DxfImportJob(dxf, group, 12.0, batch_size=5, cache=cache))
+    first = _layer_polylines(group)
+    assert len(first["WALLS"]) == 20
+    with cache.open(cache.key(dxf, 12.0)) as cached:
+        assert {e["name"] for e in cached.table} == {"WALLS", "0"}
+
+    def fail(path):
+        raise AssertionError("DXF parsed despite cache hit")
+
+    dxf_import._read_doc, orig = fail, dxf_import._read_doc
+    try:
+        job = _run(dxf_import.DxfImportJob(dxf, group, 12.0, cache=cache))
+    finally:
+        dxf_import._read_doc = orig
+    assert _layer_polylines(group) == first
+    assert set(job.layer_groups) == {"WALLS", "0"}
@@ -89,3 +89,103 @@ class TestDXFImport:
                 pytest.skip("ezdxf not available in test environment")
             else:
                 raise
+
+    def _write_dxf(self, path, n_lines=50):
+        ezdxf = pytest.importorskip("ezdxf")
+        doc = ezdxf.new()
+        doc.header["$INSUNITS"] = 2  # feet
+        doc.layers.add("WALLS", color=1)
+        msp = doc.modelspace()
+        for i in range(n_lines):
+            msp.add_line((i, 0), (i, 10), dxfattribs={"layer": "WALLS"})
+        msp.add_circle((5, 5), 1, dxfattribs={"layer": "0"})
+        doc.saveas(path)
+        return str(path)
+
+    def _scene_group(self):
+        from PySide6 import QtWidgets
+
+        self._app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        scene = QtWidgets.QGraphicsScene()
+        group = QtWidgets.QGraphicsItemGroup()
+        scene.addItem(group)
+        return scene, group
+
+    def test_import_job_streams_batches_per_layer(self, tmp_path):
+        path = self._write_dxf(tmp_path / "plan.dxf")
+        scene, group = self._scene_group()
+        job = dxf_import.DxfImportJob(path, group, 12.0, batch_size=10).start()
+        assert job.wait(timeout=30)
+        while job.poll():
+            pass
+        assert job.error is None and job.progress == 1.0
+        assert set(job.layer_groups) == {"WALLS", "0"}
+        # 51 entities in batches of 10 -> WALLS arrives as several path chunks
+        assert len(job.layer_groups["WALLS"].childItems()) > 1
+        assert job.layer_groups["WALLS"].data(2002) == "#ff0000"
+        assert job.bounds.width() == pytest.approx(49 * 12.0)
+
+    def test_import_job_cancel_removes_partial_layers(self, tmp_path):
+        path = self._write_dxf(tmp_path / "plan.dxf")
+        scene, group = self._scene_group()
+        job = dxf_import.DxfImportJob(path, group, 12.0, batch_size=10).start()
+        job.wait(timeout=30)
+        job.poll(budget_s=0.0)
+        job.cancel()
+        assert not job.poll()
+        assert job.cancelled and job.layer_groups == {}
+        assert group.childItems() == []
+
+    def _block_doc(self, placements=((0, 1), (90, 2), (30, 0.75), (180, 0.5))):
+        ezdxf = pytest.importorskip("ezdxf")
+        doc = ezdxf.new()
+        doc.header["$INSUNITS"] = 2  # feet
+        blk = doc.blocks.new("DOOR", base_point=(1, 1))
+        blk.add_line((1, 1), (4, 1), dxfattribs={"layer": "DOORS"})
+        blk.add_lwpolyline([(1, 1), (1, 4), (4, 4)], dxfattribs={"layer": "DOORS"})
+        msp = doc.modelspace()
+        for i, (rot, sx) in enumerate(placements):
+            msp.add_blockref(
+                "DOOR", (10 * i, 5), dxfattribs={"rotation": rot, "xscale": sx, "yscale": 1.5}
+            )
+        return doc
+
+    def test_insert_stamping_matches_virtual_entities(self):
+        doc = self._block_doc()
+        ref = dxf_import._PathBuilder(doc, 12.0)
+        for e in doc.modelspace():
+            for ve in e.virtual_entities():
+                ref.emit(ve)
+        expected = ref.take()["DOORS"][0]
+        builder = dxf_import._PathBuilder(doc, 12.0)
+        for e in doc.modelspace():
+            builder.emit(e)
+        got = builder.take()["DOORS"][0]
+        assert list(builder._blocks) == ["DOOR"]  # flattened once for 4 inserts
+        exp_pts = [(p.x(), p.y()) for poly in expected.toSubpathPolygons() for p in poly]
+        got_pts = [(p.x(), p.y()) for poly in got.toSubpathPolygons() for p in poly]
+        assert len(got_pts) == len(exp_pts)
+        for (gx, gy), (ex, ey) in zip(got_pts, exp_pts):
+            assert gx == pytest.approx(ex, abs=1e-6) and gy == pytest.approx(ey, abs=1e-6)
+
+    def test_mirrored_insert_stays_at_insertion_point(self):
+        # virtual_entities() yields OCS points with a flipped extrusion for
+        # mirrored inserts; the stamped block path is placed in WCS directly.
+        doc = self._block_doc(placements=((0, -1),))
+        builder = dxf_import._PathBuilder(doc, 12.0)
+        for e in doc.modelspace():
+            builder.emit(e)
+        rect = builder.take()["DOORS"][0].boundingRect()
+        assert rect.right() == pytest.approx(0.0)
+        assert rect.left() == pytest.approx(-3 * 12.0)
+        assert rect.top() == pytest.approx(-(5 + 4.5) * 12.0)
+
+    def test_block_instances_share_block_path(self):
+        doc = self._block_doc()
+        batches = list(dxf_import._iter_path_batches(doc, 12.0, block_instances=True))
+        _, _, packs, instances = batches[-1]
+        assert "DOORS" not in packs
+        pen, color, placed = instances["DOORS"]
+        assert len(placed) == 4
+        assert all(p is placed[0][0] for p, _ in placed)
+        assert len({(tr.m11(), tr.m12(), tr.dx()) for _, tr in placed}) == 4
@@ -0,0 +1,72 @@
+import pytest
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from app.dxf_tiles import TiledPathItem, TileSet
+
+
+def _grid_path(n=20, step=100.0):
+    path = QtGui.QPainterPath()
+    for i in range(n + 1):
+        path.moveTo(i * step, 0)
+        path.lineTo(i * step, n * step)
+        path.moveTo(0, i * step)
+        path.lineTo(n * step, i * step)
+    return path
+
+
+def _elements(path):
+    return path.elementCount()
+
+
+def test_segments_are_bucketed_by_midpoint_into_tiles():
+    tiles = TileSet(_grid_path(n=4, step=100.0), tile=256.0)
+    # 400x400 drawing, tiles of 256 -> 2x2 tiles
+    assert len(tiles) == 4
+    everything = tiles.visible(QtCore.QRectF(-10, -10, 1000, 1000))
+    assert everything == [0, 1, 2, 3]
+    corner = tiles.visible(QtCore.QRectF(10, 10, 20, 20))
+    assert len(corner) == 1
+    bounds = tiles.tiles[corner[0]][0]
+    assert bounds.contains(QtCore.QPointF(10, 10))
+
+
+def test_coarse_levels_drop_sub_tolerance_detail():
+    path = QtGui.QPainterPath()
+    # A long wall and a tiny circle-ish polyline
+    path.moveTo(0, 0)
+    path.lineTo(400, 0)
+    path.addEllipse(QtCore.QRectF(100, 100, 2, 2))
+    tiles = TileSet(path, tile=1024.0, tolerances=(1.0, 16.0))
+    _, levels = tiles.tiles[0]
+    full, fine, coarse = levels
+    assert _elements(fine) < _elements(full)
+    # At 16 units the 2-unit ellipse disappears and only the wall remains
+    assert _elements(coarse) == 2
+    assert coarse.boundingRect().width() == pytest.approx(400.0)
+
+
+def test_level_for_picks_coarser_levels_when_zoomed_out():
+    tiles = TileSet(_grid_path(n=2), tolerances=(1.0, 4.0, 16.0))
+    assert tiles.level_for(1.0) == 0
+    assert tiles.level_for(0.5) == 1
+    assert tiles.level_for(0.1) == 2
+    assert tiles.level_for(0.01) == 3
+
+
+def test_tiled_item_paints_like_a_path_item():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    path = _grid_path(n=10, step=50.0)
+    images = []
+    for cls in (QtWidgets.QGraphicsPathItem, TiledPathItem):
+        scene = QtWidgets.QGraphicsScene(0, 0, 500, 500)
+        item = cls(path)
+        item.setPen(QtGui.QPen(QtGui.QColor("black"), 0))
+        scene.addItem(item)
+        img = QtGui.QImage(250, 250, QtGui.QImage.Format_ARGB32)
+        img.fill(QtGui.QColor("white"))
+        painter = QtGui.QPainter(img)
+        scene.render(painter, QtCore.QRectF(0, 0, 250, 250), QtCore.QRectF(0, 0, 500, 500))
+        painter.end()
+        images.append(img)
+    assert app is not None
+    assert images[0] == images[1]
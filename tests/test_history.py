@@ -0,0 +1,63 @@
+from app.history import History, HistoryEntry, diff_items, diff_state
+
+
+def _move(uid, before, after, stamp):
+    return HistoryEntry({uid: ("sketch", before, after)}, coalesce=True, stamp=stamp)
+
+
+def test_diff_items_reports_created_modified_and_removed():
+    before = {"a": ("devices", "1"), "b": ("wires", "2")}
+    after = {"a": ("devices", "1b"), "c": ("sketch", "3")}
+    assert diff_items(before, after) == {
+        "a": ("devices", "1", "1b"),
+        "b": ("wires", "2", None),
+        "c": ("sketch", None, "3"),
+    }
+    assert diff_state({"grid": 6, "snap": True}, {"grid": 8, "snap": True}) == {"grid": (6, 8)}
+
+
+def test_undo_redo_walks_entries_and_push_truncates_redo_branch():
+    h = History()
+    assert not h.push(HistoryEntry())
+    h.push(HistoryEntry({"a": ("devices", None, "1")}))
+    h.push(HistoryEntry({"a": ("devices", "1", "2")}))
+    assert h.undo().items["a"][1] == "1"
+    assert h.can_redo()
+    h.push(HistoryEntry({"b": ("wires", None, "x")}))
+    assert not h.can_redo()
+    assert len(h) == 2
+    assert set(h.undo().items) == {"b"}
+    assert set(h.undo().items) == {"a"}
+    assert h.undo() is None
+    assert set(h.redo().items) == {"a"}
+
+
+def test_drag_moves_coalesce_within_window():
+    h = History(coalesce_window_s=1.0)
+    h.push(_move("a", "p0", "p1", stamp=10.0))
+    h.push(_move("a", "p1", "p2", stamp=10.5))
+    h.push(_move("a", "p2", "p3", stamp=20.0))
+    assert len(h) == 2
+    assert h.undo().items["a"] == ("sketch", "p2", "p3")
+    assert h.undo().items["a"] == ("sketch", "p0", "p2")
+
+
+def test_coalescing_can_be_disabled():
+    h = History(coalesce_moves=False)
+    h.push(_move("a", "p0", "p1", stamp=1.0))
+    h.push(_move("a", "p1", "p2", stamp=1.1))
+    assert len(h) == 2
+
+
+def test_memory_cap_drops_oldest_entries():
+    big = "x" * 1000
+    h = History(max_bytes=5000)
+    for i in range(20):
+        h.push(HistoryEntry({str(i): ("sketch", None, big)}))
+    assert h.nbytes <= 5000
+    assert 1 <= len(h) < 20
+    undone = []
+    while (entry := h.undo()) is not None:
+        undone.extend(entry.items)
+    assert undone[0] == "19"
+    assert "0" not in undone
@@ -0,0 +1,125 @@
+from PySide6 import QtGui, QtWidgets
+
+from app.intersection_cache import IntersectionCache
+
+
+def _cross(cache, *items):
+    for it in items:
+        cache.add_item(it)
+    cache.flush()
+    cache.wait()
+
+
+def test_line_crosses_path_polyline():
+    cache = IntersectionCache(tile=16.0)
+    line = QtWidgets.QGraphicsLineItem(0, 5, 40, 5)
+    path = QtGui.QPainterPath()
+    path.moveTo(10, 0)
+    path.lineTo(10, 10)
+    path.lineTo(30, 10)
+    path.lineTo(30, 0)
+    poly = QtWidgets.QGraphicsPathItem(path)
+    _cross(cache, line, poly)
+    hits = cache.query(10.5, 5.0, 2.0)
+    assert hits and hits[0][1:] == (10.0, 5.0)
+    assert cache.query(30.0, 5.0, 1.0)
+    # polyline corners are shared vertices, not intersections
+    assert cache.query(10.0, 10.0, 0.5) == []
+
+
+def test_removed_item_invalidates_its_tiles():
+    cache = IntersectionCache(tile=16.0, background=False)
+    a = QtWidgets.QGraphicsLineItem(0, 0, 10, 10)
+    b = QtWidgets.QGraphicsLineItem(0, 10, 10, 0)
+    _cross(cache, a, b)
+    assert cache.query(5, 5, 1)
+    cache.remove_item(b)
+    cache.flush()
+    assert cache.query(5, 5, 1) == []
+
+
+def test_persisted_table_is_reused(tmp_path, monkeypatch):
+    path = str(tmp_path / "ints.json")
+    first = IntersectionCache(tile=16.0, path=path)
+    a = QtWidgets.QGraphicsLineItem(0, 0, 10, 10)
+    b = QtWidgets.QGraphicsLineItem(0, 10, 10, 0)
+    _cross(first, a, b)
+    first.save(path)
+
+    second = IntersectionCache(tile=16.0, background=False, path=path)
+    monkeypatch.setattr(second, "_build", lambda cell, segs: (_ for _ in ()).throw(AssertionError))
+    _cross(second, a, b)
+    assert second.query(5, 5, 1)
+
+
+def test_other_drawings_tables_survive_until_evicted(tmp_path, monkeypatch):
+    from app import intersection_cache
+
+    path = str(tmp_path / "ints.json")
+    drawing_a = [
+        QtWidgets.QGraphicsLineItem(0, 0, 10, 10),
+        QtWidgets.QGraphicsLineItem(0, 10, 10, 0),
+    ]
+    drawing_b = [
+        QtWidgets.QGraphicsLineItem(100, 0, 110, 10),
+        QtWidgets.QGraphicsLineItem(100, 10, 110, 0),
+    ]
+    for drawing in (drawing_a, drawing_b):
+        cache = IntersectionCache(tile=16.0, background=False, path=path)
+        _cross(cache, *drawing)
+        cache.save(path)
+
+    # Reopening A after B still finds A's tile on disk
+    reopened = IntersectionCache(tile=16.0, background=False, path=path)
+    monkeypatch.setattr(
+        reopened, "_build", lambda cell, segs: (_ for _ in ()).throw(AssertionError)
+    )
+    _cross(reopened, *drawing_a)
+    assert reopened.query(5, 5, 1)
+
+    # With room for one tile, the least recently used (B's) is dropped
+    monkeypatch.setattr(intersection_cache, "MAX_STORED_TILES", 1)
+    reopened.save(path)
+    assert len(IntersectionCache(tile=16.0, background=False, path=path)._stored) == 1
+    last = IntersectionCache(tile=16.0, background=False, path=path)
+    monkeypatch.setattr(last, "_build", lambda cell, segs: (_ for _ in ()).throw(AssertionError))
+    _cross(last, *drawing_a)
+    assert last.query(5, 5, 1)
+
+
+def test_dense_tiles_use_grid_engine(monkeypatch):
+    from app import intersection_cache
+
+    lines = [QtWidgets.QGraphicsLineItem(0, y, 100, y) for y in range(2, 100, 5)]
+    lines += [QtWidgets.QGraphicsLineItem(x, 0, x, 100) for x in range(3, 100, 5)]
+    found = []
+    for threshold in (10_000, 0):
+        monkeypatch.setattr(intersection_cache, "GRID_ENGINE_MIN", threshold)
+        cache = IntersectionCache(tile=128.0, background=False)
+        _cross(cache, *lines)
+        found.append(sorted(h[1:] for h in cache.query(50, 50, 100)))
+    assert found[0] == found[1] and len(found[0]) == 400
+
+
+def test_saves_are_debounced_until_idle(tmp_path, monkeypatch):
+    from app import intersection_cache
+
+    monkeypatch.setattr(intersection_cache, "SAVE_DELAY", 60.0)
+    path = str(tmp_path / "ints.json")
+    cache = IntersectionCache(tile=16.0, path=path)
+    saves = []
+    save = cache.save
+    monkeypatch.setattr(cache, "save", lambda p: saves.append(p) or save(p))
+    for i in range(3):  # e.g. successive drag steps
+        _cross(
+            cache,
+            QtWidgets.QGraphicsLineItem(i * 64, 0, i * 64 + 10, 10),
+            QtWidgets.QGraphicsLineItem(i * 64, 10, i * 64 + 10, 0),
+        )
+    assert saves == []
+
+    cache.close()
+    assert saves == [path]
+    assert len(IntersectionCache(tile=16.0, background=False, path=path)._stored) == 3
+    cache.close()  # nothing new since the last write
+    assert saves == [path]
@@ -0,0 +1,247 @@
+import copy
+from pathlib import Path
+
+import pytest
+from PySide6 import QtWidgets
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def win(qapp, tmp_path, monkeypatch):
+    # tests/frontend would otherwise shadow the real frontend package
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parents[1]))
+    main = pytest.importorskip("app.main")
+
+    # Keep prefs, caches and the catalog database out of the real home
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for name, sub in (
+        ("PREF_DIR", ""),
+        ("PREF_PATH", "preferences.json"),
+        ("LOG_DIR", "logs"),
+        ("CACHE_DIR", "cache"),
+    ):
+        monkeypatch.setattr(main, name, str(tmp_path / "LV_CAD" / sub))
+    w = main.MainWindow()
+    yield w
+    w.close()
+
+
+DEVICE = {"id": "dev", "x": 10.0, "y": 20.0, "symbol": "S", "name": "Strobe"}
+WIRE = {"id": "wire", "ax": 0.0, "ay": 0.0, "bx": 50.0, "by": 0.0}
+SKETCH = [
+    {"id": "line", "type": "line", "x1": 0.0, "y1": 0.0, "x2": 10.0, "y2": 10.0},
+    {"id": "rect", "type": "rect", "x": 5.0, "y": 5.0, "w": 20.0, "h": 10.0},
+    {"id": "circle", "type": "circle", "x": 40.0, "y": 40.0, "r": 6.0},
+    {"id": "poly", "type": "poly", "pts": [{"x": 0.0, "y": 0.0}, {"x": 5.0, "y": 9.0}]},
+    {"id": "text", "type": "text", "x": 3.0, "y": 4.0, "text": "Lobby"},
+]
+
+
+def _load(win, **layers):
+    data = {**win.serialize_state(), "devices": [], "wires": [], "sketch": []}
+    data.update(copy.deepcopy(layers))
+    win.load_state(data)
+    return win.serialize_state()
+
+
+def _live(win):
+    """uid -> item for everything on the tracked layers."""
+    return {
+        win._item_uid(it): it for grp in win._tracked_layers().values() for it in grp.childItems()
+    }
+
+
+def _by_id(state, layer):
+    return {d["id"]: d for d in state[layer]}
+
+
+def test_matched_items_are_updated_in_place(win, monkeypatch):
+    state = _load(win, devices=[DEVICE], wires=[WIRE], sketch=SKETCH)
+    before = _live(win)
+    reconciled = []
+    original = win._reconcile_item
+    monkeypatch.setattr(
+        win,
+        "_reconcile_item",
+        lambda layer, it, d: reconciled.append(d["id"]) or original(layer, it, d),
+    )
+
+    _by_id(state, "devices")["dev"]["x"] = 99.0
+    _by_id(state, "sketch")["line"]["x2"] = 30.0
+    win.load_state(state)
+
+    # Only the two edited items were reconciled, and both kept their identity
+    assert sorted(reconciled) == ["dev", "line"]
+    assert _live(win) == before
+    assert before["dev"].pos().x() == 99.0
+    assert before["line"].line().x2() == 30.0
+    assert win.serialize_state() == state
+
+
+def test_removed_and_added_ids_are_deleted_and_created(win):
+    state = _load(win, devices=[DEVICE], wires=[WIRE], sketch=SKETCH[:1])
+    before = _live(win)
+    state["wires"] = []
+    state["sketch"].append(dict(SKETCH[1]))
+    win.load_state(state)
+
+    after = _live(win)
+    assert set(after) == {"dev", "line", "rect"}
+    assert before["wire"].scene() is None
+    assert after["dev"] is before["dev"] and after["line"] is before["line"]
+    assert isinstance(after["rect"], QtWidgets.QGraphicsRectItem)
+
+
+def test_changed_sketch_type_replaces_item(win):
+    state = _load(win, sketch=SKETCH[:1])
+    line = _live(win)["line"]
+    state["sketch"] = [dict(SKETCH[1], id="line")]
+    win.load_state(state)
+    rect = _live(win)["line"]
+    assert rect is not line and line.scene() is None
+    assert isinstance(rect, QtWidgets.QGraphicsRectItem)
+
+
+def test_files_without_ids_still_load(win):
+    strip = lambda items: [{k: v for k, v in d.items() if k != "id"} for d in items]  # noqa: E731
+    data = {"devices": strip([DEVICE]), "wires": strip([WIRE]), "sketch": strip(SKETCH)}
+    state = _load(win, **data)
+    assert [len(state[k]) for k in ("devices", "wires", "sketch")] == [1, 1, len(SKETCH)]
+    assert all(d["id"] for layer in ("devices", "wires", "sketch") for d in state[layer])
+
+    # Reloading the same id-less file replaces rather than duplicates
+    again = _load(win, **data)
+    assert [len(again[k]) for k in ("devices", "wires", "sketch")] == [1, 1, len(SKETCH)]
+
+
+def test_sketch_and_wire_items_round_trip(win):
+    state = _load(win, wires=[WIRE], sketch=SKETCH)
+    assert _by_id(state, "wires")["wire"] == WIRE
+    assert [_by_id(state, "sketch")[d["id"]] for d in SKETCH] == SKETCH
+
+    # Dragged items bake their offset into the saved geometry and load back unmoved
+    live = _live(win)
+    live["wire"].setPos(5.0, 5.0)
+    live["line"].setPos(1.0, 2.0)
+    moved = win.serialize_state()
+    assert _by_id(moved, "sketch")["line"]["x1"] == 1.0
+    fresh = _load(win)
+    assert fresh["sketch"] == [] and fresh["wires"] == []
+    assert _load(win, wires=moved["wires"], sketch=moved["sketch"]) == moved
+    live = _live(win)
+    assert live["wire"].pos().isNull() and live["line"].pos().isNull()
+
+
+def _click(win, x, y):
+    from PySide6 import QtCore
+    from PySide6.QtTest import QTest
+
+    view = win.view
+    QTest.mouseClick(
+        view.viewport(), QtCore.Qt.LeftButton, pos=view.mapFromScene(QtCore.QPointF(x, y))
+    )
+
+
+def test_tool_edits_undo_and_redo_through_the_window(win, monkeypatch):
+    _load(
+        win,
+        sketch=[
+            {"id": "cut", "type": "line", "x1": 50.0, "y1": -50.0, "x2": 50.0, "y2": 50.0},
+            {"id": "target", "type": "line", "x1": 0.0, "y1": 0.0, "x2": 100.0, "y2": 0.0},
+        ],
+    )
+    win.push_history()
+    target = _live(win)["target"]
+    steps = len(win.history)
+
+    # The trim records just the line it changed, without a full scene diff
+    monkeypatch.setattr(win, "_history_snapshot", lambda: pytest.fail("full diff"))
+    pushed = []
+    push = win.history.push
+    monkeypatch.setattr(win.history, "push", lambda entry: pushed.append(entry) or push(entry))
+    win.trim_tool.start()
+    _click(win, 50.0, 30.0)
+    _click(win, 95.0, 0.0)
+    assert target.line().x2() == pytest.approx(50.0)
+    assert len(win.history) == steps + 1
+    assert [set(e.items) for e in pushed if e.items] == [{"target"}]
+
+    win.undo()
+    assert _live(win)["target"] is target
+    assert target.line().x2() == pytest.approx(100.0)
+    win.redo()
+    assert target.line().x2() == pytest.approx(50.0)
+
+    # Deleting the selection is one step; undo brings the line back
+    target.setSelected(True)
+    win.delete_selection()
+    assert "target" not in _live(win)
+    win.undo()
+    assert _live(win)["target"].line().x2() == pytest.approx(50.0)
+
+
+def test_drag_release_refreshes_only_the_selection_snaps(win, monkeypatch):
+    from PySide6 import QtCore
+    from PySide6.QtTest import QTest
+
+    from app.snap_index import SNAP_END
+
+    _load(win, sketch=SKETCH[:1])
+    view = win.view
+    view._sync_snap_index()
+    monkeypatch.setattr(view.snap_index, "sync", lambda items: pytest.fail("full sync"))
+    line = _live(win)["line"]
+    line.setSelected(True)
+    line.setPos(100.0, 0.0)  # as a drag would
+    QTest.mouseRelease(view.viewport(), QtCore.Qt.LeftButton, pos=QtCore.QPoint(5, 5))
+
+    assert not view.snap_index.dirty
+    assert view.snap_index.query(100.5, 0.5, 2.0, {SNAP_END})[0][1:] == (100.0, 0.0)
+    assert not view.snap_index.query(0.5, 0.5, 2.0, {SNAP_END})
+
+
+def test_moving_the_underlay_moves_its_snaps_and_can_be_undone(win):
+    from app.snap_index import SNAP_END
+
+    def snapped(x, y):
+        view._sync_snap_index()
+        hits = view.snap_index.query(x + 0.5, y + 0.5, 2.0, {SNAP_END})
+        return hits[0][1:] if hits else None
+
+    view = win.view
+    QtWidgets.QGraphicsLineItem(0, 0, 10, 0).setParentItem(win.layer_underlay)
+    win.layer_underlay.setPos(100.0, 0.0)
+    win.push_history(changed=[])
+    assert snapped(100.0, 0.0) == (100.0, 0.0)
+
+    win.move_underlay_to_origin()
+    assert snapped(0.0, 0.0) == (0.0, 0.0)
+    assert snapped(100.0, 0.0) is None
+
+    win.undo()
+    assert win.layer_underlay.pos().x() == 100.0
+    assert snapped(100.0, 0.0) == (100.0, 0.0)
+
+
+def test_device_palette_dock_queries_the_lazy_model(win, monkeypatch):
+    assert win.device_tree is win.device_view
+    win._build_left_panel()
+    dock = next(
+        d for d in win.findChildren(QtWidgets.QDockWidget) if d.windowTitle() == "Device Palette"
+    )
+    assert win.device_view in dock.widget().findChildren(QtWidgets.QTreeView)
+    assert not dock.widget().findChildren(QtWidgets.QListWidget)
+    assert win.device_model.loaded_count() == 0  # devices page in only when a type expands
+
+    queries = []
+    set_query = win.device_model.set_query
+    monkeypatch.setattr(
+        win.device_model, "set_query", lambda q, f=None: queries.append((q, f)) or set_query(q, f)
+    )
+    win.search.setText("strobe")
+    win.cmb_type.setCurrentIndex(win.cmb_type.count() - 1)
+    assert queries == [("strobe", {}), ("strobe", {"type": win.cmb_type.currentText()})]
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from app.plan_set_analyzer import PlanSetAnalyzer
+
+
+def _write_sheet(path, n_devices):
+    ezdxf = pytest.importorskip("ezdxf")
+    doc = ezdxf.new()
+    doc.layers.add("FA-DEVICES")
+    doc.layers.add("WALLS")
+    msp = doc.modelspace()
+    for i in range(n_devices):
+        msp.add_circle((i * 10, 0), 1, dxfattribs={"layer": "FA-DEVICES"})
+    msp.add_line((0, 0), (100, 50), dxfattribs={"layer": "WALLS"})
+    doc.saveas(path)
+    return str(path)
+
+
+@pytest.fixture
+def plan_set(tmp_path):
+    return [_write_sheet(tmp_path / f"sheet{i}.dxf", i + 1) for i in range(4)]
+
+
+def test_pool_matches_serial_in_input_order(plan_set):
+    serial = PlanSetAnalyzer().analyze_plan_set(plan_set)
+    streamed = []
+    parallel = PlanSetAnalyzer(workers=2).analyze_plan_set(
+        plan_set, on_sheet=lambda i, s: streamed.append(i)
+    )
+    assert sorted(streamed) == [0, 1, 2, 3]
+    assert [s.filename for s in parallel.sheets] == [os.path.basename(p) for p in plan_set]
+    assert [s.device_count for s in parallel.sheets] == [1, 2, 3, 4]
+    assert parallel.total_devices == serial.total_devices == 10
+    assert parallel.layer_summary == serial.layer_summary == {"FA-DEVICES": 4}
+    assert parallel.combined_bounds == serial.combined_bounds
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs a FIFO to block a read")
+def test_sheet_timeout_reports_error_and_keeps_other_sheets(plan_set, tmp_path):
+    stuck = str(tmp_path / "stuck.dxf")
+    os.mkfifo(stuck)  # opening it for reading blocks forever
+    paths = [plan_set[0], stuck, plan_set[1]]
+    analysis = PlanSetAnalyzer(workers=2, sheet_timeout_s=2.0).analyze_plan_set(paths)
+    assert [s.filename for s in analysis.sheets] == ["sheet0.dxf", "sheet1.dxf"]
+    assert len(analysis.errors) == 1 and "stuck.dxf" in analysis.errors[0]
+    assert "timed out" in analysis.errors[0]
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs a FIFO to block a read")
+def test_sheets_queued_behind_stuck_ones_do_not_time_out(plan_set, tmp_path):
+    stuck = []
+    for name in ("stuck1.dxf", "stuck2.dxf"):
+        stuck.append(str(tmp_path / name))
+        os.mkfifo(stuck[-1])
+    # Both workers block first; the sheets behind them wait longer than the
+    # timeout in total but must still run on the fresh pool
+    paths = stuck + plan_set
+    analysis = PlanSetAnalyzer(workers=2, sheet_timeout_s=1.0).analyze_plan_set(paths)
+    assert [s.filename for s in analysis.sheets] == [os.path.basename(p) for p in plan_set]
+    assert len(analysis.errors) == 2 and all("timed out" in e for e in analysis.errors)
+
+
+def test_missing_file_becomes_error_sheet(tmp_path):
+    analysis = PlanSetAnalyzer(workers=2).analyze_plan_set(
+        [str(tmp_path / "a.dxf"), str(tmp_path / "b.dxf")]
+    )
+    assert analysis.sheet_count == 2
+    assert all(s.errors for s in analysis.sheets)
+
+
+def test_layer_histogram_single_pass(tmp_path):
+    ezdxf = pytest.importorskip("ezdxf")
+    doc = ezdxf.new()
+    doc.layers.add("FA-DEVICES")
+    doc.blocks.new("SMOKE").add_circle((0, 0), 0.5)
+    msp = doc.modelspace()
+    msp.add_blockref("SMOKE", (10, 10), dxfattribs={"layer": "FA-DEVICES"})
+    msp.add_blockref("SMOKE", (20, 5), dxfattribs={"layer": "fa-devices"})
+    msp.add_line((0, 0), (30, 0), dxfattribs={"layer": "WALLS"})
+    path = tmp_path / "sheet.dxf"
+    doc.saveas(path)
+
+    sheet = PlanSetAnalyzer()._analyze_single_sheet(str(path))
+    fa = sheet.layer_histogram["FA-DEVICES"]
+    assert fa.entity_types == {"INSERT": 1} and fa.block_names == {"SMOKE": 1}
+    assert fa.bbox == pytest.approx((9.5, 9.5, 10.5, 10.5))
+    assert sheet.layer_histogram["WALLS"].entity_types == {"LINE": 1}
+    # Entity layer names differing only in case count toward the fire layer
+    assert sheet.device_count == 2
+    assert (sheet.bounds.left(), sheet.bounds.top()) == pytest.approx((0.0, -10.5))
+    assert (sheet.bounds.right(), sheet.bounds.bottom()) == pytest.approx((30.0, 0.0))
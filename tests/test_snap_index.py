@@ -0,0 +1,77 @@
+from PySide6 import QtGui, QtWidgets
+
+from app.intersection_cache import IntersectionCache
+from app.snap_index import SNAP_CENTER, SNAP_END, SNAP_INTERSECT, SNAP_MID, SnapIndex
+
+ALL = {SNAP_END, SNAP_MID, SNAP_CENTER, SNAP_INTERSECT}
+
+
+def _nearest(idx, x, y, r=2.0, kinds=ALL):
+    hits = idx.query(x, y, r, kinds)
+    return hits[0][1:] if hits else None
+
+
+def test_line_endpoints_midpoint_and_intersection():
+    idx = SnapIndex(cell=8.0, intersections=IntersectionCache(background=False))
+    a = QtWidgets.QGraphicsLineItem(0, 0, 10, 10)
+    b = QtWidgets.QGraphicsLineItem(0, 10, 10, 0)
+    idx.sync([a, b])
+    assert _nearest(idx, 0.5, 0.5) == (0.0, 0.0)
+    assert _nearest(idx, 5.5, 5.5, kinds={SNAP_INTERSECT}) == (5.0, 5.0)
+    assert _nearest(idx, 2.6, 2.4, kinds={SNAP_MID}) is None
+    assert _nearest(idx, 5.2, 5.2, kinds={SNAP_MID}) == (5.0, 5.0)
+
+
+def test_sync_updates_moved_and_drops_removed_items():
+    idx = SnapIndex(cell=8.0, intersections=IntersectionCache(background=False))
+    a = QtWidgets.QGraphicsLineItem(0, 0, 10, 10)
+    b = QtWidgets.QGraphicsLineItem(0, 10, 10, 0)
+    idx.sync([a, b])
+    a.setPos(100, 0)
+    idx.sync([a, b])
+    assert _nearest(idx, 100.5, 0.5) == (100.0, 0.0)
+    assert _nearest(idx, 5.0, 5.0, kinds={SNAP_INTERSECT}) is None
+    idx.sync([b])
+    assert b in idx and a not in idx
+    assert _nearest(idx, 100.5, 0.5) is None
+
+
+def test_update_items_rechecks_only_the_given_items():
+    idx = SnapIndex(cell=8.0, intersections=IntersectionCache(background=False))
+    scene = QtWidgets.QGraphicsScene()
+    a = scene.addLine(0, 0, 10, 10)
+    b = scene.addLine(0, 10, 10, 0)
+    idx.sync([a, b])
+    a.setPos(100, 0)
+    b.setPos(0, 100)
+    idx.update_items([a])
+    assert _nearest(idx, 100.5, 0.5) == (100.0, 0.0)
+    assert _nearest(idx, 0.5, 10.5) == (0.0, 10.0)  # b was not re-checked
+    scene.removeItem(a)
+    idx.update_items([a])
+    assert a not in idx and b in idx
+
+
+def test_ellipse_center_and_path_vertices():
+    idx = SnapIndex(intersections=IntersectionCache(background=False))
+    circ = QtWidgets.QGraphicsEllipseItem(-5, -5, 10, 10)
+    path = QtGui.QPainterPath()
+    path.moveTo(20, 0)
+    path.lineTo(30, 0)
+    path.lineTo(30, 10)
+    poly = QtWidgets.QGraphicsPathItem(path)
+    idx.sync([circ, poly])
+    assert _nearest(idx, 0.5, 0.5) == (0.0, 0.0)
+    # interior vertex of the polyline, not just first/last element
+    assert _nearest(idx, 29.5, 0.5) == (30.0, 0.0)
+    assert _nearest(idx, 30.5, 5.0, kinds={SNAP_MID}) == (30.0, 5.0)
+
+
+def test_hidden_items_do_not_snap_and_perpendicular():
+    idx = SnapIndex(intersections=IntersectionCache(background=False))
+    line = QtWidgets.QGraphicsLineItem(0, 0, 100, 0)
+    idx.sync([line])
+    hits = idx.perpendicular(40.0, 3.0, 5.0)
+    assert hits and hits[0][1:] == (40.0, 0.0)
+    line.setVisible(False)
+    assert idx.query(0.5, 0.0, 2.0, ALL) == []